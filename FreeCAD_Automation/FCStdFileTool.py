@@ -3,8 +3,45 @@ IMPORT_FLAG:str = '--import'
 SILENT_FLAG:str = '--SILENT'
 CONFIG_FILE_FLAG:str = '--CONFIG-FILE' # Uses config file to determine configurations. Optionally provide path to config file. Args interpreted differently from what's listed in help()
 DIR_FLAG:str = '--dir'
+SYNC_ALL_FLAG:str = '--sync-all'
+JOBS_FLAG:str = '--jobs'
+VERIFY_FLAG:str = '--verify'
+RESOLVE_CHANGES_FLAG:str = '--resolve-changes'
+SCOPED_FLAG:str = '--scoped'
+LFS_PULL_FLAG:str = '--lfs-pull'
+LOCK_FLAG:str = '--lock'
+UNLOCK_FLAG:str = '--unlock'
+FORCE_FLAG:str = '--force'
+REFERENCE_FLAG:str = '--reference'
+ADVISE_COMPRESSION_FLAG:str = '--advise-compression'
+STAGE_FLAG:str = '--stage'
+CHECKOUT_FLAG:str = '--checkout'
+SHOW_FLAG:str = '--show'
+CACHE_STATS_FLAG:str = '--cache-stats'
+WATCH_FLAG:str = '--watch'
+SNAPSHOT_FLAG:str = '--snapshot'
+STATS_FLAG:str = '--stats'
+TOP_FLAG:str = '--top'
+JSON_FLAG:str = '--json'
+COMPILE_CONFIG_FLAG:str = '--compile-config'
+GC_FLAG:str = '--gc'
+DRY_RUN_FLAG:str = '--dry-run'
+BATCH_FLAG:str = '--batch'
+BATCH_IMPORT:str = 'import' # BATCH_FLAG modes
+BATCH_EXPORT:str = 'export'
+LOCK_HELD:str = 'locked' # Lock verdicts printed by RESOLVE_CHANGES_FLAG
+LOCK_NOT_HELD:str = 'not-locked'
+LOCK_NOT_REQUIRED:str = 'not-required'
+LOCK_REQUESTS_IN_FLIGHT:int = 8 # Default concurrent `git lfs lock`/`git lfs unlock` calls for LOCK_FLAG/UNLOCK_FLAG, bounded to not hammer the LFS server
+WATCH_DEBOUNCE_SECONDS:float = 2.0 # Quiet period after the last write to a .FCStd file before WATCH_FLAG exports it
+STATS_TOP_DEFAULT:int = 10 # Shards and models listed by STATS_FLAG unless TOP_FLAG is given
+JOB_BASE_MEMORY_BYTES:int = 256 * (1024 ** 2) # Estimated memory of an import/export before it reads the model (python + FreeCAD modules), see get_FCStd_job()
+JOB_MEMORY_AVAILABLE_FRACTION:float = 0.75 # `memory-budget-megabyte` 0 => This fraction of the memory available when the jobs start
+EXPORT_PIPELINE_QUEUE_SIZE:int = 8 # Max .FCStd entries buffered between the stages of a streaming export (see stream_FCStd_file_to_dir()), bounds its memory use
+CONFIG_SNAPSHOT_NAME:str = '.config-snapshot.json' # Written next to the config file, load_config_file() returns its parsed config while the config file's sha256 matches
+CONFIG_SHELL_SNAPSHOT_NAME:str = '.config-snapshot.sh' # Written next to the config file by COMPILE_CONFIG_FLAG, sourced by utils.sh and python.sh while newer than the config file
 HELP_MESSAGE:str =f"""
-usage: FCStdFileTool.py [{EXPORT_FLAG} INPUT_FCSTD_FILE OUTPUT_FCSTD_DIR] [{IMPORT_FLAG} INPUT_FCSTD_DIR OUTPUT_FCSTD_FILE] [{CONFIG_FILE_FLAG} [CONFIG_PATH] {EXPORT_FLAG} FCSTD_FILE] [{CONFIG_FILE_FLAG} [CONFIG_PATH] {IMPORT_FLAG} FCSTD_FILE] [{DIR_FLAG} FCStd_file_path]
+usage: FCStdFileTool.py [{EXPORT_FLAG} INPUT_FCSTD_FILE OUTPUT_FCSTD_DIR] [{IMPORT_FLAG} INPUT_FCSTD_DIR OUTPUT_FCSTD_FILE] [{CONFIG_FILE_FLAG} [CONFIG_PATH] {EXPORT_FLAG} FCSTD_FILE] [{CONFIG_FILE_FLAG} [CONFIG_PATH] {IMPORT_FLAG} FCSTD_FILE] [{DIR_FLAG} FCStd_file_path] [{CONFIG_FILE_FLAG} [CONFIG_PATH] {SYNC_ALL_FLAG} JOURNAL_PATH [{JOBS_FLAG} N]] [{CONFIG_FILE_FLAG} [CONFIG_PATH] {VERIFY_FLAG} FCSTD_FILE [FCSTD_FILE ...]] [{CONFIG_FILE_FLAG} [CONFIG_PATH] {RESOLVE_CHANGES_FLAG} [{SCOPED_FLAG}]] [{CONFIG_FILE_FLAG} [CONFIG_PATH] {LFS_PULL_FLAG}] [{CONFIG_FILE_FLAG} [CONFIG_PATH] {LOCK_FLAG} [{FORCE_FLAG}] [{JOBS_FLAG} N]] [{CONFIG_FILE_FLAG} [CONFIG_PATH] {UNLOCK_FLAG} [{FORCE_FLAG} | {REFERENCE_FLAG} REF] [{JOBS_FLAG} N]] [{CONFIG_FILE_FLAG} [CONFIG_PATH] {ADVISE_COMPRESSION_FLAG} [FCSTD_FILE ...]] [{CONFIG_FILE_FLAG} [CONFIG_PATH] {STAGE_FLAG} [{CHECKOUT_FLAG}]] [{CONFIG_FILE_FLAG} [CONFIG_PATH] {SHOW_FLAG} REV FCSTD_FILE OUTPUT_FCSTD_FILE] [{CONFIG_FILE_FLAG} [CONFIG_PATH] {CACHE_STATS_FLAG}] [{CONFIG_FILE_FLAG} [CONFIG_PATH] {WATCH_FLAG}] [{CONFIG_FILE_FLAG} [CONFIG_PATH] {SNAPSHOT_FLAG}] [{CONFIG_FILE_FLAG} [CONFIG_PATH] {STATS_FLAG} [FCSTD_FILE ...] [{REFERENCE_FLAG} REV] [{TOP_FLAG} N] [{JSON_FLAG}]] [{CONFIG_FILE_FLAG} [CONFIG_PATH] {COMPILE_CONFIG_FLAG}] [{CONFIG_FILE_FLAG} [CONFIG_PATH] {GC_FLAG} [{DRY_RUN_FLAG}]] [{CONFIG_FILE_FLAG} [CONFIG_PATH] {BATCH_FLAG} {{{BATCH_IMPORT},{BATCH_EXPORT}}} [{JOBS_FLAG} N] [{TOP_FLAG} N]]
 
 FreeCAD .FCStd file tool. Used to automate the process of importing and exporting .FCStd files.
 
@@ -31,6 +68,106 @@ options:
     {DIR_FLAG} FCStd_file_path
                         Print path to directory containing contents for the given FCStd file. Requires {CONFIG_FILE_FLAG}. Does not guarantee directory exists.
 
+    {SYNC_ALL_FLAG} JOURNAL_PATH
+                        Import every .FCStd file listed (NUL separated) on stdin in parallel. Requires {CONFIG_FILE_FLAG}.
+                        Progress is recorded in JOURNAL_PATH so an interrupted run resumes where it stopped, unchanged files are skipped.
+                        Imported .FCStd file paths are printed NUL separated to stdout.
+
+    {JOBS_FLAG} N
+                        Max number of worker processes for {SYNC_ALL_FLAG}/{BATCH_FLAG}. Defaults to `job-scheduling` `max-jobs` in the config file (0 => number of CPUs).
+                        Max number of lock requests in flight for {LOCK_FLAG}/{UNLOCK_FLAG}. Defaults to {LOCK_REQUESTS_IN_FLIGHT}.
+
+    {VERIFY_FLAG} FCSTD_FILE [FCSTD_FILE ...]
+                        Check if .FCStd files and their uncompressed directories contain the same data. Requires {CONFIG_FILE_FLAG}.
+                        Only zip central directories are read (CRC32s and sizes), nothing is decompressed or exported.
+                        Prints 'in-sync', 'stale' or 'missing' per file. Exits with 1 if any file isn't in sync.
+
+    {RESOLVE_CHANGES_FLAG}
+                        Read NUL separated changed paths (IE `git diff-tree -z --name-only`) on stdin. Requires {CONFIG_FILE_FLAG}.
+                        For every changed `.changefile` or .FCStd file print a NUL terminated, tab separated record:
+                            FCSTD_FILE DIR LOCKFILE LOCK_VERDICT
+                        FCSTD_FILE is empty if the `.changefile` doesn't exist (anymore).
+                        LOCK_VERDICT is '{LOCK_HELD}' (user holds the lock), '{LOCK_NOT_HELD}' or '{LOCK_NOT_REQUIRED}' (locking disabled in config).
+
+    {SCOPED_FLAG}
+                        With {RESOLVE_CHANGES_FLAG} or {SYNC_ALL_FLAG}, skip paths outside the configured `sync-scope` (include directories and sparse-checkout cone).
+
+    {LFS_PULL_FLAG}
+                        Read NUL separated .FCStd file paths on stdin and download the LFS files (compressed binary zips, shared store blobs)
+                        their imports need but are missing, with a single `git lfs pull --include` call. Requires {CONFIG_FILE_FLAG}.
+                        Note: Imports also pull their own missing LFS files, this just batches the download for many files.
+
+    {LOCK_FLAG}
+                        Read NUL separated .FCStd file paths on stdin and lock their `.lockfile`s concurrently. Requires {CONFIG_FILE_FLAG}.
+                        The lock table is read once, files already locked by the user are skipped. Locked .FCStd files are made writable.
+                        With {FORCE_FLAG}, locks held by other users are stolen. Exits with 1 if any file failed.
+
+    {UNLOCK_FLAG}
+                        Read NUL separated .FCStd file paths on stdin and unlock their `.lockfile`s concurrently. Requires {CONFIG_FILE_FLAG}.
+                        Files with changes between {REFERENCE_FLAG} REF and HEAD or with stashed changes are not unlocked, unless {FORCE_FLAG} is given.
+                        Unlocked .FCStd files are made readonly. Exits with 1 if any file failed.
+
+    {ADVISE_COMPRESSION_FLAG} [FCSTD_FILE ...]
+                        Benchmark compression methods and levels on the binaries (files matching `files-to-compress`) of the given .FCStd files,
+                        or of every tracked .FCStd file if none are given. Requires {CONFIG_FILE_FLAG}.
+                        Prints ratio and compress/decompress throughput per pattern, then a recommended config snippet
+                        with the expected export/import time and LFS size of the whole repository.
+
+    {STAGE_FLAG}
+                        Read NUL separated .FCStd file paths on stdin and export them straight into the git index. Requires {CONFIG_FILE_FLAG}.
+                        The uncompressed directory is built in memory (same result as {EXPORT_FLAG}), its files are written to the object database
+                        with a single `git fast-import` (LFS tracked files go through `git lfs clean`) and staged with a single `git update-index`.
+                        The .FCStd files are staged empty (same as the FCStd clean filter). Only `.changefile`/`.lockfile` are written to the working tree.
+                        Exits with 1 if any file failed.
+
+    {CHECKOUT_FLAG}
+                        With {STAGE_FLAG}, also update the uncompressed directories in the working tree from the index (`git checkout-index`).
+
+    {SHOW_FLAG} REV FCSTD_FILE OUTPUT_FCSTD_FILE
+                        Create OUTPUT_FCSTD_FILE from FCSTD_FILE's uncompressed directory as it was at revision REV. Requires {CONFIG_FILE_FLAG}.
+                        Git objects are read through a single `git cat-file --batch` stream, the working tree and index are not touched.
+                        LFS files are read from the local LFS store, missing ones are downloaded.
+
+    {CACHE_STATS_FLAG}
+                        Print size and hit/miss statistics of the import cache (`FCStd-import-cache` in the config file). Requires {CONFIG_FILE_FLAG}.
+
+    {WATCH_FLAG}
+                        Linux only. Run until interrupted, watching (inotify) the directories of tracked .FCStd files. Requires {CONFIG_FILE_FLAG}.
+                        When a writable .FCStd file the user holds the lock for is saved, it is exported in a low priority background worker
+                        once writes settle for {WATCH_DEBOUNCE_SECONDS} seconds. Only changed files in the uncompressed directory are rewritten,
+                        the `.changefile` is written last so the clean filter (`git add`) sees the .FCStd file as already exported.
+                        Files GitCAD wrote itself (imports, import cache and snapshot restores) are not exported again.
+
+    {SNAPSHOT_FLAG}
+                        Read NUL separated .FCStd file (or `.changefile`) paths on stdin and snapshot the .FCStd files into the import cache. Requires {CONFIG_FILE_FLAG}.
+                        Snapshots are keyed by a digest of the .FCStd file's contents. A later import of an uncompressed directory with the same
+                        contents (IE after `git fstash pop` or `git freset`) moves the snapshot back instead of rebuilding the .FCStd file.
+
+    {STATS_FLAG} [FCSTD_FILE ...]
+                        Print storage analytics of the given .FCStd files, or of every tracked .FCStd file if none are given. Requires {CONFIG_FILE_FLAG}.
+                        Per .FCStd file: raw (uncompressed) vs stored size of its uncompressed directory and the compression ratio,
+                        per `files-to-compress` pattern: compression ratio (only zip central directories are read),
+                        per compressed binary zip (shard): LFS object versions and bytes over the history of {REFERENCE_FLAG} REV (default: all refs, one `git log` call),
+                        and the top {TOP_FLAG} N (default {STATS_TOP_DEFAULT}) shards and models by churn (history bytes). With {JSON_FLAG}, print everything as JSON instead.
+
+    {COMPILE_CONFIG_FLAG}
+                        Validate the config file (listing every problem) and write its snapshots next to it. Requires {CONFIG_FILE_FLAG}.
+                        `{CONFIG_SNAPSHOT_NAME}` is loaded instead of parsing the config file while the config file's sha256 matches,
+                        `{CONFIG_SHELL_SNAPSHOT_NAME}` is sourced by utils.sh and python.sh (which run this when the config file is newer).
+
+    {GC_FLAG}
+                        Remove LFS objects of compressed binary zips (and shared store blobs) outside the `lfs-garbage-collection` retention window
+                        from the local LFS store. Requires {CONFIG_FILE_FLAG}. Only objects committed in the history of a remote-tracking ref (IE pushed) are removed,
+                        objects of the index, of commits not on any remote, of the recent commits of HEAD and the kept branches and of the stash are kept.
+                        With {DRY_RUN_FLAG}, list the objects and their size without removing them.
+
+    {BATCH_FLAG} {{{BATCH_IMPORT},{BATCH_EXPORT}}}
+                        Read NUL separated .FCStd file paths on stdin and import/export them in parallel. Requires {CONFIG_FILE_FLAG}.
+                        Largest files (size on disk) start first, concurrent jobs are limited by `job-scheduling` in the config file: {JOBS_FLAG} N (or `max-jobs`)
+                        and `memory-budget-megabyte` of estimated peak memory (from the uncompressed size of each model, only zip central directories are read).
+                        Prints the time, CPU time and peak memory of the {TOP_FLAG} N longest jobs at the end (same for {SYNC_ALL_FLAG}).
+                        Imported/exported .FCStd file paths are printed NUL separated to stdout. Exits with 1 if any file failed.
+
     {SILENT_FLAG}
                         Suppress all print statements. Nothing will be printed to console
 """
@@ -44,45 +181,428 @@ import zipfile
 import shutil
 import io
 import warnings
+import hashlib
+import zlib
+import time
+import concurrent.futures
+import subprocess
+import posixpath
+import random
+import math
+import tempfile
+import threading
+import queue
+import struct
+import select
+import shlex
+import ctypes
+import functools
 from pathlib import PurePosixPath
+from typing import Iterable, Iterator
 
 USER_RUNNING_LINUX_OS:bool = sys.platform.startswith('linux')
 
 CONFIG_PATH:str = 'FreeCAD_Automation/config.json'
+CONFIG_SNAPSHOT_VERSION:int = 3 # Bump when load_config_file() output or CONFIG_SCHEMA changes, older snapshots are then recompiled
+
+NUMBER:tuple = (int, float)
+CONFIG_SCHEMA:dict = { # Expected type of every config file key: bool, str, int, NUMBER, [str] (list of strings) or a nested schema
+    "require-lock-to-modify-FreeCAD-files": bool,
+    "include-thumbnails": bool,
+    "sync-scope": {
+        "include-directories": [str],
+        "respect-sparse-checkout": bool
+    },
+    "uncompressed-directory-structure": {
+        "uncompressed-directory-suffix": str,
+        "uncompressed-directory-prefix": str,
+        "subdirectory": {
+            "put-uncompressed-directory-in-subdirectory": bool,
+            "subdirectory-name": str
+        }
+    },
+    "FCStd-import-cache": {
+        "enabled": bool,
+        "max-size-megabyte": NUMBER
+    },
+    "concurrent-access": {
+        "wait-if-busy": bool,
+        "timeout-seconds": NUMBER
+    },
+    "lfs-garbage-collection": {
+        "keep-recent-commits": int,
+        "keep-branches": [str],
+        "keep-stash": bool
+    },
+    "job-scheduling": {
+        "max-jobs": int,
+        "memory-budget-megabyte": NUMBER
+    },
+    "compress-non-human-readable-FreeCAD-files": {
+        "enabled": bool,
+        "files-to-compress": [str],
+        "max-compressed-file-size-gigabyte": NUMBER,
+        "compression-method": str,
+        "compression-level": int,
+        "zip-file-prefix": str,
+        "delta-storage": {
+            "enabled": bool,
+            "files-to-store-uncompressed": [str],
+            "max-file-size-megabyte": NUMBER,
+            "text-files-only": bool
+        },
+        "shared-binary-store": {
+            "enabled": bool,
+            "store-directory": str
+        }
+    }
+}
+CONFIG_DEFAULTS:dict = { # Used for CONFIG_SCHEMA keys missing from the config file (IE config.json of a clone older than the key), same values as init-repo's default config.json
+    "require-lock-to-modify-FreeCAD-files": True,
+    "include-thumbnails": True,
+    "sync-scope": {
+        "include-directories": [],
+        "respect-sparse-checkout": True
+    },
+    "uncompressed-directory-structure": {
+        "uncompressed-directory-suffix": "_FCStd",
+        "uncompressed-directory-prefix": "FCStd_",
+        "subdirectory": {
+            "put-uncompressed-directory-in-subdirectory": True,
+            "subdirectory-name": "uncompressed"
+        }
+    },
+    "FCStd-import-cache": {
+        "enabled": True,
+        "max-size-megabyte": 1024
+    },
+    "concurrent-access": {
+        "wait-if-busy": True,
+        "timeout-seconds": 300
+    },
+    "lfs-garbage-collection": {
+        "keep-recent-commits": 10,
+        "keep-branches": ["main"],
+        "keep-stash": True
+    },
+    "job-scheduling": {
+        "max-jobs": 0,
+        "memory-budget-megabyte": 0
+    },
+    "compress-non-human-readable-FreeCAD-files": {
+        "enabled": True,
+        "files-to-compress": ["**/no_extension/*", "*.brp", "**/thumbnails/*", "*.Map.*", "*.Table.*"],
+        "max-compressed-file-size-gigabyte": 2,
+        "compression-method": "deflate",
+        "compression-level": 9,
+        "zip-file-prefix": "compressed_binaries_",
+        "delta-storage": {
+            "enabled": False,
+            "files-to-store-uncompressed": ["*.brp"],
+            "max-file-size-megabyte": 64,
+            "text-files-only": True
+        },
+        "shared-binary-store": {
+            "enabled": False,
+            "store-directory": "FreeCAD_Binary_Store"
+        }
+    }
+}
+SHELL_CONFIG_SCHEMA:dict = { # Keys only the shell scripts read, required by COMPILE_CONFIG_FLAG
+    "freecad-python-instance-path": str,
+    "require-GitCAD-activation": bool
+}
 
 NO_EXTENSION_SUBDIR_NAME:str = 'no_extension'
 
+SHARED_STORE_MANIFEST_NAME:str = '.shared_binaries'
+SHARED_STORE_MEMBER_NAME:str = 'blob'
+
+EXPORT_MANIFEST_NAME:str = '.manifest'
+EXPORT_MANIFEST_VERSION:int = 1 # Bump when the manifest format changes, older manifests are then ignored (directory is walked instead)
+FCSTD_COMPRESSION_LEVEL:int = 6 # zlib default level FreeCAD (and PU.createDocument()) deflate .FCStd members with
+
+VERIFY_IN_SYNC:str = 'in-sync'
+VERIFY_STALE:str = 'stale'
+VERIFY_MISSING:str = 'missing'
+
+LFS_POINTER_PREFIX:bytes = b'version https://git-lfs.github.com/spec/v1'
+LFS_POINTER_MAX_SIZE:int = 1024 # Git LFS never writes pointer files larger than this
+LFS_INCLUDE_MAX_LENGTH:int = 8000 # Keeps `git lfs pull --include=...` well below the Windows command line limit
+
+COMPRESSION_METHODS:dict = {"deflate": zipfile.ZIP_DEFLATED, "bzip2": zipfile.ZIP_BZIP2, "lzma": zipfile.ZIP_LZMA} # `compression-method` config values
+
+ADVISE_COMPRESSION_CANDIDATES:list = [("deflate", 1), ("deflate", 3), ("deflate", 6), ("deflate", 9), ("bzip2", 1), ("bzip2", 9), ("lzma", 9)] # (method, level), lzma ignores level
+ADVISE_COMPRESSION_SAMPLE_BYTES:int = 16 * (1024 ** 2) # Max bytes benchmarked per `files-to-compress` pattern
+ADVISE_COMPRESSION_TRANSFER_BYTES_PER_SECOND:float = 10 * (1024 ** 2) # Assumed LFS transfer speed used to weigh size against time
+
+IMPORT_CACHE_DIR_NAME:str = os.path.join('GitCAD', 'FCStd-import-cache') # Relative to `git rev-parse --git-common-dir`, shared by all worktrees
+IMPORT_CACHE_VERSION:int = 1 # Bump to invalidate every cached .FCStd file (IE when import output changes)
+SNAPSHOT_INDEX_NAME:str = 'snapshots.json' # In the import cache directory, FCStd directory path -> snapshots of its .FCStd file (see snapshot_FCStd_files())
+FICLONE:int = 0x40049409 # Linux ioctl, clones a file's extents (copy-on-write) on btrfs/XFS/bcachefs
+
+PROCESS_LOCK_DIR_NAME:str = os.path.join('GitCAD', 'locks') # Relative to `git rev-parse --git-common-dir`, advisory lock files of FCStdFileLock
+PROCESS_LOCK_POLL_SECONDS:float = 0.1 # Interval between attempts to take a busy FCStdFileLock
+PROCESS_LOCK_DEFAULT_TIMEOUT_SECONDS:float = 300 # FCStdFileLock wait when no config is provided
+
+WATCH_NICENESS:int = 10 # os.nice() increment of the WATCH_FLAG process
+IN_CLOSE_WRITE:int = 0x00000008 # inotify event masks, see `man inotify`
+IN_MOVED_TO:int = 0x00000080 # FreeCAD saves to a temporary file and renames it over the .FCStd file
+IN_Q_OVERFLOW:int = 0x00004000
+IN_CLOEXEC:int = 0o2000000
+
+ZIP_LOCAL_FILE_HEADER_SIGNATURE:bytes = b'PK\x03\x04'
+ZIP_LOCAL_FILE_HEADER_SIZE:int = 30
+ZIP_FLAG_DATA_DESCRIPTOR:int = 0x08 # CRC and sizes follow the member's data instead of being in its local header
+ZIPFILE_RAW_WRITE_ATTRIBUTES:tuple = ('_lock', '_writecheck', '_didModify', 'start_dir', 'fp', 'filelist', 'NameToInfo') # zipfile.ZipFile internals write_raw_zip_member() uses
+
+TEXT_DETECTION_BYTES:int = 8000 # Same number of leading bytes git inspects to decide if a file is binary
+
 INPUT_ARG:int = 0
 OUTPUT_ARG:int = 1
 
 WRITABLE:int = 0o644
 READONLY:int = 0o444
+DIRECTORY_MODE:int = 0o755 # tempfile.mkdtemp() creates 0o700 directories
+
+TEMP_NAME_PREFIX:str = '.GitCAD-' # Temporary files/directories next to .FCStd files and their directories, ignored (see init-repo)
+PREVIOUS_EXPORT_SUFFIX:str = '-previous' # Previous export while a new one is swapped in (see export_FCStd_file)
 
 DEBUG:bool = True
 def print_debug(message:str, endswith:str='\n'):
     if DEBUG: print(message, end=endswith)
 
+def get_config_schema_errors(data:dict, schema:dict, key_path:str="") -> list:
+    """
+    Checks config file data against a schema (see CONFIG_SCHEMA). Keys not in the schema are ignored.
+
+    Args:
+        data (dict): Parsed config file (or one of its nested objects).
+        schema (dict): Expected type of every key.
+        key_path (str): Dotted path of data in the config file, prefixed to reported keys.
+
+    Returns:
+        list: Error messages, empty if data matches the schema.
+    """
+    type_names:dict = {bool: "true or false", str: "a string", int: "an integer", NUMBER: "a number"}
+    
+    errors:list = []
+    for key, expected in schema.items():
+        key_name:str = f"{key_path}.{key}" if key_path else key
+        
+        if key not in data:
+            errors.append(f"'{key_name}' is missing")
+            continue
+        
+        value = data[key]
+        if isinstance(expected, dict):
+            if isinstance(value, dict): errors.extend(get_config_schema_errors(value, expected, key_name))
+            else: errors.append(f"'{key_name}' must be an object, got {json.dumps(value)}")
+        
+        elif isinstance(expected, list):
+            if not isinstance(value, list) or not all(isinstance(item, expected[0]) for item in value):
+                errors.append(f"'{key_name}' must be a list of strings, got {json.dumps(value)}")
+        
+        # Note: bool is a subclass of int => `true` isn't accepted as a number
+        elif not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+            errors.append(f"'{key_name}' must be {type_names[expected]}, got {json.dumps(value)}")
+    
+    return errors
+
+def merge_config_defaults(data:dict, defaults:dict, key_path:str="") -> tuple:
+    """
+    Fills in keys missing from config file data with their defaults (see CONFIG_DEFAULTS). Keys with the wrong type are left for validate_config() to report.
+
+    Args:
+        data (dict): Parsed config file (or one of its nested objects).
+        defaults (dict): Default value of every key.
+        key_path (str): Dotted path of data in the config file, prefixed to reported keys.
+
+    Returns:
+        tuple: (data with the missing keys filled in (data itself isn't modified), list of dotted names of the keys that were missing)
+    """
+    merged:dict = dict(data)
+    missing_keys:list = []
+    for key, default in defaults.items():
+        key_name:str = f"{key_path}.{key}" if key_path else key
+        
+        if key not in data:
+            merged[key] = json.loads(json.dumps(default)) # Copy, callers may modify the config
+            missing_keys.append(key_name)
+        elif isinstance(default, dict) and isinstance(data[key], dict):
+            merged[key], nested_missing_keys = merge_config_defaults(data[key], default, key_name)
+            missing_keys.extend(nested_missing_keys)
+    
+    return merged, missing_keys
+
+def validate_config(data:dict, config_path:str, require_shell_keys:bool=False):
+    """
+    Validates parsed config file data against CONFIG_SCHEMA (and SHELL_CONFIG_SCHEMA), then checks values the schema can't express.
+
+    Args:
+        data (dict): Parsed config file.
+        config_path (str): Path to config file, used in the error message.
+        require_shell_keys (bool): Also require the keys only the shell scripts read.
+
+    Raises:
+        ValueError: Config file doesn't match the schema. Every problem is listed.
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"ERR: Invalid config file '{config_path}': must be a JSON object.")
+    
+    errors:list = get_config_schema_errors(data, CONFIG_SCHEMA)
+    if require_shell_keys:
+        errors.extend(get_config_schema_errors(data, SHELL_CONFIG_SCHEMA))
+    
+    # Value checks: (dotted key, check, requirement). Keys that are missing or have the wrong type were already reported
+    compress_key:str = "compress-non-human-readable-FreeCAD-files"
+    value_checks:list = [
+        (f"{compress_key}.compression-method", lambda value: value in COMPRESSION_METHODS, f"must be one of {', '.join(json.dumps(method) for method in COMPRESSION_METHODS)}"),
+        (f"{compress_key}.compression-level", lambda value: 0 <= value <= 9, "must be between 0 and 9"),
+        (f"{compress_key}.max-compressed-file-size-gigabyte", lambda value: value > 0, "must be greater than 0"),
+        (f"{compress_key}.delta-storage.max-file-size-megabyte", lambda value: value >= 0, "must not be negative"),
+        ("FCStd-import-cache.max-size-megabyte", lambda value: value >= 0, "must not be negative"),
+        ("concurrent-access.timeout-seconds", lambda value: value >= 0, "must not be negative"),
+        ("lfs-garbage-collection.keep-recent-commits", lambda value: value >= 0, "must not be negative"),
+        ("job-scheduling.max-jobs", lambda value: value >= 0, "must not be negative"),
+        ("job-scheduling.memory-budget-megabyte", lambda value: value >= 0, "must not be negative")
+    ]
+    if require_shell_keys:
+        value_checks.append(("freecad-python-instance-path", lambda value: value != "", "must not be empty"))
+    
+    reported_keys:set = {error.split("'")[1] for error in errors}
+    for key_name, check, requirement in value_checks:
+        key_parts:list = key_name.split('.')
+        if any('.'.join(key_parts[:i]) in reported_keys for i in range(1, len(key_parts) + 1)): continue
+        
+        value = data
+        for key in key_parts:
+            value = value[key]
+        
+        if not check(value):
+            errors.append(f"'{key_name}' {requirement}, got {json.dumps(value)}")
+    
+    if errors:
+        raise ValueError(f"ERR: Invalid config file '{config_path}':\n" + "\n".join(f"    {error}" for error in errors))
+
+def get_shell_config_snapshot(data:dict, config_path:str, config_sha256:str) -> str:
+    """
+    Gets the contents of the shell snapshot of a validated config file: variable assignments sourced by utils.sh and python.sh.
+    """
+    def shell_bool(value:bool) -> int: return 0 if value else 1 # $TRUE / $FALSE in utils.sh
+    
+    return (f"# Generated by FCStdFileTool.py {COMPILE_CONFIG_FLAG} from {shlex.quote(os.path.basename(config_path))}, do not edit. Recompiled when the config file is newer.\n"
+            f"CONFIG_SNAPSHOT_SHA256={config_sha256}\n"
+            f"PYTHON_PATH={shlex.quote(data['freecad-python-instance-path'])}\n"
+            f"REQUIRE_LOCKS={shell_bool(data['require-lock-to-modify-FreeCAD-files'])}\n"
+            f"REQUIRE_GITCAD_ACTIVATION={shell_bool(data['require-GitCAD-activation'])}\n")
+
+def compile_config(config_path:str, config_bytes:bytes=None, shell_snapshot:bool=False) -> dict:
+    """
+    Validates the config file, then writes the snapshot load_config_file() reads next to it (CONFIG_SNAPSHOT_NAME).
+    Keys missing from the config file get their CONFIG_DEFAULTS value, with a warning listing them.
+    Both snapshots record the config file's mtime and sha256.
+
+    Args:
+        config_path (str): Path to config file.
+        config_bytes (bytes): Contents of the config file if already read.
+        shell_snapshot (bool): Also write the snapshot the shell scripts source (CONFIG_SHELL_SNAPSHOT_NAME), this requires the shell only keys.
+
+    Returns:
+        dict: Config file contents using redefined keys (see load_config_file()).
+
+    Raises:
+        ValueError: Config file isn't valid JSON or doesn't match CONFIG_SCHEMA.
+        OSError: Shell snapshot couldn't be written. A failed write of the python snapshot is ignored (it's only a cache).
+    """
+    if config_bytes is None:
+        with open(config_path, 'rb') as f:
+            config_bytes:bytes = f.read()
+    
+    try:
+        data:dict = json.loads(config_bytes)
+    except ValueError as e:
+        raise ValueError(f"ERR: Invalid config file '{config_path}': not valid JSON ({e})")
+    
+    # Note: Keys added after a clone's config.json was created are missing from it, they get their default instead of failing every git command
+    if isinstance(data, dict):
+        data, missing_keys = merge_config_defaults(data, CONFIG_DEFAULTS)
+        if missing_keys:
+            print(f"Warning: Config file '{config_path}' is missing keys, using their defaults (add them to silence this warning):", file=sys.stderr)
+            for key_name in missing_keys:
+                default = CONFIG_DEFAULTS
+                for key in key_name.split('.'):
+                    default = default[key]
+                print(f"    '{key_name}': {json.dumps(default)}", file=sys.stderr)
+    
+    validate_config(data, config_path, require_shell_keys=shell_snapshot)
+    config:dict = get_config_from_data(data)
+    
+    config_sha256:str = hashlib.sha256(config_bytes).hexdigest()
+    config_dir_path:str = os.path.dirname(config_path)
+    
+    snapshot:dict = {
+        "version": CONFIG_SNAPSHOT_VERSION,
+        "config-file": os.path.basename(config_path),
+        "mtime-ns": os.stat(config_path).st_mtime_ns,
+        "sha256": config_sha256,
+        "config": config
+    }
+    try:
+        write_file_atomically(os.path.join(config_dir_path, CONFIG_SNAPSHOT_NAME), json.dumps(snapshot).encode())
+    except OSError:
+        pass
+    
+    # Note: Written last => Newer than the config file, utils.sh only checks that (`-nt`, no process spawned)
+    if shell_snapshot:
+        write_file_atomically(os.path.join(config_dir_path, CONFIG_SHELL_SNAPSHOT_NAME), get_shell_config_snapshot(data, config_path, config_sha256).encode())
+    
+    return config
+
 def load_config_file(config_path:str) -> dict:
     """
     Redefines config file keys for this script.
     This way if the keys for the config file changes, it will not be necessary to update the keys throughout this entire script.
     Instead only the key names in this function need be updated.
+    The config file is only parsed and validated when its snapshot (see compile_config()) doesn't match its sha256.
 
     Args:
         config_path (str): Path to config file.
 
     Returns:
         dict: Config file contents using redefined keys.
+
+    Raises:
+        ValueError: Config file isn't valid JSON or doesn't match CONFIG_SCHEMA.
     """
+    with open(config_path, 'rb') as f:
+        config_bytes:bytes = f.read()
     
-    data:dict
-    with open(config_path, 'r') as f:
-        data:dict = json.load(f)
+    try:
+        with open(os.path.join(os.path.dirname(config_path), CONFIG_SNAPSHOT_NAME), 'r') as f:
+            snapshot:dict = json.load(f)
+        
+        if snapshot["version"] == CONFIG_SNAPSHOT_VERSION and snapshot["config-file"] == os.path.basename(config_path) and snapshot["sha256"] == hashlib.sha256(config_bytes).hexdigest():
+            return snapshot["config"]
+    
+    except (OSError, ValueError, KeyError, TypeError):
+        pass # Missing or unreadable snapshot => compile
+    
+    return compile_config(config_path, config_bytes)
 
+def get_config_from_data(data:dict) -> dict:
+    """
+    Maps validated config file data to the redefined keys used by this script (see load_config_file()).
+    """
     return {
         "require_lock": data["require-lock-to-modify-FreeCAD-files"],
         "include_thumbnails": data["include-thumbnails"],
 
+        "sync_scope": {
+            "include_directories": data["sync-scope"]["include-directories"],
+            "respect_sparse_checkout": data["sync-scope"]["respect-sparse-checkout"]
+        },
+
         "uncompressed_directory_structure": {
             "uncompressed_directory_suffix": data["uncompressed-directory-structure"]["uncompressed-directory-suffix"],
             "uncompressed_directory_prefix": data["uncompressed-directory-structure"]["uncompressed-directory-prefix"],
@@ -92,12 +612,44 @@ def load_config_file(config_path:str) -> dict:
             }
         },
 
+        "import_cache": {
+            "enabled": data["FCStd-import-cache"]["enabled"],
+            "max_size_megabyte": data["FCStd-import-cache"]["max-size-megabyte"]
+        },
+
+        "concurrent_access": {
+            "wait_if_busy": data["concurrent-access"]["wait-if-busy"],
+            "timeout_seconds": data["concurrent-access"]["timeout-seconds"]
+        },
+
+        "lfs_gc": {
+            "keep_recent_commits": data["lfs-garbage-collection"]["keep-recent-commits"],
+            "keep_branches": data["lfs-garbage-collection"]["keep-branches"],
+            "keep_stash": data["lfs-garbage-collection"]["keep-stash"]
+        },
+
+        "job_scheduling": {
+            "max_jobs": data["job-scheduling"]["max-jobs"],
+            "memory_budget_megabyte": data["job-scheduling"]["memory-budget-megabyte"]
+        },
+
         "compress_binaries": {
             "enabled": data["compress-non-human-readable-FreeCAD-files"]["enabled"],
             "binary_file_patterns": data["compress-non-human-readable-FreeCAD-files"]["files-to-compress"],
             "max_compressed_file_size_gigabyte": data["compress-non-human-readable-FreeCAD-files"]["max-compressed-file-size-gigabyte"],
+            "compression_method": data["compress-non-human-readable-FreeCAD-files"]["compression-method"],
             "compression_level": data["compress-non-human-readable-FreeCAD-files"]["compression-level"],
-            "zip_file_prefix": data["compress-non-human-readable-FreeCAD-files"]["zip-file-prefix"]
+            "zip_file_prefix": data["compress-non-human-readable-FreeCAD-files"]["zip-file-prefix"],
+            "delta_storage": {
+                "enabled": data["compress-non-human-readable-FreeCAD-files"]["delta-storage"]["enabled"],
+                "file_patterns": data["compress-non-human-readable-FreeCAD-files"]["delta-storage"]["files-to-store-uncompressed"],
+                "max_file_size_megabyte": data["compress-non-human-readable-FreeCAD-files"]["delta-storage"]["max-file-size-megabyte"],
+                "text_files_only": data["compress-non-human-readable-FreeCAD-files"]["delta-storage"]["text-files-only"]
+            },
+            "shared_store": {
+                "enabled": data["compress-non-human-readable-FreeCAD-files"]["shared-binary-store"]["enabled"],
+                "store_directory": data["compress-non-human-readable-FreeCAD-files"]["shared-binary-store"]["store-directory"]
+            }
         }
     }
 
@@ -113,24 +665,49 @@ def parseArgs() -> argparse.Namespace:
     parser.add_argument(IMPORT_FLAG, dest='import_flag', nargs='+')
     parser.add_argument(CONFIG_FILE_FLAG, dest="config_file_path", nargs='?', const=CONFIG_PATH, default=None)
     parser.add_argument(DIR_FLAG, dest='dir_flag', nargs=1)
+    parser.add_argument(SYNC_ALL_FLAG, dest='sync_all_flag', nargs=1)
+    parser.add_argument(VERIFY_FLAG, dest='verify_flag', nargs='+')
+    parser.add_argument(RESOLVE_CHANGES_FLAG, dest='resolve_changes_flag', action='store_true')
+    parser.add_argument(SCOPED_FLAG, dest='scoped_flag', action='store_true')
+    parser.add_argument(LFS_PULL_FLAG, dest='lfs_pull_flag', action='store_true')
+    parser.add_argument(LOCK_FLAG, dest='lock_flag', action='store_true')
+    parser.add_argument(UNLOCK_FLAG, dest='unlock_flag', action='store_true')
+    parser.add_argument(FORCE_FLAG, dest='force_flag', action='store_true')
+    parser.add_argument(REFERENCE_FLAG, dest='reference', default=None)
+    parser.add_argument(SHOW_FLAG, dest='show_flag', nargs=3)
+    parser.add_argument(CACHE_STATS_FLAG, dest='cache_stats_flag', action='store_true')
+    parser.add_argument(WATCH_FLAG, dest='watch_flag', action='store_true')
+    parser.add_argument(SNAPSHOT_FLAG, dest='snapshot_flag', action='store_true')
+    parser.add_argument(STATS_FLAG, dest='stats_flag', nargs='*', default=None)
+    parser.add_argument(TOP_FLAG, dest='top', type=int, default=STATS_TOP_DEFAULT)
+    parser.add_argument(JSON_FLAG, dest='json_flag', action='store_true')
+    parser.add_argument(COMPILE_CONFIG_FLAG, dest='compile_config_flag', action='store_true')
+    parser.add_argument(GC_FLAG, dest='gc_flag', action='store_true')
+    parser.add_argument(DRY_RUN_FLAG, dest='dry_run_flag', action='store_true')
+    parser.add_argument(BATCH_FLAG, dest='batch_mode', choices=[BATCH_IMPORT, BATCH_EXPORT], default=None)
+    parser.add_argument(STAGE_FLAG, dest='stage_flag', action='store_true')
+    parser.add_argument(CHECKOUT_FLAG, dest='checkout_flag', action='store_true')
+    parser.add_argument(ADVISE_COMPRESSION_FLAG, dest='advise_compression_flag', nargs='*', default=None)
+    parser.add_argument(JOBS_FLAG, dest='num_jobs', type=int, default=None)
     parser.add_argument(SILENT_FLAG, dest="silent_flag", action='store_true')
     parser.add_argument("-h", "--help", dest="help_flag", action="store_true")
     
     return parser.parse_args()
 
-def get_FCStd_dir_path(FCStd_file_path:str, config:dict) -> str:
+def get_FCStd_dir_path(FCStd_file_path:str, config:dict, check_exists:bool=True) -> str:
     """
     Gets path to uncompressed FCStd file directory according to set configurations.
 
     Args:
         FCStd_file_path (str): Path to .FCStd file.
         config (dict): Configurations dictionary.
+        check_exists (bool): Raise FileNotFoundError if the .FCStd file doesn't exist. Disable for files that only exist in git history (IE deleted files).
 
     Returns:
         str: Path to uncompressed FCStd file directory.
     """
     # Fix for https://github.com/MikeOpsGit/GitCAD/issues/2
-    if not os.path.exists(FCStd_file_path):
+    if check_exists and not os.path.exists(FCStd_file_path):
         raise FileNotFoundError(f"ERR: FCStd file '{FCStd_file_path}' does not exist.")
     
     # Load relevant configs
@@ -145,9 +722,11 @@ def get_FCStd_dir_path(FCStd_file_path:str, config:dict) -> str:
     FCStd_file_name:str = os.path.splitext(os.path.basename(FCStd_file_path))[0] # remove .FCStd extension
     FCStd_constructed_dir_name:str = f"{prefix}{FCStd_file_name}{suffix}"
     
-    if USE_SUBDIR: return os.path.relpath(os.path.join(FCStd_file_dir, subdir_name, FCStd_constructed_dir_name))
-    
-    else: return os.path.relpath(os.path.join(FCStd_file_dir, FCStd_constructed_dir_name))
+    FCStd_dir_path:str = os.path.join(FCStd_file_dir, subdir_name, FCStd_constructed_dir_name) if USE_SUBDIR else os.path.join(FCStd_file_dir, FCStd_constructed_dir_name)
+    try:
+        return os.path.relpath(FCStd_dir_path)
+    except ValueError:
+        return os.path.normpath(FCStd_dir_path) # Windows: on another drive than the current directory (IE the FreeCAD add-on)
 
 # * Legacy function. Maybe it'll come in use again in the future
 def get_FCStd_file_path(FCStd_dir_path:str, config:dict) -> str:
@@ -203,24 +782,80 @@ def add_thumbnail_to_FCStd_file(FCStd_dir_path:str, FCStd_file_path:str):
         with zipfile.ZipFile(FCStd_file_path, 'a', zipfile.ZIP_DEFLATED) as zf:
             zf.write(thumbnail_path, 'thumbnails/Thumbnail.png')
 
-def compress_binaries(FCStd_dir_path:str, config:dict):
+def is_text_file(file_path:str) -> bool:
+    """
+    Guesses if a file is human-readable text the same way git does, by checking the start of the file for NUL bytes.
+
+    Args:
+        file_path (str): Path to file to check.
+
+    Returns:
+        bool: True if file looks like text, else False.
+    """
+    with open(file_path, 'rb') as f:
+        return b'\0' not in f.read(TEXT_DETECTION_BYTES)
+
+def is_delta_storage_candidate(item_full_path, posix_path:PurePosixPath, config:dict) -> bool:
+    """
+    Checks if a file that would otherwise be compressed should instead be left uncompressed and tracked as a plain git blob.
+    Small edits to such files are then stored by git as small pack deltas instead of as a whole new LFS object.
+
+    Args:
+        item_full_path (str | bytes): Path to file on disk, or the file contents.
+        posix_path (PurePosixPath): Path to file relative to the FCStd directory (rooted at '/') used for pattern matching.
+        config (dict): Configuration dictionary.
+
+    Returns:
+        bool: True if file should be stored uncompressed, else False.
+    """
+    delta_config:dict = config['compress_binaries']['delta_storage']
+    if not delta_config['enabled']: return False
+    
+    if not any(posix_path.match(pattern) for pattern in delta_config['file_patterns']): return False
+    
+    max_size_bytes:float = delta_config['max_file_size_megabyte'] * (1024 ** 2)
+    item_size:int = len(item_full_path) if isinstance(item_full_path, bytes) else os.path.getsize(item_full_path)
+    if item_size > max_size_bytes: return False
+    
+    if delta_config['text_files_only']:
+        is_text:bool = b'\0' not in item_full_path[:TEXT_DETECTION_BYTES] if isinstance(item_full_path, bytes) else is_text_file(item_full_path)
+        if not is_text: return False
+    
+    return True
+
+def is_compressed_on_export(item, posix_path:PurePosixPath, config:dict) -> bool:
+    """
+    Checks if a file is compressed on export: it matches a `files-to-compress` pattern and isn't left uncompressed for delta storage (see is_delta_storage_candidate()).
+
+    Args:
+        item (str | bytes): Path to file on disk, or the file contents.
+        posix_path (PurePosixPath): Path to file relative to the FCStd directory (rooted at '/') used for pattern matching.
+        config (dict): Configuration dictionary.
+
+    Returns:
+        bool: True if file is compressed, else False.
+    """
+    for pattern in config['compress_binaries']['binary_file_patterns']:
+        if posix_path.match(pattern):
+            return not is_delta_storage_candidate(item, posix_path, config)
+    
+    return False
+
+def compress_binaries(FCStd_dir_path:str, config:dict, previous_zip_paths:list=None):
     """
     Compresses binary files and folders in the FCStd directory that match the configured patterns.
     Uses io.BytesIO buffers to manage and size limits. Files are removed after compression
+    Files selected for delta storage (see is_delta_storage_candidate()) are left uncompressed.
 
     Args:
         FCStd_dir_path (str): Path to the FCStd directory.
         config (dict): Configuration dictionary.
+        previous_zip_paths (list): Zip files of the previous export. Compressed data of unchanged files is copied from them instead of recompressed.
     """
     assert config['compress_binaries']['enabled'], "Error: Attempting to compress binaries despite that config being disabled!"
 
-    patterns:list = config['compress_binaries']['binary_file_patterns']
-    max_size_gb:float = config['compress_binaries']['max_compressed_file_size_gigabyte']
-    compression_level:int = config['compress_binaries']['compression_level']
     zip_file_prefix:str = config['compress_binaries']['zip_file_prefix']
 
-    max_size_bytes:float = max_size_gb * (1024 ** 3)
-
     # Collect items to compress
     to_compress:list = []
     for root, _, files in os.walk(FCStd_dir_path):
@@ -229,40 +864,205 @@ def compress_binaries(FCStd_dir_path:str, config:dict):
             item_rel_path:str = os.path.relpath(item_full_path, start=FCStd_dir_path)
             posix_path:PurePosixPath = PurePosixPath('/' + item_rel_path.replace(os.sep, '/'))
             
-            for pattern in patterns:
-                if posix_path.match(pattern):
-                    to_compress.append(item_full_path)
-                    break
+            if is_compressed_on_export(item_full_path, posix_path, config):
+                to_compress.append(item_full_path)
+
+    # Deduplicate items into repository wide store instead of this directory's zip files
+    if config['compress_binaries']['shared_store']['enabled']:
+        add_files_to_shared_store(FCStd_dir_path, to_compress, config)
+        return
 
     # Compress items into zip files
     zip_index:int = 1
+    reusable_members:dict = get_reusable_zip_members(previous_zip_paths or [], config)
+    for zip_data in pack_files_into_zips([(os.path.relpath(path=item, start=FCStd_dir_path), item) for item in to_compress], config, reusable_members):
+        zip_index:int = write_zip_to_disk(FCStd_dir_path, zip_file_prefix, zip_index, io.BytesIO(zip_data))
+    
+    for item in to_compress:
+        os.remove(item)
+
+def get_zip_settings_comment(config:dict) -> bytes:
+    """
+    Gets the archive comment recording the compression settings a zip was written with (the zip format doesn't store the level).
+    """
+    return f"GitCAD compression-method={config['compress_binaries']['compression_method']} compression-level={config['compress_binaries']['compression_level']}".encode()
+
+def get_file_sha256(item) -> str:
+    """
+    Args:
+        item (str | bytes): Path to file on disk, or the file contents.
+    """
+    if isinstance(item, bytes): return hashlib.sha256(item).hexdigest()
+    
+    digest = hashlib.sha256()
+    with open(item, 'rb') as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def get_reusable_zip_members(zip_paths:list, config:dict) -> dict:
+    """
+    Indexes the members of previously written zip files (see pack_files_into_zips()) by the sha256 stored in their member comment.
+    Only zips written with the current compression settings are indexed. Unreadable zips (IE LFS pointers) are skipped.
+
+    Args:
+        zip_paths (list): Paths to zip files.
+        config (dict): Configuration dictionary.
+
+    Returns:
+        dict: sha256 hex digest of the uncompressed member -> (zip path, zipfile.ZipInfo).
+    """
+    settings_comment:bytes = get_zip_settings_comment(config)
+    
+    reusable:dict = {}
+    for zip_path in zip_paths:
+        try:
+            with zipfile.ZipFile(zip_path, 'r') as zf:
+                if zf.comment != settings_comment: continue
+                
+                for info in zf.infolist():
+                    if info.is_dir() or len(info.comment) != 64: continue
+                    reusable.setdefault(info.comment.decode(), (zip_path, info))
+        except (OSError, zipfile.BadZipFile):
+            continue
+    
+    return reusable
+
+def read_raw_zip_member(zip_path:str, info:zipfile.ZipInfo) -> bytes:
+    """
+    Reads a zip member's compressed data as stored in the zip, without decompressing it.
+
+    Raises:
+        zipfile.BadZipFile: If the member's local header is invalid.
+    """
+    with open(zip_path, 'rb') as f:
+        f.seek(info.header_offset)
+        header:bytes = f.read(ZIP_LOCAL_FILE_HEADER_SIZE)
+        if len(header) != ZIP_LOCAL_FILE_HEADER_SIZE or not header.startswith(ZIP_LOCAL_FILE_HEADER_SIGNATURE):
+            raise zipfile.BadZipFile(f"ERR: Bad local file header for '{info.filename}' in '{zip_path}'.")
+        
+        name_length, extra_length = struct.unpack('<HH', header[26:30])
+        f.seek(info.header_offset + ZIP_LOCAL_FILE_HEADER_SIZE + name_length + extra_length)
+        return f.read(info.compress_size)
+
+def write_raw_zip_member(zf:zipfile.ZipFile, path_in_zip:str, source_zip_path:str, source_info:zipfile.ZipInfo, comment:bytes=None):
+    """
+    Copies a member of another zip into an open (write/append mode) zip without recompressing it.
+    Note: zipfile has no public API for this, this mirrors what zipfile.ZipFile.open(mode='w') does before/after compressing.
+          If this python's zipfile lacks the internals it needs (ZIPFILE_RAW_WRITE_ATTRIBUTES), the member is decompressed and compressed again instead.
+
+    Args:
+        zf (zipfile.ZipFile): Zip to write to.
+        path_in_zip (str): Member name.
+        source_zip_path (str): Path to the zip the member is copied from.
+        source_info (zipfile.ZipInfo): Member info in the zip it is copied from.
+        comment (bytes): Member comment. None to keep the source member's comment.
+
+    Raises:
+        zipfile.BadZipFile: If the member's local header is invalid.
+    """
+    info:zipfile.ZipInfo = zipfile.ZipInfo(path_in_zip, date_time=source_info.date_time)
+    info.compress_type = source_info.compress_type
+    info.external_attr = source_info.external_attr
+    info.comment = source_info.comment if comment is None else comment
+    zip64:bool = max(source_info.file_size, source_info.compress_size) > zipfile.ZIP64_LIMIT
+    
+    if not all(hasattr(zf, attribute) for attribute in ZIPFILE_RAW_WRITE_ATTRIBUTES) or getattr(zf, '_writing', False):
+        # Note: zf.open() only applies zf's compression level to names, a ZipInfo brings its own (zlib's default if unset)
+        if hasattr(info, 'compress_level'): info.compress_level = zf.compresslevel # python 3.13+
+        else: info._compresslevel = zf.compresslevel
+        with zipfile.ZipFile(source_zip_path, 'r') as source_zf, source_zf.open(source_info) as src, zf.open(info, 'w', force_zip64=zip64) as dst:
+            shutil.copyfileobj(src, dst)
+        return
+    
+    raw_data:bytes = read_raw_zip_member(source_zip_path, source_info)
+    info.flag_bits = source_info.flag_bits & ~ZIP_FLAG_DATA_DESCRIPTOR # CRC and sizes are known, written in the local header
+    info.CRC = source_info.CRC
+    info.compress_size = source_info.compress_size
+    info.file_size = source_info.file_size
+    
+    with zf._lock:
+        zf.fp.seek(zf.start_dir)
+        info.header_offset = zf.fp.tell()
+        zf._writecheck(info)
+        zf._didModify = True
+        
+        zf.fp.write(info.FileHeader(zip64))
+        zf.fp.write(raw_data)
+        
+        zf.filelist.append(info)
+        zf.NameToInfo[info.filename] = info
+        zf.start_dir = zf.fp.tell()
+
+def pack_files_into_zips(items:Iterable, config:dict, reusable_members:dict=None) -> Iterator:
+    """
+    Compresses files into as few zip files as possible without any zip exceeding `max-compressed-file-size-gigabyte`.
+    Uses io.BytesIO buffers to manage size limits.
+    Each member's comment is the sha256 of its contents, so the next export can copy the compressed data of unchanged files
+    (see get_reusable_zip_members()) instead of compressing them again.
+    Items are consumed lazily and each zip is yielded as soon as it is full, so items can be streamed in (see stream_FCStd_file_to_dir()).
+
+    Args:
+        items (Iterable): (path in zip, path to file on disk or file contents as bytes) tuples.
+        config (dict): Configuration dictionary.
+        reusable_members (dict): sha256 -> (zip path, zipfile.ZipInfo) of previously compressed files, see get_reusable_zip_members().
+
+    Yields:
+        bytes: Contents of each zip file.
+    """
+    max_size_gb:float = config['compress_binaries']['max_compressed_file_size_gigabyte']
+    compression_method:int = COMPRESSION_METHODS[config['compress_binaries']['compression_method']]
+    compression_level:int = config['compress_binaries']['compression_level']
+
+    max_size_bytes:float = max_size_gb * (1024 ** 3)
+    settings_comment:bytes = get_zip_settings_comment(config)
+
+    items:Iterator = iter(items)
     current_zip:io.BytesIO = io.BytesIO()
-    i:int = 0
+    current_item:tuple = next(items, None)
     isRecompressingFile:bool = False
     wasRecompressingFile:bool = False
-    while (i < len(to_compress)):
-        item:str = to_compress[i]
+    while (current_item is not None):
+        path_to_item_in_zip, item = current_item
         
         if isRecompressingFile and wasRecompressingFile:
-            raise ValueError(f"ERR: Config Max Zip Size='{max_size_gb}' GB and Compression Level='{compression_level}' is too small for '{os.path.basename(item)}' with size='{os.path.getsize(item)/(1024 ** 3)}' GB.")
+            item_size:int = len(item) if isinstance(item, bytes) else os.path.getsize(item)
+            raise ValueError(f"ERR: Config Max Zip Size='{max_size_gb}' GB and Compression Level='{compression_level}' is too small for '{os.path.basename(path_to_item_in_zip)}' with size='{item_size/(1024 ** 3)}' GB.")
         
         # Backup before adding
         backup:io.BytesIO = io.BytesIO(current_zip.getvalue())
-        path_to_item_in_zip:str = os.path.relpath(path=item, start=FCStd_dir_path)
         
-        assert not os.path.isdir(item), "ERR: Only individual files should be matched."
+        assert isinstance(item, bytes) or not os.path.isdir(item), "ERR: Only individual files should be matched."
         
-        if os.path.isfile(item):
+        if isinstance(item, bytes) or os.path.isfile(item):
+            item_sha256:str = get_file_sha256(item)
+            
             # Add file
-            with zipfile.ZipFile(current_zip, 'a', zipfile.ZIP_DEFLATED, compresslevel=compression_level) as zf:
-                zf.write(item, path_to_item_in_zip)
+            with zipfile.ZipFile(current_zip, 'a', compression_method, compresslevel=compression_level) as zf:
+                zf.comment = settings_comment
+                
+                reused:bool = False
+                if item_sha256 in (reusable_members or {}):
+                    zip_path, source_info = reusable_members[item_sha256]
+                    try:
+                        write_raw_zip_member(zf, path_to_item_in_zip, zip_path, source_info)
+                        reused:bool = True
+                    except (OSError, zipfile.BadZipFile):
+                        pass # Compress it instead
+                
+                if not reused:
+                    if isinstance(item, bytes):
+                        zf.writestr(path_to_item_in_zip, item)
+                    else:
+                        zf.write(item, path_to_item_in_zip)
+                    zf.filelist[-1].comment = item_sha256.encode()
             
             if current_zip.tell() > max_size_bytes:
                 # Restore
                 current_zip:io.BytesIO = backup
                 
-                # Write to disk
-                zip_index:int = write_zip_to_disk(FCStd_dir_path, zip_file_prefix, zip_index, current_zip)
+                # Finish this zip
+                yield current_zip.getvalue()
                 
                 # New buffer
                 current_zip:io.BytesIO = io.BytesIO()
@@ -272,211 +1072,3683 @@ def compress_binaries(FCStd_dir_path:str, config:dict):
                 isRecompressingFile:bool = True
                 continue
             
-            # Remove file
-            os.remove(item)
-            
         isRecompressingFile:bool = False
         wasRecompressingFile:bool = False
-        i += 1
+        current_item:tuple = next(items, None)
         # End of while loop
 
-    # Write last opened archive (that didn't exceed size) to disk
+    # Last opened archive (that didn't exceed size)
     if current_zip.tell() > 0:
-        zip_index:int = write_zip_to_disk(FCStd_dir_path, zip_file_prefix, zip_index, current_zip)
+        yield current_zip.getvalue()
 
-def write_zip_to_disk(FCStd_dir_path:str, zip_file_prefix:str, zip_index:int, current_zip:io.BytesIO) -> int:
+def get_shared_store_blob_path(sha256:str, config:dict, repo_relative:bool=False, repo_root:str=None) -> str:
     """
-    Writes current_zip to disk (from memory).
-    Zip files are named f"{zip_file_prefix}{zip_index}.zip".
+    Gets path to a blob in the shared binary store. Blobs are sharded into subdirectories by the first 2 characters of their hash (like .git/objects).
+    `store-directory` is relative to the repository root, not the current directory.
 
     Args:
-        FCStd_dir_path (str): Path were to write zip file to on disk.
-        zip_file_prefix (str): Prefix for zip file name.
-        zip_index (int): Index/iterator of current zip file name being written. This function is called by compress_binaries(), 
-                         so the zip_index is essentially the only unique part of the name for each zip file created by compress_binaries().
-        current_zip (io.BytesIO): Zip file being written to disk.
+        sha256 (str): sha256 hex digest of the uncompressed blob content.
+        config (dict): Configuration dictionary.
+        repo_relative (bool): Return the path relative to the repository root ('/' separated, IE for `git cat-file` or the index) instead of an absolute path.
+        repo_root (str): Repository root. None => root of the current directory's repository.
 
     Returns:
-        int: next zip_index for next time this function is called. Essentially it's zip_index + 1.
+        str: Path to the blob's zip file.
     """
-    zip_name:str = f"{zip_file_prefix}{zip_index}.zip"
-    zip_path:str = os.path.join(FCStd_dir_path, zip_name)
-    with open(zip_path, 'wb') as f:
-        f.write(current_zip.getvalue())
-        f.flush()
-        os.fsync(f.fileno())
-    zip_index += 1
-    return zip_index
+    repo_root:str = get_repo_root(os.getcwd()) if repo_root is None else repo_root
+    blob_path:str = os.path.join(repo_root, config['compress_binaries']['shared_store']['store_directory'], sha256[:2], f"{sha256}.zip")
+    if repo_relative:
+        return os.path.relpath(blob_path, repo_root).replace(os.sep, '/')
+    return blob_path
 
-def repackFCStd(FCStd_file_path:str):
+def add_files_to_shared_store(FCStd_dir_path:str, to_compress:list, config:dict):
     """
-    Recreates a provided .FCStd file by copying the contents and the order of the contents.
-    Then recreating the .FCStd file from the copied contents.
-    
-    The this mainly serves to fix this issue: https://github.com/FreeCAD/FreeCAD/issues/23914
+    Adds files to the repository wide content-addressed binary store and records them in the directory's SHARED_STORE_MANIFEST_NAME file.
+    Content already in the store (IE an identical shape in another .FCStd file) is not compressed or stored again.
+    Files are removed after being added to the store.
 
     Args:
-        FCStd_file_path (str): Path to .FCStd file that needs to be repacked.
+        FCStd_dir_path (str): Path to the FCStd directory.
+        to_compress (list): Paths to files to add to the store.
+        config (dict): Configuration dictionary.
     """
-    namelist:list = None
-    file_data:dict = {}
-    with zipfile.ZipFile(FCStd_file_path, 'r') as zf:
-        namelist = zf.namelist()
-        for file_name in namelist:
-            if file_name == "./": continue
-            
-            with zf.open(file_name) as f:
-                file_data[file_name] = f.read()
+    manifest:dict = {}
+    for item in to_compress:
+        with open(item, 'rb') as f:
+            data:bytes = f.read()
+        
+        path_to_item_in_dir:str = os.path.relpath(path=item, start=FCStd_dir_path).replace(os.sep, '/')
+        manifest[path_to_item_in_dir] = add_blob_to_shared_store(data, config)
+        
+        os.remove(item)
     
-    with open(FCStd_file_path, 'wb') as f:
-        with zipfile.ZipFile(f, 'w', zipfile.ZIP_DEFLATED) as zf:
-            for file_name in namelist:
-                if file_name == "./": continue
-                
-                zf.writestr(file_name, file_data[file_name])
-        f.flush()
-        os.fsync(f.fileno())
+    if not manifest: return
+    
+    write_file_atomically(os.path.join(FCStd_dir_path, SHARED_STORE_MANIFEST_NAME), format_shared_store_manifest(manifest).encode())
 
-def move_files_without_extension_to_subdir(FCStd_dir_path:str):
+def add_blob_to_shared_store(data:bytes, config:dict) -> dict:
     """
-    Moves files without extensions from FCStd_dir_path to a subdirectory named NO_EXTENSION_SUBDIR_NAME.
-    
+    Adds file contents to the shared binary store, unless the store already has them.
+
     Args:
-        FCStd_dir_path (str): Path to the FCStd directory.
+        data (bytes): File contents.
+        config (dict): Configuration dictionary.
+
+    Returns:
+        dict: SHARED_STORE_MANIFEST_NAME entry of the file (sha256, size and crc32 of its contents).
     """
-    no_extension_subdir_path:str = os.path.join(FCStd_dir_path, NO_EXTENSION_SUBDIR_NAME)
-    os.makedirs(no_extension_subdir_path, exist_ok=True)
+    sha256:str = hashlib.sha256(data).hexdigest()
+    blob_path:str = get_shared_store_blob_path(sha256, config)
     
-    for item_name in os.listdir(FCStd_dir_path):
-        item_path:str = os.path.join(FCStd_dir_path, item_name)
-        if os.path.isfile(item_path) and '.' not in item_name:
-            shutil.move(item_path, os.path.join(no_extension_subdir_path, item_name))
-
+    if not os.path.exists(blob_path):
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        
+        # Note: Written atomically so concurrent exports never see a partially written blob
+        write_file_atomically(blob_path, create_shared_store_blob(data, config))
+    
+    return {"sha256": sha256, "size": len(data), "crc32": zlib.crc32(data)}
+
+def create_shared_store_blob(data:bytes, config:dict) -> bytes:
+    """
+    Compresses file contents into a shared binary store blob (zip with a single SHARED_STORE_MEMBER_NAME member).
+    """
+    compression_method:int = COMPRESSION_METHODS[config['compress_binaries']['compression_method']]
+    compression_level:int = config['compress_binaries']['compression_level']
+    
+    blob:io.BytesIO = io.BytesIO()
+    with zipfile.ZipFile(blob, 'w', compression_method, compresslevel=compression_level) as zf:
+        zf.writestr(SHARED_STORE_MEMBER_NAME, data)
+    return blob.getvalue()
+
+def format_shared_store_manifest(manifest:dict) -> str:
+    """
+    Formats a SHARED_STORE_MANIFEST_NAME file. One entry per line keeps diffs of this file readable.
+    """
+    return "{\n" + ",\n".join(f"{json.dumps(path)}: {json.dumps(manifest[path])}" for path in sorted(manifest)) + "\n}\n"
+
+def extract_files_from_shared_store(FCStd_dir_path:str, config:dict, output_dir_path:str=None) -> list:
+    """
+    Extracts the files listed in the directory's SHARED_STORE_MANIFEST_NAME file from the shared binary store into output_dir_path.
+
+    Args:
+        FCStd_dir_path (str): Path to the FCStd directory.
+        config (dict): Configuration dictionary.
+        output_dir_path (str): Directory to extract the files to. None => FCStd_dir_path.
+
+    Returns:
+        list: Paths (relative to output_dir_path) of extracted files.
+    """
+    if output_dir_path is None:
+        output_dir_path:str = FCStd_dir_path
+    
+    manifest_path:str = os.path.join(FCStd_dir_path, SHARED_STORE_MANIFEST_NAME)
+    if not os.path.exists(manifest_path): return []
+    
+    with open(manifest_path, 'r') as f:
+        manifest:dict = json.load(f)
+    
+    extracted_items:list = []
+    for path_to_item_in_dir, blob_info in manifest.items():
+        blob_path:str = get_shared_store_blob_path(blob_info['sha256'], config)
+        if not os.path.exists(blob_path):
+            raise FileNotFoundError(f"ERR: Shared store blob '{blob_path}' for '{path_to_item_in_dir}' does not exist.")
+        
+        item_full_path:str = os.path.join(output_dir_path, path_to_item_in_dir)
+        os.makedirs(os.path.dirname(item_full_path), exist_ok=True)
+        if os.path.isfile(item_full_path):
+            os.remove(item_full_path) # Never write through a hardlink (see ImportingContext)
+        with zipfile.ZipFile(blob_path, 'r') as zf:
+            with zf.open(SHARED_STORE_MEMBER_NAME) as src, open(item_full_path, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+        
+        extracted_items.append(path_to_item_in_dir)
+    
+    return extracted_items
+
+def write_zip_to_disk(FCStd_dir_path:str, zip_file_prefix:str, zip_index:int, current_zip:io.BytesIO) -> int:
+    """
+    Writes current_zip to disk (from memory).
+    Zip files are named f"{zip_file_prefix}{zip_index}.zip".
+
+    Args:
+        FCStd_dir_path (str): Path were to write zip file to on disk.
+        zip_file_prefix (str): Prefix for zip file name.
+        zip_index (int): Index/iterator of current zip file name being written. This function is called by compress_binaries(), 
+                         so the zip_index is essentially the only unique part of the name for each zip file created by compress_binaries().
+        current_zip (io.BytesIO): Zip file being written to disk.
+
+    Returns:
+        int: next zip_index for next time this function is called. Essentially it's zip_index + 1.
+    """
+    zip_name:str = f"{zip_file_prefix}{zip_index}.zip"
+    zip_path:str = os.path.join(FCStd_dir_path, zip_name)
+    write_file_atomically(zip_path, current_zip.getvalue())
+    zip_index += 1
+    return zip_index
+
+def get_export_manifest_digest(entries:list) -> str:
+    """
+    Gets the digest stored in an EXPORT_MANIFEST_NAME file. It changes with every entry, so git can't merge two exports' manifests line by line.
+    """
+    return hashlib.sha256("\n".join(json.dumps(entry) for entry in entries).encode()).hexdigest()
+
+def format_export_manifest(entries:list) -> str:
+    """
+    Formats an EXPORT_MANIFEST_NAME file. One entry per line keeps diffs of this file readable.
+    """
+    return (
+        "{\n"
+        f'"version": {EXPORT_MANIFEST_VERSION},\n'
+        f'"digest": "{get_export_manifest_digest(entries)}",\n'
+        '"entries": [\n' + ",\n".join(json.dumps(entry) for entry in entries) + "\n]\n"
+        "}\n"
+    )
+
+def get_export_manifest(FCStd_file_path:str, tree:dict, include_thumbnail:bool, config:dict) -> bytes:
+    """
+    Creates the EXPORT_MANIFEST_NAME file of an exported uncompressed directory.
+    Lists every .FCStd archive entry in the archive's original order with its size, CRC32, sha256 and where export stored it:
+        "location": path of the plain file (IE `Document.xml`, `no_extension/DiffuseColor`), compressed binary zip (shard) or SHARED_STORE_MANIFEST_NAME
+        "member": name in the shard (or in SHARED_STORE_MANIFEST_NAME), null for plain files
+
+    Args:
+        FCStd_file_path (str): Path to the exported .FCStd file.
+        tree (dict): Path relative to the uncompressed directory ('/' separated) -> path to the file on disk or the file contents.
+        include_thumbnail (bool): Thumbnail was exported.
+        config (dict): Configuration dictionary.
+
+    Returns:
+        bytes: EXPORT_MANIFEST_NAME file contents.
+    """
+    zip_file_prefix:str = config['compress_binaries']['zip_file_prefix']
+    
+    def read(item) -> bytes:
+        if isinstance(item, bytes): return item
+        with open(item, 'rb') as f:
+            return f.read()
+    
+    locations:dict = {} # Path in directory -> (location, member, sha256)
+    for path, item in tree.items():
+        if path in ('.changefile', '.lockfile', '.fcmod', EXPORT_MANIFEST_NAME): continue
+        
+        if config['compress_binaries']['enabled'] and '/' not in path and path.startswith(zip_file_prefix) and path.endswith('.zip'):
+            with zipfile.ZipFile(item if isinstance(item, str) else io.BytesIO(item), 'r') as zf:
+                for info in zf.infolist():
+                    if info.is_dir(): continue
+                    sha256:str = info.comment.decode() if len(info.comment) == 64 else get_file_sha256(zf.read(info)) # See pack_files_into_zips()
+                    locations[info.filename] = (path, info.filename, sha256)
+        
+        elif path == SHARED_STORE_MANIFEST_NAME:
+            for path_to_item_in_dir, blob_info in json.loads(read(item)).items():
+                locations[path_to_item_in_dir] = (path, path_to_item_in_dir, blob_info['sha256'])
+        
+        else:
+            locations[path] = (path, None, get_file_sha256(item))
+    
+    entries:list = []
+    with zipfile.ZipFile(FCStd_file_path, 'r') as zf:
+        for info in zf.infolist():
+            if info.is_dir(): continue
+            if not include_thumbnail and info.filename.startswith('thumbnails/'): continue
+            
+            location, member, sha256 = locations[str(get_compressed_path_in_dir(info.filename)).lstrip('/')]
+            entries.append({"name": info.filename, "size": info.file_size, "crc32": info.CRC, "sha256": sha256, "location": location, "member": member})
+    
+    return format_export_manifest(entries).encode()
+
+def load_export_manifest(FCStd_dir_path:str) -> list:
+    """
+    Reads the EXPORT_MANIFEST_NAME file of an uncompressed directory (see get_export_manifest()).
+    Missing, unreadable or merged (digest mismatch) manifests aren't used, nor manifests that don't match the directory:
+    a listed file or shard member doesn't exist, or the directory has files the manifest doesn't list.
+
+    Args:
+        FCStd_dir_path (str): Path to FCStd directory.
+
+    Returns:
+        list: Manifest entries in .FCStd archive order. None if the manifest can't be used => callers fall back to walking the directory.
+    """
+    manifest_path:str = os.path.join(FCStd_dir_path, EXPORT_MANIFEST_NAME)
+    if not os.path.isfile(manifest_path): return None
+    
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest:dict = json.load(f)
+        
+        if manifest['version'] != EXPORT_MANIFEST_VERSION: return None
+        if manifest['digest'] != get_export_manifest_digest(manifest['entries']): return None
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    
+    members:dict = {} # Location -> members listed in it, None for plain files
+    for entry in manifest['entries']:
+        if entry['member'] is None:
+            members[entry['location']] = None
+        else:
+            members.setdefault(entry['location'], set()).add(entry['member'])
+    
+    # Note: Digest only catches merged manifests. Merged (or partially checked out) files next to it can still leave members the manifest lists missing, or files it doesn't list
+    missing_locations:set = set(members)
+    for root, _, files in os.walk(FCStd_dir_path):
+        for file in files:
+            path_in_dir:str = os.path.relpath(os.path.join(root, file), FCStd_dir_path).replace(os.sep, '/')
+            if path_in_dir in ('.changefile', '.lockfile', '.fcmod', EXPORT_MANIFEST_NAME): continue
+            if path_in_dir not in members: return None
+            missing_locations.discard(path_in_dir)
+    if missing_locations: return None
+    
+    try:
+        for location, location_members in members.items():
+            if location_members is None: continue
+            
+            location_path:str = os.path.join(FCStd_dir_path, *location.split('/'))
+            if location == SHARED_STORE_MANIFEST_NAME:
+                with open(location_path, 'r') as f:
+                    available_members:set = set(json.load(f))
+            else:
+                with zipfile.ZipFile(location_path, 'r') as zf: # Only the central directory is read
+                    available_members:set = set(zf.namelist())
+            
+            if not location_members <= available_members: return None
+    except (OSError, ValueError, zipfile.BadZipFile):
+        return None # IE shard is an LFS pointer (not pulled yet)
+    
+    return manifest['entries']
+
+def write_FCStd_file(FCStd_file_path:str, write_members):
+    """
+    Writes a .FCStd file (deflate zip) to a temporary sibling file that then replaces FCStd_file_path (keeping its permissions).
+
+    Args:
+        FCStd_file_path (str): Path to .FCStd file.
+        write_members (callable): Called with the open zipfile.ZipFile to add the members.
+    """
+    temp_fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(FCStd_file_path)), prefix=get_temp_name_prefix(FCStd_file_path), suffix='.FCStd')
+    try:
+        with os.fdopen(temp_fd, 'wb') as f:
+            with zipfile.ZipFile(f, 'w', zipfile.ZIP_DEFLATED) as zf:
+                write_members(zf)
+            f.flush()
+            os.fsync(f.fileno())
+        replace_FCStd_file(temp_path, FCStd_file_path)
+    finally:
+        if os.path.exists(temp_path): os.remove(temp_path)
+
+def create_FCStd_file_from_manifest(FCStd_dir_path:str, FCStd_file_path:str, entries:list, config:dict, include_thumbnail:bool):
+    """
+    Creates a .FCStd file straight from an uncompressed directory's EXPORT_MANIFEST_NAME entries (see load_export_manifest()), in the archive's original order.
+    Nothing is staged or walked, entries are streamed from their location. Members of shards written with the compression .FCStd files use
+    (deflate, level FCSTD_COMPRESSION_LEVEL) are copied without decompressing them.
+
+    Args:
+        FCStd_dir_path (str): Path to FCStd directory.
+        FCStd_file_path (str): Path to .FCStd file.
+        entries (list): Manifest entries.
+        config (dict): Configuration dictionary.
+        include_thumbnail (bool): Add thumbnail to .FCStd file.
+    """
+    shards:dict = {} # Shard path -> open zipfile.ZipFile
+    FCStd_settings_comment:bytes = get_zip_settings_comment({"compress_binaries": {"compression_method": "deflate", "compression_level": FCSTD_COMPRESSION_LEVEL}})
+    
+    def write_members(zf:zipfile.ZipFile):
+        for entry in entries:
+            if not include_thumbnail and entry['name'].startswith('thumbnails/'): continue
+            
+            location_path:str = os.path.join(FCStd_dir_path, *entry['location'].split('/'))
+            if entry['member'] is None:
+                zf.write(location_path, entry['name'])
+                continue
+            
+            if entry['location'] == SHARED_STORE_MANIFEST_NAME:
+                blob_path:str = get_shared_store_blob_path(entry['sha256'], config)
+                with zipfile.ZipFile(blob_path, 'r') as blob_zf, blob_zf.open(SHARED_STORE_MEMBER_NAME) as src, zf.open(entry['name'], 'w', force_zip64=entry['size'] > zipfile.ZIP64_LIMIT) as dst:
+                    shutil.copyfileobj(src, dst)
+                continue
+            
+            if location_path not in shards:
+                shards[location_path] = zipfile.ZipFile(location_path, 'r')
+            info:zipfile.ZipInfo = shards[location_path].getinfo(entry['member'])
+            
+            if shards[location_path].comment == FCStd_settings_comment and info.compress_type == zipfile.ZIP_DEFLATED:
+                write_raw_zip_member(zf, entry['name'], location_path, info, comment=b'') # sha256 comment is only meaningful in shards
+            else:
+                with shards[location_path].open(info) as src, zf.open(entry['name'], 'w', force_zip64=entry['size'] > zipfile.ZIP64_LIMIT) as dst:
+                    shutil.copyfileobj(src, dst)
+    
+    try:
+        write_FCStd_file(FCStd_file_path, write_members)
+    finally:
+        for shard in shards.values():
+            shard.close()
+
+def repackFCStd(FCStd_file_path:str):
+    """
+    Recreates a provided .FCStd file by copying the contents and the order of the contents.
+    Then recreating the .FCStd file from the copied contents (in a temporary sibling file that replaces the .FCStd file).
+    
+    The this mainly serves to fix this issue: https://github.com/FreeCAD/FreeCAD/issues/23914
+
+    Args:
+        FCStd_file_path (str): Path to .FCStd file that needs to be repacked.
+    """
+    namelist:list = None
+    file_data:dict = {}
+    with zipfile.ZipFile(FCStd_file_path, 'r') as zf:
+        namelist = zf.namelist()
+        for file_name in namelist:
+            if file_name == "./": continue
+            
+            with zf.open(file_name) as f:
+                file_data[file_name] = f.read()
+    
+    def write_members(zf:zipfile.ZipFile):
+        for file_name in namelist:
+            if file_name == "./": continue
+            
+            zf.writestr(file_name, file_data[file_name])
+    
+    write_FCStd_file(FCStd_file_path, write_members)
+
+def move_files_without_extension_to_subdir(FCStd_dir_path:str):
+    """
+    Moves files without extensions from FCStd_dir_path to a subdirectory named NO_EXTENSION_SUBDIR_NAME.
+    
+    Args:
+        FCStd_dir_path (str): Path to the FCStd directory.
+    """
+    no_extension_subdir_path:str = os.path.join(FCStd_dir_path, NO_EXTENSION_SUBDIR_NAME)
+    os.makedirs(no_extension_subdir_path, exist_ok=True)
+    
+    for item_name in os.listdir(FCStd_dir_path):
+        item_path:str = os.path.join(FCStd_dir_path, item_name)
+        if os.path.isfile(item_path) and '.' not in item_name:
+            shutil.move(item_path, os.path.join(no_extension_subdir_path, item_name))
+
+def write_file_atomically(file_path:str, data:bytes):
+    """
+    Writes data to a temporary sibling of file_path, then renames it over file_path.
+    Readers (and crashes) never see a partially written file_path.
+
+    Args:
+        file_path (str): Path to file.
+        data (bytes): File contents.
+    """
+    temp_fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(file_path)), prefix=TEMP_NAME_PREFIX)
+    try:
+        with os.fdopen(temp_fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, WRITABLE) # mkstemp() creates 0o600 files
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path): os.remove(temp_path)
+
+def get_temp_name_prefix(path:str, kind:str="") -> str:
+    """
+    Gets the name prefix of temporary files/directories created for path (IE `.GitCAD-export-<directory name>-`).
+    The name of path is in the prefix so leftovers of an interrupted process can be told apart from those of other files (see recover_interrupted_FCStd_outputs()).
+
+    Args:
+        path (str): .FCStd file (extension dropped) or FCStd directory.
+        kind (str): Kind of temporary file/directory, IE 'export-'.
+    """
+    name:str = os.path.basename(os.path.normpath(os.path.abspath(path)))
+    if name.lower().endswith('.fcstd'):
+        name:str = name[:-len('.fcstd')]
+    return f"{TEMP_NAME_PREFIX}{kind}{name}-"
+
+def is_temp_name(name:str, prefix:str, suffix:str="") -> bool:
+    """
+    Checks if name was created by tempfile with prefix and suffix (the random part never contains '-', so `.GitCAD-a-` doesn't match temporary files of `a-b`).
+    """
+    if not (name.startswith(prefix) and name.endswith(suffix)): return False
+    random_part:str = name[len(prefix):len(name) - len(suffix)]
+    return bool(random_part) and '-' not in random_part
+
+def recover_interrupted_FCStd_outputs(FCStd_file_path:str, FCStd_dir_path:str):
+    """
+    Cleans up after an interrupted (IE killed, crashed) export/import of FCStd_file_path. Call with its FCStdFileLock held.
+    If an export was interrupted between its two renames (FCStd_dir_path missing), the new export is moved in place (or the previous one, if the new one is gone).
+    Remaining staging directories and temporary .FCStd files of this file are removed, those of other files are left alone (they may be in use).
+
+    Args:
+        FCStd_file_path (str): Path to .FCStd file.
+        FCStd_dir_path (str): Path to FCStd directory.
+    """
+    FCStd_dir_path:str = os.path.normpath(os.path.abspath(FCStd_dir_path))
+    parent_dir_path:str = os.path.dirname(FCStd_dir_path)
+    
+    if os.path.isdir(parent_dir_path):
+        export_prefix:str = get_temp_name_prefix(FCStd_dir_path, 'export-')
+        import_prefix:str = get_temp_name_prefix(FCStd_dir_path, 'import-')
+        leftover_names:list = sorted(
+            name for name in os.listdir(parent_dir_path)
+            if (is_temp_name(name, export_prefix) or is_temp_name(name, export_prefix, PREVIOUS_EXPORT_SUFFIX) or is_temp_name(name, import_prefix))
+            and os.path.isdir(os.path.join(parent_dir_path, name))
+        )
+        
+        for name in leftover_names:
+            if not name.endswith(PREVIOUS_EXPORT_SUFFIX) or os.path.exists(FCStd_dir_path): continue
+            
+            # Note: The staging directory is only renamed aside once it holds the complete new export
+            staging_dir_path:str = os.path.join(parent_dir_path, name[:-len(PREVIOUS_EXPORT_SUFFIX)])
+            recovered_dir_path:str = staging_dir_path if os.path.isdir(staging_dir_path) else os.path.join(parent_dir_path, name)
+            os.replace(recovered_dir_path, FCStd_dir_path)
+            print(f"Recovered '{FCStd_dir_path}' from an interrupted export.", file=sys.stderr)
+        
+        for name in leftover_names:
+            if os.path.isdir(os.path.join(parent_dir_path, name)):
+                remove_dir(os.path.join(parent_dir_path, name))
+    
+    FCStd_file_dir_path:str = os.path.dirname(os.path.abspath(FCStd_file_path))
+    if os.path.isdir(FCStd_file_dir_path):
+        FCStd_file_prefix:str = get_temp_name_prefix(FCStd_file_path)
+        for name in os.listdir(FCStd_file_dir_path):
+            if is_temp_name(name, FCStd_file_prefix, '.FCStd') and os.path.isfile(os.path.join(FCStd_file_dir_path, name)):
+                os.remove(os.path.join(FCStd_file_dir_path, name))
+
+def remove_dir(dir_path:str):
+    """
+    Removes a directory tree. Readonly files (IE a `.lockfile` without the LFS lock) are made writable first, Windows can't remove them.
+    """
+    def make_writable_and_retry(function, path, exc_info):
+        os.chmod(path, WRITABLE)
+        function(path)
+    
+    shutil.rmtree(dir_path, onerror=make_writable_and_retry)
+
+def link_or_copy_file(src_path:str, dst_path:str):
+    """
+    Hardlinks src_path to dst_path, copies it if the filesystem can't hardlink.
+    """
+    try:
+        os.link(src_path, dst_path)
+    except OSError:
+        clone_or_copy_file(src_path, dst_path)
+
 class ImportingContext:
     """
     Context manager for importing data to .FCStd file.
-    Extracts (compressed and in NO_EXTENSION_SUBDIR_NAME) files in __enter__ to self.FCStd_dir_path and removes them in __exit__.
+    __enter__ stages the files of FCStd_dir_path the way FreeCAD expects them (compressed, shared store and NO_EXTENSION_SUBDIR_NAME files extracted)
+    in a temporary sibling directory and returns its path, __exit__ removes it.
+    FCStd_dir_path is never modified, so an interrupted import leaves it intact. Unchanged files are hardlinked into the staging directory.
+    """
+    def __init__(self, FCStd_dir_path:str, config:dict):
+        self.FCStd_dir_path:str = FCStd_dir_path
+        self.config:dict = config
+        self.no_config:bool = config is None
+        self.staging_dir_path:str = None
+
+    def __enter__(self) -> str:
+        if self.no_config: return self.FCStd_dir_path
+        
+        self.staging_dir_path = tempfile.mkdtemp(prefix=get_temp_name_prefix(self.FCStd_dir_path, 'import-'), dir=os.path.dirname(os.path.abspath(self.FCStd_dir_path)))
+        try:
+            self.stage_files()
+        except BaseException:
+            self.__exit__(None, None, None)
+            raise
+        
+        return self.staging_dir_path
+
+    def stage_files(self):
+        zip_file_prefix:str = self.config['compress_binaries']['zip_file_prefix']
+        zip_files:list = []
+        if self.config['compress_binaries']['enabled']:
+            zip_files:list = sorted(f for f in os.listdir(self.FCStd_dir_path) if f.startswith(zip_file_prefix) and f.endswith('.zip'))
+        
+        # Link everything but the zip files
+        for root, _, files in os.walk(self.FCStd_dir_path):
+            for file in files:
+                if root == self.FCStd_dir_path and file in zip_files: continue
+                
+                dst:str = os.path.join(self.staging_dir_path, os.path.relpath(os.path.join(root, file), self.FCStd_dir_path))
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                link_or_copy_file(os.path.join(root, file), dst)
+        
+        # Decompress zip files
+        for zip_file in zip_files:
+            with zipfile.ZipFile(os.path.join(self.FCStd_dir_path, zip_file), 'r') as zf:
+                for info in zf.infolist():
+                    item_path:str = os.path.join(self.staging_dir_path, *info.filename.split('/'))
+                    if os.path.isfile(item_path):
+                        os.remove(item_path) # Never write through a hardlink to FCStd_dir_path's file
+                    zf.extract(info, self.staging_dir_path)
+        
+        # Extract files deduplicated into the shared binary store
+        extract_files_from_shared_store(self.FCStd_dir_path, self.config, self.staging_dir_path)
+        
+        # Move files from NO_EXTENSION_SUBDIR_NAME to the top level
+        no_extension_subdir_path:str = os.path.join(self.staging_dir_path, NO_EXTENSION_SUBDIR_NAME)
+        if os.path.isdir(no_extension_subdir_path):
+            for item in os.listdir(no_extension_subdir_path):
+                os.replace(os.path.join(no_extension_subdir_path, item), os.path.join(self.staging_dir_path, item))
+                        
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.staging_dir_path is not None:
+            shutil.rmtree(self.staging_dir_path, ignore_errors=True)
+            self.staging_dir_path = None
+
+PROCESS_LOCK_DIR_PATHS:dict = {} # cwd -> get_process_lock_dir_path(), one git call per process
+
+def get_process_lock_dir_path(cwd:str=None) -> str:
+    """
+    Gets the directory of FCStdFileLock lock files: PROCESS_LOCK_DIR_NAME in the git common directory (of the repository cwd is in, default current directory),
+    or in the system temp directory outside of git repositories.
+    """
+    cwd:str = os.getcwd() if cwd is None else os.path.abspath(cwd)
+    if cwd not in PROCESS_LOCK_DIR_PATHS:
+        try:
+            git_common_dir:str = os.path.normpath(os.path.join(cwd, run_git_command('rev-parse', '--git-common-dir', cwd=cwd).strip()))
+            PROCESS_LOCK_DIR_PATHS[cwd] = os.path.join(git_common_dir, PROCESS_LOCK_DIR_NAME)
+        except (OSError, RuntimeError):
+            PROCESS_LOCK_DIR_PATHS[cwd] = os.path.join(tempfile.gettempdir(), PROCESS_LOCK_DIR_NAME)
+    
+    return PROCESS_LOCK_DIR_PATHS[cwd]
+
+class FCStdFileLock:
+    """
+    Context manager holding an advisory inter-process lock (fcntl.flock, msvcrt.locking on Windows) for a .FCStd file and its uncompressed directory.
+    Imports and exports of the same .FCStd file (IE a hook and a manual `git fimport`, or parallel jobs) run one at a time instead of corrupting each other.
+    Busy => wait up to `concurrent-access` `timeout-seconds` (or fail right away if `wait-if-busy` is false).
+    Note: Advisory, FreeCAD itself doesn't take this lock.
+
+    Raises:
+        TimeoutError: If the lock is still held by another process/thread after waiting (or right away if not waiting).
+    """
+    def __init__(self, FCStd_file_path:str, config:dict, repo_root:str=None):
+        self.FCStd_file_path:str = FCStd_file_path
+        self.repo_root:str = repo_root # Repository to lock in, None => the current directory's
+        self.wait_if_busy:bool = config['concurrent_access']['wait_if_busy'] if config is not None else True
+        self.timeout_seconds:float = config['concurrent_access']['timeout_seconds'] if config is not None else PROCESS_LOCK_DEFAULT_TIMEOUT_SECONDS
+        self.lock_file = None
+
+    def __enter__(self) -> 'FCStdFileLock':
+        lock_dir_path:str = get_process_lock_dir_path(self.repo_root)
+        os.makedirs(lock_dir_path, exist_ok=True)
+        
+        lock_name:str = hashlib.sha1(os.path.normcase(os.path.abspath(self.FCStd_file_path)).encode()).hexdigest()
+        self.lock_file = open(os.path.join(lock_dir_path, f"{lock_name}.lock"), 'a+b')
+        
+        deadline:float = time.monotonic() + self.timeout_seconds
+        while not self.try_lock():
+            if not self.wait_if_busy or time.monotonic() >= deadline:
+                self.lock_file.close()
+                self.lock_file = None
+                waited:str = f" after waiting {self.timeout_seconds} seconds" if self.wait_if_busy else ""
+                raise TimeoutError(f"ERR: '{self.FCStd_file_path}' is being imported/exported by another process{waited}.")
+            
+            time.sleep(PROCESS_LOCK_POLL_SECONDS)
+        
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.lock_file is None: return
+        
+        if os.name == 'nt':
+            import msvcrt
+            self.lock_file.seek(0)
+            msvcrt.locking(self.lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_UN)
+        
+        self.lock_file.close()
+        self.lock_file = None
+
+    def try_lock(self) -> bool:
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                self.lock_file.seek(0)
+                msvcrt.locking(self.lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+def bad_args(args:argparse.Namespace) -> bool:
+    """
+    Checks if CLI arguments are invalid. Returns True if invalid.
+
+    Args:
+        args (argparse.Namespace): CLI arguments to check.
+
+    Returns:
+        bool: True if invalid, else False.
+    """
+    mode_flags:list = [bool(args.export_flag), bool(args.import_flag), bool(args.dir_flag), bool(args.sync_all_flag), bool(args.verify_flag), bool(args.resolve_changes_flag), bool(args.lfs_pull_flag), bool(args.lock_flag), bool(args.unlock_flag), args.advise_compression_flag is not None, bool(args.stage_flag), bool(args.show_flag), bool(args.cache_stats_flag), bool(args.watch_flag), bool(args.snapshot_flag), args.stats_flag is not None, bool(args.compile_config_flag), bool(args.gc_flag), bool(args.batch_mode)]
+    no_mode_specified:bool = sum(mode_flags) < 1
+    if no_mode_specified: return True
+
+    multiple_modes_specified:bool = sum(mode_flags) > 1
+    if multiple_modes_specified: return True
+
+    bad_arg_count:bool = True if args.export_flag and len(args.export_flag) > 2 or args.import_flag and len(args.import_flag) > 2 else False
+    if bad_arg_count: return True
+
+    missing_output_arg:bool = True if args.export_flag and len(args.export_flag) != 2 or args.import_flag and len(args.import_flag) != 2 else False
+    no_config:bool = args.config_file_path is None
+    if missing_output_arg and no_config: return True
+
+    mode_requires_config:bool = no_config and (args.dir_flag or args.sync_all_flag or args.verify_flag or args.resolve_changes_flag or args.lfs_pull_flag or args.lock_flag or args.unlock_flag or args.advise_compression_flag is not None or args.stage_flag or args.show_flag or args.cache_stats_flag or args.watch_flag or args.snapshot_flag or args.stats_flag is not None or args.compile_config_flag or args.gc_flag or args.batch_mode)
+    if mode_requires_config: return True
+    
+    unlock_missing_reference:bool = args.unlock_flag and not args.force_flag and not args.reference
+    if unlock_missing_reference: return True
+    
+    mode_cannot_be_silent:bool = args.silent_flag and (args.dir_flag)
+    if mode_cannot_be_silent: return True
+    
+    return False
+
+def get_changefile_contents(FCStd_dir_path:str, FCStd_file_path:str) -> str:
+    """
+    Gets the contents of a `.changefile`: the current timestamp and the path to the FCStd file from FCStd_dir_path.
+    """
+    FCStd_file_relpath:str = os.path.relpath(FCStd_file_path, start=FCStd_dir_path).replace(os.sep, '/')
+    current_time:str = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    return f"File Last Exported On: {current_time}\nFCStd_file_relpath='{FCStd_file_relpath}'\n"
+
+def create_lockfile_and_changefile(FCStd_dir_path:str, FCStd_file_path:str):
+    """
+    Creates a `.changefile` in FCStd_dir_path with current timestamp and path to FCStd file from FCStd_dir_path.
+    Creates an empty `.lockfile` in FCStd_dir_path.
+
+    Args:
+        FCStd_dir_path (str): Path to FCStd directory.
+        FCStd_file_path (str): Path to .FCStd file.
+    """
+    lock_file_path:str = os.path.join(FCStd_dir_path, '.lockfile')
+    change_file_path:str = os.path.join(FCStd_dir_path, '.changefile')
+    
+    # Create .changefile with FCStd_file_relpath and timestamp file was created
+    write_file_atomically(change_file_path, get_changefile_contents(FCStd_dir_path, FCStd_file_path).encode())
+    
+    # Create an empty .lockfile
+    write_file_atomically(lock_file_path, b"")
+
+def iter_queue(stage_queue:queue.Queue) -> Iterator:
+    """
+    Yields the items put in a pipeline stage's queue until the None sentinel.
+    """
+    while (item := stage_queue.get()) is not None:
+        yield item
+
+def start_pipeline_stage(name:str, stage, stage_queue:queue.Queue, errors:list) -> threading.Thread:
+    """
+    Runs stage(items) on a thread, items being what is put in stage_queue until the None sentinel (see iter_queue()).
+    If the stage fails, its exception is appended to errors and the rest of stage_queue is drained, so the producer never blocks on a full queue.
+
+    Args:
+        name (str): Thread name.
+        stage (callable): Function consuming an iterator of items.
+        stage_queue (queue.Queue): Input queue of the stage.
+        errors (list): Exceptions raised by stages.
+
+    Returns:
+        threading.Thread: Started thread, joins once the sentinel is consumed.
+    """
+    def run():
+        items:Iterator = iter_queue(stage_queue)
+        try:
+            stage(items)
+        except BaseException as e:
+            errors.append(e)
+            for _ in items: pass
+    
+    thread:threading.Thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return thread
+
+def iter_exported_FCStd_members(FCStd_file_path:str, config:dict, include_thumbnail:bool) -> Iterator:
+    """
+    Reads the members of a .FCStd file in archive order and classifies them the way an export stores them (see is_compressed_on_export()).
+    Shared by stream_FCStd_file_to_dir() and get_exported_FCStd_tree(), so both pack binaries in the same order and build identical zip files.
+
+    Args:
+        FCStd_file_path (str): Path to .FCStd file.
+        config (dict): Configuration dictionary.
+        include_thumbnail (bool): Keep exported thumbnail.
+
+    Yields:
+        tuple: (path in the uncompressed directory ('/' separated), contents, True if compressed (zip file or shared binary store))
+    """
+    compress_enabled:bool = config['compress_binaries']['enabled']
+    
+    with zipfile.ZipFile(FCStd_file_path, 'r') as zf:
+        for info in zf.infolist():
+            if info.is_dir(): continue
+            if not include_thumbnail and info.filename.startswith('thumbnails/'): continue
+            
+            posix_path:PurePosixPath = get_compressed_path_in_dir(info.filename)
+            data:bytes = zf.read(info)
+            yield str(posix_path).lstrip('/'), data, compress_enabled and is_compressed_on_export(data, posix_path, config)
+
+def stream_FCStd_file_to_dir(FCStd_file_path:str, FCStd_dir_path:str, config:dict, include_thumbnail:bool, previous_zip_paths:list=None):
+    """
+    Exports the files of a .FCStd file to an empty FCStd_dir_path in one streaming pass, instead of extracting everything to disk and compressing it back.
+    Each archive member is read once and classified by the config (see is_compressed_on_export()): binaries go straight to the compressor
+    (zip files or shared binary store), only the other files are written to disk.
+    The reader (calling thread), compressor and writer run concurrently, connected by queues bounded to EXPORT_PIPELINE_QUEUE_SIZE entries.
+
+    Args:
+        FCStd_file_path (str): Path to .FCStd file.
+        FCStd_dir_path (str): Path to FCStd directory (empty).
+        config (dict): Configuration dictionary.
+        include_thumbnail (bool): Keep exported thumbnail.
+        previous_zip_paths (list): Zip files of the previous export. Compressed data of unchanged files is copied from them instead of recompressed.
+
+    Raises:
+        ValueError: If a binary doesn't fit in a zip file (see pack_files_into_zips()).
+    """
+    def write_files(items:Iterator):
+        for path_to_item_in_dir, data in items:
+            with open(os.path.join(FCStd_dir_path, *path_to_item_in_dir.split('/')), 'wb') as f:
+                f.write(data)
+    
+    def compress_files(items:Iterator):
+        if config['compress_binaries']['shared_store']['enabled']:
+            manifest:dict = {path_to_item_in_dir: add_blob_to_shared_store(data, config) for path_to_item_in_dir, data in items}
+            if manifest:
+                write_file_atomically(os.path.join(FCStd_dir_path, SHARED_STORE_MANIFEST_NAME), format_shared_store_manifest(manifest).encode())
+            return
+        
+        zip_index:int = 1
+        reusable_members:dict = get_reusable_zip_members(previous_zip_paths or [], config)
+        for zip_data in pack_files_into_zips(items, config, reusable_members):
+            zip_index:int = write_zip_to_disk(FCStd_dir_path, config['compress_binaries']['zip_file_prefix'], zip_index, io.BytesIO(zip_data))
+    
+    # Note: Same directory layout as move_files_without_extension_to_subdir()
+    os.makedirs(os.path.join(FCStd_dir_path, NO_EXTENSION_SUBDIR_NAME), exist_ok=True)
+    
+    errors:list = []
+    compress_queue:queue.Queue = queue.Queue(maxsize=EXPORT_PIPELINE_QUEUE_SIZE)
+    write_queue:queue.Queue = queue.Queue(maxsize=EXPORT_PIPELINE_QUEUE_SIZE)
+    stages:list = [start_pipeline_stage("GitCAD export compress", compress_files, compress_queue, errors),
+                   start_pipeline_stage("GitCAD export write", write_files, write_queue, errors)]
+    try:
+        for path_to_item_in_dir, data, compressed in iter_exported_FCStd_members(FCStd_file_path, config, include_thumbnail):
+            if errors: break # A stage failed, the export is discarded anyway
+            
+            # Note: Directories of compressed files are kept too, same as extracting then compressing
+            os.makedirs(os.path.join(FCStd_dir_path, *path_to_item_in_dir.split('/')[:-1]), exist_ok=True)
+            
+            stage_queue:queue.Queue = compress_queue if compressed else write_queue
+            stage_queue.put((path_to_item_in_dir, data))
+    finally:
+        for stage_queue in (compress_queue, write_queue):
+            stage_queue.put(None)
+        for thread in stages:
+            thread.join()
+    
+    if errors:
+        raise errors[0]
+
+def export_FCStd_file(FCStd_file_path:str, FCStd_dir_path:str, config:dict, include_thumbnail:bool):
+    """
+    Exports (decompresses) a .FCStd file to FCStd_dir_path. Previously exported files in FCStd_dir_path are removed.
+    The export is built in a temporary sibling directory that then replaces FCStd_dir_path, so an interrupted export never leaves a half written directory.
+
+    Args:
+        FCStd_file_path (str): Path to .FCStd file.
+        FCStd_dir_path (str): Path to FCStd directory.
+        config (dict): Configuration dictionary. None if no config.
+        include_thumbnail (bool): Keep exported thumbnail.
+
+    Raises:
+        FileNotFoundError: If the .FCStd file doesn't exist.
+        TimeoutError: If another process is importing/exporting the .FCStd file (see FCStdFileLock).
+    """
+    if not os.path.exists(FCStd_file_path):
+        raise FileNotFoundError(f"ERR: FCStd file '{FCStd_file_path}' does not exist.")
+
+    with FCStdFileLock(FCStd_file_path, config):
+        recover_interrupted_FCStd_outputs(FCStd_file_path, FCStd_dir_path)
+        
+        parent_dir_path:str = os.path.dirname(os.path.abspath(FCStd_dir_path))
+        os.makedirs(parent_dir_path, exist_ok=True)
+        
+        # Note: Sibling of FCStd_dir_path => same filesystem (atomic rename) and same relative path to the .FCStd file in the `.changefile`
+        staging_dir_path:str = tempfile.mkdtemp(prefix=get_temp_name_prefix(FCStd_dir_path, 'export-'), dir=parent_dir_path)
+        previous_dir_path:str = None
+        try:
+            os.chmod(staging_dir_path, DIRECTORY_MODE)
+            
+            if config is None:
+                try:
+                    PU.extractDocument(FCStd_file_path, staging_dir_path)
+                except Exception as e:
+                    print(f"Error extracting {FCStd_file_path} to {FCStd_dir_path}: {e}", file=sys.stderr)
+                    raise
+
+                if not include_thumbnail:
+                    remove_exported_thumbnail(staging_dir_path)
+            
+            else:
+                # Copy compressed data of unchanged files from the previous export's zip files
+                zip_file_prefix:str = config['compress_binaries']['zip_file_prefix']
+                previous_zip_paths:list = [os.path.join(FCStd_dir_path, f) for f in os.listdir(FCStd_dir_path) if f.startswith(zip_file_prefix) and f.endswith('.zip')] if os.path.isdir(FCStd_dir_path) else []
+                
+                # Note: Binaries are compressed straight from the .FCStd file, never written to disk uncompressed
+                try:
+                    stream_FCStd_file_to_dir(FCStd_file_path, staging_dir_path, config, include_thumbnail, previous_zip_paths)
+                except Exception as e:
+                    print(f"Error extracting {FCStd_file_path} to {FCStd_dir_path}: {e}", file=sys.stderr)
+                    raise
+
+                create_lockfile_and_changefile(staging_dir_path, FCStd_file_path)
+                
+                tree:dict = {}
+                for root, _, files in os.walk(staging_dir_path):
+                    for file in files:
+                        tree[os.path.relpath(os.path.join(root, file), staging_dir_path).replace(os.sep, '/')] = os.path.join(root, file)
+                write_file_atomically(os.path.join(staging_dir_path, EXPORT_MANIFEST_NAME), get_export_manifest(FCStd_file_path, tree, include_thumbnail, config))
+            
+            # Swap the new export in (two renames, an interruption in between is recovered by the next export/import, see recover_interrupted_FCStd_outputs())
+            if os.path.exists(FCStd_dir_path):
+                previous_dir_path:str = f"{staging_dir_path}{PREVIOUS_EXPORT_SUFFIX}"
+                os.replace(FCStd_dir_path, previous_dir_path)
+            
+            try:
+                os.replace(staging_dir_path, FCStd_dir_path)
+            except OSError:
+                if previous_dir_path is not None:
+                    os.replace(previous_dir_path, FCStd_dir_path)
+                    previous_dir_path:str = None
+                raise
+        
+        finally:
+            if os.path.exists(staging_dir_path):
+                remove_dir(staging_dir_path)
+            if previous_dir_path is not None:
+                remove_dir(previous_dir_path)
+
+def get_import_cache_dir_path() -> str:
+    """
+    Gets the path of the import cache directory (IMPORT_CACHE_DIR_NAME in the git common directory).
+
+    Raises:
+        RuntimeError: If not in a git repository.
+    """
+    return os.path.join(run_git_command('rev-parse', '--git-common-dir').strip(), IMPORT_CACHE_DIR_NAME)
+
+def get_import_cache_tree_ids(FCStd_dir_paths:list, config:dict) -> dict:
+    """
+    Gets the git tree ids in HEAD of the uncompressed directories identical to HEAD (nothing modified or untracked),
+    with one `git ls-tree` and one `git status` call for all directories (split only if the command line would get too long).
+    Batch imports call this once and pass each import its tree id, instead of two git calls per import.
+
+    Args:
+        FCStd_dir_paths (list): Paths to FCStd directories.
+        config (dict): Configuration dictionary. None if no config.
+
+    Returns:
+        dict: Normalized FCStd directory path -> tree id. Directories differing from HEAD or not in HEAD are omitted,
+              empty if the cache is disabled or the directories aren't in a git repository.
+    """
+    if config is None or not config['import_cache']['enabled'] or not FCStd_dir_paths: return {}
+    
+    try:
+        repo_root:str = get_repo_root(os.getcwd())
+    except RuntimeError:
+        return {}
+    
+    # Note: `ls-tree --full-name` and `status --porcelain` paths are relative to the repository root
+    dir_paths:dict = {os.path.relpath(os.path.abspath(path), repo_root).replace(os.sep, '/'): os.path.normpath(path) for path in FCStd_dir_paths}
+    
+    tree_ids:dict = {}
+    changed_paths:list = []
+    batch:list = []
+    for dir_path in list(dir_paths) + [None]:
+        if batch and (dir_path is None or sum(len(path) + 1 for path in batch) + len(dir_path) > LFS_INCLUDE_MAX_LENGTH):
+            try:
+                tree_entries:str = run_git_command('ls-tree', '-z', '--full-name', 'HEAD', '--', *batch, cwd=repo_root)
+                status:str = run_git_command('status', '--porcelain', '-z', '--untracked-files=all', '--', *batch, cwd=repo_root)
+            except RuntimeError:
+                return {}
+            
+            for record in tree_entries.split('\0'):
+                if not record: continue
+                info, path = record.split('\t', 1)
+                _, object_type, tree_id = info.split(' ')
+                if object_type == 'tree':
+                    tree_ids[path] = tree_id
+            
+            records:Iterator = iter(status.split('\0'))
+            for record in records:
+                if not record: continue
+                changed_paths.append(record[3:])
+                if 'R' in record[:2] or 'C' in record[:2]:
+                    changed_paths.append(next(records)) # Source path of a rename/copy
+            batch:list = []
+        
+        if dir_path is not None:
+            batch.append(dir_path)
+    
+    for changed_path in changed_paths:
+        for parent_path in PurePosixPath(changed_path).parents:
+            tree_ids.pop(str(parent_path), None)
+    
+    return {dir_paths[path]: tree_id for path, tree_id in tree_ids.items() if path in dir_paths}
+
+def get_import_cache_key(FCStd_dir_path:str, config:dict, include_thumbnail:bool, tree_ids:dict=None) -> str:
+    """
+    Gets the import cache key of an uncompressed directory: its git tree id in HEAD plus the config keys that change the imported .FCStd file.
+    Only directories identical to HEAD (nothing modified or untracked) can be identified by their tree id.
+
+    Args:
+        FCStd_dir_path (str): Path to FCStd directory.
+        config (dict): Configuration dictionary. None if no config.
+        include_thumbnail (bool): Add thumbnail to .FCStd file.
+        tree_ids (dict): Tree ids of the directories (see get_import_cache_tree_ids()), looked up with 2 git calls if None.
+
+    Returns:
+        str: Cache key. None if the cache is disabled or the directory differs from HEAD / isn't in a git repository.
+    """
+    if config is None or not config['import_cache']['enabled']: return None
+    
+    if tree_ids is None:
+        tree_ids:dict = get_import_cache_tree_ids([FCStd_dir_path], config)
+    
+    tree_id:str = tree_ids.get(os.path.normpath(FCStd_dir_path))
+    if tree_id is None: return None
+    
+    relevant_config:str = json.dumps({
+        "version": IMPORT_CACHE_VERSION,
+        "include_thumbnail": include_thumbnail,
+        "compress_enabled": config['compress_binaries']['enabled'],
+        "zip_file_prefix": config['compress_binaries']['zip_file_prefix']
+    }, sort_keys=True)
+    return f"{tree_id}-{hashlib.sha256(relevant_config.encode()).hexdigest()[:16]}"
+
+def clone_or_copy_file(src_path:str, dst_path:str):
+    """
+    Copies a file as a reflink (copy-on-write clone, no data copied) if the filesystem supports it, else as a regular copy.
+    """
+    try:
+        import fcntl # Not available on Windows
+        with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return
+    except (ImportError, OSError):
+        pass
+    
+    shutil.copyfile(src_path, dst_path)
+
+def update_import_cache_stats(cache_dir_path:str, **increments:int):
+    """
+    Adds increments (IE hits=1) to the counters in the cache's stats.json.
+    Note: Written atomically, concurrent imports (IE `--sync-all`) may occasionally lose a count.
+    """
+    stats_path:str = os.path.join(cache_dir_path, 'stats.json')
+    try:
+        with open(stats_path, 'r') as f:
+            stats:dict = json.load(f)
+    except (OSError, ValueError):
+        stats:dict = {}
+    
+    for name, increment in increments.items():
+        stats[name] = stats.get(name, 0) + increment
+    
+    temp_fd, temp_path = tempfile.mkstemp(dir=cache_dir_path, prefix='.stats-')
+    with os.fdopen(temp_fd, 'w') as f:
+        json.dump(stats, f)
+    os.replace(temp_path, stats_path)
+
+def replace_FCStd_file(src_path:str, FCStd_file_path:str):
+    """
+    Moves src_path over FCStd_file_path, keeping FCStd_file_path's permissions (readonly/writable).
+    """
+    FCStd_file_mode:int = (os.stat(FCStd_file_path).st_mode & 0o777) if os.path.exists(FCStd_file_path) else WRITABLE
+    os.chmod(src_path, FCStd_file_mode)
+    if os.path.exists(FCStd_file_path):
+        os.chmod(FCStd_file_path, WRITABLE) # Windows can't replace readonly files
+    os.replace(src_path, FCStd_file_path)
+
+def restore_FCStd_file_from_cache(cache_key:str, FCStd_file_path:str, config:dict) -> bool:
+    """
+    Replaces FCStd_file_path with the cached .FCStd file for cache_key (keeps FCStd_file_path's permissions).
+
+    Returns:
+        bool: True if restored (cache hit), False if not in the cache (cache miss).
+    """
+    try:
+        cache_dir_path:str = get_import_cache_dir_path()
+        cached_path:str = os.path.join(cache_dir_path, f"{cache_key}.FCStd")
+        os.makedirs(cache_dir_path, exist_ok=True)
+        
+        if not os.path.isfile(cached_path):
+            update_import_cache_stats(cache_dir_path, misses=1)
+            return False
+        
+        # Note: Not hardlinked, FreeCAD saves and `chmod` in hooks would then modify the cached file too
+        temp_fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(FCStd_file_path)), prefix=get_temp_name_prefix(FCStd_file_path), suffix='.FCStd')
+        os.close(temp_fd)
+        try:
+            clone_or_copy_file(cached_path, temp_path)
+            replace_FCStd_file(temp_path, FCStd_file_path)
+        finally:
+            if os.path.exists(temp_path): os.remove(temp_path)
+        
+        os.utime(cached_path) # Most recently used
+        update_import_cache_stats(cache_dir_path, hits=1)
+        return True
+    
+    except (OSError, RuntimeError) as e:
+        print(f"Warning: import cache unavailable, rebuilding '{FCStd_file_path}': {e}", file=sys.stderr)
+        return False
+
+def add_FCStd_file_to_cache(cache_key:str, FCStd_file_path:str, config:dict):
+    """
+    Adds an imported .FCStd file to the import cache, then evicts least recently used files until the cache fits in `max-size-megabyte`.
+    """
+    try:
+        cache_dir_path:str = get_import_cache_dir_path()
+        os.makedirs(cache_dir_path, exist_ok=True)
+        
+        temp_fd, temp_path = tempfile.mkstemp(dir=cache_dir_path, prefix='.', suffix='.FCStd')
+        os.close(temp_fd)
+        clone_or_copy_file(FCStd_file_path, temp_path)
+        os.replace(temp_path, os.path.join(cache_dir_path, f"{cache_key}.FCStd"))
+        
+        evict_import_cache(cache_dir_path, config['import_cache']['max_size_megabyte'] * (1024 ** 2))
+    
+    except (OSError, RuntimeError) as e:
+        print(f"Warning: failed to add '{FCStd_file_path}' to import cache: {e}", file=sys.stderr)
+
+def get_import_cache_entries(cache_dir_path:str) -> list:
+    """
+    Returns:
+        list: (path, size, last used time) of every cached .FCStd file, least recently used first.
+    """
+    entries:list = []
+    for item_name in os.listdir(cache_dir_path) if os.path.isdir(cache_dir_path) else []:
+        if item_name.startswith('.') or not item_name.endswith('.FCStd'): continue
+        
+        item_path:str = os.path.join(cache_dir_path, item_name)
+        try:
+            item_stat:os.stat_result = os.stat(item_path)
+        except FileNotFoundError:
+            continue # Evicted by a concurrent import
+        entries.append((item_path, item_stat.st_size, item_stat.st_mtime))
+    
+    return sorted(entries, key=lambda entry: entry[2])
+
+def evict_import_cache(cache_dir_path:str, max_size_bytes:float):
+    """
+    Removes least recently used cached .FCStd files until the cache size is at most max_size_bytes.
+    """
+    entries:list = get_import_cache_entries(cache_dir_path)
+    cache_size:int = sum(size for _, size, _ in entries)
+    
+    evicted:int = 0
+    for item_path, size, _ in entries:
+        if cache_size <= max_size_bytes: break
+        
+        try:
+            os.remove(item_path)
+        except FileNotFoundError:
+            pass
+        cache_size -= size
+        evicted += 1
+    
+    if evicted:
+        update_import_cache_stats(cache_dir_path, evictions=evicted)
+
+def get_import_cache_stats(config:dict) -> dict:
+    """
+    Returns:
+        dict: Import cache statistics (entries, size_bytes, max_size_bytes, hits, misses, evictions).
+    """
+    cache_dir_path:str = get_import_cache_dir_path()
+    entries:list = get_import_cache_entries(cache_dir_path)
+    
+    stats:dict = {"hits": 0, "misses": 0, "evictions": 0, "snapshot_restores": 0}
+    try:
+        with open(os.path.join(cache_dir_path, 'stats.json'), 'r') as f:
+            stats.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+    
+    return {
+        "entries": len(entries),
+        "size_bytes": sum(size for _, size, _ in entries),
+        "max_size_bytes": config['import_cache']['max_size_megabyte'] * (1024 ** 2),
+        **stats
+    }
+
+def get_FCStd_entries_digest(entries:dict) -> str:
+    """
+    Gets a digest of .FCStd file contents from their names, CRC32s and sizes (see get_FCStd_file_entries()).
+    """
+    digest = hashlib.sha256()
+    for name in sorted(entries):
+        crc, size = entries[name]
+        digest.update(f"{name}\0{crc}\0{size}\n".encode())
+    return digest.hexdigest()
+
+def get_FCStd_dir_digest(FCStd_dir_path:str, config:dict, entries:dict=None) -> str:
+    """
+    Gets the digest (see get_FCStd_entries_digest()) of the .FCStd file an import of FCStd_dir_path would create.
+    Compressed binaries aren't decompressed, uncompressed files are read to compute their CRC32.
+    entries are the directory's get_FCStd_dir_entries(), read if None.
+    """
+    entries:dict = dict(entries) if entries is not None else get_FCStd_dir_entries(FCStd_dir_path, config)
+    for name, (crc, size) in entries.items():
+        if crc is None:
+            path_in_dir:str = name if os.path.exists(os.path.join(FCStd_dir_path, name)) else f"{NO_EXTENSION_SUBDIR_NAME}/{name}"
+            entries[name] = (get_file_crc32(os.path.join(FCStd_dir_path, path_in_dir)), size)
+    return get_FCStd_entries_digest(entries)
+
+def load_snapshot_index(cache_dir_path:str) -> dict:
+    """
+    Returns:
+        dict: SNAPSHOT_INDEX_NAME contents: absolute FCStd directory path -> snapshot digest -> {"sizes": name -> size, "dir_signature": str or None}.
+              Empty if missing or unreadable.
+    """
+    try:
+        with open(os.path.join(cache_dir_path, SNAPSHOT_INDEX_NAME), 'r') as f:
+            index:dict = json.load(f)
+        return index if isinstance(index, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def snapshot_FCStd_files(FCStd_file_paths:list, config:dict) -> dict:
+    """
+    Snapshots .FCStd files into the import cache (`snapshot-{digest}.FCStd`, reflinked where possible) before git operations
+    that rewrite their uncompressed directories. See restore_FCStd_file_from_snapshot().
+    Each snapshot is recorded in SNAPSHOT_INDEX_NAME under its FCStd directory with the sizes of its entries, and the directory's
+    signature (see get_FCStd_dir_signature()) if the directory was exported from the .FCStd file (`.changefile` not older).
+
+    Args:
+        FCStd_file_paths (list): Paths to .FCStd files. Empty, missing or non zip files are skipped.
+        config (dict): Configuration dictionary.
+
+    Returns:
+        dict: Snapshotted .FCStd file paths -> digest.
+    """
+    if not config['import_cache']['enabled']: return {}
+    
+    cache_dir_path:str = get_import_cache_dir_path()
+    os.makedirs(cache_dir_path, exist_ok=True)
+    index:dict = load_snapshot_index(cache_dir_path)
+    
+    snapshots:dict = {}
+    for FCStd_file_path in FCStd_file_paths:
+        if not os.path.isfile(FCStd_file_path) or os.path.getsize(FCStd_file_path) == 0 or not zipfile.is_zipfile(FCStd_file_path): continue
+        
+        entries:dict = get_FCStd_file_entries(FCStd_file_path, config)
+        digest:str = get_FCStd_entries_digest(entries)
+        snapshot_path:str = os.path.join(cache_dir_path, f"snapshot-{digest}.FCStd")
+        if os.path.exists(snapshot_path):
+            os.utime(snapshot_path) # Most recently used
+        else:
+            temp_fd, temp_path = tempfile.mkstemp(dir=cache_dir_path, prefix='.', suffix='.FCStd')
+            os.close(temp_fd)
+            clone_or_copy_file(FCStd_file_path, temp_path)
+            os.replace(temp_path, snapshot_path)
+        
+        FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config)
+        changefile_path:str = os.path.join(FCStd_dir_path, '.changefile')
+        exported:bool = os.path.isfile(changefile_path) and os.stat(changefile_path).st_mtime_ns >= os.stat(FCStd_file_path).st_mtime_ns
+        index.setdefault(os.path.abspath(FCStd_dir_path), {})[digest] = {
+            "sizes": {name: size for name, (_, size) in entries.items()},
+            "dir_signature": get_FCStd_dir_signature(FCStd_dir_path) if exported else None
+        }
+        
+        snapshots[FCStd_file_path] = digest
+    
+    evict_import_cache(cache_dir_path, config['import_cache']['max_size_megabyte'] * (1024 ** 2))
+    
+    # Drop moved back or evicted snapshots
+    index:dict = {FCStd_dir_path: {digest: snapshot for digest, snapshot in dir_snapshots.items() if os.path.exists(os.path.join(cache_dir_path, f"snapshot-{digest}.FCStd"))} for FCStd_dir_path, dir_snapshots in index.items()}
+    write_file_atomically(os.path.join(cache_dir_path, SNAPSHOT_INDEX_NAME), json.dumps({FCStd_dir_path: dir_snapshots for FCStd_dir_path, dir_snapshots in index.items() if dir_snapshots}).encode())
+    
+    return snapshots
+
+def restore_FCStd_file_from_snapshot(FCStd_dir_path:str, FCStd_file_path:str, config:dict) -> bool:
+    """
+    Moves a snapshot (see snapshot_FCStd_files()) whose contents match FCStd_dir_path over FCStd_file_path (keeps FCStd_file_path's permissions).
+    Only snapshots taken of this directory's .FCStd file are considered. A directory untouched since its exported snapshot matches
+    by signature, otherwise uncompressed files are only read (CRC32) if the entry names and sizes match a snapshot.
+    Directories with shards not downloaded yet (LFS pointers) are rebuilt instead.
+
+    Returns:
+        bool: True if restored, False if no snapshot matches.
+    """
+    if config is None or not config['import_cache']['enabled']: return False
+    
+    try:
+        cache_dir_path:str = get_import_cache_dir_path()
+        dir_snapshots:dict = load_snapshot_index(cache_dir_path).get(os.path.abspath(FCStd_dir_path), {})
+        dir_snapshots:dict = {digest: snapshot for digest, snapshot in dir_snapshots.items() if os.path.isfile(os.path.join(cache_dir_path, f"snapshot-{digest}.FCStd"))}
+        if not dir_snapshots: return False
+        
+        dir_signature:str = get_FCStd_dir_signature(FCStd_dir_path)
+        digest:str = next((digest for digest, snapshot in dir_snapshots.items() if snapshot['dir_signature'] == dir_signature), None)
+        if digest is None:
+            if any(not os.path.exists(LFS_path) or is_LFS_pointer_file(LFS_path) for LFS_path in get_LFS_paths_for_import(FCStd_dir_path, config)): return False
+            
+            entries:dict = get_FCStd_dir_entries(FCStd_dir_path, config)
+            sizes:dict = {name: size for name, (_, size) in entries.items()}
+            if not any(snapshot['sizes'] == sizes for snapshot in dir_snapshots.values()): return False
+            
+            digest:str = get_FCStd_dir_digest(FCStd_dir_path, config, entries)
+            if digest not in dir_snapshots: return False
+        
+        snapshot_path:str = os.path.join(cache_dir_path, f"snapshot-{digest}.FCStd")
+        
+        try:
+            replace_FCStd_file(snapshot_path, FCStd_file_path)
+        except OSError:
+            # IE .git on another filesystem/drive
+            temp_fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(FCStd_file_path)), prefix=get_temp_name_prefix(FCStd_file_path), suffix='.FCStd')
+            os.close(temp_fd)
+            try:
+                clone_or_copy_file(snapshot_path, temp_path)
+                replace_FCStd_file(temp_path, FCStd_file_path)
+            finally:
+                if os.path.exists(temp_path): os.remove(temp_path)
+            os.remove(snapshot_path)
+        
+        update_import_cache_stats(cache_dir_path, snapshot_restores=1)
+        return True
+    
+    except (OSError, RuntimeError, ValueError, KeyError, TypeError, zipfile.BadZipFile) as e:
+        print(f"Warning: snapshot unavailable, rebuilding '{FCStd_file_path}': {e}", file=sys.stderr)
+        return False
+
+def import_FCStd_file(FCStd_dir_path:str, FCStd_file_path:str, config:dict, include_thumbnail:bool, cache_tree_ids:dict=None):
+    """
+    Imports (compresses) the contents of FCStd_dir_path to a .FCStd file.
+
+    Args:
+        FCStd_dir_path (str): Path to FCStd directory.
+        FCStd_file_path (str): Path to .FCStd file.
+        config (dict): Configuration dictionary. None if no config.
+        include_thumbnail (bool): Add thumbnail to .FCStd file.
+        cache_tree_ids (dict): Import cache tree ids looked up for a whole batch (see get_import_cache_tree_ids()). Looked up for this directory if None.
+
+    Raises:
+        FileNotFoundError: If the FCStd directory doesn't exist.
+        TimeoutError: If another process is importing/exporting the .FCStd file (see FCStdFileLock).
+    """
+    with FCStdFileLock(FCStd_file_path, config):
+        recover_interrupted_FCStd_outputs(FCStd_file_path, FCStd_dir_path)
+        if not os.path.exists(FCStd_dir_path):
+            raise FileNotFoundError(f"ERR: FCStd directory '{FCStd_dir_path}' does not exist.")
+        
+        # Same directory content was imported before (IE switching back to a branch)
+        cache_key:str = get_import_cache_key(FCStd_dir_path, config, include_thumbnail, cache_tree_ids)
+        if cache_key and restore_FCStd_file_from_cache(cache_key, FCStd_file_path, config): return
+        
+        # Same directory content was snapshotted before a git operation (IE `git fstash`, `git freset`)
+        if restore_FCStd_file_from_snapshot(FCStd_dir_path, FCStd_file_path, config): return
+        
+        # Shards not downloaded yet (IE cloned with GIT_LFS_SKIP_SMUDGE=1)
+        pull_missing_LFS_objects([FCStd_dir_path], config)
+        
+        # Exported with a manifest => Written straight from the entries' locations, else staged the way PU.createDocument() expects
+        entries:list = load_export_manifest(FCStd_dir_path) if config is not None else None
+        if entries is not None:
+            create_FCStd_file_from_manifest(FCStd_dir_path, FCStd_file_path, entries, config, include_thumbnail)
+        else:
+            with ImportingContext(FCStd_dir_path, config) as import_dir_path:
+                create_FCStd_file(import_dir_path, FCStd_file_path, include_thumbnail)
+        
+        if cache_key:
+            add_FCStd_file_to_cache(cache_key, FCStd_file_path, config)
+
+def create_FCStd_file(FCStd_dir_path:str, FCStd_file_path:str, include_thumbnail:bool):
+    """
+    Creates a .FCStd file from a directory containing the FCStd file's contents as FreeCAD expects them
+    (IE no compressed binaries and files without extension at the top level, see ImportingContext).
+    The file is built in a temporary sibling file that then replaces FCStd_file_path (keeping its permissions), never written in place.
+
+    Args:
+        FCStd_dir_path (str): Path to directory with FCStd file contents.
+        FCStd_file_path (str): Path to .FCStd file.
+        include_thumbnail (bool): Add thumbnail to .FCStd file.
+    """
+    temp_fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(FCStd_file_path)), prefix=get_temp_name_prefix(FCStd_file_path), suffix='.FCStd')
+    os.close(temp_fd)
+    try:
+        duplicate_warning:bool = False
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            
+            try:
+                PU.createDocument(os.path.join(FCStd_dir_path, 'Document.xml'), temp_path)
+            except Exception as e:
+                print(f"Error extracting {FCStd_file_path} to {FCStd_dir_path}: {e}", file=sys.stderr)
+                raise
+            
+            duplicate_warning:bool = any(
+            isinstance(warning.message, UserWarning) and "Duplicate name: './'" in str(warning.message)
+            for warning in caught
+            )
+        
+        # Fix for this issue: https://github.com/FreeCAD/FreeCAD/issues/23914
+        if duplicate_warning:
+            repackFCStd(temp_path)
+
+        if include_thumbnail:
+            add_thumbnail_to_FCStd_file(FCStd_dir_path, temp_path)
+        
+        with open(temp_path, 'r+b') as f:
+            os.fsync(f.fileno())
+        replace_FCStd_file(temp_path, FCStd_file_path)
+    
+    finally:
+        if os.path.exists(temp_path): os.remove(temp_path)
+
+def clear_FCStd_file_modification(FCStd_dir_path:str):
+    """
+    Writes the `.fcmod` file in FCStd_dir_path with the current timestamp (same thing `git fcmod` does).
+    The FCStd clean filter shows the .FCStd file as unmodified while its modification time is not newer than this timestamp.
+
+    Args:
+        FCStd_dir_path (str): Path to FCStd directory.
+    """
+    current_time:str = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='microseconds') # Same format as `date -u +"%Y-%m-%dT%H:%M:%S.%6N%:z"`
+    
+    write_file_atomically(os.path.join(FCStd_dir_path, '.fcmod'), f"{current_time}\n".encode())
+
+def get_FCStd_dir_signature(FCStd_dir_path:str) -> str:
+    """
+    Gets a cheap signature (paths, sizes and modification times, no file contents) of the files in FCStd_dir_path.
+    `.fcmod` is ignored as it is rewritten after every sync.
+
+    Args:
+        FCStd_dir_path (str): Path to FCStd directory.
+
+    Returns:
+        str: sha256 hex digest of the directory's file stats.
+    """
+    signature = hashlib.sha256()
+    for root, dirs, files in os.walk(FCStd_dir_path):
+        dirs.sort()
+        for item_name in sorted(files):
+            if item_name == '.fcmod': continue
+            
+            item_full_path:str = os.path.join(root, item_name)
+            item_stat:os.stat_result = os.stat(item_full_path)
+            item_rel_path:str = os.path.relpath(item_full_path, start=FCStd_dir_path).replace(os.sep, '/')
+            signature.update(f"{item_rel_path}\0{item_stat.st_size}\0{item_stat.st_mtime_ns}\n".encode())
+    
+    return signature.hexdigest()
+
+def get_FCStd_file_signature(FCStd_file_path:str) -> str:
+    """
+    Args:
+        FCStd_file_path (str): Path to .FCStd file.
+
+    Returns:
+        str: Size and modification time of the .FCStd file, empty if it doesn't exist.
+    """
+    if not os.path.exists(FCStd_file_path): return ""
+    
+    FCStd_file_stat:os.stat_result = os.stat(FCStd_file_path)
+    return f"{FCStd_file_stat.st_size}:{FCStd_file_stat.st_mtime_ns}"
+
+def load_sync_journal(journal_path:str) -> dict:
+    """
+    Loads the journal of a (possibly interrupted) previous `--sync-all` run.
+    Incomplete trailing lines (run killed mid write) are ignored.
+
+    Args:
+        journal_path (str): Path to journal file.
+
+    Returns:
+        dict: FCStd file path -> {"dir_signature", "FCStd_file_signature"} of its last successful sync.
+    """
+    journal:dict = {}
+    if not os.path.exists(journal_path): return journal
+    
+    with open(journal_path, 'r') as f:
+        for line in f:
+            try:
+                entry:dict = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            
+            journal[entry['FCStd_file_path']] = {"dir_signature": entry['dir_signature'], "FCStd_file_signature": entry['FCStd_file_signature']}
+    
+    return journal
+
+def FCStd_file_is_synced(FCStd_file_path:str, FCStd_dir_path:str, journal:dict) -> bool:
+    """
+    Checks if neither the .FCStd file nor its directory changed since the journaled sync.
+
+    Args:
+        FCStd_file_path (str): Path to .FCStd file.
+        FCStd_dir_path (str): Path to FCStd directory.
+        journal (dict): Loaded journal (see load_sync_journal()).
+
+    Returns:
+        bool: True if the .FCStd file is already up to date.
+    """
+    if FCStd_file_path not in journal or not os.path.exists(FCStd_dir_path): return False
+    
+    entry:dict = journal[FCStd_file_path]
+    return entry['FCStd_file_signature'] == get_FCStd_file_signature(FCStd_file_path) and entry['dir_signature'] == get_FCStd_dir_signature(FCStd_dir_path)
+
+def sync_FCStd_file(FCStd_file_path:str, config:dict, cache_tree_ids:dict=None) -> dict:
+    """
+    Imports a single .FCStd file and clears its modification. Runs in a `--sync-all` worker so it never raises.
+
+    Args:
+        FCStd_file_path (str): Path to .FCStd file.
+        config (dict): Configuration dictionary.
+        cache_tree_ids (dict): See import_FCStd_file().
+
+    Returns:
+        dict: Journal entry for the .FCStd file, with "error" set if the import failed.
+    """
+    warnings.filterwarnings("ignore")
+    
+    try:
+        FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config)
+        import_FCStd_file(FCStd_dir_path, FCStd_file_path, config, config['include_thumbnails'], cache_tree_ids)
+        clear_FCStd_file_modification(FCStd_dir_path)
+        
+        return {
+            "FCStd_file_path": FCStd_file_path,
+            "dir_signature": get_FCStd_dir_signature(FCStd_dir_path),
+            "FCStd_file_signature": get_FCStd_file_signature(FCStd_file_path),
+            "error": None
+        }
+    
+    except Exception as e:
+        return {"FCStd_file_path": FCStd_file_path, "error": f"{type(e).__name__}: {e}"}
+
+def format_duration(seconds:float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+def print_sync_progress(num_done:int, num_total:int, start_time:float, FCStd_file_path:str):
+    """
+    Prints sync progress with throughput and ETA to stderr. Overwrites the same line when stderr is a terminal.
+    """
+    elapsed:float = time.monotonic() - start_time
+    files_per_second:float = num_done / elapsed if elapsed > 0 else 0.0
+    eta:str = format_duration((num_total - num_done) / files_per_second) if files_per_second > 0 else "--:--:--"
+    
+    progress:str = f"[{num_done}/{num_total}] {files_per_second:.2f} files/s, elapsed {format_duration(elapsed)}, ETA {eta}: '{FCStd_file_path}'"
+    if sys.stderr.isatty():
+        print(f"\r\033[K{progress}", end='', file=sys.stderr, flush=True)
+    else:
+        print(progress, file=sys.stderr, flush=True)
+
+def sync_all_FCStd_files(FCStd_file_paths:list, journal_path:str, config:dict, num_jobs:int, silent:bool, top:int=STATS_TOP_DEFAULT) -> tuple:
+    """
+    Imports many .FCStd files in a process pool, scheduled by size and estimated memory (see run_scheduled_jobs()).
+    Resumable: every successful import is appended to the journal immediately,
+    files whose .FCStd file and directory are unchanged since their journaled import are skipped.
+
+    Args:
+        FCStd_file_paths (list): Paths to .FCStd files.
+        journal_path (str): Path to journal file (IE under .git/).
+        config (dict): Configuration dictionary.
+        num_jobs (int): Max number of worker processes.
+        silent (bool): Don't print progress.
+        top (int): Number of jobs listed in the job report (see print_job_report()).
+
+    Returns:
+        tuple: (list of imported .FCStd file paths, dict of failed .FCStd file paths -> error message)
+    """
+    journal:dict = load_sync_journal(journal_path)
+    
+    to_sync:list = []
+    num_skipped:int = 0
+    for FCStd_file_path in FCStd_file_paths:
+        try:
+            FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config)
+        except FileNotFoundError:
+            FCStd_dir_path:str = None
+        
+        if FCStd_dir_path is not None and FCStd_file_is_synced(FCStd_file_path, FCStd_dir_path, journal):
+            num_skipped += 1
+        else:
+            to_sync.append(FCStd_file_path)
+    
+    memory_budget_bytes:int = get_memory_budget_bytes(config)
+    if not silent:
+        print(f"Syncing {len(to_sync)} .FCStd files with up to {num_jobs} jobs, {format_memory_budget(memory_budget_bytes)} ({num_skipped} already up to date)", file=sys.stderr)
+    
+    # Compact journal: drop entries of files no longer tracked
+    os.makedirs(os.path.dirname(os.path.abspath(journal_path)), exist_ok=True)
+    with open(f"{journal_path}.tmp", 'w') as f:
+        for FCStd_file_path in FCStd_file_paths:
+            if FCStd_file_path in journal:
+                f.write(json.dumps({"FCStd_file_path": FCStd_file_path, **journal[FCStd_file_path]}) + "\n")
+    os.replace(f"{journal_path}.tmp", journal_path)
+    
+    # One LFS download and one import cache lookup for every file about to be imported, instead of one per worker
+    FCStd_dir_paths:list = [get_FCStd_dir_path(path, config, check_exists=False) for path in to_sync]
+    cache_tree_ids:dict = get_import_cache_tree_ids(FCStd_dir_paths, config)
+    try:
+        pulled:list = pull_missing_LFS_objects(FCStd_dir_paths, config)
+        if pulled and not silent:
+            print(f"Pulled {len(pulled)} LFS files", file=sys.stderr)
+    except RuntimeError as e:
+        print(f"Error: Failed to pull LFS files: {e}", file=sys.stderr)
+    
+    synced:list = []
+    failed:dict = {}
+    reports:list = []
+    start_time:float = time.monotonic()
+    with open(journal_path, 'a') as journal_file:
+        def record_result(job:dict, result:dict, usage:dict):
+            FCStd_file_path:str = result.pop('FCStd_file_path')
+            error:str = result.pop('error')
+            reports.append({**job, **usage, "error": error})
+            
+            if error is None:
+                journal_file.write(json.dumps({"FCStd_file_path": FCStd_file_path, **result}) + "\n")
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+                synced.append(FCStd_file_path)
+            else:
+                failed[FCStd_file_path] = error
+            
+            if not silent:
+                print_sync_progress(len(synced) + len(failed), len(to_sync), start_time, FCStd_file_path)
+        
+        jobs:list = [get_FCStd_job(BATCH_IMPORT, FCStd_file_path, config, (FCStd_file_path, config, get_job_cache_tree_ids(FCStd_file_path, config, cache_tree_ids))) for FCStd_file_path in to_sync]
+        run_scheduled_jobs(jobs, sync_FCStd_file, num_jobs, memory_budget_bytes, record_result)
+    
+    if not silent:
+        if to_sync and sys.stderr.isatty(): print(file=sys.stderr)
+        for FCStd_file_path, error in failed.items():
+            print(f"ERROR: Failed to import '{FCStd_file_path}': {error}", file=sys.stderr)
+        if reports:
+            print_job_report(reports, time.monotonic() - start_time, top)
+        print(f"Synced {len(synced)}, skipped {num_skipped}, failed {len(failed)} in {format_duration(time.monotonic() - start_time)}", file=sys.stderr)
+    
+    return synced, failed
+
+def get_max_jobs(num_jobs:int, config:dict) -> int:
+    """
+    Gets the max number of concurrent jobs: JOBS_FLAG if given, else `job-scheduling` `max-jobs` (0 => number of CPUs).
+    """
+    return num_jobs or config['job_scheduling']['max_jobs'] or os.cpu_count() or 1
+
+def get_available_memory_bytes() -> int:
+    """
+    Gets the physical memory currently available (free + reclaimable), or the total physical memory where that isn't exposed.
+
+    Returns:
+        int: Bytes. None if unknown.
+    """
+    if os.name == 'nt':
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong), ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                        ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong), ("ullTotalVirtual", ctypes.c_ulonglong),
+                        ("ullAvailVirtual", ctypes.c_ulonglong), ("ullAvailExtendedVirtual", ctypes.c_ulonglong)]
+        
+        status:MEMORYSTATUSEX = MEMORYSTATUSEX(dwLength=ctypes.sizeof(MEMORYSTATUSEX))
+        if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)): return None
+        return status.ullAvailPhys
+    
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass # Not Linux
+    
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+def get_memory_budget_bytes(config:dict) -> int:
+    """
+    Gets the max total estimated memory of concurrent jobs: `job-scheduling` `memory-budget-megabyte`,
+    0 => JOB_MEMORY_AVAILABLE_FRACTION of the memory available now.
+
+    Returns:
+        int: Bytes. None if unbounded (available memory unknown).
+    """
+    budget_megabyte:float = config['job_scheduling']['memory_budget_megabyte']
+    if budget_megabyte > 0: return int(budget_megabyte * (1024 ** 2))
+    
+    available_bytes:int = get_available_memory_bytes()
+    return None if available_bytes is None else int(available_bytes * JOB_MEMORY_AVAILABLE_FRACTION)
+
+def format_memory_budget(memory_budget_bytes:int) -> str:
+    return "no memory budget" if memory_budget_bytes is None else f"memory budget {memory_budget_bytes / (1024 ** 2):.0f} MB"
+
+def get_FCStd_job(mode:str, FCStd_file_path:str, config:dict, args:tuple) -> dict:
+    """
+    Sizes the import/export of a .FCStd file for run_scheduled_jobs(). Size is what the job reads: the .FCStd file for an export,
+    its uncompressed directory for an import. Peak memory is estimated as JOB_BASE_MEMORY_BYTES plus the uncompressed size of the model,
+    only zip central directories (or the export manifest) are read. Unreadable files are sized empty, their job reports the error.
+
+    Args:
+        mode (str): BATCH_IMPORT or BATCH_EXPORT.
+        FCStd_file_path (str): Path to .FCStd file.
+        config (dict): Configuration dictionary.
+        args (tuple): Args of the job's function.
+
+    Returns:
+        dict: Job with "FCStd_file_path", "args", "size_bytes" and "memory_bytes".
+    """
+    size_bytes:int = 0
+    model_bytes:int = 0
+    try:
+        if mode == BATCH_EXPORT:
+            size_bytes:int = os.path.getsize(FCStd_file_path)
+            model_bytes:int = sum(size for _, size in get_FCStd_file_entries(FCStd_file_path, config).values())
+        else:
+            FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config, check_exists=False)
+            size_bytes:int = sum(os.path.getsize(os.path.join(root, file)) for root, _, files in os.walk(FCStd_dir_path) for file in files)
+            model_bytes:int = sum(size for _, size in get_FCStd_dir_entries(FCStd_dir_path, config).values())
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        pass
+    
+    return {"FCStd_file_path": FCStd_file_path, "args": args, "size_bytes": size_bytes, "memory_bytes": JOB_BASE_MEMORY_BYTES + model_bytes}
+
+def get_job_cache_tree_ids(FCStd_file_path:str, config:dict, cache_tree_ids:dict) -> dict:
+    """
+    Gets the part of a batch's import cache tree ids (see get_import_cache_tree_ids()) a single job needs, so workers aren't sent the whole batch's.
+
+    Returns:
+        dict: Tree id of the file's FCStd directory (empty if it differs from HEAD). None if cache_tree_ids is None.
+    """
+    if cache_tree_ids is None: return None
+    
+    FCStd_dir_path:str = os.path.normpath(get_FCStd_dir_path(FCStd_file_path, config, check_exists=False))
+    return {FCStd_dir_path: cache_tree_ids[FCStd_dir_path]} if FCStd_dir_path in cache_tree_ids else {}
+
+def reset_peak_memory() -> bool:
+    """
+    Linux only: resets the peak resident memory (VmHWM) of the current process, so get_peak_memory_bytes() measures from now on.
+
+    Returns:
+        bool: True if reset.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def get_peak_memory_bytes() -> int:
+    """
+    Gets the peak resident memory (VmHWM) of the current process since reset_peak_memory().
+
+    Returns:
+        int: Bytes. None if unknown.
+    """
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+def run_measured_job(function, *args) -> tuple:
+    """
+    Runs function(*args) in a job worker (see run_scheduled_jobs()) and measures it.
+
+    Returns:
+        tuple: (function's result, dict of "seconds", "cpu_seconds" and "peak_memory_bytes" (None if unknown))
+    """
+    measure_memory:bool = reset_peak_memory()
+    start_time:float = time.monotonic()
+    start_cpu_time:float = time.process_time()
+    
+    result = function(*args)
+    
+    return result, {
+        "seconds": time.monotonic() - start_time,
+        "cpu_seconds": time.process_time() - start_cpu_time,
+        "peak_memory_bytes": get_peak_memory_bytes() if measure_memory else None
+    }
+
+def run_scheduled_jobs(jobs:list, function, max_jobs:int, memory_budget_bytes:int, on_done):
+    """
+    Runs function(*job["args"]) for every job in a process pool, largest first (size, then estimated memory),
+    while at most max_jobs run and their total estimated memory stays within memory_budget_bytes.
+    Smaller jobs fill the room left next to the running ones. A job estimated larger than the whole budget runs once nothing else does.
+    Mixed batches then finish close to the time of the largest job instead of the sum, without running out of memory.
+
+    Args:
+        jobs (list): Jobs (see get_FCStd_job()).
+        function (callable): Module level function, called in the workers. Must never raise (IE return the error instead).
+        max_jobs (int): Max concurrent jobs. 1 => Jobs run in this process.
+        memory_budget_bytes (int): Max total estimated memory of the concurrent jobs. None => Unbounded.
+        on_done (callable): Called in this process with (job, function's result, usage) as each job finishes (see run_measured_job()).
+    """
+    pending:list = sorted(jobs, key=lambda job: (job['size_bytes'], job['memory_bytes']), reverse=True)
+    
+    if max_jobs <= 1 or len(pending) <= 1:
+        for job in pending:
+            on_done(job, *run_measured_job(function, *job['args']))
+        return
+    
+    running:dict = {} # Future -> job
+    reserved_bytes:int = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(max_jobs, len(pending))) as executor:
+        while pending or running:
+            for job in list(pending):
+                if len(running) >= max_jobs: break
+                
+                fits:bool = memory_budget_bytes is None or reserved_bytes + job['memory_bytes'] <= memory_budget_bytes
+                if running and not fits: continue # Try the smaller jobs
+                
+                pending.remove(job)
+                reserved_bytes += job['memory_bytes']
+                running[executor.submit(run_measured_job, function, *job['args'])] = job
+            
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                job:dict = running.pop(future)
+                reserved_bytes -= job['memory_bytes']
+                on_done(job, *future.result())
+
+def print_job_report(reports:list, wall_seconds:float, top:int):
+    """
+    Prints the resource usage of the `top` longest jobs to stderr, and their total time vs the wall clock time.
+
+    Args:
+        reports (list): Jobs (see get_FCStd_job()) updated with their usage (see run_measured_job()) and "error".
+        wall_seconds (float): Wall clock time of all jobs.
+        top (int): Number of jobs listed.
+    """
+    def mb(num_bytes:int) -> str:
+        return "-" if num_bytes is None else f"{num_bytes / (1024 ** 2):.1f} MB"
+    
+    print(f"Job report (top {min(top, len(reports))} of {len(reports)} by time):", file=sys.stderr)
+    print(f"    {'FCStd file':<48}{'size':>12}{'est. memory':>14}{'peak memory':>14}{'time':>10}{'cpu':>10}  status", file=sys.stderr)
+    for report in sorted(reports, key=lambda report: report['seconds'], reverse=True)[:top]:
+        status:str = "OK" if report['error'] is None else "FAILED"
+        print(f"    {report['FCStd_file_path']:<48}{mb(report['size_bytes']):>12}{mb(report['memory_bytes']):>14}{mb(report['peak_memory_bytes']):>14}"
+              f"{report['seconds']:>9.2f}s{report['cpu_seconds']:>9.2f}s  {status}", file=sys.stderr)
+    print(f"    {len(reports)} jobs: {sum(report['seconds'] for report in reports):.2f}s of work in {wall_seconds:.2f}s", file=sys.stderr)
+
+def run_FCStd_job(mode:str, FCStd_file_path:str, config:dict, cache_tree_ids:dict=None) -> dict:
+    """
+    Imports or exports a single .FCStd file. Runs in a BATCH_FLAG worker so it never raises.
+
+    Args:
+        mode (str): BATCH_IMPORT or BATCH_EXPORT.
+        FCStd_file_path (str): Path to .FCStd file.
+        config (dict): Configuration dictionary.
+        cache_tree_ids (dict): See import_FCStd_file().
+
+    Returns:
+        dict: "error" message, None if the import/export succeeded.
+    """
+    warnings.filterwarnings("ignore")
+    
+    try:
+        if mode == BATCH_EXPORT:
+            if os.path.getsize(FCStd_file_path) == 0:
+                raise ValueError(f"ERR: FCStd file '{FCStd_file_path}' is empty.")
+            export_FCStd_file(FCStd_file_path, get_FCStd_dir_path(FCStd_file_path, config), config, config['include_thumbnails'])
+        else:
+            import_FCStd_file(get_FCStd_dir_path(FCStd_file_path, config), FCStd_file_path, config, config['include_thumbnails'], cache_tree_ids)
+        
+        return {"error": None}
+    
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+def run_FCStd_jobs(mode:str, FCStd_file_paths:list, config:dict, num_jobs:int, silent:bool, top:int=STATS_TOP_DEFAULT) -> tuple:
+    """
+    Imports or exports many .FCStd files in a process pool, scheduled by size and estimated memory (see run_scheduled_jobs()).
+
+    Args:
+        mode (str): BATCH_IMPORT or BATCH_EXPORT.
+        FCStd_file_paths (list): Paths to .FCStd files.
+        config (dict): Configuration dictionary.
+        num_jobs (int): Max number of worker processes.
+        silent (bool): Don't print progress and the job report (see print_job_report()). Errors are always printed.
+        top (int): Number of jobs listed in the job report.
+
+    Returns:
+        tuple: (list of imported/exported .FCStd file paths, dict of failed .FCStd file paths -> error message)
+    """
+    action:str = "IMPORTING" if mode == BATCH_IMPORT else "EXPORTING"
+    memory_budget_bytes:int = get_memory_budget_bytes(config)
+    FCStd_file_paths:list = list(dict.fromkeys(FCStd_file_paths))
+    
+    # One LFS download and one import cache lookup for every file about to be imported, instead of one per worker (their `git lfs pull`s would fight over .git/index.lock)
+    cache_tree_ids:dict = None
+    if mode == BATCH_IMPORT:
+        FCStd_dir_paths:list = [get_FCStd_dir_path(path, config, check_exists=False) for path in FCStd_file_paths]
+        cache_tree_ids:dict = get_import_cache_tree_ids(FCStd_dir_paths, config)
+        try:
+            pulled:list = pull_missing_LFS_objects(FCStd_dir_paths, config)
+            if pulled and not silent:
+                print(f"Pulled {len(pulled)} LFS files", file=sys.stderr)
+        except RuntimeError as e:
+            print(f"Error: Failed to pull LFS files: {e}", file=sys.stderr)
+    
+    jobs:list = [get_FCStd_job(mode, FCStd_file_path, config, (mode, FCStd_file_path, config, get_job_cache_tree_ids(FCStd_file_path, config, cache_tree_ids))) for FCStd_file_path in FCStd_file_paths]
+    
+    if not silent and len(jobs) > 1:
+        print(f"{action} {len(jobs)} .FCStd files with up to {num_jobs} jobs, {format_memory_budget(memory_budget_bytes)}", file=sys.stderr)
+    
+    done:list = []
+    failed:dict = {}
+    reports:list = []
+    def record_result(job:dict, result:dict, usage:dict):
+        FCStd_file_path:str = job['FCStd_file_path']
+        reports.append({**job, **usage, "error": result['error']})
+        
+        if result['error'] is None:
+            done.append(FCStd_file_path)
+            if not silent:
+                print(f"{action}: '{FCStd_file_path}'....SUCCESS", file=sys.stderr)
+        else:
+            failed[FCStd_file_path] = result['error']
+            print(f"ERROR: Failed to {mode} '{FCStd_file_path}': {result['error']}", file=sys.stderr)
+    
+    start_time:float = time.monotonic()
+    run_scheduled_jobs(jobs, run_FCStd_job, num_jobs, memory_budget_bytes, record_result)
+    
+    if not silent and len(reports) > 1:
+        print_job_report(reports, time.monotonic() - start_time, top)
+    
+    return done, failed
+
+def get_file_crc32(file_path:str) -> int:
+    crc:int = 0
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(1024 * 1024):
+            crc:int = zlib.crc32(chunk, crc)
+    return crc
+
+def get_FCStd_file_entries(FCStd_file_path:str, config:dict) -> dict:
+    """
+    Reads only the zip central directory of a .FCStd file. Nothing is decompressed.
+
+    Args:
+        FCStd_file_path (str): Path to .FCStd file.
+        config (dict): Configuration dictionary.
+
+    Returns:
+        dict: Member name -> (crc32, uncompressed size).
+    """
+    entries:dict = {}
+    with zipfile.ZipFile(FCStd_file_path, 'r') as zf:
+        for info in zf.infolist():
+            if info.is_dir(): continue
+            
+            # Exported directory doesn't contain thumbnails if they're excluded
+            if not config['include_thumbnails'] and info.filename.startswith('thumbnails/'): continue
+            
+            entries[info.filename] = (info.CRC, info.file_size)
+    
+    return entries
+
+def get_FCStd_dir_entries(FCStd_dir_path:str, config:dict) -> dict:
+    """
+    Gets CRC32s and sizes of the files an import of FCStd_dir_path would write to the .FCStd file, keyed by their name in the .FCStd file.
+    With an EXPORT_MANIFEST_NAME file the entries are looked up in it, otherwise compressed binaries are read from the zip central directories
+    of the shards and from the shared store manifest. Nothing is decompressed, uncompressed files are only read to compute their CRC32.
+
+    Args:
+        FCStd_dir_path (str): Path to FCStd directory.
+        config (dict): Configuration dictionary.
+
+    Returns:
+        dict: Name in .FCStd file -> (crc32, size) or (None, size) when the CRC32 is computed lazily (see get_FCStd_sync_status()).
+    """
+    zip_file_prefix:str = config['compress_binaries']['zip_file_prefix']
+    no_extension_prefix:str = f"{NO_EXTENSION_SUBDIR_NAME}/"
+    
+    def name_in_FCStd_file(path_in_dir:str) -> str:
+        return path_in_dir.removeprefix(no_extension_prefix)
+    
+    # Exported with a manifest => Compressed binaries are looked up instead of read, only plain files are stat'ed
+    manifest_entries:list = load_export_manifest(FCStd_dir_path)
+    if manifest_entries is not None:
+        return {
+            entry['name']: (entry['crc32'], entry['size']) if entry['member'] is not None else (None, os.path.getsize(os.path.join(FCStd_dir_path, *entry['location'].split('/'))))
+            for entry in manifest_entries
+        }
+    
+    entries:dict = {}
+    for root, _, files in os.walk(FCStd_dir_path):
+        for item_name in files:
+            item_full_path:str = os.path.join(root, item_name)
+            item_rel_path:str = os.path.relpath(item_full_path, start=FCStd_dir_path).replace(os.sep, '/')
+            
+            if item_rel_path in ('.changefile', '.lockfile', '.fcmod', EXPORT_MANIFEST_NAME): continue
+            
+            if item_rel_path == SHARED_STORE_MANIFEST_NAME:
+                with open(item_full_path, 'r') as f:
+                    for path_in_dir, blob_info in json.load(f).items():
+                        entries[name_in_FCStd_file(path_in_dir)] = (blob_info['crc32'], blob_info['size'])
+                continue
+            
+            if item_rel_path.startswith(zip_file_prefix) and item_rel_path.endswith('.zip'):
+                with zipfile.ZipFile(item_full_path, 'r') as zf:
+                    for info in zf.infolist():
+                        if not info.is_dir():
+                            entries[name_in_FCStd_file(info.filename)] = (info.CRC, info.file_size)
+                continue
+            
+            entries[name_in_FCStd_file(item_rel_path)] = (None, os.path.getsize(item_full_path))
+    
+    return entries
+
+def get_FCStd_sync_status(FCStd_file_path:str, config:dict) -> tuple:
+    """
+    Checks if a .FCStd file and its uncompressed directory contain the same data by comparing CRC32s and sizes.
+
+    Args:
+        FCStd_file_path (str): Path to .FCStd file.
+        config (dict): Configuration dictionary.
+
+    Returns:
+        tuple: (VERIFY_IN_SYNC | VERIFY_STALE | VERIFY_MISSING, list of names that differ or a reason)
+    """
+    if not os.path.exists(FCStd_file_path):
+        return VERIFY_MISSING, ["FCStd file does not exist"]
+    
+    FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config)
+    if not os.path.isdir(FCStd_dir_path):
+        return VERIFY_MISSING, ["uncompressed directory does not exist"]
+    
+    # Empty .FCStd files are what git checks out, they still need to be imported
+    if os.path.getsize(FCStd_file_path) == 0 or not zipfile.is_zipfile(FCStd_file_path):
+        return VERIFY_STALE, ["FCStd file is empty or not a zip archive"]
+    
+    FCStd_file_entries:dict = get_FCStd_file_entries(FCStd_file_path, config)
+    FCStd_dir_entries:dict = get_FCStd_dir_entries(FCStd_dir_path, config)
+    
+    differing:list = sorted(set(FCStd_file_entries) ^ set(FCStd_dir_entries))
+    for name in sorted(set(FCStd_file_entries) & set(FCStd_dir_entries)):
+        FCStd_file_crc, FCStd_file_size = FCStd_file_entries[name]
+        dir_crc, dir_size = FCStd_dir_entries[name]
+        
+        if FCStd_file_size != dir_size:
+            differing.append(name)
+            continue
+        
+        # Only read uncompressed directory files when sizes match
+        if dir_crc is None:
+            path_in_dir:str = name if os.path.exists(os.path.join(FCStd_dir_path, name)) else f"{NO_EXTENSION_SUBDIR_NAME}/{name}"
+            dir_crc:int = get_file_crc32(os.path.join(FCStd_dir_path, path_in_dir))
+        
+        if FCStd_file_crc != dir_crc:
+            differing.append(name)
+    
+    if differing: return VERIFY_STALE, differing
+    
+    return VERIFY_IN_SYNC, []
+
+def get_compressed_path_in_dir(member_name:str) -> PurePosixPath:
+    """
+    Gets the path a .FCStd archive member has in the uncompressed directory (files without extension are moved to NO_EXTENSION_SUBDIR_NAME),
+    in the form compress_binaries() matches `files-to-compress` patterns against.
+    """
+    if '/' not in member_name and '.' not in member_name:
+        member_name:str = f"{NO_EXTENSION_SUBDIR_NAME}/{member_name}"
+    return PurePosixPath('/' + member_name)
+
+def sample_binaries_for_compression(FCStd_file_paths:list, config:dict, sample_bytes:int) -> tuple:
+    """
+    Finds the .FCStd archive members export would compress, grouped by the first `files-to-compress` pattern they match.
+    Only zip central directories are read to size the binaries, a random (but reproducible) sample of up to sample_bytes per pattern is decompressed.
+
+    Args:
+        FCStd_file_paths (list): Paths to .FCStd files.
+        config (dict): Configuration dictionary.
+        sample_bytes (int): Max uncompressed bytes sampled per pattern.
+
+    Returns:
+        tuple: (dict of pattern -> list of sampled member contents (bytes), dict of pattern -> total uncompressed bytes in all files,
+                dict of .FCStd file path -> uncompressed bytes of its binaries)
+    """
+    patterns:list = config['compress_binaries']['binary_file_patterns']
+    
+    members:dict = {pattern: [] for pattern in patterns}
+    total_bytes:dict = {pattern: 0 for pattern in patterns}
+    file_bytes:dict = {}
+    for FCStd_file_path in FCStd_file_paths:
+        file_bytes[FCStd_file_path] = 0
+        with zipfile.ZipFile(FCStd_file_path, 'r') as zf:
+            for info in zf.infolist():
+                if info.is_dir(): continue
+                if not config['include_thumbnails'] and info.filename.startswith('thumbnails/'): continue
+                
+                posix_path:PurePosixPath = get_compressed_path_in_dir(info.filename)
+                for pattern in patterns:
+                    if posix_path.match(pattern):
+                        members[pattern].append((FCStd_file_path, info.filename, info.file_size))
+                        total_bytes[pattern] += info.file_size
+                        file_bytes[FCStd_file_path] += info.file_size
+                        break
+    
+    samples:dict = {}
+    rng:random.Random = random.Random(0)
+    for pattern, pattern_members in members.items():
+        rng.shuffle(pattern_members)
+        
+        samples[pattern] = []
+        num_sampled_bytes:int = 0
+        for FCStd_file_path, member_name, file_size in pattern_members:
+            if num_sampled_bytes >= sample_bytes: break
+            if num_sampled_bytes and num_sampled_bytes + file_size > sample_bytes: continue # Keep looking for smaller members that fit
+            
+            with zipfile.ZipFile(FCStd_file_path, 'r') as zf:
+                samples[pattern].append(zf.read(member_name))
+            num_sampled_bytes += file_size
+    
+    return samples, total_bytes, file_bytes
+
+def benchmark_compression(samples:list, method:str, level:int) -> dict:
+    """
+    Zips samples in memory the same way compress_binaries() does, then reads them back.
+
+    Returns:
+        dict: "raw_bytes", "compressed_bytes", "compress_seconds", "decompress_seconds"
+    """
+    buffer:io.BytesIO = io.BytesIO()
+    
+    start:float = time.perf_counter()
+    with zipfile.ZipFile(buffer, 'w', COMPRESSION_METHODS[method], compresslevel=level) as zf:
+        for i, data in enumerate(samples):
+            zf.writestr(str(i), data)
+    compress_seconds:float = time.perf_counter() - start
+    
+    start:float = time.perf_counter()
+    with zipfile.ZipFile(buffer, 'r') as zf:
+        for info in zf.infolist():
+            zf.read(info)
+    decompress_seconds:float = time.perf_counter() - start
+    
+    return {
+        "raw_bytes": sum(len(data) for data in samples),
+        "compressed_bytes": buffer.tell(),
+        "compress_seconds": compress_seconds,
+        "decompress_seconds": decompress_seconds
+    }
+
+def advise_compression(FCStd_file_paths:list, config:dict, sample_bytes:int=ADVISE_COMPRESSION_SAMPLE_BYTES) -> dict:
+    """
+    Benchmarks every ADVISE_COMPRESSION_CANDIDATES (and the configured) method/level on samples of the repository's own binaries
+    and extrapolates to all of them. The recommended candidate has the lowest export time + import time + LFS transfer time
+    (at ADVISE_COMPRESSION_TRANSFER_BYTES_PER_SECOND).
+
+    Args:
+        FCStd_file_paths (list): Paths to .FCStd files.
+        config (dict): Configuration dictionary.
+        sample_bytes (int): Max uncompressed bytes sampled per pattern.
+
+    Returns:
+        dict: "patterns" -> {pattern -> {(method, level) -> benchmark_compression() result}},
+              "estimates" -> {(method, level) -> {"lfs_bytes", "export_seconds", "import_seconds", "cost_seconds"}},
+              "recommended" -> (method, level), "max_compressed_file_size_gigabyte" -> float, "total_bytes" -> int
+    """
+    samples, total_bytes, file_bytes = sample_binaries_for_compression(FCStd_file_paths, config, sample_bytes)
+    
+    candidates:list = list(ADVISE_COMPRESSION_CANDIDATES)
+    configured:tuple = (config['compress_binaries']['compression_method'], config['compress_binaries']['compression_level'])
+    if configured not in candidates: candidates.append(configured)
+    
+    results:dict = {pattern: {candidate: benchmark_compression(pattern_samples, *candidate) for candidate in candidates} for pattern, pattern_samples in samples.items() if pattern_samples}
+    
+    estimates:dict = {}
+    for candidate in candidates:
+        estimate:dict = {"lfs_bytes": 0.0, "export_seconds": 0.0, "import_seconds": 0.0}
+        for pattern, pattern_results in results.items():
+            result:dict = pattern_results[candidate]
+            scale:float = total_bytes[pattern] / result['raw_bytes'] if result['raw_bytes'] else 0.0
+            
+            estimate['lfs_bytes'] += result['compressed_bytes'] * scale
+            estimate['export_seconds'] += result['compress_seconds'] * scale
+            estimate['import_seconds'] += result['decompress_seconds'] * scale
+        
+        estimate['cost_seconds'] = estimate['export_seconds'] + estimate['import_seconds'] + estimate['lfs_bytes'] / ADVISE_COMPRESSION_TRANSFER_BYTES_PER_SECOND
+        estimates[candidate] = estimate
+    
+    recommended:tuple = min(candidates, key=lambda candidate: estimates[candidate]['cost_seconds'])
+    
+    # Largest file's binaries should fit one zip (one LFS object per import), without exceeding the configured limit (IE GitHub's 2 GB LFS limit)
+    all_bytes:int = sum(total_bytes.values())
+    ratio:float = estimates[recommended]['lfs_bytes'] / all_bytes if all_bytes else 1.0
+    largest_zip_gigabyte:float = max(file_bytes.values(), default=0) * ratio / (1024 ** 3)
+    max_compressed_file_size_gigabyte:float = min(config['compress_binaries']['max_compressed_file_size_gigabyte'], max(0.01, math.ceil(largest_zip_gigabyte * 1.1 * 100) / 100))
+    
+    return {
+        "patterns": results,
+        "estimates": estimates,
+        "recommended": recommended,
+        "max_compressed_file_size_gigabyte": max_compressed_file_size_gigabyte,
+        "total_bytes": all_bytes
+    }
+
+def print_compression_advice(advice:dict, config:dict):
+    """
+    Prints advise_compression() results as tables followed by the recommended config snippet.
+    """
+    def mb(num_bytes:float) -> str:
+        return f"{num_bytes / (1024 ** 2):.2f} MB"
+    
+    def duration(seconds:float) -> str:
+        return f"{seconds:.2f}s" if seconds < 60 else format_duration(seconds)
+    
+    def candidate_name(candidate:tuple) -> str:
+        return candidate[0] if candidate[0] == "lzma" else f"{candidate[0]}-{candidate[1]}"
+    
+    for pattern, pattern_results in advice['patterns'].items():
+        print(f"'{pattern}' (sampled {mb(next(iter(pattern_results.values()))['raw_bytes'])}):")
+        print(f"    {'method':<12}{'ratio':>8}{'compress':>16}{'decompress':>16}")
+        for candidate, result in pattern_results.items():
+            ratio:float = result['compressed_bytes'] / result['raw_bytes'] if result['raw_bytes'] else 1.0
+            compress_speed:float = result['raw_bytes'] / max(result['compress_seconds'], 1e-9)
+            decompress_speed:float = result['raw_bytes'] / max(result['decompress_seconds'], 1e-9)
+            print(f"    {candidate_name(candidate):<12}{ratio:>8.3f}{mb(compress_speed) + '/s':>16}{mb(decompress_speed) + '/s':>16}")
+        print()
+    
+    print(f"Whole repository ({mb(advice['total_bytes'])} of binaries):")
+    print(f"    {'method':<12}{'LFS size':>14}{'export':>10}{'import':>10}")
+    for candidate, estimate in advice['estimates'].items():
+        print(f"    {candidate_name(candidate):<12}{mb(estimate['lfs_bytes']):>14}{duration(estimate['export_seconds']):>10}{duration(estimate['import_seconds']):>10}")
+    print()
+    
+    method, level = advice['recommended']
+    estimate:dict = advice['estimates'][advice['recommended']]
+    configured:tuple = (config['compress_binaries']['compression_method'], config['compress_binaries']['compression_level'])
+    current:dict = advice['estimates'][configured]
+    
+    print(f"Recommended (assuming LFS transfers at {mb(ADVISE_COMPRESSION_TRANSFER_BYTES_PER_SECOND)}/s), in \"compress-non-human-readable-FreeCAD-files\":")
+    print(f'    "max-compressed-file-size-gigabyte": {advice["max_compressed_file_size_gigabyte"]},')
+    print(f'    "compression-method": "{method}",')
+    print(f'    "compression-level": {level},')
+    print()
+    print(f"Expected: LFS size {mb(estimate['lfs_bytes'])}, export {duration(estimate['export_seconds'])}, import {duration(estimate['import_seconds'])}")
+    print(f"Current:  LFS size {mb(current['lfs_bytes'])}, export {duration(current['export_seconds'])}, import {duration(current['import_seconds'])} ({candidate_name(configured)})")
+
+def get_LFS_pointer_info(data:bytes) -> tuple:
+    """
+    Parses Git LFS pointer contents.
+
+    Returns:
+        tuple: (oid, size) of the LFS object. None if data isn't an LFS pointer.
+    """
+    if len(data) > LFS_POINTER_MAX_SIZE or not data.startswith(LFS_POINTER_PREFIX): return None
+    
+    oid:str = None
+    size:int = 0
+    for line in data.decode(errors='replace').splitlines():
+        if line.startswith('oid sha256:'): oid:str = line.removeprefix('oid sha256:').strip()
+        elif line.startswith('size '): size:int = int(line.removeprefix('size ').strip())
+    return oid, size
+
+def get_stored_file_size(file_path:str) -> tuple:
+    """
+    Gets the size a file takes in the repository, LFS pointers (IE not pulled yet) are sized by the object they point to.
+
+    Returns:
+        tuple: (size in bytes, True if file_path is an LFS pointer)
+    """
+    if not is_LFS_pointer_file(file_path): return os.path.getsize(file_path), False
+    
+    with open(file_path, 'rb') as f:
+        return get_LFS_pointer_info(f.read())[1], True
+
+def get_FCStd_storage_stats(FCStd_file_path:str, config:dict) -> dict:
+    """
+    Sizes the uncompressed directory of a .FCStd file as stored in the repository. Only zip central directories are read, nothing is decompressed.
+    Files matching `files-to-compress` are attributed to the first pattern they match, files kept uncompressed (delta storage) count as ratio 1.
+
+    Args:
+        FCStd_file_path (str): Path to .FCStd file.
+        config (dict): Configuration dictionary.
+
+    Returns:
+        dict: "directory", "raw_bytes" (uncompressed contents), "stored_bytes" (files in git + LFS objects), "shards" (compressed binary zips),
+              "shards_not_pulled" (LFS pointers, their contents aren't counted in "raw_bytes"), "patterns" -> {pattern -> {"raw_bytes", "compressed_bytes"}}
+    """
+    patterns:list = config['compress_binaries']['binary_file_patterns']
+    zip_file_prefix:str = config['compress_binaries']['zip_file_prefix']
+    FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config, check_exists=False)
+    
+    stats:dict = {"directory": FCStd_dir_path, "raw_bytes": 0, "stored_bytes": 0, "shards": 0, "shards_not_pulled": 0, "patterns": {}}
+    
+    def add_to_pattern(path_in_dir:str, raw_bytes:int, compressed_bytes:int):
+        posix_path:PurePosixPath = PurePosixPath('/' + path_in_dir)
+        pattern:str = next((pattern for pattern in patterns if posix_path.match(pattern)), None)
+        if pattern is None: return
+        
+        pattern_stats:dict = stats['patterns'].setdefault(pattern, {"raw_bytes": 0, "compressed_bytes": 0})
+        pattern_stats['raw_bytes'] += raw_bytes
+        pattern_stats['compressed_bytes'] += compressed_bytes
+    
+    if not os.path.isdir(FCStd_dir_path): return stats
+    
+    for root, _, files in os.walk(FCStd_dir_path):
+        for item_name in files:
+            item_full_path:str = os.path.join(root, item_name)
+            path_in_dir:str = os.path.relpath(item_full_path, FCStd_dir_path).replace(os.sep, '/')
+            size, is_pointer = get_stored_file_size(item_full_path)
+            stats['stored_bytes'] += size
+            
+            if path_in_dir.startswith(zip_file_prefix) and path_in_dir.endswith('.zip'):
+                stats['shards'] += 1
+                if is_pointer:
+                    stats['shards_not_pulled'] += 1
+                    continue
+                
+                with zipfile.ZipFile(item_full_path, 'r') as zf:
+                    for info in zf.infolist():
+                        stats['raw_bytes'] += info.file_size
+                        add_to_pattern(info.filename, info.file_size, info.compress_size)
+            
+            elif path_in_dir == SHARED_STORE_MANIFEST_NAME:
+                stats['raw_bytes'] += size
+                with open(item_full_path, 'r') as f:
+                    manifest:dict = json.load(f)
+                
+                for path_to_item_in_dir, blob_info in manifest.items():
+                    blob_path:str = get_shared_store_blob_path(blob_info['sha256'], config)
+                    blob_size:int = get_stored_file_size(blob_path)[0] if os.path.isfile(blob_path) else 0
+                    
+                    stats['raw_bytes'] += blob_info['size']
+                    stats['stored_bytes'] += blob_size
+                    add_to_pattern(path_to_item_in_dir, blob_info['size'], blob_size)
+            
+            else:
+                stats['raw_bytes'] += size
+                add_to_pattern(path_in_dir, size, size)
+    
+    return stats
+
+def get_LFS_shard_pathspecs(config:dict) -> list:
+    """
+    Gets `git log`/`git diff-tree` pathspecs matching every compressed binary zip (shard) in the repository, and the shared store blobs if enabled.
+    """
+    pathspecs:list = [f":(glob)**/{config['compress_binaries']['zip_file_prefix']}*.zip"]
+    if config['compress_binaries']['shared_store']['enabled']:
+        pathspecs.append(f":(glob){config['compress_binaries']['shared_store']['store_directory'].replace(os.sep, '/').strip('/')}/**")
+    return pathspecs
+
+def get_LFS_objects_of_blobs(blob_ids:list) -> dict:
+    """
+    Reads which LFS object each git blob points to, with one `git cat-file --batch-check` call and one `git cat-file --batch` stream.
+
+    Args:
+        blob_ids (list): Git blob ids, duplicates are read once.
+
+    Returns:
+        dict: Blob id -> (object id, size in bytes). Object id is the LFS oid, or the blob id itself for blobs that aren't LFS pointers.
+    """
+    blob_ids:list = list(dict.fromkeys(blob_ids))
+    if not blob_ids: return {}
+    
+    blob_sizes:dict = {}
+    for line in run_git_command_with_input('cat-file', '--batch-check', input=('\n'.join(blob_ids) + '\n').encode()).decode().splitlines():
+        blob_id, _, size = line.split()
+        blob_sizes[blob_id] = int(size)
+    
+    objects:dict = {}
+    with GitCatFileBatch() as batch:
+        for blob_id in blob_ids:
+            pointer_info:tuple = get_LFS_pointer_info(batch.read(blob_id)) if blob_sizes[blob_id] <= LFS_POINTER_MAX_SIZE else None
+            objects[blob_id] = pointer_info or (blob_id, blob_sizes[blob_id])
+    return objects
+
+def get_LFS_shard_history(FCStd_dir_paths:list, config:dict, revisions:list) -> dict:
+    """
+    Reads every version of the compressed binary zips (and shared store blobs) ever committed in revisions, with one `git log` call.
+    Versions are sized from their LFS pointers (one `git cat-file --batch` stream), blobs that aren't LFS pointers are sized by git.
+
+    Args:
+        FCStd_dir_paths (list): Uncompressed directories to read the zips of. None => All zips in the repository.
+        config (dict): Configuration dictionary.
+        revisions (list): Revisions passed to `git log` (IE ['--all'] or ['main']).
+
+    Returns:
+        dict: Shard path -> {"commits" -> set of commit ids, "objects" -> {object id (LFS oid or git blob id) -> size in bytes}}
+    """
+    if FCStd_dir_paths is None:
+        pathspecs:list = get_LFS_shard_pathspecs(config)
+    else:
+        pathspecs:list = [f":(glob){FCStd_dir_path.replace(os.sep, '/')}/{config['compress_binaries']['zip_file_prefix']}*.zip" for FCStd_dir_path in FCStd_dir_paths]
+    
+    if not pathspecs: return {}
+    
+    # Note: With -z every commit id and raw diff field is NUL terminated => ["<commit>", "\n:<modes> <old> <new> <status>", "<path>", ...]
+    fields:list = run_git_command('log', '-z', '--no-renames', '--raw', '--no-abbrev', '--format=%H', *revisions, '--', *pathspecs).split('\0')
+    
+    versions:list = [] # (path, commit, blob id)
+    commit:str = None
+    i:int = 0
+    while i < len(fields):
+        field:str = fields[i].lstrip('\n')
+        if field.startswith(':'):
+            blob_id:str = field.split()[3]
+            if blob_id.strip('0'): versions.append((fields[i + 1], commit, blob_id)) # All zeros => Deleted
+            i += 2
+            continue
+        
+        if field: commit:str = field
+        i += 1
+    
+    objects:dict = get_LFS_objects_of_blobs([blob_id for _, _, blob_id in versions])
+    
+    history:dict = {}
+    for path, commit, blob_id in versions:
+        shard:dict = history.setdefault(path, {"commits": set(), "objects": {}})
+        shard['commits'].add(commit)
+        object_id, size = objects[blob_id]
+        shard['objects'][object_id] = size
+    
+    return history
+
+def get_storage_stats(FCStd_file_paths:list, config:dict, revisions:list, whole_repository:bool) -> dict:
+    """
+    Collects storage analytics: per .FCStd file raw vs stored size (get_FCStd_storage_stats()), compression ratio per `files-to-compress` pattern,
+    and LFS object versions and bytes per shard over the history of revisions (get_LFS_shard_history()), rolled up per model to rank churn.
+
+    Args:
+        FCStd_file_paths (list): Paths to .FCStd files.
+        config (dict): Configuration dictionary.
+        revisions (list): Revisions passed to `git log` for the history.
+        whole_repository (bool): Read the history of every shard in the repository (including deleted models and the shared store), not just FCStd_file_paths'.
+
+    Returns:
+        dict: "revisions", "models" -> list of dicts, "patterns" -> {pattern -> {"raw_bytes", "compressed_bytes", "ratio"}},
+              "shards" -> list of dicts, "total" -> dict. Models and shards are sorted by history bytes (churn), largest first.
+              In whole repository mode the shared store's blobs are one model with "shared_store" True.
+    """
+    models:dict = {}
+    for FCStd_file_path in FCStd_file_paths:
+        stats:dict = get_FCStd_storage_stats(FCStd_file_path, config)
+        stats['FCStd_file'] = FCStd_file_path
+        models[os.path.normpath(stats['directory'])] = stats
+    
+    history:dict = get_LFS_shard_history(None if whole_repository else [model['directory'] for model in models.values()], config, revisions)
+    
+    # Note: History paths are relative to the repository root, blobs are in `<store>/ab/<sha>.zip` => Whole store is one row, not one per subdirectory
+    store_dir_path:str = None
+    if whole_repository:
+        repo_root:str = get_repo_root(os.getcwd())
+        store_dir_path:str = os.path.relpath(os.path.join(repo_root, config['compress_binaries']['shared_store']['store_directory']), repo_root)
+    
+    shards:list = []
+    for path, shard in history.items():
+        FCStd_dir_path:str = os.path.normpath(os.path.dirname(path))
+        if store_dir_path is not None and os.path.normpath(path).startswith(store_dir_path + os.sep):
+            if store_dir_path not in models:
+                # Blob sizes are already counted in the stored size of the models using them
+                models[store_dir_path] = {"FCStd_file": None, "directory": store_dir_path, "shared_store": True, "raw_bytes": 0, "stored_bytes": 0, "shards": 0, "shards_not_pulled": 0, "patterns": {}}
+            FCStd_dir_path:str = store_dir_path
+        
+        elif FCStd_dir_path not in models:
+            # Deleted model or not selected model
+            changefile_FCStd_file_path:str = get_FCStd_file_from_changefile(os.path.join(FCStd_dir_path, '.changefile'))
+            models[FCStd_dir_path] = {"FCStd_file": changefile_FCStd_file_path, "directory": FCStd_dir_path, "raw_bytes": 0, "stored_bytes": 0, "shards": 0, "shards_not_pulled": 0, "patterns": {}}
+        
+        model:dict = models[FCStd_dir_path]
+        model_history:dict = model.setdefault('history', {"commits": set(), "versions": 0, "bytes": 0})
+        model_history['commits'].update(shard['commits'])
+        model_history['versions'] += len(shard['objects'])
+        model_history['bytes'] += sum(shard['objects'].values())
+        
+        shards.append({"path": path, "model": model['FCStd_file'] or FCStd_dir_path, "versions": len(shard['objects']), "bytes": sum(shard['objects'].values())})
+    
+    patterns:dict = {}
+    for model in models.values():
+        for pattern, pattern_stats in model['patterns'].items():
+            total:dict = patterns.setdefault(pattern, {"raw_bytes": 0, "compressed_bytes": 0})
+            total['raw_bytes'] += pattern_stats['raw_bytes']
+            total['compressed_bytes'] += pattern_stats['compressed_bytes']
+        
+        model_history:dict = model.setdefault('history', {"commits": set(), "versions": 0, "bytes": 0})
+        model_history['commits'] = len(model_history['commits'])
+        model['ratio'] = model['stored_bytes'] / model['raw_bytes'] if model['raw_bytes'] else None
+    
+    patterns:dict = {pattern: patterns[pattern] for pattern in config['compress_binaries']['binary_file_patterns'] if pattern in patterns} # Config order
+    for pattern_stats in patterns.values():
+        pattern_stats['ratio'] = pattern_stats['compressed_bytes'] / pattern_stats['raw_bytes'] if pattern_stats['raw_bytes'] else None
+    
+    # Same LFS object in several shards (IE reverted edits) is only stored once on the LFS server
+    unique_objects:dict = {object_id: size for shard in history.values() for object_id, size in shard['objects'].items()}
+    
+    models_by_churn:list = sorted(models.values(), key=lambda model: (model['history']['bytes'], model['history']['versions']), reverse=True)
+    raw_bytes:int = sum(model['raw_bytes'] for model in models_by_churn)
+    stored_bytes:int = sum(model['stored_bytes'] for model in models_by_churn)
+    return {
+        "revisions": revisions,
+        "models": models_by_churn,
+        "patterns": patterns,
+        "shards": sorted(shards, key=lambda shard: (shard['bytes'], shard['versions']), reverse=True),
+        "total": {
+            "raw_bytes": raw_bytes,
+            "stored_bytes": stored_bytes,
+            "ratio": stored_bytes / raw_bytes if raw_bytes else None,
+            "shards_not_pulled": sum(model['shards_not_pulled'] for model in models_by_churn),
+            "history_versions": len(unique_objects),
+            "history_bytes": sum(unique_objects.values())
+        }
+    }
+
+def print_storage_stats(stats:dict, top:int):
+    """
+    Prints get_storage_stats() results as tables, shards and models are limited to the top entries by churn.
+    """
+    def mb(num_bytes:float) -> str:
+        return f"{num_bytes / (1024 ** 2):.2f} MB"
+    
+    def ratio(value:float) -> str:
+        return "-" if value is None else f"{value:.3f}"
+    
+    print("Current size (raw = uncompressed contents, stored = files in git + LFS objects):")
+    print(f"    {'model':<48}{'raw':>14}{'stored':>14}{'ratio':>8}{'shards':>8}")
+    for model in sorted(stats['models'], key=lambda model: model['stored_bytes'], reverse=True):
+        if model['FCStd_file'] is None and not model['stored_bytes']: continue # Only in history
+        print(f"    {model['FCStd_file'] or model['directory']:<48}{mb(model['raw_bytes']):>14}{mb(model['stored_bytes']):>14}{ratio(model['ratio']):>8}{model['shards']:>8}")
+    print(f"    {'total':<48}{mb(stats['total']['raw_bytes']):>14}{mb(stats['total']['stored_bytes']):>14}{ratio(stats['total']['ratio']):>8}")
+    if stats['total']['shards_not_pulled']:
+        print(f"    Note: {stats['total']['shards_not_pulled']} shards are LFS pointers (not pulled), their contents aren't counted in raw.")
+    print()
+    
+    print("Compression by `files-to-compress` pattern:")
+    print(f"    {'pattern':<24}{'raw':>14}{'compressed':>14}{'ratio':>8}")
+    for pattern, pattern_stats in stats['patterns'].items():
+        print(f"    {pattern:<24}{mb(pattern_stats['raw_bytes']):>14}{mb(pattern_stats['compressed_bytes']):>14}{ratio(pattern_stats['ratio']):>8}")
+    print()
+    
+    print(f"LFS shard history ({' '.join(stats['revisions'])}): {stats['total']['history_versions']} object versions, {mb(stats['total']['history_bytes'])}")
+    print(f"    {'shard (top ' + str(top) + ' of ' + str(len(stats['shards'])) + ')':<64}{'versions':>10}{'bytes':>14}")
+    for shard in stats['shards'][:top]:
+        print(f"    {shard['path']:<64}{shard['versions']:>10}{mb(shard['bytes']):>14}")
+    print()
+    
+    print(f"Top {top} models by churn:")
+    print(f"    {'model':<48}{'commits':>10}{'versions':>10}{'bytes':>14}")
+    for model in stats['models'][:top]:
+        if not model['history']['versions']: break
+        name:str = f"{model['directory']} (shared store)" if model.get('shared_store') else model['FCStd_file'] or model['directory']
+        print(f"    {name:<48}{model['history']['commits']:>10}{model['history']['versions']:>10}{mb(model['history']['bytes']):>14}")
+
+def get_LFS_gc_retained_trees(config:dict) -> list:
+    """
+    Gets the trees of the `lfs-garbage-collection` retention window: the recent (first parent) commits of HEAD and the kept branches,
+    every stash entry (worktree, index and untracked trees) and every commit not on any remote.
+
+    Returns:
+        list: Unique tree ids.
+    """
+    keep_recent_commits:int = config['lfs_gc']['keep_recent_commits']
+    
+    tips:list = ['HEAD']
+    if config['lfs_gc']['keep_branches']:
+        tips.extend(run_git_command('for-each-ref', '--format=%(objectname)', *[f"refs/heads/{branch}" for branch in config['lfs_gc']['keep_branches']]).split())
+    
+    tree_ids:list = []
+    if keep_recent_commits > 0:
+        for tip in dict.fromkeys(tips):
+            try:
+                tree_ids.extend(run_git_command('log', '--first-parent', f"--max-count={keep_recent_commits}", '--format=%T', tip, '--').split())
+            except RuntimeError:
+                pass # Unborn HEAD
+    
+    # Note: Objects of unpushed commits are never pruned, `git lfs pre-push` still needs them
+    tree_ids.extend(run_git_command('log', '--format=%T', '--all', '--not', '--remotes', '--').split())
+    
+    if config['lfs_gc']['keep_stash']:
+        try:
+            stash_commits:list = run_git_command('log', '--walk-reflogs', '--format=%H %P', 'refs/stash', '--').split()
+        except RuntimeError:
+            stash_commits:list = [] # No stash
+        
+        if stash_commits:
+            tree_ids.extend(run_git_command('rev-parse', *[f"{commit}^{{tree}}" for commit in dict.fromkeys(stash_commits)]).split())
+    
+    return list(dict.fromkeys(tree_ids))
+
+def get_LFS_gc_plan(config:dict) -> dict:
+    """
+    Works out which LFS objects of compressed binary zips (and shared store blobs) `git fgc` may prune from the local LFS store.
+    An object is only pruned if it's stored locally, was committed in the history of a remote-tracking ref (IE it was pushed)
+    and isn't referenced by the retention window (get_LFS_gc_retained_trees()) or the index.
+
+    Args:
+        config (dict): Configuration dictionary.
+
+    Returns:
+        dict: "prune" -> list of {"oid", "path", "bytes"} (largest first), "prune_bytes", "retained" -> number of retained objects stored locally,
+              "not_pushed" -> number of retained objects stored locally that aren't in the history of any remote-tracking ref.
+              Other objects in the local LFS store (IE of files that aren't shards) are never pruned.
+    """
+    pathspecs:list = get_LFS_shard_pathspecs(config)
+    
+    # Pushed shard objects: every version committed in the history of a remote-tracking ref
+    pushed:dict = {} # LFS oid -> shard path
+    for path, shard in get_LFS_shard_history(None, config, ['--remotes']).items():
+        for object_id in shard['objects']:
+            pushed.setdefault(object_id, path)
+    
+    # Retained shard objects: index + every tree of the retention window, listed with a single `git diff-tree --stdin` against the empty tree
+    retained_blob_ids:list = [line.split()[1] for line in run_git_command('ls-files', '-z', '--stage', '--', *pathspecs).split('\0') if line]
+    
+    tree_ids:list = get_LFS_gc_retained_trees(config)
+    if tree_ids:
+        empty_tree_id:str = run_git_command_with_input('hash-object', '-t', 'tree', '--stdin', input=b'').decode().strip()
+        diff_input:bytes = ''.join(f"{empty_tree_id} {tree_id}\n" for tree_id in tree_ids).encode()
+        
+        # Note: With -z every raw diff field is NUL terminated, the echoed tree pairs are newline terminated => ["<tree> <tree>\n:<modes> <old> <new> <status>", "<path>", ...]
+        fields:list = run_git_command_with_input('diff-tree', '--stdin', '-r', '-z', '--raw', '--no-abbrev', '--no-renames', '--', *pathspecs, input=diff_input).decode().split('\0')
+        i:int = 0
+        while i < len(fields):
+            field:str = fields[i].split('\n')[-1]
+            if field.startswith(':'):
+                retained_blob_ids.append(field.split()[3])
+                i += 2 # Skip path
+                continue
+            i += 1
+    
+    retained:set = {object_id for object_id, _ in get_LFS_objects_of_blobs(retained_blob_ids).values()}
+    
+    objects_dir_path:str = get_LFS_objects_dir_path()
+    stored:dict = {} # LFS oid -> size of the locally stored object
+    if os.path.isdir(objects_dir_path):
+        for root, _, files in os.walk(objects_dir_path):
+            for file in files:
+                if len(file) == 64: stored[file] = os.path.getsize(os.path.join(root, file))
+    
+    prune:list = [{"oid": oid, "path": pushed[oid], "bytes": size} for oid, size in stored.items() if oid in pushed and oid not in retained]
+    prune.sort(key=lambda item: item['bytes'], reverse=True)
+    
+    return {
+        "prune": prune,
+        "prune_bytes": sum(item['bytes'] for item in prune),
+        "retained": sum(1 for oid in stored if oid in retained),
+        "not_pushed": sum(1 for oid in stored if oid in retained and oid not in pushed)
+    }
+
+def prune_LFS_objects(plan:dict) -> int:
+    """
+    Removes the objects of a get_LFS_gc_plan() from the local LFS store.
+
+    Returns:
+        int: Bytes freed.
+    """
+    objects_dir_path:str = get_LFS_objects_dir_path()
+    
+    freed:int = 0
+    for item in plan['prune']:
+        try:
+            os.remove(get_LFS_object_path(item['oid'], objects_dir_path))
+            freed += item['bytes']
+        except FileNotFoundError:
+            pass # Pruned concurrently
+    return freed
+
+def run_git_command(*args:str, cwd:str=None) -> str:
+    """
+    Runs a git command (with the GIT_COMMAND env variable the GitCAD scripts expect) and returns its stdout.
+    Runs in cwd if given, else in the current directory.
+
+    Raises:
+        RuntimeError: If the git command fails.
+    """
+    result:subprocess.CompletedProcess = subprocess.run(['git', *args], cwd=cwd, capture_output=True, text=True, env={**os.environ, "GIT_COMMAND": args[0]})
+    if result.returncode != 0:
+        raise RuntimeError(f"ERR: 'git {' '.join(args)}' failed: {result.stderr.strip()}")
+    return result.stdout
+
+def run_git_command_with_input(*args:str, input:bytes) -> bytes:
+    """
+    Same as run_git_command() but feeds input (bytes) to stdin and returns stdout as bytes.
+
+    Raises:
+        RuntimeError: If the git command fails.
+    """
+    result:subprocess.CompletedProcess = subprocess.run(['git', *args], input=input, capture_output=True, env={**os.environ, "GIT_COMMAND": args[0]})
+    if result.returncode != 0:
+        raise RuntimeError(f"ERR: 'git {' '.join(args)}' failed: {os.fsdecode(result.stderr).strip()}")
+    return result.stdout
+
+@functools.lru_cache(maxsize=None)
+def get_repo_root(cwd:str) -> str:
+    """
+    Gets the absolute path of the working tree root (`git rev-parse --show-toplevel`) of the repository containing cwd. Cached per directory.
+    """
+    return os.path.normpath(run_git_command('rev-parse', '--show-toplevel', cwd=cwd).strip())
+
+def get_current_git_user(cwd:str=None) -> str:
+    """
+    Gets the current user (git config user.name) LFS locks are owned by.
+
+    Raises:
+        RuntimeError: If user.name isn't set.
+    """
+    try:
+        current_user:str = run_git_command('config', '--get', 'user.name', cwd=cwd).strip()
+    except RuntimeError:
+        current_user:str = ""
+    
+    if not current_user:
+        raise RuntimeError("ERR: git config user.name not set!")
+    return current_user
+
+def get_lock_owners(cwd:str=None) -> dict:
+    """
+    Reads the whole LFS lock table with a single `git lfs locks` call (in cwd, default current directory).
+
+    Returns:
+        dict: Locked path (relative to repository root) -> owner name.
+    """
+    locks:list = json.loads(run_git_command('lfs', 'locks', '--json', cwd=cwd) or "[]")
+    return {lock['path']: lock.get('owner', {}).get('name') for lock in locks}
+
+def get_user_locked_paths(cwd:str=None) -> set:
+    """
+    Gets paths of all LFS locks held by the current user (git config user.name) with a single `git lfs locks` call (in cwd, default current directory).
+
+    Returns:
+        set: Locked paths (relative to repository root).
+    """
+    current_user:str = get_current_git_user(cwd)
+    return {path for path, owner in get_lock_owners(cwd).items() if owner == current_user}
+
+def get_sparse_checkout_cone(cwd:str=None) -> list:
+    """
+    Gets the directories of the active cone mode sparse-checkout (of the repository cwd is in, default current directory).
+
+    Returns:
+        list: Directories (relative to repository root). None if no cone mode sparse-checkout is active.
+    """
+    try:
+        # Note: `git sparse-checkout set` writes both keys, unset keys make `git config --get` fail
+        if run_git_command('config', '--bool', '--get', 'core.sparseCheckout', cwd=cwd).strip() != 'true': return None
+        if run_git_command('config', '--bool', '--get', 'core.sparseCheckoutCone', cwd=cwd).strip() != 'true': return None
+        
+        return [line.strip('/') for line in run_git_command('sparse-checkout', 'list', cwd=cwd).splitlines() if line.strip('/')]
+    
+    except RuntimeError:
+        # Not a sparse-checkout or not a git repository
+        return None
+
+def get_sync_scope(config:dict, cwd:str=None) -> tuple:
+    """
+    Gets the directories hooks and sync commands should limit their work to (see `sync-scope` config).
+
+    Args:
+        config (dict): Configuration dictionary.
+        cwd (str): Directory in the repository. None => current directory.
+
+    Returns:
+        tuple: (configured include directories or None, sparse-checkout cone directories or None). None => no limit.
+    """
+    include_directories:list = [path.replace(os.sep, '/').strip('/') for path in config['sync_scope']['include_directories']] or None
+    sparse_checkout_cone:list = get_sparse_checkout_cone(cwd) if config['sync_scope']['respect_sparse_checkout'] else None
+    
+    return include_directories, sparse_checkout_cone
+
+def path_in_directories(path:str, directories:list, cone_mode:bool=False) -> bool:
+    """
+    Checks if path (relative to repository root) is inside any of the directories.
+
+    Args:
+        path (str): Path to check.
+        directories (list): Directories (relative to repository root). None => every path is inside.
+        cone_mode (bool): Also match files directly inside the root or a parent of a directory (what a cone mode sparse-checkout checks out).
+
+    Returns:
+        bool: True if path is inside.
+    """
+    if directories is None: return True
+    
+    path:str = path.replace(os.sep, '/').strip('/')
+    if any(path.startswith(f"{directory}/") or path == directory for directory in directories): return True
+    
+    if cone_mode:
+        parent_dir:str = posixpath.dirname(path)
+        return parent_dir == "" or any(directory.startswith(f"{parent_dir}/") for directory in directories)
+    
+    return False
+
+def path_in_sync_scope(path:str, sync_scope:tuple) -> bool:
+    """
+    Checks if path (relative to repository root) is inside the sync scope (see get_sync_scope()).
+    """
+    include_directories, sparse_checkout_cone = sync_scope
+    return path_in_directories(path, include_directories) and path_in_directories(path, sparse_checkout_cone, cone_mode=True)
+
+def is_LFS_pointer_file(file_path:str) -> bool:
+    """
+    Checks if a file is a Git LFS pointer (IE checked out with GIT_LFS_SKIP_SMUDGE=1 and not pulled yet) instead of the real content.
+
+    Args:
+        file_path (str): Path to file.
+
+    Returns:
+        bool: True if file is an LFS pointer.
+    """
+    if os.path.getsize(file_path) > LFS_POINTER_MAX_SIZE: return False
+    
+    with open(file_path, 'rb') as f:
+        return f.read(len(LFS_POINTER_PREFIX)) == LFS_POINTER_PREFIX
+
+def get_LFS_paths_for_import(FCStd_dir_path:str, config:dict) -> list:
+    """
+    Gets paths of the LFS tracked files (compressed binary zips and shared store blobs) an import of FCStd_dir_path reads.
+
+    Args:
+        FCStd_dir_path (str): Path to FCStd directory.
+        config (dict): Configuration dictionary.
+
+    Returns:
+        list: Paths to LFS tracked files. They may not exist or be LFS pointers.
+    """
+    if config is None or not config['compress_binaries']['enabled'] or not os.path.isdir(FCStd_dir_path): return []
+    
+    zip_file_prefix:str = config['compress_binaries']['zip_file_prefix']
+    LFS_paths:list = [os.path.join(FCStd_dir_path, f) for f in sorted(os.listdir(FCStd_dir_path)) if f.startswith(zip_file_prefix) and f.endswith('.zip')]
+    
+    manifest_path:str = os.path.join(FCStd_dir_path, SHARED_STORE_MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r') as f:
+            LFS_paths.extend(get_shared_store_blob_path(blob_info['sha256'], config) for blob_info in json.load(f).values())
+    
+    return LFS_paths
+
+def pull_missing_LFS_objects(FCStd_dir_paths:list, config:dict) -> list:
+    """
+    Downloads the LFS objects the imports of FCStd_dir_paths need but are missing (still LFS pointers), batched into a single `git lfs pull --include` call.
+    Does nothing (no git call) if nothing is missing.
+
+    Args:
+        FCStd_dir_paths (list): Paths to FCStd directories (relative to repository root).
+        config (dict): Configuration dictionary.
+
+    Returns:
+        list: Pulled paths.
+    """
+    missing_paths:list = []
+    for FCStd_dir_path in FCStd_dir_paths:
+        for LFS_path in get_LFS_paths_for_import(FCStd_dir_path, config):
+            if not os.path.exists(LFS_path) or is_LFS_pointer_file(LFS_path):
+                missing_paths.append(os.path.relpath(LFS_path).replace(os.sep, '/'))
+    
+    missing_paths:list = sorted(set(missing_paths))
+    
+    # Note: `--include` patterns are comma separated, batches only split if the command line would get too long
+    batch:list = []
+    for LFS_path in missing_paths + [None]:
+        if batch and (LFS_path is None or len(','.join(batch)) + len(LFS_path) + 1 > LFS_INCLUDE_MAX_LENGTH):
+            run_git_command('lfs', 'pull', f"--include={','.join(batch)}")
+            batch:list = []
+        
+        if LFS_path is not None:
+            batch.append(LFS_path)
+    
+    return missing_paths
+
+def get_FCStd_file_from_changefile(changefile_path:str) -> str:
+    """
+    Gets the .FCStd file path (relative to the current directory) recorded in a `.changefile`.
+
+    Args:
+        changefile_path (str): Path to `.changefile`.
+
+    Returns:
+        str: Path to .FCStd file. None if the changefile doesn't exist or has no FCStd_file_relpath.
+    """
+    if not os.path.isfile(changefile_path): return None
+    
+    with open(changefile_path, 'r') as f:
+        for line in f:
+            if line.startswith("FCStd_file_relpath='"):
+                FCStd_file_relpath:str = line.strip().removeprefix("FCStd_file_relpath='").removesuffix("'")
+                return os.path.relpath(os.path.normpath(os.path.join(os.path.dirname(changefile_path), FCStd_file_relpath)))
+    
+    return None
+
+def resolve_changed_paths(changed_paths:list, config:dict, locked_paths:set, sync_scope:tuple=(None, None)) -> list:
+    """
+    Maps changed paths (IE `git diff-tree --name-only` output) to the .FCStd files they belong to.
+    `.changefile`s and `.FCStd` files are resolved, other paths are ignored. Each FCStd directory is only reported once.
+
+    Args:
+        changed_paths (list): Paths relative to repository root.
+        config (dict): Configuration dictionary.
+        locked_paths (set): Paths locked by the current user (see get_user_locked_paths()). Ignored if locks aren't required.
+        sync_scope (tuple): Paths outside this scope are skipped before being resolved (see get_sync_scope()).
+
+    Returns:
+        list: (FCStd file path or "" if unknown, FCStd dir path, lockfile path, LOCK_HELD | LOCK_NOT_HELD | LOCK_NOT_REQUIRED) tuples in input order.
+    """
+    resolved:dict = {}
+    for changed_path in changed_paths:
+        if not path_in_sync_scope(changed_path, sync_scope): continue
+        
+        lowercase_path:str = changed_path.lower()
+        
+        if lowercase_path.endswith('.changefile'):
+            FCStd_dir_path:str = os.path.dirname(changed_path)
+            FCStd_file_path:str = get_FCStd_file_from_changefile(changed_path)
+        
+        elif lowercase_path.endswith('.fcstd'):
+            FCStd_file_path:str = changed_path
+            FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config, check_exists=False)
+        
+        else: continue
+        
+        FCStd_dir_path:str = os.path.normpath(FCStd_dir_path).replace(os.sep, '/')
+        FCStd_file_path:str = FCStd_file_path.replace(os.sep, '/') if FCStd_file_path else ""
+        
+        # Changefile and .FCStd file of the same directory both changed, keep whichever knows the FCStd file path
+        if FCStd_dir_path in resolved and (resolved[FCStd_dir_path][0] or not FCStd_file_path): continue
+        
+        lockfile_path:str = f"{FCStd_dir_path}/.lockfile"
+        if not config['require_lock']:
+            lock_verdict:str = LOCK_NOT_REQUIRED
+        elif lockfile_path in locked_paths:
+            lock_verdict:str = LOCK_HELD
+        else:
+            lock_verdict:str = LOCK_NOT_HELD
+        
+        resolved[FCStd_dir_path] = (FCStd_file_path, FCStd_dir_path, lockfile_path, lock_verdict)
+    
+    return list(resolved.values())
+
+def read_null_separated_paths(stream) -> list:
+    """
+    Reads NUL separated paths (IE output of `git ls-files -z`) from a binary stream.
+    """
+    return [os.fsdecode(path) for path in stream.read().split(b'\0') if path]
+
+def get_FCStd_lockfile_paths(FCStd_file_paths:list, config:dict) -> tuple:
+    """
+    Resolves the `.lockfile` of every .FCStd file in one pass.
+
+    Returns:
+        tuple: (dict of .FCStd file path -> lockfile path (relative to repository root, '/' separated), dict of failed .FCStd file paths -> error message)
+    """
+    lockfile_paths:dict = {}
+    failed:dict = {}
+    for FCStd_file_path in FCStd_file_paths:
+        try:
+            FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config)
+        except FileNotFoundError as e:
+            failed[FCStd_file_path] = str(e)
+            continue
+        lockfile_paths[FCStd_file_path] = f"{os.path.normpath(FCStd_dir_path).replace(os.sep, '/')}/.lockfile"
+    
+    return lockfile_paths, failed
+
+def run_lock_requests(requests:dict, num_jobs:int, action:str, silent:bool) -> dict:
+    """
+    Runs lock requests (lists of git commands) concurrently, with at most num_jobs requests in flight.
+    The git commands of a single request run in order, the request stops at the first failing command.
+
+    Args:
+        requests (dict): .FCStd file path -> list of git command argument tuples.
+        num_jobs (int): Max number of requests in flight.
+        action (str): Progress message prefix (IE "LOCKING").
+        silent (bool): Don't print progress.
+
+    Returns:
+        dict: Failed .FCStd file paths -> error message.
+    """
+    def run_request(git_commands:list):
+        for git_command in git_commands:
+            run_git_command(*git_command)
+    
+    failed:dict = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, num_jobs)) as executor:
+        futures:dict = {executor.submit(run_request, git_commands): FCStd_file_path for FCStd_file_path, git_commands in requests.items()}
+        for future in concurrent.futures.as_completed(futures):
+            FCStd_file_path:str = futures[future]
+            try:
+                future.result()
+            except RuntimeError as e:
+                failed[FCStd_file_path] = str(e)
+            
+            if not silent:
+                print(f"{action}: '{FCStd_file_path}'...." + ("SUCCESS" if FCStd_file_path not in failed else "FAILED"), file=sys.stderr)
+    
+    return failed
+
+def set_FCStd_files_mode(FCStd_file_paths:list, mode:int) -> dict:
+    """
+    Sets the permissions (WRITABLE or READONLY) of many .FCStd files. On Windows os.chmod toggles the readonly attribute.
+
+    Returns:
+        dict: Failed .FCStd file paths -> error message.
+    """
+    failed:dict = {}
+    for FCStd_file_path in FCStd_file_paths:
+        try:
+            os.chmod(FCStd_file_path, mode)
+        except OSError as e:
+            failed[FCStd_file_path] = f"Failed to change permissions: {e}"
+    return failed
+
+def lock_FCStd_files(FCStd_file_paths:list, config:dict, force:bool, num_jobs:int, silent:bool) -> dict:
+    """
+    Locks the `.lockfile`s of many .FCStd files and makes the .FCStd files writable.
+    The lock table is read once: files the user already locked aren't requested again,
+    files locked by other users fail without a request unless force is set (then the lock is stolen).
+
+    Args:
+        FCStd_file_paths (list): Paths to .FCStd files.
+        config (dict): Configuration dictionary.
+        force (bool): Steal locks held by other users.
+        num_jobs (int): Max number of lock requests in flight.
+        silent (bool): Don't print progress.
+
+    Returns:
+        dict: Failed .FCStd file paths -> error message.
+    """
+    lockfile_paths, failed = get_FCStd_lockfile_paths(FCStd_file_paths, config)
+    if not lockfile_paths: return failed
+    
+    current_user:str = get_current_git_user()
+    lock_owners:dict = get_lock_owners()
+    
+    requests:dict = {}
+    already_locked:list = []
+    for FCStd_file_path, lockfile_path in lockfile_paths.items():
+        owner:str = lock_owners.get(lockfile_path)
+        
+        if owner == current_user:
+            already_locked.append(FCStd_file_path)
+        elif owner is None:
+            requests[FCStd_file_path] = [('lfs', 'lock', lockfile_path)]
+        elif force:
+            requests[FCStd_file_path] = [('lfs', 'unlock', '--force', lockfile_path), ('lfs', 'lock', lockfile_path)]
+        else:
+            failed[FCStd_file_path] = f"'{lockfile_path}' is locked by '{owner}'. Use --force to steal the lock."
+    
+    if not silent:
+        for FCStd_file_path in already_locked:
+            print(f"LOCKING: '{FCStd_file_path}'....SUCCESS (already locked)", file=sys.stderr)
+    
+    failed.update(run_lock_requests(requests, num_jobs, "LOCKING", silent))
+    
+    locked:list = already_locked + [path for path in requests if path not in failed]
+    failed.update(set_FCStd_files_mode(locked, WRITABLE))
+    
+    return failed
+
+def get_paths_with_unpushed_changes(reference:str) -> set:
+    """
+    Gets every path changed between reference and HEAD, or changed in any stash, with one `git diff-tree` call and one `git stash show` call per stash.
+
+    Returns:
+        set: Changed paths (relative to repository root).
+    """
+    changed_paths:set = set(run_git_command('diff-tree', '--no-commit-id', '--name-only', '-r', '-z', reference, 'HEAD').split('\0'))
+    
+    for stash in run_git_command('stash', 'list', '--format=%gd').splitlines():
+        changed_paths.update(run_git_command('stash', 'show', '--name-only', '-z', stash).split('\0'))
+    
+    changed_paths.discard("")
+    return changed_paths
+
+def unlock_FCStd_files(FCStd_file_paths:list, config:dict, force:bool, reference:str, num_jobs:int, silent:bool) -> dict:
+    """
+    Unlocks the `.lockfile`s of many .FCStd files and makes the .FCStd files readonly.
+    Unless force is set, files with unpushed (see get_paths_with_unpushed_changes()) changes aren't unlocked,
+    and files not locked by the user fail without a request.
+
+    Args:
+        FCStd_file_paths (list): Paths to .FCStd files.
+        config (dict): Configuration dictionary.
+        force (bool): Unlock regardless of unpushed changes and lock owner.
+        reference (str): Branch unpushed changes are diffed against. Ignored if force is set.
+        num_jobs (int): Max number of unlock requests in flight.
+        silent (bool): Don't print progress.
+
+    Returns:
+        dict: Failed .FCStd file paths -> error message.
+    """
+    lockfile_paths, failed = get_FCStd_lockfile_paths(FCStd_file_paths, config)
+    if not lockfile_paths: return failed
+    
+    requests:dict = {}
+    if force:
+        for FCStd_file_path, lockfile_path in lockfile_paths.items():
+            requests[FCStd_file_path] = [('lfs', 'unlock', '--force', lockfile_path)]
+    
+    else:
+        current_user:str = get_current_git_user()
+        lock_owners:dict = get_lock_owners()
+        unpushed_paths:set = get_paths_with_unpushed_changes(reference)
+        
+        for FCStd_file_path, lockfile_path in lockfile_paths.items():
+            FCStd_dir_path:str = posixpath.dirname(lockfile_path)
+            owner:str = lock_owners.get(lockfile_path)
+            
+            if FCStd_file_path.replace(os.sep, '/') in unpushed_paths or any(path.startswith(f"{FCStd_dir_path}/") for path in unpushed_paths):
+                failed[FCStd_file_path] = f"Cannot unlock '{FCStd_file_path}' with unpushed or stashed changes. Use --force to override."
+            elif owner is None:
+                failed[FCStd_file_path] = f"'{lockfile_path}' is not locked."
+            elif owner != current_user:
+                failed[FCStd_file_path] = f"'{lockfile_path}' is locked by '{owner}'. Use --force to override."
+            else:
+                requests[FCStd_file_path] = [('lfs', 'unlock', lockfile_path)]
+    
+    failed.update(run_lock_requests(requests, num_jobs, "UNLOCKING", silent))
+    
+    unlocked:list = [path for path in requests if path not in failed]
+    failed.update(set_FCStd_files_mode(unlocked, READONLY))
+    
+    return failed
+
+def get_exported_FCStd_tree(FCStd_file_path:str, FCStd_dir_path:str, config:dict, include_thumbnail:bool, repo_root:str=None) -> tuple:
+    """
+    In memory equivalent of export_FCStd_file(): builds the uncompressed directory's files without writing anything to disk.
+
+    Args:
+        FCStd_file_path (str): Path to .FCStd file.
+        FCStd_dir_path (str): Path to FCStd directory.
+        config (dict): Configuration dictionary.
+        include_thumbnail (bool): Keep exported thumbnail.
+        repo_root (str): Repository root. None => root of the current directory's repository.
+
+    Returns:
+        tuple: (dict of path relative to FCStd_dir_path ('/' separated) -> contents, dict of shared store blob path (relative to repository root) -> uncompressed contents)
     """
-    def __init__(self, FCStd_dir_path:str, FCStd_file_path:str, config:dict):
-        self.FCStd_dir_path:str = FCStd_dir_path
-        self.no_extension_subdir_path:str = os.path.join(self.FCStd_dir_path, NO_EXTENSION_SUBDIR_NAME)
+    files:dict = {}
+    to_compress:list = [] # (path, contents) in archive order, same as stream_FCStd_file_to_dir()
+    for path_to_item_in_dir, data, compressed in iter_exported_FCStd_members(FCStd_file_path, config, include_thumbnail):
+        if compressed: to_compress.append((path_to_item_in_dir, data))
+        else: files[path_to_item_in_dir] = data
+    
+    blobs:dict = {}
+    if to_compress:
+        if config['compress_binaries']['shared_store']['enabled']:
+            manifest:dict = {}
+            for path, data in to_compress:
+                sha256:str = hashlib.sha256(data).hexdigest()
+                blobs[get_shared_store_blob_path(sha256, config, repo_relative=True, repo_root=repo_root)] = data
+                manifest[path] = {"sha256": sha256, "size": len(data), "crc32": zlib.crc32(data)}
+            files[SHARED_STORE_MANIFEST_NAME] = format_shared_store_manifest(manifest).encode()
         
-        self.FCStd_file_path:str = FCStd_file_path
-        self.FCStd_file_isReadonly:bool = os.access(self.FCStd_file_path, os.R_OK) and not os.access(self.FCStd_file_path, os.W_OK)
+        else:
+            zip_file_prefix:str = config['compress_binaries']['zip_file_prefix']
+            
+            # Copy compressed data of unchanged files from the zip files currently in the uncompressed directory
+            current_zip_paths:list = [os.path.join(FCStd_dir_path, f) for f in os.listdir(FCStd_dir_path) if f.startswith(zip_file_prefix) and f.endswith('.zip')] if os.path.isdir(FCStd_dir_path) else []
+            reusable_members:dict = get_reusable_zip_members(current_zip_paths, config)
+            
+            for zip_index, zip_data in enumerate(pack_files_into_zips(to_compress, config, reusable_members), start=1):
+                files[f"{zip_file_prefix}{zip_index}.zip"] = zip_data
+    
+    files[EXPORT_MANIFEST_NAME] = get_export_manifest(FCStd_file_path, files, include_thumbnail, config)
+    files['.changefile'] = get_changefile_contents(FCStd_dir_path, FCStd_file_path).encode()
+    files['.lockfile'] = b''
+    
+    return files, blobs
 
-        self.config:dict = config
-        self.no_config:bool = config is None
-        self.extracted_items:list = []
-        self.moved_items:list = []
+def get_index_entries(paths:list) -> dict:
+    """
+    Lists the index entries under paths with a single `git ls-files --stage` call.
+
+    Returns:
+        dict: Path (relative to repository root) -> (mode, object id).
+    """
+    if not paths: return {}
+    
+    entries:dict = {}
+    for record in run_git_command('ls-files', '-z', '--stage', '--', *paths).split('\0'):
+        if not record: continue
+        info, path = record.split('\t', 1)
+        mode, object_id, _ = info.split(' ')
+        entries[path] = (mode, object_id)
+    return entries
+
+def get_LFS_tracked_paths(paths:list) -> set:
+    """
+    Finds which paths have the `filter=lfs` attribute with a single `git check-attr` call.
+    """
+    if not paths: return set()
+    
+    output:list = run_git_command_with_input('check-attr', '-z', '--stdin', 'filter', input=b''.join(os.fsencode(path) + b'\0' for path in paths)).split(b'\0')
+    return {os.fsdecode(output[i]) for i in range(0, len(output) - 2, 3) if output[i + 2] == b'lfs'}
+
+class GitFastImport:
+    """
+    Context manager around a single `git fast-import` process. Blobs are streamed to it one at a time and their object ids read back
+    with `get-mark`, so only the blob being written is held in memory (instead of one `git hash-object` per file).
+    The objects are readable by other git commands once the context exits.
+    """
+    def __init__(self):
+        self.process:subprocess.Popen = None
+        self.mark:int = 0
 
     def __enter__(self):
-        if self.no_config: return
-        # Temporarily make file writable
-        if self.FCStd_file_isReadonly:
-            os.chmod(self.FCStd_file_path, WRITABLE)
+        self.process = subprocess.Popen(['git', 'fast-import', '--quiet', '--done'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, env={**os.environ, "GIT_COMMAND": "fast-import"})
+        return self
+
+    def write(self, data:bytes) -> str:
+        """
+        Returns:
+            str: Object id of the blob.
+
+        Raises:
+            RuntimeError: If `git fast-import` exited.
+        """
+        self.mark += 1
+        self.process.stdin.write(f"blob\nmark :{self.mark}\ndata {len(data)}\n".encode())
+        self.process.stdin.write(data)
+        self.process.stdin.write(f"\nget-mark :{self.mark}\n".encode())
+        self.process.stdin.flush()
         
-        # Decompress zip files into self.FCStd_dir_path
-        if self.config['compress_binaries']['enabled']:
-            zip_files:list = [f for f in os.listdir(self.FCStd_dir_path) if f.startswith(self.config['compress_binaries']['zip_file_prefix']) and f.endswith('.zip')]
+        object_id:str = self.process.stdout.readline().decode().strip()
+        if not object_id:
+            raise RuntimeError("ERR: 'git fast-import' exited unexpectedly.")
+        return object_id
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # Note: Without `done` fast-import treats the stream as truncated and exits with an error
+        if exc_type is None:
+            self.process.stdin.write(b"done\n")
+        self.process.stdin.close()
+        self.process.stdout.close()
+        if self.process.wait() != 0 and exc_type is None:
+            raise RuntimeError("ERR: 'git fast-import' failed.")
+
+def stage_FCStd_files(FCStd_file_paths:list, config:dict, include_thumbnail:bool, checkout:bool, silent:bool) -> dict:
+    """
+    Exports .FCStd files straight into the git index, without writing (and git re-reading) the uncompressed directories.
+    See get_exported_FCStd_tree(). Files no longer exported are removed from the index.
+    The .FCStd files are staged empty, like the FCStd clean filter does. The `.changefile`s are written to the working tree
+    so the clean filter sees the .FCStd files as exported.
+    Files are exported and streamed to `git fast-import` one at a time, so only one model is held in memory.
+
+    Args:
+        FCStd_file_paths (list): Paths to .FCStd files.
+        config (dict): Configuration dictionary.
+        include_thumbnail (bool): Keep exported thumbnail.
+        checkout (bool): Update the uncompressed directories in the working tree from the index.
+        silent (bool): Don't print progress.
+
+    Returns:
+        dict: Failed .FCStd file paths -> error message.
+    """
+    failed:dict = {}
+    index_info:list = []
+    staged_paths:set = set() # Paths relative to repository root
+    checkout_paths:list = []
+    working_tree_files:dict = {} # Path -> contents, written to the working tree even without checkout
+    FCStd_dir_paths:list = []
+    with GitFastImport() as fast_import:
+        for FCStd_file_path in FCStd_file_paths:
+            try:
+                FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config)
+                if os.path.getsize(FCStd_file_path) == 0:
+                    raise ValueError(f"ERR: FCStd file '{FCStd_file_path}' is empty.")
+                
+                files, blobs = get_exported_FCStd_tree(FCStd_file_path, FCStd_dir_path, config, include_thumbnail)
+            except (OSError, ValueError, zipfile.BadZipFile) as e:
+                failed[FCStd_file_path] = str(e)
+                continue
+            
+            FCStd_dir_path:str = os.path.normpath(FCStd_dir_path).replace(os.sep, '/')
+            FCStd_dir_paths.append(FCStd_dir_path)
+            staged:dict = {f"{FCStd_dir_path}/{path}": data for path, data in files.items()} # Path relative to repository root -> contents
+            for path in ('.changefile', '.lockfile'):
+                working_tree_files[f"{FCStd_dir_path}/{path}"] = files[path]
+            checkout_paths.extend(staged)
+            files:dict = None
+            
+            # Shared store blobs are content addressed, only stage the ones the index doesn't have yet
+            index_entries:dict = get_index_entries([FCStd_dir_path] + sorted(blobs))
+            for blob_path, data in blobs.items():
+                if blob_path in index_entries or blob_path in staged_paths: continue
                 
+                if os.path.exists(blob_path):
+                    with open(blob_path, 'rb') as f:
+                        staged[blob_path] = f.read()
+                else:
+                    staged[blob_path] = create_shared_store_blob(data, config)
+                checkout_paths.append(blob_path)
+            
+            staged[FCStd_file_path.replace(os.sep, '/')] = b''
+            
+            # Store LFS tracked files (compressed binaries, shared store blobs, `.lockfile`) as LFS pointers
+            for path in sorted(get_LFS_tracked_paths(list(staged))):
+                staged[path] = run_git_command_with_input('lfs', 'clean', '--', path, input=staged[path])
+            
+            for path, data in staged.items():
+                object_id:str = fast_import.write(data)
+                index_info.append(f"{index_entries.get(path, ('100644',))[0]} {object_id}\t{path}\0")
+            staged_paths.update(staged)
+            
+            null_object_id:str = '0' * len(object_id)
+            index_info += [f"0 {null_object_id}\t{path}\0" for path in index_entries if path not in staged and path not in blobs]
+            staged:dict = None
+            blobs:dict = None
     
-            for zip_file in sorted(zip_files):
-                zip_path:str = os.path.join(self.FCStd_dir_path, zip_file)
-                with zipfile.ZipFile(zip_path, 'r') as zf:
-                    zf.extractall(self.FCStd_dir_path)
-                    self.extracted_items.extend(zf.namelist())
-        
-        # Move files from NO_EXTENSION_SUBDIR_NAME to self.FCStd_dir_path
-        os.makedirs(self.no_extension_subdir_path, exist_ok=True)
-        for item in os.listdir(self.no_extension_subdir_path):
-            src:str = os.path.join(self.no_extension_subdir_path, item)
-            dst:str = os.path.join(self.FCStd_dir_path, item)
-            if os.path.exists(src):
-                shutil.move(src, dst)
-                self.moved_items.append(item)
-                        
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.no_config: return
+    if not FCStd_dir_paths: return failed
+    
+    run_git_command_with_input('update-index', '-z', '--index-info', input=''.join(index_info).encode())
+    
+    for path, data in working_tree_files.items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if path.endswith('/.lockfile'):
+            if not os.path.exists(path):
+                write_file_atomically(path, b"")
+            continue
+        write_file_atomically(path, data)
+    
+    if checkout:
+        for path in working_tree_files:
+            if path.endswith('/.lockfile'):
+                os.chmod(path, WRITABLE) # Note: checkout-index can't replace readonly files on Windows
         
-        # Restore file permissions
-        if self.FCStd_file_isReadonly:
-            os.chmod(self.FCStd_file_path, READONLY)
+        run_git_command_with_input('checkout-index', '-f', '-z', '--stdin', input=b''.join(os.fsencode(path) + b'\0' for path in checkout_paths))
         
-        # Move files back to NO_EXTENSION_SUBDIR_NAME
-        os.makedirs(self.no_extension_subdir_path, exist_ok=True)
-        for item_name in self.moved_items:
-            src:str = os.path.join(self.FCStd_dir_path, item_name)
-            dst:str = os.path.join(self.no_extension_subdir_path, item_name)
-            if os.path.exists(src):
-                shutil.move(src, dst)
+        # Same as export_FCStd_file() clearing previously exported files
+        for FCStd_dir_path in FCStd_dir_paths:
+            for root, _, files in os.walk(FCStd_dir_path):
+                for file in files:
+                    path:str = os.path.relpath(os.path.join(root, file)).replace(os.sep, '/')
+                    if path not in staged_paths:
+                        os.remove(path)
+    
+    elif not silent:
+        print("Note: Uncompressed directories in the working tree were not updated. Update them with `git checkout -- DIR` or stage with --checkout.", file=sys.stderr)
+    
+    return failed
+
+class GitCatFileBatch:
+    """
+    Context manager around a single `git cat-file --batch` process. Objects are requested one at a time (IE `REV:path` or object ids),
+    so later requests can depend on the contents of earlier ones without starting another git process.
+    """
+    def __init__(self):
+        self.process:subprocess.Popen = None
+
+    def __enter__(self):
+        self.process = subprocess.Popen(['git', 'cat-file', '--batch'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, env={**os.environ, "GIT_COMMAND": "cat-file"})
+        return self
+
+    def read(self, object_name:str) -> bytes:
+        """
+        Returns:
+            bytes: Object contents. None if the object doesn't exist.
+        """
+        self.process.stdin.write(os.fsencode(object_name) + b'\n')
+        self.process.stdin.flush()
         
-        # When leaving context, remove all extracted items
-        if self.config['compress_binaries']['enabled']:
-            for item_name in self.extracted_items:
-                item_path:str = os.path.join(self.FCStd_dir_path, item_name)
-                if os.path.exists(item_path):
-                    if os.path.isdir(item_path):
-                        shutil.rmtree(item_path)
-                    else:
-                        os.remove(item_path)
+        header:list = self.process.stdout.readline().split()
+        if len(header) != 3: return None # "<name> missing" / "<name> ambiguous"
+        
+        data:bytes = self.process.stdout.read(int(header[2]))
+        self.process.stdout.read(1) # Trailing newline
+        return data
 
-def bad_args(args:argparse.Namespace) -> bool:
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.process.stdin.close()
+        self.process.stdout.close()
+        self.process.wait()
+
+def get_LFS_objects_dir_path() -> str:
     """
-    Checks if CLI arguments are invalid. Returns True if invalid.
+    Gets the directory of the local LFS store (`lfs.storage` or `.git/lfs`) objects.
+    """
+    try:
+        storage_path:str = run_git_command('config', '--get', 'lfs.storage').strip()
+    except RuntimeError:
+        storage_path:str = os.path.join(run_git_command('rev-parse', '--git-common-dir').strip(), 'lfs')
+    return os.path.join(storage_path, 'objects')
 
-    Args:
-        args (argparse.Namespace): CLI arguments to check.
+def get_LFS_object_path(oid:str, objects_dir_path:str=None) -> str:
+    """
+    Gets the path of an object in the local LFS store (`lfs.storage` or `.git/lfs/objects`).
+    Pass objects_dir_path (see get_LFS_objects_dir_path()) when resolving many objects.
+    """
+    return os.path.join(objects_dir_path or get_LFS_objects_dir_path(), oid[0:2], oid[2:4], oid)
 
-    Returns:
-        bool: True if invalid, else False.
+def resolve_LFS_pointer(data:bytes, path:str) -> bytes:
     """
-    mode_flags:list = [bool(args.export_flag), bool(args.import_flag), bool(args.dir_flag)]
-    no_mode_specified:bool = sum(mode_flags) < 1
-    if no_mode_specified: return True
+    Replaces LFS pointer contents with the real file contents, from the local LFS store or else downloaded with `git lfs smudge`.
+    Contents that aren't an LFS pointer are returned unchanged.
 
-    multiple_modes_specified:bool = sum(mode_flags) > 1
-    if multiple_modes_specified: return True
+    Args:
+        data (bytes): Blob contents.
+        path (str): Path of the blob in the repository (used by `git lfs smudge` to pick the remote).
 
-    bad_arg_count:bool = True if args.export_flag and len(args.export_flag) > 2 or args.import_flag and len(args.import_flag) > 2 else False
-    if bad_arg_count: return True
+    Raises:
+        RuntimeError: If the LFS object couldn't be retrieved.
+    """
+    if len(data) > LFS_POINTER_MAX_SIZE or not data.startswith(LFS_POINTER_PREFIX): return data
+    
+    oid:str = next((line.split(b'sha256:')[1].decode() for line in data.splitlines() if line.startswith(b'oid sha256:')), None)
+    object_path:str = get_LFS_object_path(oid) if oid else None
+    
+    if object_path and os.path.isfile(object_path):
+        with open(object_path, 'rb') as f:
+            return f.read()
+    
+    contents:bytes = run_git_command_with_input('lfs', 'smudge', '--', path, input=data)
+    if contents.startswith(LFS_POINTER_PREFIX):
+        raise RuntimeError(f"ERR: LFS object of '{path}' couldn't be downloaded (is GIT_LFS_SKIP_SMUDGE set?).")
+    return contents
 
-    missing_output_arg:bool = True if args.export_flag and len(args.export_flag) != 2 or args.import_flag and len(args.import_flag) != 2 else False
-    no_config:bool = args.config_file_path is None
-    if missing_output_arg and no_config: return True
+def show_FCStd_file(revision:str, FCStd_file_path:str, output_FCStd_file_path:str, config:dict, include_thumbnail:bool):
+    """
+    Creates a .FCStd file from FCStd_file_path's uncompressed directory as it was at a revision, straight from git objects.
+    Compressed binaries, shared store blobs and NO_EXTENSION_SUBDIR_NAME are resolved in memory, the working tree and index aren't touched.
 
-    mode_requires_config:bool = no_config and (args.dir_flag)
-    if mode_requires_config: return True
+    Args:
+        revision (str): Revision (IE commit, branch, tag) to read the uncompressed directory from.
+        FCStd_file_path (str): Path to .FCStd file (relative to repository root).
+        output_FCStd_file_path (str): Path to write the .FCStd file to.
+        config (dict): Configuration dictionary.
+        include_thumbnail (bool): Add thumbnail to .FCStd file.
+
+    Raises:
+        FileNotFoundError: If the uncompressed directory doesn't exist at revision.
+        RuntimeError: If a git command fails.
+    """
+    FCStd_dir_path:str = os.path.normpath(get_FCStd_dir_path(FCStd_file_path, config, check_exists=False)).replace(os.sep, '/')
     
-    mode_cannot_be_silent:bool = args.silent_flag and (args.dir_flag)
-    if mode_cannot_be_silent: return True
+    entries:list = []
+    for record in run_git_command('ls-tree', '-r', '-z', '--full-tree', revision, '--', f"{FCStd_dir_path}/").split('\0'):
+        if not record: continue
+        info, path = record.split('\t', 1)
+        _, object_type, object_id = info.split(' ')
+        if object_type == 'blob':
+            entries.append((path.removeprefix(f"{FCStd_dir_path}/"), object_id))
     
-    return False
+    if not entries:
+        raise FileNotFoundError(f"ERR: FCStd directory '{FCStd_dir_path}' does not exist at '{revision}'.")
+    
+    zip_file_prefix:str = config['compress_binaries']['zip_file_prefix']
+    files:dict = {}
+    manifest:dict = None
+    with GitCatFileBatch() as cat_file:
+        for path, object_id in entries:
+            if path in ('.changefile', '.lockfile', '.fcmod'): continue
+            
+            data:bytes = cat_file.read(object_id)
+            
+            if path == EXPORT_MANIFEST_NAME:
+                try:
+                    manifest:dict = json.loads(data)
+                except ValueError:
+                    pass # IE committed with merge conflict markers
+                continue
+            
+            if config['compress_binaries']['enabled'] and '/' not in path and path.startswith(zip_file_prefix) and path.endswith('.zip'):
+                with zipfile.ZipFile(io.BytesIO(resolve_LFS_pointer(data, f"{FCStd_dir_path}/{path}")), 'r') as zf:
+                    for info in zf.infolist():
+                        if not info.is_dir():
+                            files[info.filename] = zf.read(info)
+            
+            elif path == SHARED_STORE_MANIFEST_NAME:
+                for path_to_item_in_dir, blob_info in json.loads(data).items():
+                    blob_path:str = get_shared_store_blob_path(blob_info['sha256'], config, repo_relative=True)
+                    blob:bytes = cat_file.read(f"{revision}:{blob_path}")
+                    if blob is None:
+                        raise FileNotFoundError(f"ERR: Shared store blob '{blob_path}' for '{path_to_item_in_dir}' does not exist at '{revision}'.")
+                    
+                    with zipfile.ZipFile(io.BytesIO(resolve_LFS_pointer(blob, blob_path)), 'r') as zf:
+                        files[path_to_item_in_dir] = zf.read(SHARED_STORE_MEMBER_NAME)
+            
+            else:
+                files[path] = data
+    
+    # FreeCAD expects files without extension at the top level
+    files:dict = {path.removeprefix(f"{NO_EXTENSION_SUBDIR_NAME}/"): data for path, data in files.items()}
+    
+    if os.path.dirname(output_FCStd_file_path):
+        os.makedirs(os.path.dirname(output_FCStd_file_path), exist_ok=True)
+    
+    # Exported with a manifest => Members written in the archive's original order
+    manifest_usable:bool = (
+        isinstance(manifest, dict) and manifest.get('version') == EXPORT_MANIFEST_VERSION and manifest.get('digest') == get_export_manifest_digest(manifest.get('entries', []))
+        and all(entry['name'] in files for entry in manifest['entries'])
+    )
+    if manifest_usable:
+        def write_members(zf:zipfile.ZipFile):
+            for entry in manifest['entries']:
+                if not include_thumbnail and entry['name'].startswith('thumbnails/'): continue
+                zf.writestr(entry['name'], files[entry['name']])
+        
+        write_FCStd_file(output_FCStd_file_path, write_members)
+        return
+    
+    # Note: PU.createDocument() packs files referenced by Document.xml/GuiDocument.xml from a directory, same as import_FCStd_file()
+    with tempfile.TemporaryDirectory(prefix='GitCAD_show_') as temp_dir:
+        for path, data in files.items():
+            os.makedirs(os.path.dirname(os.path.join(temp_dir, path)), exist_ok=True)
+            with open(os.path.join(temp_dir, path), 'wb') as f:
+                f.write(data)
+        
+        create_FCStd_file(temp_dir, output_FCStd_file_path, include_thumbnail)
 
-def create_lockfile_and_changefile(FCStd_dir_path:str, FCStd_file_path:str):
+def write_exported_FCStd_tree(FCStd_dir_path:str, files:dict, blobs:dict, config:dict, repo_root:str=None) -> int:
     """
-    Creates a `.changefile` in FCStd_dir_path with current timestamp and path to FCStd file from FCStd_dir_path.
-    Creates an empty `.lockfile` in FCStd_dir_path.
+    Writes an in memory export (see get_exported_FCStd_tree()) to FCStd_dir_path, only rewriting files whose contents changed.
+    Compressed binaries are considered unchanged if their members (names and CRCs) are the same. Files no longer exported are removed.
+    The `.changefile` is written last so an interrupted write leaves the .FCStd file looking unexported to the clean filter.
 
     Args:
         FCStd_dir_path (str): Path to FCStd directory.
-        FCStd_file_path (str): Path to .FCStd file.
+        files (dict): Path relative to FCStd_dir_path ('/' separated) -> contents.
+        blobs (dict): Shared store blob path (relative to repository root) -> uncompressed contents.
+        config (dict): Configuration dictionary.
+        repo_root (str): Repository root. None => root of the current directory's repository.
+
+    Returns:
+        int: Number of files written or removed.
     """
-    lock_file_path:str = os.path.join(FCStd_dir_path, '.lockfile')
-    change_file_path:str = os.path.join(FCStd_dir_path, '.changefile')
-    FCStd_file_relpath:str = os.path.relpath(FCStd_file_path, start=FCStd_dir_path).replace(os.sep, '/')
+    def zip_members(data) -> list:
+        with zipfile.ZipFile(data if isinstance(data, str) else io.BytesIO(data), 'r') as zf:
+            return sorted((info.filename, info.CRC, info.file_size) for info in zf.infolist())
     
-    current_time:str = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    zip_file_prefix:str = config['compress_binaries']['zip_file_prefix']
+    num_changed:int = 0
+    for path, data in files.items():
+        if path == '.changefile': continue
+        
+        file_path:str = os.path.join(FCStd_dir_path, *path.split('/'))
+        if os.path.isfile(file_path):
+            if path == '.lockfile': continue # Keep LFS lock's readonly/writable state
+            
+            try:
+                if '/' not in path and path.startswith(zip_file_prefix) and path.endswith('.zip'):
+                    if zip_members(file_path) == zip_members(data): continue
+                elif os.path.getsize(file_path) == len(data):
+                    with open(file_path, 'rb') as f:
+                        if f.read() == data: continue
+            except zipfile.BadZipFile:
+                pass # IE LFS pointer, rewrite
+        
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        write_file_atomically(file_path, data)
+        num_changed += 1
     
-    # Create .changefile with FCStd_file_relpath and timestamp file was created
-    with open(change_file_path, 'w') as f:
-        f.write(f"File Last Exported On: {current_time}\nFCStd_file_relpath='{FCStd_file_relpath}'\n")
-        f.flush()
-        os.fsync(f.fileno())
+    if blobs and repo_root is None:
+        repo_root:str = get_repo_root(os.getcwd())
     
-    # Create an empty .lockfile
-    with open(lock_file_path, 'w') as f:
-        f.flush()
-        os.fsync(f.fileno())
+    for blob_path, data in blobs.items():
+        blob_path:str = os.path.join(repo_root, *blob_path.split('/'))
+        if os.path.exists(blob_path): continue # Content addressed
+        
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        write_file_atomically(blob_path, create_shared_store_blob(data, config))
+        num_changed += 1
+    
+    # Same as export_FCStd_file() clearing previously exported files
+    for root, _, dir_files in os.walk(FCStd_dir_path):
+        for file in dir_files:
+            path:str = os.path.relpath(os.path.join(root, file), FCStd_dir_path).replace(os.sep, '/')
+            if path not in files:
+                os.remove(os.path.join(root, file))
+                num_changed += 1
+    
+    write_file_atomically(os.path.join(FCStd_dir_path, '.changefile'), files['.changefile'])
+    
+    return num_changed
+
+class InotifyWatcher:
+    """
+    Context manager around a Linux inotify instance (through ctypes, no dependencies). Reports files closed after writing or moved into watched directories.
+    """
+    def __init__(self):
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.fd:int = -1
+        self.watched_dirs:dict = {} # Watch descriptor -> directory path
+
+    def __enter__(self):
+        self.fd:int = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        return self
+
+    def add_watch(self, dir_path:str):
+        watch_descriptor:int = self.libc.inotify_add_watch(self.fd, os.fsencode(dir_path), IN_CLOSE_WRITE | IN_MOVED_TO)
+        if watch_descriptor < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for '{dir_path}'")
+        self.watched_dirs[watch_descriptor] = dir_path
+
+    def read_events(self, timeout:float) -> list:
+        """
+        Waits up to timeout seconds (None => forever) for events.
+
+        Returns:
+            list: Paths of files written. None if events were lost (queue overflow).
+        """
+        if not select.select([self.fd], [], [], timeout)[0]: return []
+        
+        buffer:bytes = os.read(self.fd, 64 * 1024)
+        paths:list = []
+        offset:int = 0
+        while offset < len(buffer):
+            watch_descriptor, mask, _, name_length = struct.unpack_from('iIII', buffer, offset)
+            name:bytes = buffer[offset + 16:offset + 16 + name_length].rstrip(b'\0')
+            offset += 16 + name_length
+            
+            if mask & IN_Q_OVERFLOW: return None
+            if watch_descriptor in self.watched_dirs and name:
+                paths.append(os.path.join(self.watched_dirs[watch_descriptor], os.fsdecode(name)))
+        return paths
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.fd >= 0:
+            os.close(self.fd)
+
+def FCStd_file_is_exported(FCStd_file_path:str, FCStd_dir_path:str, config:dict) -> bool:
+    """
+    Checks if the uncompressed directory already holds the .FCStd file's contents: `.changefile` is not older than the .FCStd file
+    (the FCStd clean filter's test), or their CRC32s and sizes match (see get_FCStd_sync_status()).
+    """
+    changefile_path:str = os.path.join(FCStd_dir_path, '.changefile')
+    if os.path.isfile(changefile_path) and os.stat(changefile_path).st_mtime_ns >= os.stat(FCStd_file_path).st_mtime_ns: return True
+    
+    return os.path.isdir(FCStd_dir_path) and get_FCStd_sync_status(FCStd_file_path, config)[0] == VERIFY_IN_SYNC
+
+def export_saved_FCStd_file(FCStd_file_path:str, config:dict, include_thumbnail:bool, repo_root:str=None) -> str:
+    """
+    Exports a saved .FCStd file for WATCH_FLAG if the user is allowed to modify it (writable, and locked by the user if locks are required).
+    Files GitCAD wrote itself (see FCStd_file_is_exported()) are skipped.
+    With repo_root git commands run in the repository root, so callers (IE the FreeCAD add-on) don't need to change the current directory.
+
+    Returns:
+        str: Result message, IE "SUCCESS (3 files changed)" or the reason it was skipped.
+    """
+    if not os.path.isfile(FCStd_file_path) or os.path.getsize(FCStd_file_path) == 0: return "SKIPPED (empty)"
+    if not os.stat(FCStd_file_path).st_mode & 0o200: return "SKIPPED (readonly)"
+    
+    FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config, check_exists=False)
+    if config['require_lock']:
+        lockfile_path:str = os.path.relpath(os.path.join(FCStd_dir_path, '.lockfile'), repo_root or os.curdir).replace(os.sep, '/')
+        if lockfile_path not in get_user_locked_paths(repo_root): return "SKIPPED (not locked by user)"
+    
+    with FCStdFileLock(FCStd_file_path, config, repo_root):
+        # Written by GitCAD itself (IE imported by a hook, restored from the import cache or a snapshot) => Nothing to export
+        if FCStd_file_is_exported(FCStd_file_path, FCStd_dir_path, config): return "SKIPPED (already exported)"
+        
+        before:os.stat_result = os.stat(FCStd_file_path)
+        files, blobs = get_exported_FCStd_tree(FCStd_file_path, FCStd_dir_path, config, include_thumbnail, repo_root)
+        num_changed:int = write_exported_FCStd_tree(FCStd_dir_path, files, blobs, config, repo_root)
+        after:os.stat_result = os.stat(FCStd_file_path)
+    
+    # Saved again while exporting => Make the clean filter export it (the next inotify event exports it here too)
+    if (before.st_mtime_ns, before.st_size) != (after.st_mtime_ns, after.st_size):
+        os.utime(os.path.join(FCStd_dir_path, '.changefile'), (before.st_mtime - 1, before.st_mtime - 1))
+        return "STALE (saved during export)"
+    
+    return f"SUCCESS ({num_changed} files changed)"
+
+def watch_FCStd_files(config:dict, include_thumbnail:bool, silent:bool):
+    """
+    Watches the directories of tracked .FCStd files (inside the configured `sync-scope`) and exports saved .FCStd files
+    in a background worker thread, WATCH_DEBOUNCE_SECONDS after their last write. Runs until interrupted.
+    Note: Directories created after starting aren't watched.
+
+    Raises:
+        OSError: If not on Linux or inotify fails.
+    """
+    if not USER_RUNNING_LINUX_OS:
+        raise OSError(f"ERR: {WATCH_FLAG} requires Linux (inotify).")
+    
+    sync_scope:tuple = get_sync_scope(config)
+    FCStd_file_paths:set = {os.path.normpath(path) for path in run_git_command('ls-files', '-z').split('\0') if path.lower().endswith('.fcstd') and path_in_sync_scope(path, sync_scope)}
+    
+    os.nice(WATCH_NICENESS)
+    
+    pending:dict = {} # .FCStd file path -> time of last write
+    export_queue:queue.Queue = queue.Queue()
+    
+    def worker():
+        while True:
+            FCStd_file_path:str = export_queue.get()
+            try:
+                result:str = export_saved_FCStd_file(FCStd_file_path, config, include_thumbnail)
+            except Exception as e:
+                result:str = f"FAILED ({e})"
+            if not silent: print(f"EXPORTING: '{FCStd_file_path}'....{result}", flush=True)
+            export_queue.task_done()
+    
+    threading.Thread(target=worker, daemon=True).start()
+    
+    with InotifyWatcher() as watcher:
+        for dir_path in sorted({os.path.dirname(path) or '.' for path in FCStd_file_paths}):
+            watcher.add_watch(dir_path)
+        
+        if not silent: print(f"Watching {len(FCStd_file_paths)} .FCStd files in {len(watcher.watched_dirs)} directories. Press Ctrl+C to stop.", flush=True)
+        
+        try:
+            while True:
+                timeout:float = max(0.0, min(pending.values()) + WATCH_DEBOUNCE_SECONDS - time.monotonic()) if pending else None
+                written:list = watcher.read_events(timeout)
+                
+                if written is None: # Events lost => Recheck everything
+                    written:list = list(FCStd_file_paths)
+                
+                for path in written:
+                    path:str = os.path.normpath(path)
+                    if path in FCStd_file_paths:
+                        pending[path] = time.monotonic()
+                
+                for path, last_write in list(pending.items()):
+                    if time.monotonic() - last_write >= WATCH_DEBOUNCE_SECONDS:
+                        del pending[path]
+                        export_queue.put(path)
+        
+        except KeyboardInterrupt:
+            export_queue.join() # Don't leave a half written directory behind
 
 def main():
     args:argparse.Namespace = parseArgs()
@@ -492,6 +4764,14 @@ def main():
     config_provided:bool = not args.config_file_path is None
     
     config:dict = None
+    if args.compile_config_flag:
+        try:
+            compile_config(args.config_file_path, shell_snapshot=True)
+        except (ValueError, OSError) as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        return
+    
     if config_provided:
         config:dict = load_config_file(args.config_file_path)
 
@@ -518,33 +4798,7 @@ def main():
         if config_provided:
             FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config)
 
-        # Clear previously exported files
-        if os.path.exists(FCStd_dir_path):
-            lockfile_path = os.path.join(FCStd_dir_path, '.lockfile')
-            if os.path.exists(lockfile_path):
-                os.chmod(lockfile_path, WRITABLE) # Note: os.remove and rmtree will err if lockfile is readonly.
-                os.remove(lockfile_path)
-            
-            shutil.rmtree(FCStd_dir_path)
-
-        os.makedirs(FCStd_dir_path, exist_ok=True)
-
-        try:
-            PU.extractDocument(FCStd_file_path, FCStd_dir_path)
-        except Exception as e:
-            print(f"Error extracting {FCStd_file_path} to {FCStd_dir_path}: {e}", file=sys.stderr)
-            raise
-
-        if not INCLUDE_THUMBNAIL:
-            remove_exported_thumbnail(FCStd_dir_path)
-            
-        if config_provided:
-            move_files_without_extension_to_subdir(FCStd_dir_path)
-            
-            if config['compress_binaries']['enabled']:
-                compress_binaries(FCStd_dir_path, config)
-
-            create_lockfile_and_changefile(FCStd_dir_path, FCStd_file_path)
+        export_FCStd_file(FCStd_file_path, FCStd_dir_path, config, INCLUDE_THUMBNAIL)
                 
         if not args.silent_flag:
             print(f"Exported {FCStd_file_path} to {FCStd_dir_path}")
@@ -558,38 +4812,214 @@ def main():
         if config_provided:
             FCStd_file_path:str = FCStd_dir_path
             FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config)
-            
-        if not os.path.exists(FCStd_dir_path):
-            raise FileNotFoundError(f"ERR: FCStd directory '{FCStd_dir_path}' does not exist.")
         
-        with ImportingContext(FCStd_dir_path, FCStd_file_path, config):
+        import_FCStd_file(FCStd_dir_path, FCStd_file_path, config, INCLUDE_THUMBNAIL)
+        
+        if not args.silent_flag:
+            print(f"Created {FCStd_file_path} from {FCStd_dir_path}")
+        
+        if USER_RUNNING_LINUX_OS: os.sync()
+
+    elif args.resolve_changes_flag:
+        changed_paths:list = read_null_separated_paths(sys.stdin.buffer)
+        sync_scope:tuple = get_sync_scope(config) if args.scoped_flag else (None, None)
+        
+        try:
+            locked_paths:set = get_user_locked_paths() if config['require_lock'] and changed_paths else set()
+        except RuntimeError as e:
+            print(f"Error: failed to list active locks: {e}", file=sys.stderr)
+            sys.exit(1)
+        
+        for record in resolve_changed_paths(changed_paths, config, locked_paths, sync_scope):
+            sys.stdout.write("\t".join(record) + "\0")
+        sys.stdout.flush()
+
+    elif args.lfs_pull_flag:
+        FCStd_file_paths:list = read_null_separated_paths(sys.stdin.buffer)
+        
+        try:
+            pulled:list = pull_missing_LFS_objects([get_FCStd_dir_path(path, config, check_exists=False) for path in FCStd_file_paths], config)
+        except RuntimeError as e:
+            print(f"Error: Failed to pull LFS files: {e}", file=sys.stderr)
+            sys.exit(1)
+        
+        if not args.silent_flag and pulled:
+            print(f"Pulled {len(pulled)} LFS files", file=sys.stderr)
+
+    elif args.lock_flag or args.unlock_flag:
+        FCStd_file_paths:list = [os.path.relpath(path) for path in read_null_separated_paths(sys.stdin.buffer)]
+        num_jobs:int = args.num_jobs or LOCK_REQUESTS_IN_FLIGHT
+        
+        try:
+            if args.lock_flag:
+                failed:dict = lock_FCStd_files(FCStd_file_paths, config, args.force_flag, num_jobs, args.silent_flag)
+            else:
+                failed:dict = unlock_FCStd_files(FCStd_file_paths, config, args.force_flag, args.reference, num_jobs, args.silent_flag)
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        
+        for FCStd_file_path, error in failed.items():
+            print(f"Error: '{FCStd_file_path}': {error}", file=sys.stderr)
+        
+        if failed: sys.exit(1)
+
+    elif args.show_flag:
+        revision, FCStd_file_path, output_FCStd_file_path = args.show_flag
+        
+        try:
+            show_FCStd_file(revision, os.path.relpath(FCStd_file_path), os.path.relpath(output_FCStd_file_path), config, INCLUDE_THUMBNAIL)
+        except (FileNotFoundError, RuntimeError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        
+        if not args.silent_flag:
+            print(f"Created {output_FCStd_file_path} from {FCStd_file_path} at {revision}")
+
+    elif args.stage_flag:
+        FCStd_file_paths:list = [os.path.relpath(path) for path in read_null_separated_paths(sys.stdin.buffer)]
+        
+        try:
+            failed:dict = stage_FCStd_files(FCStd_file_paths, config, INCLUDE_THUMBNAIL, args.checkout_flag, args.silent_flag)
+        except RuntimeError as e:
+            print(f"Error: Failed to stage .FCStd files: {e}", file=sys.stderr)
+            sys.exit(1)
+        
+        for FCStd_file_path in FCStd_file_paths:
+            if FCStd_file_path in failed:
+                print(f"Error: Failed to stage '{FCStd_file_path}': {failed[FCStd_file_path]}", file=sys.stderr)
+            elif not args.silent_flag:
+                print(f"Staged {FCStd_file_path}", file=sys.stderr)
+        
+        if failed: sys.exit(1)
+
+    elif args.watch_flag:
+        try:
+            watch_FCStd_files(config, INCLUDE_THUMBNAIL, args.silent_flag)
+        except (OSError, RuntimeError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    elif args.snapshot_flag:
+        FCStd_file_paths:list = []
+        for path in read_null_separated_paths(sys.stdin.buffer):
+            path:str = os.path.relpath(path)
+            if os.path.basename(path) == '.changefile':
+                path:str = get_FCStd_file_from_changefile(path)
+            if path: FCStd_file_paths.append(path)
+        
+        try:
+            snapshots:dict = snapshot_FCStd_files(FCStd_file_paths, config)
+        except (OSError, RuntimeError, zipfile.BadZipFile) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        
+        if not args.silent_flag:
+            print(f"Snapshotted {len(snapshots)} .FCStd files")
+
+    elif args.cache_stats_flag:
+        try:
+            stats:dict = get_import_cache_stats(config)
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        
+        lookups:int = stats['hits'] + stats['misses']
+        print(f"Import cache: {'enabled' if config['import_cache']['enabled'] else 'disabled'}")
+        print(f"Entries:      {stats['entries']} ({stats['size_bytes'] / (1024 ** 2):.1f} MB of {stats['max_size_bytes'] / (1024 ** 2):.1f} MB)")
+        print(f"Hits:         {stats['hits']}" + (f" ({100 * stats['hits'] / lookups:.1f}%)" if lookups else ""))
+        print(f"Misses:       {stats['misses']}")
+        print(f"Evictions:    {stats['evictions']}")
+        print(f"Snapshots:    {stats['snapshot_restores']} restored")
+
+    elif args.advise_compression_flag is not None:
+        FCStd_file_paths:list = [os.path.relpath(path) for path in args.advise_compression_flag]
+        if not FCStd_file_paths:
+            FCStd_file_paths:list = [path for path in run_git_command('ls-files', '-z').split('\0') if path.lower().endswith('.fcstd') and os.path.isfile(path)]
+        
+        print_compression_advice(advise_compression(FCStd_file_paths, config), config)
+
+    elif args.stats_flag is not None:
+        FCStd_file_paths:list = [os.path.relpath(path) for path in args.stats_flag]
+        whole_repository:bool = not FCStd_file_paths
+        if whole_repository:
+            FCStd_file_paths:list = [path for path in run_git_command('ls-files', '-z').split('\0') if path.lower().endswith('.fcstd')]
+        
+        try:
+            stats:dict = get_storage_stats(FCStd_file_paths, config, [args.reference] if args.reference else ['--all'], whole_repository)
+        except (RuntimeError, zipfile.BadZipFile) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        
+        if args.json_flag:
+            print(json.dumps(stats, indent=4))
+        else:
+            print_storage_stats(stats, args.top)
+
+    elif args.gc_flag:
+        try:
+            plan:dict = get_LFS_gc_plan(config)
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        
+        if args.dry_run_flag:
+            for item in plan['prune']:
+                print(f"    {item['path']:<64}{item['oid'][:12]:>14}{item['bytes'] / (1024 ** 2):>11.2f} MB")
+            print(f"Would prune {len(plan['prune'])} LFS objects, {plan['prune_bytes'] / (1024 ** 2):.2f} MB")
+        else:
+            freed:int = prune_LFS_objects(plan)
+            print(f"Pruned {len(plan['prune'])} LFS objects, freed {freed / (1024 ** 2):.2f} MB")
+        
+        print(f"Kept {plan['retained']} LFS objects of the retention window ({plan['not_pushed']} not pushed yet)")
+
+    elif args.verify_flag:
+        all_in_sync:bool = True
+        for FCStd_file_path in args.verify_flag:
+            FCStd_file_path:str = os.path.relpath(FCStd_file_path)
+            status, differing = get_FCStd_sync_status(FCStd_file_path, config)
             
-            duplicate_warning:bool = False
-            with warnings.catch_warnings(record=True) as caught:
-                warnings.simplefilter("always")
-                
-                try:
-                    PU.createDocument(os.path.join(FCStd_dir_path, 'Document.xml'), FCStd_file_path)
-                except Exception as e:
-                    print(f"Error extracting {FCStd_file_path} to {FCStd_dir_path}: {e}", file=sys.stderr)
-                    raise
-                
-                duplicate_warning:bool = any(
-                isinstance(warning.message, UserWarning) and "Duplicate name: './'" in str(warning.message)
-                for warning in caught
-                )
+            all_in_sync:bool = all_in_sync and status == VERIFY_IN_SYNC
             
-            # Fix for this issue: https://github.com/FreeCAD/FreeCAD/issues/23914
-            if duplicate_warning:
-                repackFCStd(FCStd_file_path)
+            if not args.silent_flag:
+                print(f"{status}\t{FCStd_file_path}" + (f"\t{', '.join(differing)}" if differing else ""))
+        
+        if not all_in_sync: sys.exit(1)
 
-            if INCLUDE_THUMBNAIL:
-                add_thumbnail_to_FCStd_file(FCStd_dir_path, FCStd_file_path)
+    elif args.sync_all_flag:
+        FCStd_file_paths:list = [os.path.relpath(path) for path in read_null_separated_paths(sys.stdin.buffer)]
         
-        if not args.silent_flag:
-            print(f"Created {FCStd_file_path} from {FCStd_dir_path}")
+        if args.scoped_flag:
+            sync_scope:tuple = get_sync_scope(config)
+            FCStd_file_paths:list = [path for path in FCStd_file_paths if path_in_sync_scope(path, sync_scope)]
+        
+        synced, failed = sync_all_FCStd_files(FCStd_file_paths, args.sync_all_flag[INPUT_ARG], config, get_max_jobs(args.num_jobs, config), args.silent_flag, args.top)
+        
+        # Imported files are printed NUL separated so the caller can refresh them in the git index
+        for FCStd_file_path in synced:
+            sys.stdout.write(f"{FCStd_file_path}\0")
+        sys.stdout.flush()
+        
+        if USER_RUNNING_LINUX_OS: os.sync()
+        
+        if failed: sys.exit(1)
+
+    elif args.batch_mode:
+        input_paths:list = list(dict.fromkeys(read_null_separated_paths(sys.stdin.buffer)))
+        FCStd_file_paths:list = [os.path.relpath(path) for path in input_paths]
+        
+        done, failed = run_FCStd_jobs(args.batch_mode, FCStd_file_paths, config, get_max_jobs(args.num_jobs, config), args.silent_flag, args.top)
+        
+        # Imported/exported files are printed NUL separated so the caller can update their locks, exactly as given (the caller looks them up by the paths it passed)
+        done:set = set(done)
+        for input_path, FCStd_file_path in zip(input_paths, FCStd_file_paths):
+            if FCStd_file_path in done:
+                sys.stdout.write(f"{input_path}\0")
+        sys.stdout.flush()
         
         if USER_RUNNING_LINUX_OS: os.sync()
+        
+        if failed: sys.exit(1)
 
     elif not args.silent_flag:
         print(HELP_MESSAGE)
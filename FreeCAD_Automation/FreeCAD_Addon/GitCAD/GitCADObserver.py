@@ -0,0 +1,119 @@
+"""
+GitCAD FreeCAD add-on: exports .FCStd files to their uncompressed directories as soon as FreeCAD saves them.
+
+The export runs the repository's own `FreeCAD_Automation/FCStdFileTool.py` inside the FreeCAD process on a background thread
+(same export as `git ftool --CONFIG-FILE --watch`), so no separate FreeCAD python interpreter is started per export and the UI stays responsive.
+The uncompressed directory is then already current when you `git fadd`, the clean filter skips files whose `.changefile` is newer than the `.FCStd` file.
+
+Only tracked .FCStd files inside the configured `sync-scope` of a repository with a `FreeCAD_Automation/config.json` are exported,
+and only if they are writable (and locked by the user if `require-lock-to-modify-FreeCAD-files` is enabled).
+
+Install: copy (or symlink) the `FreeCAD_Automation/FreeCAD_Addon/GitCAD` directory into FreeCAD's user `Mod` directory
+(`FreeCAD.getUserAppDataDir()` + `Mod`), then restart FreeCAD.
+"""
+import FreeCAD as App
+import importlib.util
+import os
+import queue
+import subprocess
+import threading
+
+FCSTD_FILE_TOOL_PATH:str = os.path.join('FreeCAD_Automation', 'FCStdFileTool.py') # Relative to repository root
+CONFIG_PATH:str = os.path.join('FreeCAD_Automation', 'config.json')
+
+def get_repo_root(dir_path:str) -> str:
+    """
+    Gets the root of the git repository dir_path is in.
+
+    Returns:
+        str: Absolute path of the repository root, None if dir_path isn't in a git repository (or git isn't installed).
+    """
+    try:
+        result:subprocess.CompletedProcess = subprocess.run(['git', 'rev-parse', '--show-toplevel'], cwd=dir_path, capture_output=True, text=True,
+                                                            creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0))
+    except OSError:
+        return None
+
+    if result.returncode != 0: return None
+    return os.path.normpath(result.stdout.strip())
+
+class GitCADDocumentObserver:
+    """
+    FreeCAD document observer queueing saved .FCStd files for export on a background thread.
+    Saves of the same file queued while an export runs are exported once.
+    """
+    def __init__(self):
+        self.export_queue:queue.Queue = queue.Queue()
+        self.tools:dict = {} # repository root -> (FCStdFileTool.py modification time, FCStdFileTool module of that repository)
+        self.num_loaded_tools:int = 0
+        threading.Thread(target=self.worker, name="GitCAD export", daemon=True).start()
+
+    def slotFinishSaveDocument(self, doc, file_name:str):
+        if file_name.lower().endswith('.fcstd'):
+            self.export_queue.put(os.path.abspath(file_name))
+
+    def get_FCStd_file_tool(self, repo_root:str):
+        """
+        Imports the repository's FCStdFileTool.py, so the export always matches the repository's hooks and filters.
+        Imported once per repository, and again whenever the file changes (IE updated by `git pull`).
+        """
+        tool_path:str = os.path.join(repo_root, FCSTD_FILE_TOOL_PATH)
+        tool_mtime:int = os.stat(tool_path).st_mtime_ns
+
+        if repo_root not in self.tools or self.tools[repo_root][0] != tool_mtime:
+            self.num_loaded_tools += 1
+            spec = importlib.util.spec_from_file_location(f"GitCAD_FCStdFileTool_{self.num_loaded_tools}", tool_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            self.tools[repo_root] = (tool_mtime, module)
+
+        return self.tools[repo_root][1]
+
+    def export(self, FCStd_file_path:str) -> str:
+        """
+        Exports a saved .FCStd file if it belongs to a GitCAD repository.
+
+        Returns:
+            str: Result message of the export, None if the file isn't exported by GitCAD.
+        """
+        repo_root:str = get_repo_root(os.path.dirname(FCStd_file_path))
+        if repo_root is None or not os.path.isfile(os.path.join(repo_root, CONFIG_PATH)): return None
+
+        tool = self.get_FCStd_file_tool(repo_root)
+
+        # Note: Never chdir, the current directory is shared by FreeCAD's threads. Paths stay absolute and git runs in repo_root.
+        config:dict = tool.load_config_file(os.path.join(repo_root, CONFIG_PATH)) # Reloaded every export => config.json edits apply without restarting FreeCAD
+        FCStd_file_relpath:str = os.path.relpath(FCStd_file_path, repo_root).replace(os.sep, '/')
+
+        if not tool.run_git_command('ls-files', '-z', '--', FCStd_file_relpath, cwd=repo_root): return None
+        if not tool.path_in_sync_scope(FCStd_file_relpath, tool.get_sync_scope(config, cwd=repo_root)): return None
+
+        return tool.export_saved_FCStd_file(FCStd_file_path, config, config['include_thumbnails'], repo_root)
+
+    def worker(self):
+        while True:
+            FCStd_file_paths:list = [self.export_queue.get()]
+            while not self.export_queue.empty():
+                FCStd_file_paths.append(self.export_queue.get_nowait())
+
+            for FCStd_file_path in dict.fromkeys(FCStd_file_paths):
+                try:
+                    result:str = self.export(FCStd_file_path)
+                except Exception as e:
+                    App.Console.PrintWarning(f"GitCAD: EXPORTING '{FCStd_file_path}'....FAILED ({e})\n")
+                    continue
+
+                if result is not None:
+                    App.Console.PrintLog(f"GitCAD: EXPORTING '{FCStd_file_path}'....{result}\n")
+
+OBSERVER:GitCADDocumentObserver = None
+
+def register():
+    """
+    Registers the GitCAD document observer (once per FreeCAD session).
+    """
+    global OBSERVER
+    if OBSERVER is not None: return
+
+    OBSERVER = GitCADDocumentObserver()
+    App.addDocumentObserver(OBSERVER)
@@ -0,0 +1,5 @@
+# GitCAD add-on, see GitCADObserver.py
+# Note: FreeCAD runs every `Mod/*/Init.py` at startup (GUI and console mode) with the Mod directory on sys.path.
+import GitCADObserver
+
+GitCADObserver.register()
@@ -2,7 +2,7 @@
 # ==============================================================================================
 #                                       Script Overview
 # ==============================================================================================
-# Script to run the FCStdFileTool.py script manually via `git ftool`, git `fimport`, `git fexport` aliases
+# Script to run the FCStdFileTool.py script manually via `git ftool`, git `fimport`, `git fexport`, `git fverify` aliases
 
 # ==============================================================================================
 #                               Verify and Retrieve Dependencies
@@ -38,6 +38,11 @@ case $1 in
         ALIAS_MODE="$1"
         shift
         ;;
+
+    "--fverify")
+        ALIAS_MODE="$1"
+        shift
+        ;;
 esac
 
 # Parse remaining args: prepend CALLER_SUBDIR to paths (skip args containing '-')
@@ -92,7 +97,7 @@ if [ -n "$ALIAS_MODE" ]; then
         mapfile -t MATCHED_FCStd_file_paths < <(printf '%s\n' "${MATCHED_FCStd_file_paths[@]}" | sort -u) # Remove duplicates (creates an empty element if no elements)
 
     else
-        echo "Error: No valid .FCStd files found. Usage: git fimport [path/to/file.FCStd ...] or git fexport [path/to/file.FCStd ...]" >&2
+        echo "Error: No valid .FCStd files found. Usage: git fimport [path/to/file.FCStd ...] or git fexport [path/to/file.FCStd ...] or git fverify [path/to/file.FCStd ...]" >&2
         exit $FAIL
     fi
 fi
@@ -101,57 +106,19 @@ fi
 #                                    Call FCStdFileTool.py
 # ==============================================================================================
 case $ALIAS_MODE in
-    "--fimport")
-        for FCStd_file_path in "${MATCHED_FCStd_file_paths[@]}"; do
-            echo -n "IMPORTING: '$FCStd_file_path'...." >&2
-            
-            # Import data to FCStd file
-            "$PYTHON_EXEC" "$FCStdFileTool" --SILENT --CONFIG-FILE --import "$FCStd_file_path" || {
-                echo >&2
-                echo "ERROR: Failed to import '$FCStd_file_path', skipping..." >&2
-                continue
-            }
-            
-            echo "SUCCESS" >&2
-            
-            # Handle locks
-            if [ "$REQUIRE_LOCKS" = "$TRUE" ]; then
-                FCSTD_FILE_HAS_VALID_LOCK="$(FCStd_file_has_valid_lock "$FCStd_file_path")" || continue
+    "--fimport"|"--fexport")
+        if [ "$ALIAS_MODE" = "--fimport" ]; then
+            batch_mode="import"
+        else
+            batch_mode="export"
+        fi
 
-                if [ "$FCSTD_FILE_HAS_VALID_LOCK" = "$FALSE" ]; then
-                    # User doesn't have lock, set .FCStd file to readonly
-                    make_readonly "$FCStd_file_path"
-                    # echo "DEBUG: Set '$FCStd_file_path' readonly." >&2
-                else
-                    # User has lock, set .FCStd file to writable
-                    make_writable "$FCStd_file_path"
-                    # echo "DEBUG: Set '$FCStd_file_path' writable." >&2
-                fi
-            fi
-        done
-        ;;
+        # Note: Files are imported/exported in a single python call, largest first within the `job-scheduling` limits of the config file
+        mapfile -d '' -t DONE_FCStd_file_paths < <(run_FCStd_file_jobs "$batch_mode" "${MATCHED_FCStd_file_paths[@]}")
 
-    "--fexport")
-        for FCStd_file_path in "${MATCHED_FCStd_file_paths[@]}"; do
-            echo -n "EXPORTING: '$FCStd_file_path'...." >&2
-            
-            if [ ! -s "$1" ]; then
-                echo >&2
-                echo "ERROR: '$FCStd_file_path' is empty, skipping..." >&2
-                continue
-            fi
-
-            # Import data to FCStd file
-            "$PYTHON_EXEC" "$FCStdFileTool" --SILENT --CONFIG-FILE --export "$FCStd_file_path" || {
-                echo >&2
-                echo "ERROR: Failed to export '$FCStd_file_path', skipping..." >&2
-                continue
-            }
-            
-            echo "SUCCESS" >&2
-            
-            # Handle locks
-            if [ "$REQUIRE_LOCKS" = "$TRUE" ]; then
+        # Handle locks
+        if [ "$REQUIRE_LOCKS" = "$TRUE" ]; then
+            for FCStd_file_path in "${DONE_FCStd_file_paths[@]}"; do
                 FCSTD_FILE_HAS_VALID_LOCK="$(FCStd_file_has_valid_lock "$FCStd_file_path")" || continue
 
                 if [ "$FCSTD_FILE_HAS_VALID_LOCK" = "$FALSE" ]; then
@@ -163,8 +130,13 @@ case $ALIAS_MODE in
                     make_writable "$FCStd_file_path"
                     # echo "DEBUG: Set '$FCStd_file_path' writable." >&2
                 fi
-            fi
-        done
+            done
+        fi
+        ;;
+
+    "--fverify")
+        # Note: All files are verified by a single python call, only zip central directories are read.
+        exec "$PYTHON_EXEC" "$FCStdFileTool" --CONFIG-FILE --verify "${MATCHED_FCStd_file_paths[@]}"
         ;;
 
     *)
@@ -0,0 +1,47 @@
+#!/bin/bash
+# ==============================================================================================
+#                                       Script Overview
+# ==============================================================================================
+# Script to prune superseded compressed binary zip (shard) objects from the local LFS store via `git fgc`.
+# The retention window is set by `lfs-garbage-collection` in the config file, objects that haven't been pushed are never pruned (FCStdFileTool.py --gc).
+
+# ==============================================================================================
+#                               Verify and Retrieve Dependencies
+# ==============================================================================================
+# Note: PWD for all scripts called via git aliases is the root of the git repository
+
+# Import code used in this script
+FUNCTIONS_FILE="FreeCAD_Automation/utils.sh"
+source "$FUNCTIONS_FILE" --ignore-GitCAD-activation
+
+if [ -z "$PYTHON_PATH" ]; then
+    echo "Error: Config file missing or invalid; cannot proceed." >&2
+    exit $FAIL
+fi
+
+# ==============================================================================================
+#                                          Parse Args
+# ==============================================================================================
+USAGE="Usage: git fgc [--dry-run]"
+
+gc_args=()
+while [ $# -gt 0 ]; do
+    # echo "DEBUG: parsing '$1'..." >&2
+    case $1 in
+        "-n"|"--dry-run")
+            gc_args+=(--dry-run)
+            ;;
+
+        *)
+            echo "Error: '$1' is not recognized. $USAGE" >&2
+            exit $FAIL
+            ;;
+    esac
+    shift
+done
+
+# ==============================================================================================
+#                                     Prune LFS Objects
+# ==============================================================================================
+# Note: Remote-tracking refs decide what counts as pushed, fetch first so objects pushed from other clones (IE merged branches) can be pruned too.
+exec "$PYTHON_EXEC" "$FCStdFileTool" --CONFIG-FILE --gc "${gc_args[@]}"
@@ -0,0 +1,100 @@
+#!/bin/bash
+# ==============================================================================================
+#                                       Script Overview
+# ==============================================================================================
+# Script to print storage analytics of .FCStd files via `git fstats`.
+# Raw vs stored size per .FCStd file, compression ratio per `files-to-compress` pattern and LFS shard churn over history (FCStdFileTool.py --stats).
+
+# ==============================================================================================
+#                               Verify and Retrieve Dependencies
+# ==============================================================================================
+# Note: PWD for all scripts called via git aliases is the root of the git repository
+
+# Import code used in this script
+FUNCTIONS_FILE="FreeCAD_Automation/utils.sh"
+source "$FUNCTIONS_FILE" --ignore-GitCAD-activation
+
+# Note: Controlled by "FreeCAD_Automation/activate.sh" and "FreeCAD_Automation/git"
+if [ "$GITCAD_ACTIVATED" = "$TRUE" ]; then
+    git_path="$REAL_GIT"
+else
+    git_path="git"
+fi
+
+if [ -z "$PYTHON_PATH" ]; then
+    echo "Error: Config file missing or invalid; cannot proceed." >&2
+    exit $FAIL
+fi
+
+# ==============================================================================================
+#                                          Parse Args
+# ==============================================================================================
+# CALLER_SUBDIR=${GIT_PREFIX}:
+    # If caller's pwd is $GIT_ROOT/subdir, $(GIT_PREFIX) = "subdir/"
+    # If caller's pwd is $GIT_ROOT, $(GIT_PREFIX) = ""
+CALLER_SUBDIR="$1"
+shift
+
+USAGE="Usage: git fstats [--json] [--top N] [--rev REV] [path/to/file.FCStd ...]"
+
+stats_args=()
+parsed_pathspec_args=()
+while [ $# -gt 0 ]; do
+    # echo "DEBUG: parsing '$1'..." >&2
+    case $1 in
+        "--json")
+            stats_args+=(--json)
+            ;;
+
+        "--top")
+            if ! [[ "$2" =~ ^[0-9]+$ ]] || [ "$2" -lt 1 ]; then
+                echo "Error: '--top' requires a positive integer, got '$2'. $USAGE" >&2
+                exit $FAIL
+            fi
+            stats_args+=(--top "$2")
+            shift
+            ;;
+
+        "--rev")
+            if [ -z "$2" ]; then
+                echo "Error: '--rev' requires a revision. $USAGE" >&2
+                exit $FAIL
+            fi
+            stats_args+=(--reference "$2")
+            shift
+            ;;
+
+        -*)
+            echo "Error: '$1' flag is not recognized, skipping..." >&2
+            ;;
+
+        # Assume arg is a pathspec. Fix path to be relative to root of the git repo instead of user's terminal pwd.
+        *)
+            if [ -n "$CALLER_SUBDIR" ] && [ "$1" = "." ]; then
+                parsed_pathspec_args+=("$CALLER_SUBDIR")
+            else
+                parsed_pathspec_args+=("${CALLER_SUBDIR}${1}")
+            fi
+            ;;
+    esac
+    shift
+done
+
+# ==============================================================================================
+#                                    Match Args to FCStd Files
+# ==============================================================================================
+# Note: No pathspecs => FCStdFileTool.py reports every tracked .FCStd file and the history of every shard (including deleted models)
+MATCHED_FCStd_file_paths=()
+if [ ${#parsed_pathspec_args[@]} -gt 0 ]; then
+    mapfile -d '' -t MATCHED_FCStd_file_paths < <(GIT_COMMAND="ls-files" "$git_path" ls-files -z -- "${parsed_pathspec_args[@]}" | grep -z -i -- '\.fcstd$')
+
+    if [ ${#MATCHED_FCStd_file_paths[@]} -eq 0 ]; then
+        echo "Error: No tracked .FCStd files found. $USAGE" >&2
+        exit $FAIL
+    fi
+fi
+
+# ==============================================================================================
+#                                     Print Storage Stats
+# ==============================================================================================
+exec "$PYTHON_EXEC" "$FCStdFileTool" --CONFIG-FILE --stats "${MATCHED_FCStd_file_paths[@]}" "${stats_args[@]}"
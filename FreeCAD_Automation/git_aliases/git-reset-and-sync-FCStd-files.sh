@@ -38,6 +38,10 @@ BEFORE_RESET_MODIFIED_FCSTD="$(GIT_COMMAND="diff-index" "$git_path" diff-index -
 GIT_COMMAND="update-index" "$git_path" update-index --refresh -q >/dev/null 2>&1
 BEFORE_RESET_MODIFIED_CHANGEFILES="$(GIT_COMMAND="diff-index" "$git_path" diff-index --name-only HEAD | grep -i -- '\.changefile$' | sort)"
 
+# Snapshot .FCStd files that may be restored to their current contents later (IE `git freset` back), see `snapshot_FCStd_files`
+mapfile -t BEFORE_RESET_MODIFIED_FCSTD_AND_CHANGEFILES <<<"$(printf '%s\n%s\n' "$BEFORE_RESET_MODIFIED_FCSTD" "$BEFORE_RESET_MODIFIED_CHANGEFILES" | grep -v '^$')"
+snapshot_FCStd_files "${BEFORE_RESET_MODIFIED_FCSTD_AND_CHANGEFILES[@]}"
+
 # Get original HEAD before reset
 ORIGINAL_HEAD="$(GIT_COMMAND="rev-parse" "$git_path" rev-parse HEAD)" || {
     echo "Error: Failed to get original HEAD" >&2
@@ -438,6 +438,9 @@ elif [ "$STASH_COMMAND" = "pop" ] || [ "$STASH_COMMAND" = "apply" ] || [ "$STASH
         done
     fi
 
+    # Snapshot the .FCStd files the stash is about to change, stashing them again restores them without rebuilding (see `snapshot_FCStd_files`)
+    snapshot_FCStd_files "${CHANGEFILES_IN_STASH_BEING_APPLIED[@]}"
+
     # Execute git stash pop/apply/branch
         # Note: `git stash` sometimes calls clean filter...
         # Note: As of git v2.52.0, the FILE_SEPARATOR is only valid for the "push" STASH_COMMAND
@@ -589,6 +592,9 @@ elif [ "$STASH_COMMAND" = "push" ] || [ "$STASH_COMMAND" = "save" ] || [ "$STASH
     
     # echo "DEBUG: retrieved before stash changefiles..." >&2
 
+    # Snapshot the .FCStd files being stashed, `git fstash pop` restores them without rebuilding (see `snapshot_FCStd_files`)
+    snapshot_FCStd_files "${BEFORE_STASH_CHANGEFILES[@]}"
+
     # Execute git stash
         # Note: `git stash` sometimes calls clean filter...
         # Note: As of git v2.52.0, the FILE_SEPARATOR is only valid for the "push" STASH_COMMAND
@@ -2,7 +2,8 @@
 # ==============================================================================================
 #                                       Script Overview
 # ==============================================================================================
-# Script to lock a .FCStd file for editing. Locks the associated .lockfile using Git LFS and makes the .FCStd file writable.
+# Script to lock .FCStd files for editing. Locks the associated .lockfiles using Git LFS and makes the .FCStd files writable.
+# All files are locked with a single FCStdFileTool.py (--lock) call, lock requests are sent concurrently.
 # Supports force locking to steal existing locks if user has perms to do so.
 
 # ==============================================================================================
@@ -107,50 +108,18 @@ fi
 # ==============================================================================================
 #                                          Lock Files
 # ==============================================================================================
-for FCStd_file_path in "${MATCHED_FCStd_file_paths[@]}"; do
-    # echo "DEBUG: Processing FCStd file: '$FCStd_file_path'" >&2
-
-    FCStd_dir_path="$(get_FCStd_dir "$FCStd_file_path")" || continue
-    lockfile_path="$FCStd_dir_path/.lockfile"
-
-    if [ "$FORCE_FLAG" = "$TRUE" ]; then
-        # Check if locked by someone else
-        LOCK_INFO="$(GIT_COMMAND="lfs" git lfs locks --path="$lockfile_path")"
-        CURRENT_USER="$(GIT_COMMAND="config" git config --get user.name)" || {
-            echo "Error: git config user.name not set!" >&2
-            exit $FAIL
-        }
-
-        # echo "DEBUG: Stealing..." >&2
-        
-        if printf '%s\n' "$LOCK_INFO" | grep -Fq -- "$CURRENT_USER"; then
-            # echo "DEBUG: lock already owned, no need to steal." >&2
-            :
-        
-        elif [ -n "$LOCK_INFO" ]; then
-            # echo "DEBUG: Forcefully unlocking..." >&2
-            GIT_COMMAND="lfs" git lfs unlock --force "$lockfile_path" || continue
-        fi
-    fi
-
-    echo -n "LOCKING: '$FCStd_file_path'...." >&2
-
-    lock_output="$(GIT_COMMAND="lfs" git lfs lock "$lockfile_path" 2>&1)"
+# Note: FCStdFileTool.py resolves every lockfile in one pass, reads the lock table once and sends the lock requests concurrently.
+lock_args=(--CONFIG-FILE --lock)
+if [ "$FORCE_FLAG" = "$TRUE" ]; then
+    lock_args+=(--force)
+fi
 
-    if [ $? -eq $SUCCESS ]; then
-        echo "SUCCESS" >&2
-    else
-        echo "Error: '$lock_output'" >&2
-        if [ ${#MATCHED_FCStd_file_paths[@]} -eq 1 ]; then
-            exit $FAIL
-        
-        else
-            continue
-        fi
-    fi
+printf '%s\0' "${MATCHED_FCStd_file_paths[@]}" | "$PYTHON_EXEC" "$FCStdFileTool" "${lock_args[@]}"
+lock_exit_code=$?
 
-    make_writable "$FCStd_file_path" || continue
-    # echo "DEBUG: '$FCStd_file_path' now writable and locked" >&2
-done
+# Note: Errors are reported per file, only fail if the single requested file couldn't be locked.
+if [ $lock_exit_code -ne $SUCCESS ] && [ ${#MATCHED_FCStd_file_paths[@]} -eq 1 ]; then
+    exit $FAIL
+fi
 
-exit $SUCCESS
\ No newline at end of file
+exit $SUCCESS
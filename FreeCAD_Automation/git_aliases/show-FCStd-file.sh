@@ -0,0 +1,95 @@
+#!/bin/bash
+# ==============================================================================================
+#                                       Script Overview
+# ==============================================================================================
+# Script to rebuild a .FCStd file as it was at any revision via `git fshow`.
+# The uncompressed directory is read straight from git objects by FCStdFileTool.py (--show), the working tree and index are not touched.
+
+# ==============================================================================================
+#                               Verify and Retrieve Dependencies
+# ==============================================================================================
+# Note: PWD for all scripts called via git aliases is the root of the git repository
+
+# Import code used in this script
+FUNCTIONS_FILE="FreeCAD_Automation/utils.sh"
+source "$FUNCTIONS_FILE" --ignore-GitCAD-activation
+
+# Note: Controlled by "FreeCAD_Automation/activate.sh" and "FreeCAD_Automation/git"
+if [ "$GITCAD_ACTIVATED" = "$TRUE" ]; then
+    git_path="$REAL_GIT"
+else
+    git_path="git"
+fi
+
+if [ -z "$PYTHON_PATH" ]; then
+    echo "Error: Config file missing or invalid; cannot proceed." >&2
+    exit $FAIL
+fi
+
+# ==============================================================================================
+#                                          Parse Args
+# ==============================================================================================
+# CALLER_SUBDIR=${GIT_PREFIX}:
+    # If caller's pwd is $GIT_ROOT/subdir, $(GIT_PREFIX) = "subdir/"
+    # If caller's pwd is $GIT_ROOT, $(GIT_PREFIX) = ""
+CALLER_SUBDIR="$1"
+shift
+
+USAGE="Usage: git fshow REV path/to/file.FCStd [-o path/to/output.FCStd]"
+
+parsed_positional_args=()
+OUTPUT_FCStd_file_path=""
+while [ $# -gt 0 ]; do
+    # echo "DEBUG: parsing '$1'..." >&2
+    case $1 in
+        "-o"|"--output")
+            if [ -z "$2" ]; then
+                echo "Error: '$1' requires a path. $USAGE" >&2
+                exit $FAIL
+            fi
+            OUTPUT_FCStd_file_path="${CALLER_SUBDIR}${2}"
+            shift
+            ;;
+
+        -*)
+            echo "Error: '$1' flag is not recognized, skipping..." >&2
+            ;;
+
+        *)
+            parsed_positional_args+=("$1")
+            ;;
+    esac
+    shift
+done
+
+if [ ${#parsed_positional_args[@]} -ne 2 ]; then
+    echo "Error: $USAGE" >&2
+    exit $FAIL
+fi
+
+REVISION="${parsed_positional_args[0]}"
+FCStd_file_path="${CALLER_SUBDIR}${parsed_positional_args[1]}" # Fix path to be relative to root of the git repo instead of user's terminal pwd.
+
+if ! [[ "$FCStd_file_path" =~ \.[fF][cC][sS][tT][dD]$ ]]; then
+    echo "Error: '$FCStd_file_path' is not an FCStd file. $USAGE" >&2
+    exit $FAIL
+fi
+
+SHORT_REVISION="$(GIT_COMMAND="rev-parse" "$git_path" rev-parse --short --verify --quiet "${REVISION}^{commit}")"
+if [ -z "$SHORT_REVISION" ]; then
+    echo "Error: '$REVISION' is not a valid revision." >&2
+    exit $FAIL
+fi
+
+# Default: path/to/file@<short sha>.FCStd next to the .FCStd file
+if [ -z "$OUTPUT_FCStd_file_path" ]; then
+    OUTPUT_FCStd_file_path="${FCStd_file_path%.*}@${SHORT_REVISION}.${FCStd_file_path##*.}"
+fi
+# echo "DEBUG: '$FCStd_file_path' at '$REVISION' -> '$OUTPUT_FCStd_file_path'" >&2
+
+# ==============================================================================================
+#                                      Rebuild .FCStd File
+# ==============================================================================================
+"$PYTHON_EXEC" "$FCStdFileTool" --CONFIG-FILE --show "$REVISION" "$FCStd_file_path" "$OUTPUT_FCStd_file_path" || exit $FAIL
+
+exit $SUCCESS
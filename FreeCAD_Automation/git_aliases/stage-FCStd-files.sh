@@ -0,0 +1,150 @@
+#!/bin/bash
+# ==============================================================================================
+#                                       Script Overview
+# ==============================================================================================
+# Script to export .FCStd files straight into the git index via `git fstage`. Replacement for `git fadd` on large models.
+# The uncompressed directories are built in memory by FCStdFileTool.py (--stage), one file at a time, and streamed to git's object database,
+# the working tree copies are only updated with `--checkout`. Checks the user has a valid lock if locking is required.
+
+# ==============================================================================================
+#                               Verify and Retrieve Dependencies
+# ==============================================================================================
+# Note: PWD for all scripts called via git aliases is the root of the git repository
+
+# Import code used in this script
+FUNCTIONS_FILE="FreeCAD_Automation/utils.sh"
+source "$FUNCTIONS_FILE"
+
+if [ -z "$PYTHON_PATH" ]; then
+    echo "Error: Config file missing or invalid; cannot proceed." >&2
+    exit $FAIL
+fi
+
+# ==============================================================================================
+#                                          Parse Args
+# ==============================================================================================
+# CALLER_SUBDIR=${GIT_PREFIX}:
+    # If caller's pwd is $GIT_ROOT/subdir, $(GIT_PREFIX) = "subdir/"
+    # If caller's pwd is $GIT_ROOT, $(GIT_PREFIX) = ""
+CALLER_SUBDIR="$1"
+shift
+
+# Parse remaining args: prepend CALLER_SUBDIR to paths (skip args containing '-')
+parsed_file_path_args=()
+CHECKOUT_FLAG=$FALSE
+while [ $# -gt 0 ]; do
+    # echo "DEBUG: parsing '$1'..." >&2
+    case $1 in
+        # Set boolean flag if arg is a valid flag
+        "--checkout")
+            CHECKOUT_FLAG=$TRUE
+            # echo "DEBUG: CHECKOUT_FLAG set" >&2
+            ;;
+        
+        -*)
+            echo "Error: '$1' flag is not recognized, skipping..." >&2
+            ;;
+        
+        # Assume arg is path. Fix path to be relative to root of the git repo instead of user's terminal pwd.
+        *)
+            if [ -n "$CALLER_SUBDIR" ]; then
+                case $1 in
+                    ".")
+                        # echo "DEBUG: '$1' -> '$CALLER_SUBDIR'" >&2
+                        parsed_file_path_args+=("$CALLER_SUBDIR")
+                        ;;
+                    *)
+                        # echo "DEBUG: prepend '$1'" >&2
+                        parsed_file_path_args+=("${CALLER_SUBDIR}${1}")
+                        ;;
+                esac
+            else
+                # echo "DEBUG: Don't prepend '$1'" >&2
+                parsed_file_path_args+=("$1")
+            fi
+            ;;
+    esac
+    shift
+done
+# echo "DEBUG: Args='$parsed_file_path_args'" >&2
+
+# ==============================================================================================
+#                                   Match Args to FCStd Files
+# ==============================================================================================
+MATCHED_FCStd_file_paths=()
+for file_path in "${parsed_file_path_args[@]}"; do
+    # echo "DEBUG: Matching file_path: '$file_path'...." >&2
+
+    if [[ -d "$file_path" || "$file_path" == *"*"* || "$file_path" == *"?"* ]]; then
+        # echo "DEBUG: file_path contains wildcards or is a directory" >&2
+        
+        mapfile -t files_matching_pattern < <(GIT_COMMAND="ls-files" git ls-files -- "$file_path" && GIT_COMMAND="ls-files" git ls-files --others --exclude-standard -- "$file_path")
+        for file in "${files_matching_pattern[@]}"; do
+            if [[ "$file" =~ \.[fF][cC][sS][tT][dD]$ ]]; then
+                # echo "DEBUG: Matched '$file'" >&2
+                MATCHED_FCStd_file_paths+=("$file")
+            fi
+        done
+
+    elif [[ "$file_path" =~ \.[fF][cC][sS][tT][dD]$ ]]; then
+        # echo "DEBUG: file_path is an FCStd file" >&2
+        MATCHED_FCStd_file_paths+=("$file_path")
+    else
+        # echo "DEBUG: file_path '$file_path' is not an FCStd file, directory, or wildcard..... skipping" >&2
+        :
+    fi
+done
+
+if [ ${#MATCHED_FCStd_file_paths[@]} -gt 0 ]; then
+    mapfile -t MATCHED_FCStd_file_paths < <(printf '%s\n' "${MATCHED_FCStd_file_paths[@]}" | sort -u) # Remove duplicates (creates an empty element if no elements)
+
+else
+    echo "Error: No valid .FCStd files found. Usage: git fstage [--checkout] [path/to/file.FCStd ...]" >&2
+    exit $FAIL
+fi
+
+# echo "DEBUG: matched '${#MATCHED_FCStd_file_paths[@]}' .FCStd files: '${MATCHED_FCStd_file_paths[@]}'" >&2
+
+# ==============================================================================================
+#                         Check if user allowed to modify .FCStd files
+# ==============================================================================================
+FCStd_files_to_stage=()
+if [ "$BYPASS_LOCK" = "$TRUE" ]; then
+    # echo "DEBUG: BYPASS_LOCK=$TRUE, bypassing lock check." >&2
+    FCStd_files_to_stage=("${MATCHED_FCStd_file_paths[@]}")
+
+else
+    # Note: One python call (and one `git lfs locks` call) for all files
+    mapfile -d '' RECORDS < <(printf '%s\0' "${MATCHED_FCStd_file_paths[@]}" | resolve_changed_FCStd_files); wait $! || exit $FAIL
+
+    for record in "${RECORDS[@]}"; do
+        IFS=$'\t' read -r FCStd_file_path FCStd_dir_path lockfile lock_verdict <<<"$record"
+
+        if [ "$lock_verdict" = "$LOCK_NOT_HELD" ]; then
+            echo "Error: User doesn't have lock for '$FCStd_file_path'... skipping..." >&2
+            continue
+        fi
+
+        FCStd_files_to_stage+=("$FCStd_file_path")
+    done
+fi
+
+if [ ${#FCStd_files_to_stage[@]} -eq 0 ]; then
+    exit $FAIL
+fi
+
+# ==============================================================================================
+#                                       Stage .FCStd Files
+# ==============================================================================================
+stage_args=(--CONFIG-FILE --stage)
+if [ "$CHECKOUT_FLAG" = "$TRUE" ]; then
+    stage_args+=(--checkout)
+fi
+
+printf '%s\0' "${FCStd_files_to_stage[@]}" | "$PYTHON_EXEC" "$FCStdFileTool" "${stage_args[@]}" || exit $FAIL
+
+if [ ${#FCStd_files_to_stage[@]} -ne ${#MATCHED_FCStd_file_paths[@]} ]; then
+    exit $FAIL
+fi
+
+exit $SUCCESS
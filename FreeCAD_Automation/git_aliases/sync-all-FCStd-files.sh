@@ -0,0 +1,120 @@
+#!/bin/bash
+# echo "DEBUG: ============== sync-all-FCStd-files.sh trap-card triggered! ==============" >&2
+# ==============================================================================================
+#                                       Script Overview
+# ==============================================================================================
+# Script to import every tracked .FCStd file from its uncompressed directory via `git fsync-all`.
+# Targets are discovered once with `git ls-files`, imports run in parallel in FCStdFileTool.py (--sync-all).
+# Progress is journaled under .git/ so an interrupted run resumes where it stopped. Files already up to date are skipped.
+
+# ==============================================================================================
+#                               Verify and Retrieve Dependencies
+# ==============================================================================================
+# Note: PWD for all scripts called via git aliases is the root of the git repository
+
+# Import code used in this script
+FUNCTIONS_FILE="FreeCAD_Automation/utils.sh"
+source "$FUNCTIONS_FILE" --ignore-GitCAD-activation
+
+# Note: Controlled by "FreeCAD_Automation/activate.sh" and "FreeCAD_Automation/git"
+if [ "$GITCAD_ACTIVATED" = "$TRUE" ]; then
+    git_path="$REAL_GIT"
+else
+    git_path="git"
+fi
+
+if [ -z "$PYTHON_PATH" ]; then
+    echo "Error: Config file missing or invalid; cannot proceed." >&2
+    exit $FAIL
+fi
+
+JOURNAL_PATH="$(GIT_COMMAND="rev-parse" "$git_path" rev-parse --git-path GitCAD/sync-all.journal)" || exit $FAIL
+mkdir -p "$(dirname "$JOURNAL_PATH")"
+
+# ==============================================================================================
+#                                          Parse Args
+# ==============================================================================================
+# CALLER_SUBDIR=${GIT_PREFIX}:
+    # If caller's pwd is $GIT_ROOT/subdir, $(GIT_PREFIX) = "subdir/"
+    # If caller's pwd is $GIT_ROOT, $(GIT_PREFIX) = ""
+CALLER_SUBDIR="$1"
+shift
+
+NUM_JOBS=""
+RESTART_FLAG="$FALSE"
+parsed_pathspec_args=()
+while [ $# -gt 0 ]; do
+    # echo "DEBUG: parsing '$1'..." >&2
+    case $1 in
+        "-j"|"--jobs")
+            NUM_JOBS="$2"
+            shift
+            if ! [[ "$NUM_JOBS" =~ ^[0-9]+$ ]] || [ "$NUM_JOBS" -lt 1 ]; then
+                echo "Error: '--jobs' requires a positive integer, got '$NUM_JOBS'" >&2
+                exit $FAIL
+            fi
+            ;;
+
+        "--restart")
+            RESTART_FLAG="$TRUE"
+            ;;
+
+        -*)
+            echo "Error: '$1' flag is not recognized, skipping..." >&2
+            ;;
+
+        # Assume arg is a pathspec. Fix path to be relative to root of the git repo instead of user's terminal pwd.
+        *)
+            if [ -n "$CALLER_SUBDIR" ] && [ "$1" = "." ]; then
+                parsed_pathspec_args+=("$CALLER_SUBDIR")
+            else
+                parsed_pathspec_args+=("${CALLER_SUBDIR}${1}")
+            fi
+            ;;
+    esac
+    shift
+done
+
+if [ "$RESTART_FLAG" = "$TRUE" ] && [ -f "$JOURNAL_PATH" ]; then
+    # echo "DEBUG: removing journal '$JOURNAL_PATH'" >&2
+    rm -f "$JOURNAL_PATH"
+fi
+
+# ==============================================================================================
+#                                     Sync Tracked FCStd Files
+# ==============================================================================================
+sync_all_args=(--CONFIG-FILE --sync-all "$JOURNAL_PATH")
+
+# No pathspecs => Limit to the configured `sync-scope`
+if [ ${#parsed_pathspec_args[@]} -eq 0 ]; then
+    sync_all_args+=(--scoped)
+fi
+
+if [ -n "$NUM_JOBS" ]; then
+    sync_all_args+=(--jobs "$NUM_JOBS")
+fi
+
+# Note: Paths are passed NUL separated so file names with spaces/newlines/quotes survive.
+mapfile -d '' -t SYNCED_FCStd_file_paths < <(
+    GIT_COMMAND="ls-files" "$git_path" ls-files -z -- "${parsed_pathspec_args[@]}" | grep -z -i -- '\.fcstd$' | \
+    "$PYTHON_EXEC" "$FCStdFileTool" "${sync_all_args[@]}"
+    echo -n "$?" > "${JOURNAL_PATH}.exit"
+)
+
+sync_exit_code="$(cat "${JOURNAL_PATH}.exit" 2>/dev/null)"
+rm -f "${JOURNAL_PATH}.exit"
+
+# ==============================================================================================
+#                              Clear Modifications For Synced Files
+# ==============================================================================================
+# Note: FCStdFileTool.py already wrote the `.fcmod` files (same as `git fcmod`), this just refreshes the index in one call.
+if [ ${#SYNCED_FCStd_file_paths[@]} -gt 0 ]; then
+    printf '%s\0' "${SYNCED_FCStd_file_paths[@]}" | GIT_COMMAND="fcmod" "$git_path" add --pathspec-from-file=- --pathspec-file-nul
+fi
+
+if [ "$sync_exit_code" != "$SUCCESS" ]; then
+    echo "Error: Some .FCStd files failed to sync. Fix the errors above and rerun \`git fsync-all\` to resume." >&2
+    exit $FAIL
+fi
+
+exit $SUCCESS
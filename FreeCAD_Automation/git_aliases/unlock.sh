@@ -2,7 +2,7 @@
 # ==============================================================================================
 #                                       Script Overview
 # ==============================================================================================
-# Script to unlock a previously locked .FCStd file. Unlocks the associated .lockfile using Git LFS and makes the .FCStd file readonly.
+# Script to unlock previously locked .FCStd files. Unlocks the associated .lockfiles using Git LFS and makes the .FCStd files readonly.
 # Checks for unpushed changes and warns if unlocking before changes are pushed. Supports force unlocking.
 
 # ==============================================================================================
@@ -148,75 +148,20 @@ fi
 # ==============================================================================================
 #                                          Unlock Files
 # ==============================================================================================
-for FCStd_file_path in "${MATCHED_FCStd_file_paths[@]}"; do
-    # echo "DEBUG: Processing FCStd file: '$FCStd_file_path'" >&2
-
-    FCStd_dir_path="$(get_FCStd_dir "$FCStd_file_path")" || continue
-    lockfile_path="$FCStd_dir_path/.lockfile"
-
-    # Check for unpushed changes if not force
-    if [ "$FORCE_FLAG" = "$FALSE" ]; then
-        DIR_HAS_CHANGES="$(dir_has_changes "$FCStd_dir_path" "$REFERENCE_BRANCH" "HEAD")" || continue
-
-        if [ "$DIR_HAS_CHANGES" = "$TRUE" ]; then
-            echo "Error: Cannot unlock '$FCStd_file_path' with unpushed changes. Use --force to override." >&2
-            if [ ${#MATCHED_FCStd_file_paths[@]} -eq 1 ]; then
-                exit $FAIL
-            
-            else
-                continue
-            fi
-        fi
-
-        # Check for stashed changes
-        STASH_COUNT="$(GIT_COMMAND="stash" git stash list | wc -l)"
-        stashed_changes_found=$FALSE
-        for i in $(seq 0 $((STASH_COUNT - 1))); do
-            # echo "DEBUG: checking stash '$i'...." >&2
-            
-            stashed_files="$(GIT_COMMAND="stash" git stash show --name-only "stash@{$i}" 2>/dev/null)"
-
-            if printf '%s\n' "$stashed_files" | grep -q -- "^$FCStd_dir_path/" || \
-               printf '%s\n' "$stashed_files" | grep -Fxq -- "$FCStd_file_path"; then
-                echo "Error: Cannot unlock '$FCStd_file_path' with stashed changes. Use --force to override." >&2
-                stashed_changes_found=$TRUE
-                break
-            fi
-        done
-
-        if [ "$stashed_changes_found" = "$TRUE" ]; then
-            if [ ${#MATCHED_FCStd_file_paths[@]} -eq 1 ]; then
-                exit $FAIL
-            
-            else
-                continue
-            fi
-        fi
-        # echo "DEBUG: No uncommitted changes to '$FCStd_dir_path', clear to unlock!" >&2
-    fi
+# Note: FCStdFileTool.py checks unpushed/stashed changes once for all files and sends the unlock requests concurrently.
+unlock_args=(--CONFIG-FILE --unlock)
+if [ "$FORCE_FLAG" = "$TRUE" ]; then
+    unlock_args+=(--force)
+else
+    unlock_args+=(--reference "$REFERENCE_BRANCH")
+fi
 
-    echo -n "UNLOCKING: '$FCStd_file_path'...." >&2
-    if [ "$FORCE_FLAG" = "$TRUE" ]; then
-        unlock_output="$(GIT_COMMAND="lfs" git lfs unlock --force "$lockfile_path" 2>&1)"
-        
-    else
-        unlock_output="$(GIT_COMMAND="lfs" git lfs unlock "$lockfile_path" 2>&1)"
-    fi
+printf '%s\0' "${MATCHED_FCStd_file_paths[@]}" | "$PYTHON_EXEC" "$FCStdFileTool" "${unlock_args[@]}"
+unlock_exit_code=$?
 
-    if [ $? -eq $SUCCESS ]; then
-        echo "SUCCESS" >&2
-    else
-        echo "Error: '$unlock_output'" >&2
-        if [ ${#MATCHED_FCStd_file_paths[@]} -eq 1 ]; then
-            exit $FAIL
-        
-        else
-            continue
-        fi
-    fi
-
-    make_readonly "$FCStd_file_path" || continue
-    # echo "DEBUG: '$FCStd_file_path' now readonly" >&2
-done
+# Note: Errors are reported per file, only fail if the single requested file couldn't be unlocked.
+if [ $unlock_exit_code -ne $SUCCESS ] && [ ${#MATCHED_FCStd_file_paths[@]} -eq 1 ]; then
+    exit $FAIL
+fi
 
-exit $SUCCESS
\ No newline at end of file
+exit $SUCCESS
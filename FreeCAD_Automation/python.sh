@@ -10,6 +10,7 @@ FALSE=1
 
 # Config file path
 CONFIG_FILE="FreeCAD_Automation/config.json"
+CONFIG_SHELL_SNAPSHOT="FreeCAD_Automation/.config-snapshot.sh" # Written by `FCStdFileTool.py --compile-config`
 
 # DESCRIPTION: Function to extract FreeCAD Python path from config file
     # USAGE: `PYTHON_PATH="$(get_freecad_python_path "$CONFIG_FILE")" || exit $FAIL`
@@ -42,8 +43,13 @@ get_freecad_python_path() {
 }
 
 # Only set if the config file exists
+# Note: The snapshot is only trusted while newer than the config file (`-nt` is a bash builtin, no process spawned). utils.sh recompiles stale snapshots.
 if [ -f "$CONFIG_FILE" ]; then
-    PYTHON_PATH="$(get_freecad_python_path "$CONFIG_FILE")" || exit $FAIL
+    if [ "$CONFIG_SHELL_SNAPSHOT" -nt "$CONFIG_FILE" ]; then
+        source "$CONFIG_SHELL_SNAPSHOT" || exit $FAIL
+    else
+        PYTHON_PATH="$(get_freecad_python_path "$CONFIG_FILE")" || exit $FAIL
+    fi
 fi
 
 if [ -z "$PYTHON_PATH" ]; then
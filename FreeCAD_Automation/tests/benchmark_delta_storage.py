@@ -0,0 +1,235 @@
+"""
+Benchmarks repository growth and clone time of the delta-storage mode against the default zip + LFS mode.
+
+A synthetic uncompressed FCStd directory (text `*.brp` shapes + binary `no_extension` files) is committed over a history of small geometry edits.
+Git LFS is emulated by replacing each compressed_binaries_*.zip with an LFS pointer and storing the zip in a local object store,
+this is what `git lfs clean` does, without needing an LFS server.
+
+usage (from repo root): FreeCAD_Automation/python.sh -m FreeCAD_Automation.tests.benchmark_delta_storage [--edits N] [--shapes N] [--shape-size-kb N]
+"""
+from ..FCStdFileTool import *
+import argparse
+import hashlib
+import json
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+
+FCSTD_DIR_NAME:str = "FCStd_Benchmark_FCStd"
+LFS_POINTER_TEMPLATE:str = "version https://git-lfs.github.com/spec/v1\noid sha256:{oid}\nsize {size}\n"
+
+def create_config(config_dir:str, delta_storage:bool) -> dict:
+    """
+    Writes a default config file with delta storage enabled or disabled, then loads it.
+
+    Args:
+        config_dir (str): Directory to write config.json to.
+        delta_storage (bool): Enable delta storage mode.
+
+    Returns:
+        dict: Loaded config.
+    """
+    config_path:str = os.path.join(config_dir, 'config.json')
+    with open(config_path, 'w') as f:
+        json.dump({
+            "require-lock-to-modify-FreeCAD-files": True,
+            "include-thumbnails": True,
+            "sync-scope": {
+                "include-directories": [],
+                "respect-sparse-checkout": True
+            },
+            "uncompressed-directory-structure": {
+                "uncompressed-directory-suffix": "_FCStd",
+                "uncompressed-directory-prefix": "FCStd_",
+                "subdirectory": {
+                    "put-uncompressed-directory-in-subdirectory": True,
+                    "subdirectory-name": "uncompressed"
+                }
+            },
+            "FCStd-import-cache": {
+                "enabled": False,
+                "max-size-megabyte": 1024
+            },
+            "concurrent-access": {
+                "wait-if-busy": True,
+                "timeout-seconds": 300
+            },
+            "lfs-garbage-collection": {
+                "keep-recent-commits": 10,
+                "keep-branches": ["main"],
+                "keep-stash": True
+            },
+            "job-scheduling": {
+                "max-jobs": 0,
+                "memory-budget-megabyte": 0
+            },
+            "compress-non-human-readable-FreeCAD-files": {
+                "enabled": True,
+                "files-to-compress": ["**/no_extension/*", "*.brp", "**/thumbnails/*", "*.Map.*", "*.Table.*"],
+                "max-compressed-file-size-gigabyte": 2,
+                "compression-method": "deflate",
+                "compression-level": 9,
+                "zip-file-prefix": "compressed_binaries_",
+                "delta-storage": {
+                    "enabled": delta_storage,
+                    "files-to-store-uncompressed": ["*.brp"],
+                    "max-file-size-megabyte": 64,
+                    "text-files-only": True
+                },
+                "shared-binary-store": {
+                    "enabled": False,
+                    "store-directory": os.path.join(config_dir, 'FreeCAD_Binary_Store')
+                }
+            }
+        }, f)
+    return load_config_file(config_path)
+
+def git(repo_path:str, *args:str) -> str:
+    return subprocess.run(['git', '-C', repo_path, *args], check=True, capture_output=True, text=True).stdout
+
+def generate_shapes(rng:random.Random, num_shapes:int, shape_size_kb:int) -> dict:
+    """
+    Generates text shapes that look like OpenCASCADE brep vertex/curve data.
+
+    Returns:
+        dict: Shape name -> list of lines.
+    """
+    num_lines:int = max(1, (shape_size_kb * 1024) // 60)
+    return {f"Shape{i}.brp": [f"{rng.uniform(-1e3, 1e3):.15g} {rng.uniform(-1e3, 1e3):.15g} {rng.uniform(-1e3, 1e3):.15g}\n" for _ in range(num_lines)] for i in range(num_shapes)}
+
+def edit_shapes(rng:random.Random, shapes:dict):
+    """
+    Simulates a small geometry edit: ~2% of the lines of a single shape change.
+    """
+    lines:list = shapes[rng.choice(sorted(shapes))]
+    for _ in range(max(1, len(lines) // 50)):
+        lines[rng.randrange(len(lines))] = f"{rng.uniform(-1e3, 1e3):.15g} {rng.uniform(-1e3, 1e3):.15g} {rng.uniform(-1e3, 1e3):.15g}\n"
+
+def write_FCStd_dir(FCStd_dir_path:str, shapes:dict, binary_blob:bytes):
+    if os.path.exists(FCStd_dir_path):
+        shutil.rmtree(FCStd_dir_path)
+    os.makedirs(os.path.join(FCStd_dir_path, NO_EXTENSION_SUBDIR_NAME))
+
+    with open(os.path.join(FCStd_dir_path, 'Document.xml'), 'w') as f:
+        f.write("<Document>\n" + "".join(f'  <Part file="{name}"/>\n' for name in sorted(shapes)) + "</Document>\n")
+
+    for name, lines in shapes.items():
+        with open(os.path.join(FCStd_dir_path, name), 'w') as f:
+            f.writelines(lines)
+
+    with open(os.path.join(FCStd_dir_path, NO_EXTENSION_SUBDIR_NAME, 'DiffuseColor'), 'wb') as f:
+        f.write(binary_blob)
+
+def store_zips_in_emulated_lfs(FCStd_dir_path:str, lfs_store_path:str):
+    """
+    Replaces every zip in FCStd_dir_path with an LFS pointer and stores the zip in lfs_store_path (keyed by sha256 like git lfs).
+    """
+    for item_name in os.listdir(FCStd_dir_path):
+        if not item_name.endswith('.zip'): continue
+
+        zip_path:str = os.path.join(FCStd_dir_path, item_name)
+        with open(zip_path, 'rb') as f:
+            data:bytes = f.read()
+
+        oid:str = hashlib.sha256(data).hexdigest()
+        with open(os.path.join(lfs_store_path, oid), 'wb') as f:
+            f.write(data)
+
+        with open(zip_path, 'w') as f:
+            f.write(LFS_POINTER_TEMPLATE.format(oid=oid, size=len(data)))
+
+def get_dir_size(dir_path:str) -> int:
+    return sum(os.path.getsize(os.path.join(root, file)) for root, _, files in os.walk(dir_path) for file in files)
+
+def run_benchmark(work_dir:str, delta_storage:bool, num_edits:int, num_shapes:int, shape_size_kb:int) -> dict:
+    """
+    Commits num_edits edits of a synthetic model using one storage mode and measures the resulting repository.
+
+    Returns:
+        dict: Benchmark results.
+    """
+    mode_name:str = "delta" if delta_storage else "zip+lfs"
+    mode_dir:str = os.path.join(work_dir, mode_name.replace('+', '_'))
+    repo_path:str = os.path.join(mode_dir, 'repo')
+    lfs_store_path:str = os.path.join(mode_dir, 'lfs_store')
+    os.makedirs(repo_path)
+    os.makedirs(lfs_store_path)
+
+    config:dict = create_config(mode_dir, delta_storage)
+
+    git(repo_path, 'init', '-q')
+    git(repo_path, 'config', 'user.name', 'benchmark')
+    git(repo_path, 'config', 'user.email', 'benchmark@localhost')
+
+    rng:random.Random = random.Random(0) # Same seed => Both modes commit the same history
+    shapes:dict = generate_shapes(rng, num_shapes, shape_size_kb)
+    binary_blob:bytes = rng.randbytes(64 * 1024)
+    FCStd_dir_path:str = os.path.join(repo_path, FCSTD_DIR_NAME)
+
+    export_time:float = 0.0
+    for i in range(num_edits + 1):
+        if i > 0:
+            edit_shapes(rng, shapes)
+
+        write_FCStd_dir(FCStd_dir_path, shapes, binary_blob)
+
+        start:float = time.perf_counter()
+        compress_binaries(FCStd_dir_path, config)
+        export_time += time.perf_counter() - start
+
+        store_zips_in_emulated_lfs(FCStd_dir_path, lfs_store_path)
+
+        git(repo_path, 'add', '-A')
+        git(repo_path, 'commit', '-q', '-m', f"edit {i}")
+
+    git(repo_path, 'gc', '-q')
+
+    git_bytes:int = get_dir_size(os.path.join(repo_path, '.git', 'objects'))
+    lfs_bytes:int = get_dir_size(lfs_store_path)
+
+    # Clone = git transfer + download of the LFS objects referenced by HEAD
+    clone_path:str = os.path.join(mode_dir, 'clone')
+    start:float = time.perf_counter()
+    subprocess.run(['git', 'clone', '-q', '--no-local', repo_path, clone_path], check=True)
+
+    clone_FCStd_dir_path:str = os.path.join(clone_path, FCSTD_DIR_NAME)
+    for item_name in os.listdir(clone_FCStd_dir_path):
+        if not item_name.endswith('.zip'): continue
+
+        with open(os.path.join(clone_FCStd_dir_path, item_name), 'r') as f:
+            oid:str = f.read().split('oid sha256:')[1].split()[0]
+        shutil.copyfile(os.path.join(lfs_store_path, oid), os.path.join(clone_FCStd_dir_path, item_name))
+    clone_time:float = time.perf_counter() - start
+
+    return {
+        "mode": mode_name,
+        "git_bytes": git_bytes,
+        "lfs_bytes": lfs_bytes,
+        "total_bytes": git_bytes + lfs_bytes,
+        "clone_seconds": clone_time,
+        "compress_seconds": export_time
+    }
+
+def main():
+    parser:argparse.ArgumentParser = argparse.ArgumentParser(description="Benchmark delta-storage vs zip+LFS storage modes.")
+    parser.add_argument('--edits', type=int, default=50, help="Number of edit commits after the initial commit.")
+    parser.add_argument('--shapes', type=int, default=20, help="Number of .brp shapes in the synthetic model.")
+    parser.add_argument('--shape-size-kb', type=int, default=256, help="Size of each .brp shape in KiB.")
+    args:argparse.Namespace = parser.parse_args()
+
+    work_dir:str = tempfile.mkdtemp(prefix='GitCAD_benchmark_')
+    try:
+        results:list = [run_benchmark(work_dir, delta_storage, args.edits, args.shapes, args.shape_size_kb) for delta_storage in (False, True)]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"History: {args.edits} edits of {args.shapes} x {args.shape_size_kb} KiB .brp shapes (~2% of one shape changed per edit)")
+    print(f"{'mode':<10}{'git objects':>14}{'LFS store':>14}{'total':>14}{'clone (s)':>12}{'compress (s)':>14}")
+    for result in results:
+        print(f"{result['mode']:<10}{result['git_bytes']/(1024 ** 2):>11.2f} MB{result['lfs_bytes']/(1024 ** 2):>11.2f} MB{result['total_bytes']/(1024 ** 2):>11.2f} MB{result['clone_seconds']:>12.3f}{result['compress_seconds']:>14.3f}")
+
+if __name__ == "__main__":
+    main()
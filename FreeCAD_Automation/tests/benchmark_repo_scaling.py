@@ -0,0 +1,605 @@
+"""
+Measures how the GitCAD hooks and aliases scale with the number of .FCStd files in a repository.
+
+For each N a throwaway repo with N synthetic models is built next to a local bare remote and a local stand-in LFS server
+(Batch API with basic transfers + File Locking API, served by http.server on 127.0.0.1). Two users then run a realistic workflow
+(commit, push, clone, fsync-all, status, lock, edit, pull, checkout, fstash, freset, unlock) with the hooks and aliases installed
+the same way `init-repo` installs them. Each operation is timed and its process launches are counted:
+    - git processes, git-lfs launches and hook runs are read from git's trace2 events (GIT_TRACE2_EVENT).
+    - FreeCAD python launches are counted by a shim set as `freecad-python-instance-path` in the throwaway config.json.
+    - LFS requests are counted by the stand-in server.
+Use --no-count to time the workflows without trace2 and the python shim.
+
+Requires git-lfs. The FreeCAD python of this repo's config.json is used by the throwaway repos.
+
+usage (from repo root): FreeCAD_Automation/python.sh -m FreeCAD_Automation.tests.benchmark_repo_scaling [--sizes 10 100 1000] [--edit-percent 1] [--report FILE]
+"""
+from ..FCStdFileTool import *
+import argparse
+import http.server
+import json
+import os
+import random
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+GITCAD_DIR_PATH:str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GITCAD_DIR_NAME:str = os.path.basename(GITCAD_DIR_PATH)
+INIT_REPO_PATH:str = os.path.join(GITCAD_DIR_PATH, 'user_scripts', 'init-repo')
+
+MODELS_DIR_NAME:str = "models"
+BRANCH_NAME:str = "main"
+FEATURE_BRANCH_NAME:str = "feature"
+AUTHOR:str = "alice"
+COLLABORATOR:str = "bob"
+
+LOCK_OWNER_HEADER:str = "X-GitCAD-Benchmark-User"
+LFS_MEDIA_TYPE:str = "application/vnd.git-lfs+json"
+LAUNCH_LOG_ENV:str = "GITCAD_BENCHMARK_LAUNCH_LOG"
+
+GITATTRIBUTES:str = (
+    ".lockfile filter=lfs diff=lfs merge=lfs -text lockable\n"
+    "*.[Ff][Cc][Ss][Tt][Dd] filter=FCStd\n"
+    "*.zip filter=lfs diff=lfs merge=lfs -text\n"
+)
+GITIGNORE:str = "**/__pycache__\nFreeCAD_Automation/config.json\n*.FCBak\n.fcmod\n"
+
+class LFSStandInServer:
+    """
+    Local stand-in for an LFS server, just enough of the Batch API (basic transfers) and File Locking API for `git lfs` to push, pull and lock.
+
+    Objects are stored in a directory keyed by oid, locks are kept in memory.
+    The lock owner is read from the LOCK_OWNER_HEADER request header (set per repo with `http.extraHeader`),
+    so locks are owned by the repo's `user.name` like on a real server.
+    """
+    def __init__(self, storage_dir:str):
+        self.storage_dir:str = storage_dir
+        self.locks:dict = {}
+        self.next_lock_id:int = 1
+        self.requests:int = 0
+        self.state_lock:threading.Lock = threading.Lock()
+        os.makedirs(storage_dir, exist_ok=True)
+
+        server:LFSStandInServer = self
+        class RequestHandler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            def log_message(self, format, *args): pass
+            def do_GET(self): server.handle_request(self, 'GET')
+            def do_POST(self): server.handle_request(self, 'POST')
+            def do_PUT(self): server.handle_request(self, 'PUT')
+
+        self.httpd:http.server.ThreadingHTTPServer = http.server.ThreadingHTTPServer(('127.0.0.1', 0), RequestHandler)
+        self.url:str = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread:threading.Thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self) -> 'LFSStandInServer':
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def send(self, request:http.server.BaseHTTPRequestHandler, status:int, body:bytes=b"", content_type:str=LFS_MEDIA_TYPE):
+        request.send_response(status)
+        request.send_header('Content-Type', content_type)
+        request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def send_json(self, request:http.server.BaseHTTPRequestHandler, status:int, data:dict):
+        self.send(request, status, json.dumps(data).encode())
+
+    def handle_request(self, request:http.server.BaseHTTPRequestHandler, method:str):
+        with self.state_lock:
+            self.requests += 1
+
+        url:urllib.parse.SplitResult = urllib.parse.urlsplit(request.path)
+        path:str = url.path.rstrip('/')
+        length:int = int(request.headers.get('Content-Length') or 0)
+        body:bytes = request.rfile.read(length) if length else b""
+        owner:str = request.headers.get(LOCK_OWNER_HEADER, "benchmark")
+
+        if method == 'POST' and path == '/objects/batch':
+            return self.send_json(request, 200, self.batch(json.loads(body)))
+
+        match:re.Match = re.fullmatch(r'/objects/([0-9a-f]{64})', path)
+        if match:
+            object_path:str = os.path.join(self.storage_dir, match.group(1))
+            if method == 'PUT':
+                with tempfile.NamedTemporaryFile(dir=self.storage_dir, delete=False) as f:
+                    f.write(body)
+                os.replace(f.name, object_path)
+                return self.send(request, 200)
+
+            if method == 'GET' and os.path.isfile(object_path):
+                with open(object_path, 'rb') as f:
+                    return self.send(request, 200, f.read(), 'application/octet-stream')
+
+            return self.send_json(request, 404, {"message": "Object does not exist"})
+
+        if path == '/locks' and method == 'GET':
+            query:dict = urllib.parse.parse_qs(url.query)
+            with self.state_lock:
+                locks:list = [lock for lock in self.locks.values()
+                              if query.get('path', [lock['path']])[0] == lock['path'] and query.get('id', [lock['id']])[0] == lock['id']]
+            return self.send_json(request, 200, {"locks": locks, "next_cursor": ""})
+
+        if path == '/locks' and method == 'POST':
+            lock_path:str = json.loads(body)['path']
+            with self.state_lock:
+                existing:list = [lock for lock in self.locks.values() if lock['path'] == lock_path]
+                if existing:
+                    return self.send_json(request, 409, {"lock": existing[0], "message": "already created lock"})
+
+                lock:dict = {
+                    "id": str(self.next_lock_id),
+                    "path": lock_path,
+                    "locked_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                    "owner": {"name": owner}
+                }
+                self.locks[lock['id']] = lock
+                self.next_lock_id += 1
+            return self.send_json(request, 201, {"lock": lock})
+
+        if path == '/locks/verify' and method == 'POST':
+            with self.state_lock:
+                ours:list = [lock for lock in self.locks.values() if lock['owner']['name'] == owner]
+                theirs:list = [lock for lock in self.locks.values() if lock['owner']['name'] != owner]
+            return self.send_json(request, 200, {"ours": ours, "theirs": theirs, "next_cursor": ""})
+
+        match = re.fullmatch(r'/locks/([^/]+)/unlock', path)
+        if match and method == 'POST':
+            force:bool = bool(json.loads(body or b"{}").get('force'))
+            with self.state_lock:
+                lock:dict = self.locks.get(match.group(1))
+                if lock is None:
+                    return self.send_json(request, 404, {"message": "unable to find lock"})
+
+                if lock['owner']['name'] != owner and not force:
+                    return self.send_json(request, 403, {"message": f"lock is owned by {lock['owner']['name']}"})
+
+                del self.locks[lock['id']]
+            return self.send_json(request, 200, {"lock": lock})
+
+        return self.send_json(request, 404, {"message": f"{method} {path} is not supported by the stand-in LFS server"})
+
+    def batch(self, batch_request:dict) -> dict:
+        """
+        Answers a Batch API request: uploads are requested for objects the server doesn't have, downloads are offered for objects it has.
+        """
+        objects:list = []
+        for lfs_object in batch_request.get('objects', []):
+            oid:str = lfs_object['oid']
+            entry:dict = {"oid": oid, "size": lfs_object['size'], "authenticated": True}
+            exists:bool = bool(re.fullmatch(r'[0-9a-f]{64}', oid)) and os.path.isfile(os.path.join(self.storage_dir, oid))
+            action:dict = {"href": f"{self.url}/objects/{oid}"}
+
+            if batch_request.get('operation') == 'upload':
+                if not exists:
+                    entry['actions'] = {"upload": action}
+
+            elif exists:
+                entry['actions'] = {"download": action}
+
+            else:
+                entry['error'] = {"code": 404, "message": "Object does not exist"}
+
+            objects.append(entry)
+
+        return {"transfer": "basic", "objects": objects}
+
+def get_init_repo_settings(function_name:str) -> dict:
+    """
+    Reads the `function_name "key" "value"` calls (`setup_git_alias`, `setup_git_FCStd_filter`) of init-repo, so the benchmark installs what users get.
+
+    Returns:
+        dict: key -> value with bash double quote escapes removed.
+    """
+    with open(INIT_REPO_PATH, 'r') as f:
+        init_repo:str = f.read()
+
+    pattern:str = rf'^{function_name} "([^"]+)" "((?:[^"\\]|\\.)*)"'
+    return {key: re.sub(r'\\([\\"$`])', r'\1', value) for key, value in re.findall(pattern, init_repo, re.MULTILINE)}
+
+def write_config(repo_path:str, python_path:str):
+    """
+    Writes the throwaway repo's config.json: init-repo defaults, GitCAD activation not required.
+    """
+    with open(os.path.join(repo_path, GITCAD_DIR_NAME, 'config.json'), 'w') as f:
+        json.dump({
+            "freecad-python-instance-path": python_path,
+            "require-lock-to-modify-FreeCAD-files": True,
+            "require-GitCAD-activation": False,
+            "include-thumbnails": True,
+            "sync-scope": {
+                "include-directories": [],
+                "respect-sparse-checkout": True
+            },
+            "uncompressed-directory-structure": {
+                "uncompressed-directory-suffix": "_FCStd",
+                "uncompressed-directory-prefix": "FCStd_",
+                "subdirectory": {
+                    "put-uncompressed-directory-in-subdirectory": True,
+                    "subdirectory-name": "uncompressed"
+                }
+            },
+            "FCStd-import-cache": {
+                "enabled": True,
+                "max-size-megabyte": 1024
+            },
+            "concurrent-access": {
+                "wait-if-busy": True,
+                "timeout-seconds": 300
+            },
+            "lfs-garbage-collection": {
+                "keep-recent-commits": 10,
+                "keep-branches": ["main"],
+                "keep-stash": True
+            },
+            "job-scheduling": {
+                "max-jobs": 0,
+                "memory-budget-megabyte": 0
+            },
+            "compress-non-human-readable-FreeCAD-files": {
+                "enabled": True,
+                "files-to-compress": ["**/no_extension/*", "*.brp", "**/thumbnails/*", "*.Map.*", "*.Table.*"],
+                "max-compressed-file-size-gigabyte": 2,
+                "compression-method": "deflate",
+                "compression-level": 9,
+                "zip-file-prefix": "compressed_binaries_",
+                "delta-storage": {
+                    "enabled": False,
+                    "files-to-store-uncompressed": ["*.brp"],
+                    "max-file-size-megabyte": 64,
+                    "text-files-only": True
+                },
+                "shared-binary-store": {
+                    "enabled": False,
+                    "store-directory": "FreeCAD_Binary_Store"
+                }
+            }
+        }, f, indent=4)
+
+def install_GitCAD(repo_path:str, user:str, lfs_url:str, python_path:str, env:dict):
+    """
+    Configures a repo like init-repo does (hooks, filters, aliases, LFS lock verification) for a benchmark user.
+    """
+    def git_config(*args:str):
+        subprocess.run(['git', '-C', repo_path, 'config', *args], check=True, env=env)
+
+    git_config('user.name', user)
+    git_config('user.email', f"{user}@localhost")
+    git_config('lfs.url', lfs_url)
+    git_config('lfs.locksverify', 'true')
+    git_config(f"http.{lfs_url}/.extraHeader", f"{LOCK_OWNER_HEADER}: {user}")
+
+    for filter_type, value in get_init_repo_settings('setup_git_FCStd_filter').items():
+        git_config(f"filter.FCStd.{filter_type}", value)
+
+    for alias, value in get_init_repo_settings('setup_git_alias').items():
+        git_config(f"alias.{alias}", value)
+
+    hooks_dir_path:str = os.path.join(repo_path, '.git', 'hooks')
+    for hook in os.listdir(os.path.join(repo_path, GITCAD_DIR_NAME, 'hooks')):
+        shutil.copyfile(os.path.join(repo_path, GITCAD_DIR_NAME, 'hooks', hook), os.path.join(hooks_dir_path, hook))
+        os.chmod(os.path.join(hooks_dir_path, hook), 0o755)
+
+    write_config(repo_path, python_path)
+
+def write_python_shim(shim_dir_path:str, python_path:str) -> str:
+    """
+    Writes a FreeCAD python shim that logs each launch to $LAUNCH_LOG_ENV before exec'ing the real python.
+    python.sh derives the FreeCAD root from `<python dir>/..`, so the shim's `../lib` links to the real FreeCAD lib dir.
+
+    Returns:
+        str: Path of the shim, to use as `freecad-python-instance-path`.
+    """
+    bin_dir_path:str = os.path.join(shim_dir_path, 'bin')
+    os.makedirs(bin_dir_path)
+    os.symlink(os.path.realpath(os.path.join(os.path.dirname(python_path), '..', 'lib')), os.path.join(shim_dir_path, 'lib'))
+
+    shim_path:str = os.path.join(bin_dir_path, os.path.basename(python_path))
+    with open(shim_path, 'w') as f:
+        f.write("#!/bin/bash\n"
+                f"[ -n \"${LAUNCH_LOG_ENV}\" ] && echo python >> \"${LAUNCH_LOG_ENV}\"\n"
+                f"exec {shlex.quote(python_path)} \"$@\"\n")
+    os.chmod(shim_path, 0o755)
+    return shim_path
+
+def write_synthetic_model(FCStd_file_path:str, model_index:int, revision:int, num_shapes:int, shape_size_kb:int):
+    """
+    Writes a synthetic .FCStd file: Document.xml/GuiDocument.xml referencing text `*.brp` shapes, a binary color list and a thumbnail.
+    Revision r > 0 changes the label and regenerates one shape, like a small edit in FreeCAD.
+    """
+    rng:random.Random = random.Random(model_index)
+    num_lines:int = max(1, (shape_size_kb * 1024) // 60)
+    shapes:dict = {f"Shape{i}.brp": "".join(f"{rng.uniform(-1e3, 1e3):.15g} {rng.uniform(-1e3, 1e3):.15g} {rng.uniform(-1e3, 1e3):.15g}\n" for _ in range(num_lines))
+                   for i in range(num_shapes)}
+    diffuse_color:bytes = rng.randbytes(4 * 1024)
+    thumbnail:bytes = rng.randbytes(16 * 1024)
+
+    if revision > 0:
+        edit_rng:random.Random = random.Random(f"{model_index}:{revision}")
+        shapes[f"Shape{(revision - 1) % num_shapes}.brp"] = "".join(
+            f"{edit_rng.uniform(-1e3, 1e3):.15g} {edit_rng.uniform(-1e3, 1e3):.15g} {edit_rng.uniform(-1e3, 1e3):.15g}\n" for _ in range(num_lines)
+        )
+
+    document:str = (
+        "<?xml version='1.0' encoding='utf-8'?>\n"
+        '<Document SchemaVersion="4" ProgramVersion="1.0" FileVersion="1">\n'
+        f'  <Properties Count="1"><Property name="Label" type="App::PropertyString"><String value="Model{model_index} r{revision}"/></Property></Properties>\n'
+        + "".join(f'  <Object name="Part{i}"><Property name="Shape" type="Part::PropertyPartShape"><Part file="{name}"/></Property></Object>\n' for i, name in enumerate(sorted(shapes)))
+        + "</Document>\n"
+    )
+    gui_document:str = (
+        "<?xml version='1.0' encoding='utf-8'?>\n"
+        '<Document SchemaVersion="1">\n  <ViewProvider name="Part0"><ColorList file="DiffuseColor"/></ViewProvider>\n</Document>\n'
+    )
+
+    with zipfile.ZipFile(FCStd_file_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('Document.xml', document)
+        zf.writestr('GuiDocument.xml', gui_document)
+        for name, shape in shapes.items():
+            zf.writestr(name, shape)
+        zf.writestr('DiffuseColor', diffuse_color)
+        zf.writestr('thumbnails/Thumbnail.png', thumbnail)
+
+class WorkflowRecorder:
+    """
+    Runs timed git commands and records their duration, process launches and LFS requests.
+    """
+    def __init__(self, work_dir:str, env:dict, lfs_server:LFSStandInServer, count_launches:bool):
+        self.env:dict = dict(env)
+        self.lfs_server:LFSStandInServer = lfs_server
+        self.count_launches:bool = count_launches
+        self.trace_dir_path:str = os.path.join(work_dir, 'trace2')
+        self.launch_log_path:str = os.path.join(work_dir, 'launches.log')
+        self.results:dict = {}
+
+        if count_launches:
+            os.makedirs(self.trace_dir_path)
+            self.env['GIT_TRACE2_EVENT'] = self.trace_dir_path
+            self.env[LAUNCH_LOG_ENV] = self.launch_log_path
+
+    def reset_launch_logs(self):
+        if not self.count_launches: return
+
+        for item_name in os.listdir(self.trace_dir_path):
+            os.remove(os.path.join(self.trace_dir_path, item_name))
+        open(self.launch_log_path, 'w').close()
+
+    def get_launch_counts(self) -> dict:
+        """
+        Counts git processes ("start" events), git-lfs launches and hook runs ("child_start" events) and FreeCAD python launches (shim log).
+        """
+        counts:dict = {"git": 0, "git-lfs": 0, "hooks": 0, "python": 0}
+        if not self.count_launches: return counts
+
+        for item_name in os.listdir(self.trace_dir_path):
+            with open(os.path.join(self.trace_dir_path, item_name), 'r', errors='replace') as f:
+                for line in f:
+                    try:
+                        event:dict = json.loads(line)
+                    except ValueError:
+                        continue
+
+                    if event.get('event') == 'start':
+                        counts['git'] += 1
+
+                    elif event.get('event') == 'child_start':
+                        if event.get('child_class') == 'hook':
+                            counts['hooks'] += 1
+
+                        elif (event.get('argv') or [""])[0].startswith('git-lfs'):
+                            counts['git-lfs'] += 1
+
+        with open(self.launch_log_path, 'r') as f:
+            counts['python'] = sum(1 for _ in f)
+
+        return counts
+
+    def run(self, operation:str, repo_path:str, *args:str):
+        """
+        Times `git *args` in repo_path and records it under operation.
+
+        Raises:
+            RuntimeError: If the git command fails.
+        """
+        self.reset_launch_logs()
+        lfs_requests:int = self.lfs_server.requests
+
+        start:float = time.perf_counter()
+        result:subprocess.CompletedProcess = subprocess.run(['git', *args], cwd=repo_path, env=self.env, capture_output=True, text=True)
+        seconds:float = time.perf_counter() - start
+
+        if result.returncode != 0:
+            raise RuntimeError(f"ERR: `git {' '.join(args)}` failed during '{operation}':\n{result.stdout}{result.stderr}")
+
+        self.results[operation] = {"seconds": seconds, "lfs_requests": self.lfs_server.requests - lfs_requests, **self.get_launch_counts()}
+
+def get_benchmark_env(home_dir_path:str) -> dict:
+    """
+    Environment for the throwaway repos: isolated HOME/global git config with git-lfs installed, GitCAD git wrapper deactivated.
+    """
+    env:dict = dict(os.environ)
+    for variable in ('GITCAD_ACTIVATED', 'GITCAD_REPO_ROOT', 'REAL_GIT', 'GIT_WRAPPER_PATH', 'GIT_DIR', 'GIT_WORK_TREE', 'GIT_INDEX_FILE'):
+        env.pop(variable, None)
+
+    if os.environ.get('GIT_WRAPPER_PATH'):
+        env['PATH'] = os.pathsep.join(path for path in env['PATH'].split(os.pathsep) if path != os.environ['GIT_WRAPPER_PATH'])
+
+    os.makedirs(home_dir_path)
+    env['HOME'] = home_dir_path
+    env['XDG_CONFIG_HOME'] = os.path.join(home_dir_path, '.config')
+    env['GIT_CONFIG_NOSYSTEM'] = '1'
+    env['GIT_TERMINAL_PROMPT'] = '0'
+
+    for key, value in (('init.defaultBranch', BRANCH_NAME), ('pull.rebase', 'false'), ('advice.detachedHead', 'false')):
+        subprocess.run(['git', 'config', '--global', key, value], check=True, env=env)
+    subprocess.run(['git', 'lfs', 'install', '--skip-repo'], check=True, capture_output=True, env=env)
+    return env
+
+def run_benchmark(work_dir:str, num_models:int, edit_percent:float, num_shapes:int, shape_size_kb:int, python_path:str, count_launches:bool) -> dict:
+    """
+    Builds a throwaway repo with num_models synthetic models and runs the benchmark workflow on it.
+
+    Returns:
+        dict: operation -> {"seconds", "git", "git-lfs", "hooks", "python", "lfs_requests"}, plus the number of edited models under "edited".
+    """
+    size_dir:str = os.path.join(work_dir, f"N{num_models}")
+    remote_path:str = os.path.join(size_dir, 'remote.git')
+    author_path:str = os.path.join(size_dir, AUTHOR)
+    collaborator_path:str = os.path.join(size_dir, COLLABORATOR)
+    os.makedirs(author_path)
+
+    env:dict = get_benchmark_env(os.path.join(size_dir, 'home'))
+    if count_launches:
+        python_path = write_python_shim(os.path.join(size_dir, 'freecad'), python_path)
+
+    def git(repo_path:str, *args:str) -> str:
+        return subprocess.run(['git', *args], cwd=repo_path, env=env, check=True, capture_output=True, text=True).stdout
+
+    with LFSStandInServer(os.path.join(size_dir, 'lfs_store')) as lfs_server:
+        recorder:WorkflowRecorder = WorkflowRecorder(size_dir, env, lfs_server, count_launches)
+
+        # ==================== Author: Repo With GitCAD + N Models ====================
+        git(size_dir, 'init', '-q', '--bare', remote_path)
+        git(author_path, 'init', '-q')
+        shutil.copytree(GITCAD_DIR_PATH, os.path.join(author_path, GITCAD_DIR_NAME), ignore=shutil.ignore_patterns('__pycache__', 'config.json', 'tests'))
+        install_GitCAD(author_path, AUTHOR, lfs_server.url, python_path, env)
+
+        for file_name, content in (('.gitattributes', GITATTRIBUTES), ('.gitignore', GITIGNORE), ('.lfsconfig', f"[lfs]\n\turl = {lfs_server.url}\n\tlocksverify = true\n")):
+            with open(os.path.join(author_path, file_name), 'w') as f:
+                f.write(content)
+
+        git(author_path, 'add', '-A')
+        git(author_path, 'commit', '-q', '-m', "Add GitCAD")
+        git(author_path, 'remote', 'add', 'origin', remote_path)
+
+        models:list = [os.path.join(MODELS_DIR_NAME, f"model_{i:05d}.FCStd") for i in range(num_models)]
+        os.makedirs(os.path.join(author_path, MODELS_DIR_NAME))
+        for i, model in enumerate(models):
+            write_synthetic_model(os.path.join(author_path, model), i, 0, num_shapes, shape_size_kb)
+
+        recorder.run("fadd all", author_path, 'fadd', MODELS_DIR_NAME)
+        recorder.run("commit all", author_path, 'commit', '-q', '-m', f"Add {num_models} models")
+        recorder.run("push all", author_path, 'push', '-q', '-u', 'origin', BRANCH_NAME)
+
+        # ==================== Collaborator: Clone + Sync ====================
+        recorder.run("clone", size_dir, 'clone', '-q', '-c', f"http.{lfs_server.url}/.extraHeader={LOCK_OWNER_HEADER}: {COLLABORATOR}", remote_path, collaborator_path)
+        install_GitCAD(collaborator_path, COLLABORATOR, lfs_server.url, python_path, env)
+        recorder.run("fsync-all", collaborator_path, 'fsync-all')
+        recorder.run("status", collaborator_path, 'status', '--porcelain')
+
+        # ==================== Collaborator: Lock, Edit, Commit, Push ====================
+        edited:list = models[:max(1, round(num_models * edit_percent / 100))]
+
+        def edit_models(revision:int):
+            for model in edited:
+                write_synthetic_model(os.path.join(collaborator_path, model), models.index(model), revision, num_shapes, shape_size_kb)
+
+        recorder.run("lock edited", collaborator_path, 'lock', *edited)
+        edit_models(1)
+        recorder.run("fadd edited", collaborator_path, 'fadd', *edited)
+        recorder.run("commit edited", collaborator_path, 'commit', '-q', '-m', "Edit models")
+        recorder.run("push edited", collaborator_path, 'push', '-q')
+
+        # ==================== Author: Pull ====================
+        recorder.run("pull edited", author_path, 'pull', '-q')
+
+        # ==================== Collaborator: Branch Switching ====================
+        git(collaborator_path, 'checkout', '-q', '-b', FEATURE_BRANCH_NAME)
+        edit_models(2)
+        git(collaborator_path, 'fadd', *edited)
+        git(collaborator_path, 'commit', '-q', '-m', "Edit models on a branch")
+        recorder.run("checkout main", collaborator_path, 'checkout', '-q', BRANCH_NAME)
+        recorder.run("checkout feature", collaborator_path, 'checkout', '-q', FEATURE_BRANCH_NAME)
+        git(collaborator_path, 'checkout', '-q', BRANCH_NAME)
+
+        # ==================== Collaborator: Stash + Reset ====================
+        edit_models(3)
+        git(collaborator_path, 'fadd', *edited)
+        recorder.run("fstash push", collaborator_path, 'fstash')
+        recorder.run("fstash pop", collaborator_path, 'fstash', 'pop')
+        recorder.run("freset --hard", collaborator_path, 'freset', '--hard')
+        recorder.run("unlock edited", collaborator_path, 'unlock', *edited)
+
+    return {"edited": len(edited), "operations": recorder.results}
+
+def format_report(results:dict, args:argparse.Namespace) -> str:
+    """
+    Formats the results of every size as a markdown scaling report (time table + process launch table).
+    """
+    sizes:list = list(results)
+    operations:list = list(results[sizes[0]]['operations'])
+    git_version:str = subprocess.run(['git', '--version'], capture_output=True, text=True).stdout.strip()
+    lfs_version:str = subprocess.run(['git-lfs', 'version'], capture_output=True, text=True).stdout.strip()
+
+    header:str = "| operation | " + " | ".join(f"N={size} ({results[size]['edited']} edited)" for size in sizes) + " |\n"
+    separator:str = "|---|" + "---:|" * len(sizes) + "\n"
+
+    report:str = "# GitCAD Hook/Alias Scaling Report\n\n"
+    report += f"- Models: {args.shapes} x {args.shape_size_kb} KiB `.brp` shapes + binary color list + thumbnail, edits touch {args.edit_percent}% of the models (at least 1)\n"
+    report += f"- {git_version}, {lfs_version}, stand-in LFS server on 127.0.0.1\n"
+    report += f"- Process launches counted: {'yes' if args.count else 'no (--no-count)'}\n\n"
+
+    report += "## Wall Time (seconds)\n\n" + header + separator
+    for operation in operations:
+        report += f"| {operation} | " + " | ".join(f"{results[size]['operations'][operation]['seconds']:.2f}" for size in sizes) + " |\n"
+
+    if args.count:
+        report += "\n## Process Launches (git / git-lfs / hooks / FreeCAD python) and LFS Requests\n\n" + header + separator
+        for operation in operations:
+            report += f"| {operation} | " + " | ".join(
+                "{git} / {git-lfs} / {hooks} / {python}, {lfs_requests} req".format(**results[size]['operations'][operation]) for size in sizes
+            ) + " |\n"
+
+    return report
+
+def main():
+    parser:argparse.ArgumentParser = argparse.ArgumentParser(description="Benchmark how the GitCAD hooks and aliases scale with the number of .FCStd files.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help="Numbers of .FCStd files to benchmark.")
+    parser.add_argument('--edit-percent', type=float, default=1.0, help="Percent of the models edited/locked by the workflow (at least 1 model).")
+    parser.add_argument('--shapes', type=int, default=4, help="Number of .brp shapes per synthetic model.")
+    parser.add_argument('--shape-size-kb', type=int, default=16, help="Size of each .brp shape in KiB.")
+    parser.add_argument('--report', default="GitCAD_scaling_report.md", help="Markdown file to write the scaling report to.")
+    parser.add_argument('--no-count', dest='count', action='store_false', help="Don't count process launches (no trace2/python shim overhead in the timings).")
+    parser.add_argument('--keep', action='store_true', help="Keep the throwaway repos for inspection.")
+    args:argparse.Namespace = parser.parse_args()
+
+    if shutil.which('git-lfs') is None:
+        print("Error: git-lfs is required to benchmark the hooks and aliases.", file=sys.stderr)
+        sys.exit(1)
+
+    with open(os.path.join(GITCAD_DIR_PATH, 'config.json'), 'r') as f:
+        python_path:str = os.path.abspath(json.load(f)['freecad-python-instance-path'])
+
+    work_dir:str = tempfile.mkdtemp(prefix='GitCAD_scaling_')
+    try:
+        results:dict = {}
+        for size in args.sizes:
+            print(f"Benchmarking N={size}...", file=sys.stderr)
+            results[size] = run_benchmark(work_dir, size, args.edit_percent, args.shapes, args.shape_size_kb, python_path, args.count)
+    finally:
+        if args.keep:
+            print(f"Throwaway repos kept in '{work_dir}'", file=sys.stderr)
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report:str = format_report(results, args)
+    with open(args.report, 'w') as f:
+        f.write(report)
+
+    print(report)
+    print(f"Report written to '{args.report}'", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
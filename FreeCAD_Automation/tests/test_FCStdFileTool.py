@@ -4,6 +4,7 @@ import shutil
 import os
 import json
 import tempfile
+import subprocess
 from unittest.mock import patch
 from io import StringIO
 from freecad import project_utility as PU
@@ -20,6 +21,10 @@ class Config:
         
         self.enable_locking:bool = True
         self.enable_thumbnail:bool = True
+        
+        # Sync scope
+        self.include_directories:list = []
+        self.respect_sparse_checkout:bool = False
 
         # Uncompressed directory structure
         self.dir_suffix:str = "_FCStd"
@@ -27,18 +32,50 @@ class Config:
         self.subdir_enabled:bool = True
         self.subdir_name:str = "uncompressed"
         
+        # Import cache
+        self.enable_import_cache:bool = False
+        self.import_cache_max_size_mb:float = 1024
+        
+        # Concurrent access
+        self.wait_if_busy:bool = True
+        self.busy_timeout_seconds:float = 300
+        
+        # LFS garbage collection
+        self.gc_keep_recent_commits:int = 10
+        self.gc_keep_branches:list = ["main"]
+        self.gc_keep_stash:bool = True
+        
+        # Job scheduling
+        self.max_jobs:int = 0
+        self.memory_budget_mb:float = 0
+        
         # Compressing
         self.enable_compressing:bool = True
         self.files_to_compress:list = ["**/no_extension/*", "*.brp", "**/thumbnails/*", "*.Map.*", "*.Table.*"]
         self.max_size_gb:float = 2.0
+        self.compression_method:str = "deflate"
         self.compression_level:int = 9
         self.zip_prefix:str = "compressed_binaries_"
         
+        # Delta storage
+        self.enable_delta_storage:bool = False
+        self.files_to_store_uncompressed:list = ["*.brp"]
+        self.delta_max_size_mb:float = 64
+        self.delta_text_only:bool = True
+        
+        # Shared binary store
+        self.enable_shared_store:bool = False
+        self.store_dir:str = os.path.relpath(os.path.join(config_dir, 'FreeCAD_Binary_Store'))
+        
     @property
     def json_config(self) -> dict:
         return {
             "require-lock-to-modify-FreeCAD-files": self.enable_locking,
             "include-thumbnails": self.enable_thumbnail,
+            "sync-scope": {
+                "include-directories": self.include_directories,
+                "respect-sparse-checkout": self.respect_sparse_checkout
+            },
             "uncompressed-directory-structure": {
                 "uncompressed-directory-suffix": self.dir_suffix,
                 "uncompressed-directory-prefix": self.dir_prefix,
@@ -47,12 +84,40 @@ class Config:
                     "subdirectory-name": self.subdir_name
                 }
             },
+            "FCStd-import-cache": {
+                "enabled": self.enable_import_cache,
+                "max-size-megabyte": self.import_cache_max_size_mb
+            },
+            "concurrent-access": {
+                "wait-if-busy": self.wait_if_busy,
+                "timeout-seconds": self.busy_timeout_seconds
+            },
+            "lfs-garbage-collection": {
+                "keep-recent-commits": self.gc_keep_recent_commits,
+                "keep-branches": self.gc_keep_branches,
+                "keep-stash": self.gc_keep_stash
+            },
+            "job-scheduling": {
+                "max-jobs": self.max_jobs,
+                "memory-budget-megabyte": self.memory_budget_mb
+            },
             "compress-non-human-readable-FreeCAD-files": {
                 "enabled": self.enable_compressing,
                 "files-to-compress": self.files_to_compress,
                 "max-compressed-file-size-gigabyte": self.max_size_gb,
+                "compression-method": self.compression_method,
                 "compression-level": self.compression_level,
-                "zip-file-prefix": self.zip_prefix
+                "zip-file-prefix": self.zip_prefix,
+                "delta-storage": {
+                    "enabled": self.enable_delta_storage,
+                    "files-to-store-uncompressed": self.files_to_store_uncompressed,
+                    "max-file-size-megabyte": self.delta_max_size_mb,
+                    "text-files-only": self.delta_text_only
+                },
+                "shared-binary-store": {
+                    "enabled": self.enable_shared_store,
+                    "store-directory": self.store_dir
+                }
             }
         }
 
@@ -108,6 +173,75 @@ class TestFCStdFileTool(unittest.TestCase):
         expected:str = os.path.relpath(os.path.join(self.temp_dir, f"{self.config_file.dir_prefix}AssemblyExample{self.config_file.dir_suffix}"))
         self.assertEqual(path, expected, msg=f"ERR: Expected path '{expected}', got '{path}'")
 
+    def test_compile_config(self):
+        config_dir:str = os.path.dirname(self.config_file.config_path)
+        snapshot_path:str = os.path.join(config_dir, CONFIG_SNAPSHOT_NAME)
+        shell_snapshot_path:str = os.path.join(config_dir, CONFIG_SHELL_SNAPSHOT_NAME)
+        
+        # Snapshot written on first load, then loaded instead of parsing the config file
+        config:dict = self.config_file.createTestConfig()
+        self.assertTrue(os.path.isfile(snapshot_path), f"ERR: Expected config snapshot '{snapshot_path}'.")
+        
+        with patch('FreeCAD_Automation.FCStdFileTool.compile_config') as compile_config_mock:
+            self.assertEqual(load_config_file(self.config_file.config_path), config, "ERR: Snapshot config differs from the compiled config.")
+            compile_config_mock.assert_not_called()
+        
+        # Same size edit => Snapshot keyed by sha256, not size/mtime
+        self.config_file.compression_level = 6
+        self.assertEqual(self.config_file.createTestConfig()['compress_binaries']['compression_level'], 6, "ERR: Stale config snapshot loaded after editing the config file.")
+        
+        # Missing keys (IE config.json older than the key) => Defaults, with a warning
+        config_data:dict = self.config_file.json_config
+        del config_data["job-scheduling"]
+        del config_data["sync-scope"]["respect-sparse-checkout"]
+        with patch('sys.stderr', new_callable=StringIO) as mock_stderr:
+            config:dict = self.config_file.createTestConfig(config_data)
+        self.assertEqual(config['job_scheduling'], {"max_jobs": 0, "memory_budget_megabyte": 0}, "ERR: Missing section should get its defaults.")
+        self.assertIs(config['sync_scope']['respect_sparse_checkout'], True, "ERR: Missing nested key should get its default.")
+        for expected in ["'job-scheduling'", "'sync-scope.respect-sparse-checkout'"]:
+            self.assertIn(expected, mock_stderr.getvalue(), f"ERR: Expected warning about {expected}.")
+        
+        # Every problem is reported at once
+        self.config_file.compression_method = "zstd"
+        self.config_file.compression_level = 12
+        self.config_file.enable_thumbnail = "yes"
+        config_data:dict = self.config_file.json_config
+        config_data["sync-scope"]["respect-sparse-checkout"] = "no"
+        
+        with self.assertRaises(ValueError) as cm:
+            self.config_file.createTestConfig(config_data)
+        for expected in ["'include-thumbnails' must be true or false", "'sync-scope.respect-sparse-checkout' must be true or false"]:
+            self.assertIn(expected, str(cm.exception), f"ERR: Expected '{expected}' in '{cm.exception}'.")
+        
+        # Value checks once the types are right
+        self.config_file.enable_thumbnail = True
+        with self.assertRaises(ValueError) as cm:
+            self.config_file.createTestConfig()
+        for expected in ["compression-method' must be one of", "compression-level' must be between 0 and 9"]:
+            self.assertIn(expected, str(cm.exception), f"ERR: Expected '{expected}' in '{cm.exception}'.")
+        
+        # Shell snapshot requires the keys only the shell scripts read
+        self.config_file.compression_method = "deflate"
+        self.config_file.compression_level = 9
+        self.config_file.createTestConfig()
+        
+        with patch('sys.argv', [FILE_NAME, '--CONFIG-FILE', self.config_file.config_path, '--compile-config']), patch('sys.stderr', new_callable=StringIO) as mock_stderr:
+            with self.assertRaises(SystemExit, msg="ERR: Expected non zero exit code."):
+                main()
+        self.assertIn("'freecad-python-instance-path' is missing", mock_stderr.getvalue())
+        self.assertFalse(os.path.exists(shell_snapshot_path), "ERR: Shell snapshot written for an invalid config file.")
+        
+        config_data:dict = self.config_file.json_config
+        config_data.update({"freecad-python-instance-path": "/opt/Free CAD/bin/python's", "require-GitCAD-activation": False})
+        self.config_file.createTestConfig(config_data)
+        
+        with patch('sys.argv', [FILE_NAME, '--CONFIG-FILE', self.config_file.config_path, '--compile-config']):
+            main()
+        
+        shell_variables:str = subprocess.run(['bash', '-c', f'source "$1" && printf "%s\\n" "$PYTHON_PATH" "$REQUIRE_LOCKS" "$REQUIRE_GITCAD_ACTIVATION"', 'bash', shell_snapshot_path],
+                                             capture_output=True, text=True, check=True).stdout
+        self.assertEqual(shell_variables, "/opt/Free CAD/bin/python's\n0\n1\n", "ERR: Unexpected shell snapshot variables.")
+
     def test_no_config_export(self):
         with patch('sys.argv', [FILE_NAME, '--export', self.temp_AssemblyExample_path, os.path.join(self.temp_dir, 'output_dir')]):
             main()
@@ -659,5 +793,1254 @@ class TestFCStdFileTool(unittest.TestCase):
         main()
 
 
+    def test_config_export_import__delta_storage(self):
+        # SET CONFIGS:
+        self.config_file.enable_compressing = True
+        self.config_file.enable_delta_storage = True
+        self.config_file.files_to_store_uncompressed = ["*.brp", "**/no_extension/*"]
+        self.config_file.delta_max_size_mb = 64
+        self.config_file.delta_text_only = True
+
+        self.config_file.createTestConfig()
+        original_size:int = os.path.getsize(self.temp_AssemblyExample_path)
+        
+        # EXPORT
+        with patch('sys.argv', [FILE_NAME, '--CONFIG-FILE', self.config_file.config_path, '--export', self.temp_AssemblyExample_path]):
+            main()
+
+        # CHECK EXPORT
+        FCStd_dir_name:str = os.path.splitext(os.path.basename(self.temp_AssemblyExample_path))[0]
+        expected_dir:str = os.path.join(self.temp_dir, "uncompressed", f"FCStd_{FCStd_dir_name}_FCStd")
+        no_extension_dir:str = os.path.join(expected_dir, NO_EXTENSION_SUBDIR_NAME)
+        brp_files:list = [f for f in os.listdir(expected_dir) if f.endswith('.brp')]
+        zip_files:list = [f for f in os.listdir(expected_dir) if f.startswith(self.config_file.zip_prefix) and f.endswith('.zip')]
+        
+        self.assertTrue(len(brp_files) > 0, f"ERR: Num brp files '{len(brp_files)}' is <= 0 (text .brp files should be stored uncompressed).")
+        self.assertTrue(len(zip_files) > 0, f"ERR: Num zip files '{len(zip_files)}' is <= 0 (thumbnails should still be compressed).")
+        
+        for brp_file in brp_files:
+            self.assertTrue(is_text_file(os.path.join(expected_dir, brp_file)), f"ERR: '{brp_file}' is not text yet was stored uncompressed.")
+        
+        for item_name in os.listdir(no_extension_dir):
+            self.assertTrue(is_text_file(os.path.join(no_extension_dir, item_name)), f"ERR: binary file '{item_name}' was stored uncompressed with text-files-only enabled.")
+        
+        for zip_file in zip_files:
+            with zipfile.ZipFile(os.path.join(expected_dir, zip_file), 'r') as zf:
+                self.assertTrue(not any(name.endswith('.brp') for name in zf.namelist()), f"ERR: '.brp' file found in '{zip_file}' with delta storage enabled.")
+        
+        # IMPORT
+        with patch('sys.argv', [FILE_NAME, '--CONFIG-FILE', self.config_file.config_path, '--import', self.temp_AssemblyExample_path]):
+            main()
+
+        # CHECK IMPORT
+        new_size:int = os.path.getsize(self.temp_AssemblyExample_path)
+        self.assertAlmostEqual(new_size, original_size, delta=int(original_size*0.05), msg=f"ERR: Original file size={original_size}, New file size={new_size}, Acceptable Delta={int(original_size*0.05)}")
+        
+        self.assertEqual(sorted(f for f in os.listdir(expected_dir) if f.endswith('.brp')), sorted(brp_files), "ERR: Uncompressed '.brp' files were modified by import.")
+
+    def test_config_export_import__shared_store(self):
+        # SET CONFIGS:
+        self.config_file.enable_compressing = True
+        self.config_file.enable_shared_store = True
+
+        self.config_file.createTestConfig()
+        
+        # Second copy of the same file => Every stored blob should be shared
+        temp_AssemblyCopy_path:str = os.path.relpath(os.path.join(self.temp_dir, 'AssemblyCopy.FCStd'))
+        shutil.copy(self.temp_AssemblyExample_path, temp_AssemblyCopy_path)
+        original_size:int = os.path.getsize(self.temp_AssemblyExample_path)
+        
+        # EXPORT
+        for FCStd_file_path in [self.temp_AssemblyExample_path, temp_AssemblyCopy_path]:
+            with patch('sys.argv', [FILE_NAME, '--CONFIG-FILE', self.config_file.config_path, '--export', FCStd_file_path]):
+                main()
+
+        # CHECK EXPORT
+        expected_dirs:list = [os.path.join(self.temp_dir, "uncompressed", f"FCStd_{name}_FCStd") for name in ["AssemblyExample", "AssemblyCopy"]]
+        manifests:list = []
+        for expected_dir in expected_dirs:
+            zip_files:list = [f for f in os.listdir(expected_dir) if f.startswith(self.config_file.zip_prefix) and f.endswith('.zip')]
+            self.assertEqual(len(zip_files), 0, f"ERR: Zip files '{zip_files}' created in '{expected_dir}' with shared store enabled.")
+            
+            manifest_path:str = os.path.join(expected_dir, SHARED_STORE_MANIFEST_NAME)
+            self.assertTrue(os.path.exists(manifest_path), f"ERR: '{manifest_path}' does not exist.")
+            with open(manifest_path, 'r') as f:
+                manifests.append(json.load(f))
+        
+        self.assertTrue(len(manifests[0]) > 0, "ERR: Manifest is empty.")
+        self.assertEqual(manifests[0], manifests[1], "ERR: Manifests of identical files differ.")
+        
+        blob_paths:list = [os.path.join(root, f) for root, _, files in os.walk(self.config_file.store_dir) for f in files]
+        unique_hashes:set = {blob_info['sha256'] for blob_info in manifests[0].values()}
+        self.assertEqual(len(blob_paths), len(unique_hashes), f"ERR: Expected '{len(unique_hashes)}' deduplicated blobs in store, got '{len(blob_paths)}'.")
+        
+        # IMPORT
+        with patch('sys.argv', [FILE_NAME, '--CONFIG-FILE', self.config_file.config_path, '--import', temp_AssemblyCopy_path]):
+            main()
+
+        # CHECK IMPORT
+        new_size:int = os.path.getsize(temp_AssemblyCopy_path)
+        self.assertAlmostEqual(new_size, original_size, delta=int(original_size*0.05), msg=f"ERR: Original file size={original_size}, New file size={new_size}, Acceptable Delta={int(original_size*0.05)}")
+        
+        with zipfile.ZipFile(self.temp_AssemblyExample_path, 'r') as original, zipfile.ZipFile(temp_AssemblyCopy_path, 'r') as imported:
+            self.assertEqual(sorted(original.namelist()), sorted(imported.namelist()), "ERR: Imported file contents differ from original.")
+        
+        self.assertEqual(sorted(os.listdir(expected_dirs[1])), sorted(os.listdir(expected_dirs[0])), "ERR: Extracted shared store files were not cleaned up after import.")
+
+    def test_sync_all(self):
+        self.config_file.createTestConfig()
+        journal_path:str = os.path.join(self.temp_dir, 'sync-all.journal')
+        FCStd_file_paths:list = [self.temp_AssemblyExample_path, self.temp_BIMExample_path]
+        
+        for FCStd_file_path in FCStd_file_paths:
+            with patch('sys.argv', [FILE_NAME, '--SILENT', '--CONFIG-FILE', self.config_file.config_path, '--export', FCStd_file_path]):
+                main()
+        
+        def run_sync_all() -> list:
+            stdin:StringIO = StringIO()
+            stdin.buffer = io.BytesIO(b''.join(os.fsencode(path) + b'\0' for path in FCStd_file_paths))
+            with patch('sys.argv', [FILE_NAME, '--SILENT', '--CONFIG-FILE', self.config_file.config_path, '--sync-all', journal_path, '--jobs', '2']), patch('sys.stdin', stdin), patch('sys.stdout', new_callable=StringIO) as stdout:
+                main()
+            return [path for path in stdout.getvalue().split('\0') if path]
+        
+        # First run imports everything
+        self.assertEqual(sorted(run_sync_all()), sorted(FCStd_file_paths), "ERR: Not all files were synced on first run.")
+        self.assertEqual(sorted(load_sync_journal(journal_path)), sorted(FCStd_file_paths), "ERR: Journal does not contain all synced files.")
+        
+        for FCStd_file_path in FCStd_file_paths:
+            FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, load_config_file(self.config_file.config_path))
+            self.assertTrue(os.path.exists(os.path.join(FCStd_dir_path, '.fcmod')), f"ERR: '.fcmod' not created for '{FCStd_file_path}'.")
+            with zipfile.ZipFile(FCStd_file_path, 'r') as zf:
+                self.assertIn('Document.xml', zf.namelist(), f"ERR: '{FCStd_file_path}' was not imported.")
+        
+        # Second run skips up to date files
+        self.assertEqual(run_sync_all(), [], "ERR: Up to date files were synced again.")
+        
+        # Changed directory is synced again
+        FCStd_dir_path:str = get_FCStd_dir_path(self.temp_BIMExample_path, load_config_file(self.config_file.config_path))
+        with open(os.path.join(FCStd_dir_path, 'Document.xml'), 'a') as f:
+            f.write("\n")
+        self.assertEqual(run_sync_all(), [self.temp_BIMExample_path], "ERR: Modified directory was not synced again.")
+        
+        # Interrupted journal write is ignored
+        with open(journal_path, 'a') as f:
+            f.write('{"FCStd_file_path": "trunc')
+        self.assertEqual(sorted(load_sync_journal(journal_path)), sorted(FCStd_file_paths), "ERR: Truncated journal line was not ignored.")
+
+    def test_batch_jobs(self):
+        # Scheduler: largest first, concurrent jobs within max jobs and memory budget, too large job runs alone
+        jobs:list = [{"FCStd_file_path": name, "args": (name,), "size_bytes": size, "memory_bytes": memory} for name, size, memory in
+                     [("small1", 1, 10), ("huge", 100, 500), ("medium", 50, 60), ("small2", 2, 10), ("small3", 3, 10)]]
+        memory_of:dict = {job['FCStd_file_path']: job['memory_bytes'] for job in jobs}
+        lock:threading.Lock = threading.Lock()
+        running:list = []
+        started:list = []
+        violations:list = []
+        
+        def job_function(name:str) -> str:
+            with lock:
+                running.append(name)
+                started.append(name)
+                if len(running) > 2 or (len(running) > 1 and sum(memory_of[job] for job in running) > 100):
+                    violations.append(list(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(name)
+            return name
+        
+        finished:list = []
+        with patch('concurrent.futures.ProcessPoolExecutor', concurrent.futures.ThreadPoolExecutor):
+            run_scheduled_jobs(jobs, job_function, 2, 100, lambda job, result, usage: finished.append((job['FCStd_file_path'], result, usage)))
+        
+        self.assertEqual(started[:2], ["huge", "medium"], "ERR: Largest jobs should start first.")
+        self.assertEqual(violations, [], "ERR: Concurrent jobs exceeded max jobs or memory budget.")
+        self.assertEqual(sorted(name for name, result, _ in finished), sorted(memory_of), "ERR: Not every job ran.")
+        self.assertTrue(all(name == result and usage['seconds'] > 0 for name, result, usage in finished), "ERR: Job results or usage not reported.")
+        
+        # Batch export/import through the CLI
+        config:dict = self.config_file.createTestConfig()
+        FCStd_file_paths:list = [os.path.join('.', self.temp_AssemblyExample_path), os.path.abspath(self.temp_BIMExample_path)] # Printed back as given, not normalized
+        
+        def run_batch(mode:str) -> list:
+            stdin:StringIO = StringIO()
+            stdin.buffer = io.BytesIO(b''.join(os.fsencode(path) + b'\0' for path in FCStd_file_paths + [os.path.join(self.temp_dir, 'missing.FCStd')]))
+            with patch('sys.argv', [FILE_NAME, '--CONFIG-FILE', self.config_file.config_path, '--batch', mode, '--jobs', '2']), patch('sys.stdin', stdin), \
+                 patch('sys.stdout', new_callable=StringIO) as stdout, patch('sys.stderr', new_callable=StringIO) as stderr:
+                with self.assertRaises(SystemExit, msg="ERR: Missing file should fail the batch."):
+                    main()
+            self.assertIn("Job report", stderr.getvalue(), "ERR: Job report not printed.")
+            return [path for path in stdout.getvalue().split('\0') if path]
+        
+        self.assertEqual(sorted(run_batch('export')), sorted(FCStd_file_paths), "ERR: Not all files were exported.")
+        for FCStd_file_path in FCStd_file_paths:
+            self.assertEqual(get_FCStd_sync_status(FCStd_file_path, config)[0], VERIFY_IN_SYNC, f"ERR: '{FCStd_file_path}' not exported.")
+            
+            job:dict = get_FCStd_job(BATCH_EXPORT, FCStd_file_path, config, ())
+            self.assertEqual(job['size_bytes'], os.path.getsize(FCStd_file_path), "ERR: Export should be sized by the .FCStd file.")
+            self.assertGreater(job['memory_bytes'], JOB_BASE_MEMORY_BYTES, "ERR: Memory estimate should include the model.")
+        
+        # LFS objects of every file pulled once up front, not by each worker
+        with patch('FreeCAD_Automation.FCStdFileTool.pull_missing_LFS_objects', return_value=[]) as mock_pull:
+            self.assertEqual(sorted(run_batch('import')), sorted(FCStd_file_paths), "ERR: Not all files were imported.")
+        mock_pull.assert_called_once()
+        self.assertEqual(len(mock_pull.call_args[0][0]), len(FCStd_file_paths) + 1, "ERR: Every file's LFS objects should be pulled in one call.")
+        for FCStd_file_path in FCStd_file_paths:
+            self.assertEqual(get_FCStd_sync_status(FCStd_file_path, config)[0], VERIFY_IN_SYNC, f"ERR: '{FCStd_file_path}' not imported.")
+
+    def test_verify(self):
+        def verify(FCStd_file_path:str) -> str:
+            with patch('sys.argv', [FILE_NAME, '--CONFIG-FILE', self.config_file.config_path, '--verify', FCStd_file_path]), patch('sys.stdout', new_callable=StringIO) as stdout:
+                try:
+                    main()
+                except SystemExit:
+                    pass
+            return stdout.getvalue().split('\t')[0]
+        
+        for enable_compressing, enable_shared_store in [(True, False), (False, False), (True, True)]:
+            self.config_file.enable_compressing = enable_compressing
+            self.config_file.enable_shared_store = enable_shared_store
+            config:dict = self.config_file.createTestConfig()
+            
+            with patch('sys.argv', [FILE_NAME, '--SILENT', '--CONFIG-FILE', self.config_file.config_path, '--export', self.temp_AssemblyExample_path]):
+                main()
+            self.assertEqual(verify(self.temp_AssemblyExample_path), VERIFY_IN_SYNC, f"ERR: Freshly exported file not in sync (compress={enable_compressing}, shared store={enable_shared_store}).")
+            
+            with patch('sys.argv', [FILE_NAME, '--SILENT', '--CONFIG-FILE', self.config_file.config_path, '--import', self.temp_AssemblyExample_path]):
+                main()
+            self.assertEqual(verify(self.temp_AssemblyExample_path), VERIFY_IN_SYNC, f"ERR: Freshly imported file not in sync (compress={enable_compressing}, shared store={enable_shared_store}).")
+            
+            FCStd_dir_path:str = get_FCStd_dir_path(self.temp_AssemblyExample_path, config)
+            with open(os.path.join(FCStd_dir_path, 'Document.xml'), 'a') as f:
+                f.write("\n")
+            self.assertEqual(verify(self.temp_AssemblyExample_path), VERIFY_STALE, "ERR: Modified directory not detected as stale.")
+        
+        # Same size, different content
+        with open(os.path.join(FCStd_dir_path, 'Document.xml'), 'rb') as f:
+            data:bytes = f.read()
+        with open(os.path.join(FCStd_dir_path, 'Document.xml'), 'wb') as f:
+            f.write(data[:-1] + b' ')
+        with patch('sys.argv', [FILE_NAME, '--SILENT', '--CONFIG-FILE', self.config_file.config_path, '--import', self.temp_AssemblyExample_path]):
+            main()
+        with open(os.path.join(FCStd_dir_path, 'Document.xml'), 'wb') as f:
+            f.write(data[:-1] + b'\t')
+        self.assertEqual(verify(self.temp_AssemblyExample_path), VERIFY_STALE, "ERR: Same size modification not detected as stale.")
+        
+        # Empty (checked out) FCStd file
+        open(self.temp_AssemblyExample_path, 'w').close()
+        self.assertEqual(verify(self.temp_AssemblyExample_path), VERIFY_STALE, "ERR: Empty .FCStd file not detected as stale.")
+        
+        # Missing uncompressed directory
+        self.assertEqual(verify(self.temp_BIMExample_path), VERIFY_MISSING, "ERR: Missing directory not detected.")
+        
+        # Batch: exit code is 1 if any file isn't in sync
+        with patch('sys.argv', [FILE_NAME, '--SILENT', '--CONFIG-FILE', self.config_file.config_path, '--verify', self.temp_AssemblyExample_path, self.temp_BIMExample_path]):
+            with self.assertRaises(SystemExit, msg="ERR: Expected non zero exit code."):
+                main()
+
+    def test_resolve_changes(self):
+        config:dict = self.config_file.createTestConfig()
+        
+        with patch('sys.argv', [FILE_NAME, '--SILENT', '--CONFIG-FILE', self.config_file.config_path, '--export', self.temp_AssemblyExample_path]):
+            main()
+        
+        AssemblyExample_dir:str = get_FCStd_dir_path(self.temp_AssemblyExample_path, config).replace(os.sep, '/')
+        BIMExample_dir:str = get_FCStd_dir_path(self.temp_BIMExample_path, config).replace(os.sep, '/')
+        deleted_dir:str = os.path.relpath(os.path.join(self.temp_dir, 'uncompressed', 'FCStd_Deleted_FCStd')).replace(os.sep, '/')
+        changed_paths:list = [
+            f"{AssemblyExample_dir}/Document.xml",
+            f"{AssemblyExample_dir}/.changefile",
+            self.temp_AssemblyExample_path, # Same directory as the changefile, reported once
+            self.temp_BIMExample_path,
+            f"{deleted_dir}/.changefile"
+        ]
+        
+        def resolve_changes() -> list:
+            stdin:StringIO = StringIO()
+            stdin.buffer = io.BytesIO(b''.join(os.fsencode(path) + b'\0' for path in changed_paths))
+            with patch('sys.argv', [FILE_NAME, '--CONFIG-FILE', self.config_file.config_path, '--resolve-changes']), patch('sys.stdin', stdin), patch('sys.stdout', new_callable=StringIO) as stdout:
+                main()
+            return [tuple(record.split('\t')) for record in stdout.getvalue().split('\0') if record]
+        
+        with patch('FreeCAD_Automation.FCStdFileTool.get_user_locked_paths', return_value={f"{AssemblyExample_dir}/.lockfile"}) as get_user_locked_paths:
+            records:list = resolve_changes()
+            self.assertEqual(get_user_locked_paths.call_count, 1, "ERR: Lock list should be retrieved exactly once.")
+        
+        self.assertEqual(records, [
+            (self.temp_AssemblyExample_path, AssemblyExample_dir, f"{AssemblyExample_dir}/.lockfile", LOCK_HELD),
+            (self.temp_BIMExample_path, BIMExample_dir, f"{BIMExample_dir}/.lockfile", LOCK_NOT_HELD),
+            ("", deleted_dir, f"{deleted_dir}/.lockfile", LOCK_NOT_HELD)
+        ], "ERR: Unexpected resolved changes.")
+        
+        # Locks not required => Lock list is never retrieved
+        self.config_file.enable_locking = False
+        self.config_file.createTestConfig()
+        with patch('FreeCAD_Automation.FCStdFileTool.get_user_locked_paths') as get_user_locked_paths:
+            records:list = resolve_changes()
+            get_user_locked_paths.assert_not_called()
+        
+        self.assertTrue(all(record[3] == LOCK_NOT_REQUIRED for record in records), f"ERR: Expected '{LOCK_NOT_REQUIRED}' verdicts, got '{records}'.")
+
+    def test_resolve_changes__sync_scope_scale(self):
+        NUM_SUBTREES:int = 50
+        FCSTD_FILES_PER_SUBTREE:int = 40
+        
+        self.config_file.enable_locking = False
+        config:dict = self.config_file.createTestConfig()
+        
+        # Thousands of changed uncompressed directories spread over many subtrees
+        changed_paths:list = []
+        for subtree_index in range(NUM_SUBTREES):
+            for FCStd_index in range(FCSTD_FILES_PER_SUBTREE):
+                FCStd_file_path:str = os.path.relpath(os.path.join(self.temp_dir, 'repo', f"subtree_{subtree_index}", f"part_{FCStd_index}.FCStd"))
+                FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config, check_exists=False)
+                os.makedirs(FCStd_dir_path)
+                create_lockfile_and_changefile(FCStd_dir_path, FCStd_file_path)
+                changed_paths.extend([f"{FCStd_dir_path}/Document.xml", f"{FCStd_dir_path}/.changefile"])
+        
+        def resolve_in_scope(include_directories:list) -> tuple:
+            sync_scope:tuple = ([os.path.relpath(os.path.join(self.temp_dir, 'repo', d)) for d in include_directories] or None, None)
+            with patch('FreeCAD_Automation.FCStdFileTool.get_FCStd_file_from_changefile', wraps=get_FCStd_file_from_changefile) as get_FCStd_file:
+                records:list = resolve_changed_paths(changed_paths, config, set(), sync_scope)
+            return records, get_FCStd_file.call_count
+        
+        # Unscoped => Whole repo
+        records, num_changefiles_read = resolve_in_scope([])
+        self.assertEqual(len(records), NUM_SUBTREES * FCSTD_FILES_PER_SUBTREE, "ERR: Unscoped resolve missed files.")
+        
+        # Work grows with the scope, not the repo
+        for num_subtrees_in_scope in [1, 2, 5]:
+            records, num_changefiles_read = resolve_in_scope([f"subtree_{i}" for i in range(num_subtrees_in_scope)])
+            self.assertEqual(len(records), num_subtrees_in_scope * FCSTD_FILES_PER_SUBTREE, f"ERR: Expected only files in {num_subtrees_in_scope} subtrees.")
+            self.assertEqual(num_changefiles_read, num_subtrees_in_scope * FCSTD_FILES_PER_SUBTREE, "ERR: Changefiles outside scope were read.")
+            self.assertTrue(all(FCStd_file_path.replace(os.sep, '/').split('/repo/')[1].split('/')[0] in [f"subtree_{i}" for i in range(num_subtrees_in_scope)] for FCStd_file_path, *_ in records), "ERR: File outside scope resolved.")
+        
+        # Prefix of a directory name is not inside the directory
+        self.assertFalse(path_in_directories("subtree_1/x.FCStd", ["subtree_"]), "ERR: Directory name prefix matched.")
+
+    def test_path_in_directories__sparse_checkout_cone(self):
+        cone:list = ["parts/motors", "assemblies"]
+        
+        # Files in the cone
+        self.assertTrue(path_in_directories("parts/motors/motor.FCStd", cone, cone_mode=True))
+        self.assertTrue(path_in_directories("parts/motors/uncompressed/FCStd_motor_FCStd/.changefile", cone, cone_mode=True))
+        self.assertTrue(path_in_directories("assemblies/arm.FCStd", cone, cone_mode=True))
+        
+        # Cone mode also checks out files in the root and in parents of cone directories
+        self.assertTrue(path_in_directories("root.FCStd", cone, cone_mode=True))
+        self.assertTrue(path_in_directories("parts/bracket.FCStd", cone, cone_mode=True))
+        
+        # Outside the cone
+        self.assertFalse(path_in_directories("parts/sensors/sensor.FCStd", cone, cone_mode=True))
+        self.assertFalse(path_in_directories("parts/motorsport/car.FCStd", cone, cone_mode=True))
+        self.assertFalse(path_in_directories("parts/bracket.FCStd", cone), "ERR: Parent directory files should only match in cone mode.")
+        
+        # No scope
+        self.assertTrue(path_in_sync_scope("anything/at/all.FCStd", (None, None)))
+        self.assertFalse(path_in_sync_scope("parts/sensors/sensor.FCStd", (["parts"], cone)), "ERR: Both include directories and cone must match.")
+
+    def test_pull_missing_LFS_objects(self):
+        config:dict = self.config_file.createTestConfig()
+        
+        FCStd_dir_paths:list = []
+        for FCStd_file_path in [self.temp_AssemblyExample_path, self.temp_BIMExample_path]:
+            with patch('sys.argv', [FILE_NAME, '--SILENT', '--CONFIG-FILE', self.config_file.config_path, '--export', FCStd_file_path]):
+                main()
+            FCStd_dir_paths.append(get_FCStd_dir_path(FCStd_file_path, config))
+        
+        # Nothing missing => No git call
+        with patch('FreeCAD_Automation.FCStdFileTool.run_git_command') as run_git_command:
+            self.assertEqual(pull_missing_LFS_objects(FCStd_dir_paths, config), [])
+            run_git_command.assert_not_called()
+        
+        # Replace shards with LFS pointers (what a GIT_LFS_SKIP_SMUDGE=1 checkout leaves behind)
+        shard_contents:dict = {}
+        for FCStd_dir_path in FCStd_dir_paths:
+            for shard_path in get_LFS_paths_for_import(FCStd_dir_path, config):
+                with open(shard_path, 'rb') as f:
+                    shard_contents[os.path.relpath(shard_path).replace(os.sep, '/')] = f.read()
+                with open(shard_path, 'w') as f:
+                    f.write(f"{LFS_POINTER_PREFIX.decode()}\noid sha256:{'0' * 64}\nsize 1234\n")
+                self.assertTrue(is_LFS_pointer_file(shard_path), f"ERR: '{shard_path}' not detected as LFS pointer.")
+        
+        def fake_lfs_pull(*args:str) -> str:
+            self.assertEqual(args[:2], ('lfs', 'pull'), f"ERR: Unexpected git command '{args}'.")
+            for LFS_path in args[2].removeprefix('--include=').split(','):
+                with open(LFS_path, 'wb') as f:
+                    f.write(shard_contents[LFS_path])
+            return ""
+        
+        # Import of one file only pulls that file's shards
+        with patch('FreeCAD_Automation.FCStdFileTool.run_git_command', side_effect=fake_lfs_pull) as run_git_command:
+            with patch('sys.argv', [FILE_NAME, '--SILENT', '--CONFIG-FILE', self.config_file.config_path, '--import', self.temp_AssemblyExample_path]):
+                main()
+            self.assertEqual(run_git_command.call_count, 1, "ERR: Expected a single git lfs pull call.")
+        
+        for shard_path in get_LFS_paths_for_import(FCStd_dir_paths[0], config):
+            self.assertFalse(is_LFS_pointer_file(shard_path), f"ERR: '{shard_path}' was not pulled.")
+        for shard_path in get_LFS_paths_for_import(FCStd_dir_paths[1], config):
+            self.assertTrue(is_LFS_pointer_file(shard_path), f"ERR: '{shard_path}' was pulled but isn't being imported.")
+        
+        # Many files => Still a single git lfs pull call
+        for shard_path in get_LFS_paths_for_import(FCStd_dir_paths[0], config):
+            with open(shard_path, 'w') as f:
+                f.write(f"{LFS_POINTER_PREFIX.decode()}\noid sha256:{'0' * 64}\nsize 1234\n")
+        with patch('FreeCAD_Automation.FCStdFileTool.run_git_command', side_effect=fake_lfs_pull) as run_git_command:
+            pulled:list = pull_missing_LFS_objects(FCStd_dir_paths, config)
+            self.assertEqual(run_git_command.call_count, 1, "ERR: Expected a single git lfs pull call.")
+        self.assertEqual(sorted(pulled), sorted(shard_contents), "ERR: Not all missing shards were pulled.")
+
+    def test_lock_unlock(self):
+        config:dict = self.config_file.createTestConfig()
+        
+        AssemblyExample_lockfile:str = f"{get_FCStd_dir_path(self.temp_AssemblyExample_path, config).replace(os.sep, '/')}/.lockfile"
+        BIMExample_lockfile:str = f"{get_FCStd_dir_path(self.temp_BIMExample_path, config).replace(os.sep, '/')}/.lockfile"
+        missing_FCStd_file:str = os.path.relpath(os.path.join(self.temp_dir, 'Missing.FCStd'))
+        FCStd_file_paths:list = [self.temp_AssemblyExample_path, self.temp_BIMExample_path, missing_FCStd_file]
+        
+        lock_owners:dict = {BIMExample_lockfile: "someone_else"}
+        unpushed_paths:list = [f"{os.path.dirname(AssemblyExample_lockfile)}/Document.xml"]
+        
+        def fake_git(*args:str, cwd:str=None) -> str:
+            if args == ('config', '--get', 'user.name'): return "test_user\n"
+            if args == ('lfs', 'locks', '--json'): return json.dumps([{"path": path, "owner": {"name": owner}} for path, owner in lock_owners.items()])
+            if args[:2] == ('lfs', 'lock'):
+                if args[2] in lock_owners: raise RuntimeError("Lock exists")
+                lock_owners[args[2]] = "test_user"
+                return ""
+            if args[:2] == ('lfs', 'unlock'):
+                lock_owners.pop(args[-1])
+                return ""
+            if args[0] == 'diff-tree': return "\0".join(unpushed_paths) + "\0"
+            if args[:2] == ('stash', 'list'): return ""
+            self.fail(f"ERR: Unexpected git command '{args}'.")
+        
+        def run_mode(*mode_args:str) -> bool:
+            stdin:StringIO = StringIO()
+            stdin.buffer = io.BytesIO(b''.join(os.fsencode(path) + b'\0' for path in FCStd_file_paths))
+            with patch('sys.argv', [FILE_NAME, '--SILENT', '--CONFIG-FILE', self.config_file.config_path, *mode_args]), patch('sys.stdin', stdin), patch('sys.stderr', new_callable=StringIO):
+                try:
+                    main()
+                except SystemExit as e:
+                    return e.code == 0
+            return True
+        
+        for FCStd_file_path in FCStd_file_paths[:2]:
+            os.chmod(FCStd_file_path, READONLY)
+        
+        # Lock held by another user isn't stolen without --force, missing file fails, lock table is read once
+        with patch('FreeCAD_Automation.FCStdFileTool.run_git_command', side_effect=fake_git) as run_git_command:
+            self.assertFalse(run_mode('--lock'), "ERR: Lock should report failed files.")
+            self.assertEqual([call.args for call in run_git_command.call_args_list].count(('lfs', 'locks', '--json')), 1, "ERR: Lock table should be read exactly once.")
+        
+        self.assertEqual(lock_owners, {AssemblyExample_lockfile: "test_user", BIMExample_lockfile: "someone_else"}, "ERR: Unexpected locks after locking.")
+        self.assertTrue(os.stat(self.temp_AssemblyExample_path).st_mode & 0o200, "ERR: Locked .FCStd file should be writable.")
+        self.assertFalse(os.stat(self.temp_BIMExample_path).st_mode & 0o200, "ERR: .FCStd file locked by someone else should stay readonly.")
+        
+        # --force steals the lock, already held lock isn't requested again
+        FCStd_file_paths.remove(missing_FCStd_file)
+        with patch('FreeCAD_Automation.FCStdFileTool.run_git_command', side_effect=fake_git) as run_git_command:
+            self.assertTrue(run_mode('--lock', '--force', '--jobs', '2'), "ERR: Forced lock should succeed.")
+            lock_requests:list = [call.args for call in run_git_command.call_args_list if call.args[:2] == ('lfs', 'lock')]
+        
+        self.assertEqual(lock_requests, [('lfs', 'lock', BIMExample_lockfile)], "ERR: Only the stolen lock should be requested.")
+        self.assertEqual(lock_owners, {AssemblyExample_lockfile: "test_user", BIMExample_lockfile: "test_user"}, "ERR: Unexpected locks after force locking.")
+        self.assertTrue(os.stat(self.temp_BIMExample_path).st_mode & 0o200, "ERR: Stolen .FCStd file should be writable.")
+        
+        # Unlock keeps files with unpushed changes locked
+        with patch('FreeCAD_Automation.FCStdFileTool.run_git_command', side_effect=fake_git):
+            self.assertFalse(run_mode('--unlock', '--reference', 'origin/main'), "ERR: Unlock should report files with unpushed changes.")
+        
+        self.assertEqual(lock_owners, {AssemblyExample_lockfile: "test_user"}, "ERR: Unexpected locks after unlocking.")
+        self.assertTrue(os.stat(self.temp_AssemblyExample_path).st_mode & 0o200, "ERR: .FCStd file with unpushed changes should stay writable.")
+        self.assertFalse(os.stat(self.temp_BIMExample_path).st_mode & 0o200, "ERR: Unlocked .FCStd file should be readonly.")
+        
+        # Unlock without --force requires a reference
+        with patch('sys.argv', [FILE_NAME, '--SILENT', '--CONFIG-FILE', self.config_file.config_path, '--unlock']):
+            self.assertTrue(bad_args(parseArgs()), "ERR: '--unlock' without '--reference' or '--force' should be invalid.")
+        
+        for FCStd_file_path in FCStd_file_paths:
+            os.chmod(FCStd_file_path, WRITABLE)
+
+    def test_advise_compression(self):
+        config:dict = self.config_file.createTestConfig()
+        
+        advice:dict = advise_compression([self.temp_AssemblyExample_path, self.temp_BIMExample_path], config, sample_bytes=1024 ** 2)
+        
+        self.assertIn(advice['recommended'], advice['estimates'], "ERR: Recommended candidate wasn't benchmarked.")
+        self.assertIn(("deflate", 9), advice['estimates'], "ERR: Configured candidate wasn't benchmarked.")
+        self.assertGreater(advice['total_bytes'], 0, "ERR: No binaries found to benchmark.")
+        self.assertLessEqual(advice['max_compressed_file_size_gigabyte'], config['compress_binaries']['max_compressed_file_size_gigabyte'], "ERR: Recommended zip size exceeds configured limit.")
+        
+        with patch('sys.argv', [FILE_NAME, '--CONFIG-FILE', self.config_file.config_path, '--advise-compression', self.temp_AssemblyExample_path]), patch('sys.stdout', new_callable=StringIO) as stdout:
+            main()
+        self.assertIn('"compression-method": ', stdout.getvalue(), "ERR: Recommended config snippet not printed.")
+        
+        # Recommended method must be usable by export/import
+        self.config_file.compression_method = "lzma"
+        config:dict = self.config_file.createTestConfig()
+        with patch('sys.argv', [FILE_NAME, '--SILENT', '--CONFIG-FILE', self.config_file.config_path, '--export', self.temp_AssemblyExample_path]):
+            main()
+        
+        FCStd_dir_path:str = get_FCStd_dir_path(self.temp_AssemblyExample_path, config)
+        zip_paths:list = [os.path.join(FCStd_dir_path, name) for name in os.listdir(FCStd_dir_path) if name.endswith('.zip')]
+        self.assertTrue(zip_paths, "ERR: No compressed binaries created.")
+        for zip_path in zip_paths:
+            with zipfile.ZipFile(zip_path, 'r') as zf:
+                self.assertTrue(all(info.compress_type == zipfile.ZIP_LZMA for info in zf.infolist()), f"ERR: '{zip_path}' not compressed with lzma.")
+        
+        with patch('sys.argv', [FILE_NAME, '--SILENT', '--CONFIG-FILE', self.config_file.config_path, '--verify', self.temp_AssemblyExample_path]):
+            main() # Exits with 1 if export isn't in sync
+
+    def test_stage(self):
+        config:dict = self.config_file.createTestConfig()
+        config_path:str = os.path.abspath(self.config_file.config_path)
+        work_path:str = os.path.abspath(os.path.join(self.temp_dir, 'work'))
+        
+        def git(*args:str, input:bytes=None) -> str:
+            return subprocess.run(['git', *args], cwd=work_path, input=input, check=True, capture_output=True).stdout.decode()
+        
+        os.makedirs(work_path)
+        git('init', '-q')
+        shutil.copy(self.temp_AssemblyExample_path, work_path)
+        
+        original_cwd:str = os.getcwd()
+        try:
+            os.chdir(work_path)
+            FCStd_file_path:str = 'AssemblyExample.FCStd'
+            FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config).replace(os.sep, '/')
+            
+            # Expected result: regular export to the working tree
+            export_FCStd_file(FCStd_file_path, FCStd_dir_path, config, config['include_thumbnails'])
+            expected:dict = {}
+            for root, _, files in os.walk(FCStd_dir_path):
+                for file in files:
+                    with open(os.path.join(root, file), 'rb') as f:
+                        expected[os.path.relpath(os.path.join(root, file)).replace(os.sep, '/')] = f.read()
+            shutil.rmtree(FCStd_dir_path)
+            
+            # Previously staged file that export no longer creates
+            os.makedirs(FCStd_dir_path)
+            with open(f"{FCStd_dir_path}/stale.txt", 'w') as f:
+                f.write("stale")
+            git('add', f"{FCStd_dir_path}/stale.txt")
+            
+            def stage(*flags:str):
+                stdin:StringIO = StringIO()
+                stdin.buffer = io.BytesIO(os.fsencode(FCStd_file_path) + b'\0')
+                with patch('sys.argv', [FILE_NAME, '--SILENT', '--CONFIG-FILE', config_path, '--stage', *flags]), patch('sys.stdin', stdin):
+                    main()
+            
+            stage()
+            
+            staged_paths:list = [path for path in git('ls-files', '-z').split('\0') if path]
+            self.assertEqual(sorted(staged_paths), sorted(list(expected) + [FCStd_file_path]), "ERR: Staged files differ from exported files.")
+            self.assertEqual(git('cat-file', 'blob', f":{FCStd_file_path}"), "", "ERR: .FCStd file should be staged empty.")
+            
+            for path, data in expected.items():
+                if path.endswith('.zip') or path.endswith('/.changefile'): continue # Zip timestamps and export time differ
+                self.assertEqual(git('cat-file', 'blob', f":{path}").encode(), data, f"ERR: Staged '{path}' differs from exported file.")
+            
+            # Working tree isn't materialized, apart from `.changefile`/`.lockfile`
+            self.assertEqual(sorted(os.listdir(FCStd_dir_path)), ['.changefile', '.lockfile', 'stale.txt'], "ERR: Working tree should not be materialized.")
+            with open(f"{FCStd_dir_path}/.changefile", 'r') as f:
+                self.assertEqual(f.read(), git('cat-file', 'blob', f":{FCStd_dir_path}/.changefile"), "ERR: Working tree `.changefile` differs from staged one.")
+            
+            # --checkout materializes the working tree from the index
+            stage('--checkout')
+            self.assertFalse(os.path.exists(f"{FCStd_dir_path}/stale.txt"), "ERR: File removed from index should be removed from working tree.")
+            self.assertEqual(git('diff', '--name-only', '--', FCStd_dir_path), "", "ERR: Working tree should match the index.")
+            self.assertEqual(get_FCStd_sync_status(FCStd_file_path, config)[0], VERIFY_IN_SYNC, "ERR: Staged directory doesn't match .FCStd file.")
+        finally:
+            os.chdir(original_cwd)
+
+    def test_import_cache(self):
+        self.config_file.enable_import_cache = True
+        config:dict = self.config_file.createTestConfig()
+        work_path:str = os.path.abspath(os.path.join(self.temp_dir, 'work'))
+        
+        def git(*args:str) -> str:
+            return subprocess.run(['git', *args], cwd=work_path, check=True, capture_output=True).stdout.decode()
+        
+        os.makedirs(work_path)
+        git('init', '-q')
+        git('config', 'user.name', 'test')
+        git('config', 'user.email', 'test@localhost')
+        shutil.copy(self.temp_AssemblyExample_path, work_path)
+        
+        original_cwd:str = os.getcwd()
+        try:
+            os.chdir(work_path)
+            FCStd_file_path:str = 'AssemblyExample.FCStd'
+            FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config)
+            
+            # Directory not committed yet => Not cached
+            export_FCStd_file(FCStd_file_path, FCStd_dir_path, config, config['include_thumbnails'])
+            self.assertIsNone(get_import_cache_key(FCStd_dir_path, config, True), "ERR: Untracked directory should not be cacheable.")
+            
+            git('add', '-A')
+            git('commit', '-q', '-m', 'export')
+            
+            # Miss => Built and added to cache
+            import_FCStd_file(FCStd_dir_path, FCStd_file_path, config, True)
+            with open(FCStd_file_path, 'rb') as f:
+                built:bytes = f.read()
+            stats:dict = get_import_cache_stats(config)
+            self.assertEqual((stats['entries'], stats['hits'], stats['misses']), (1, 0, 1), "ERR: First import should be a cache miss.")
+            
+            # Hit => Restored with the same permissions
+            os.chmod(FCStd_file_path, READONLY)
+            with patch('FreeCAD_Automation.FCStdFileTool.create_FCStd_file') as mock_create, patch('FreeCAD_Automation.FCStdFileTool.create_FCStd_file_from_manifest') as mock_create_from_manifest:
+                import_FCStd_file(FCStd_dir_path, FCStd_file_path, config, True)
+                mock_create.assert_not_called()
+                mock_create_from_manifest.assert_not_called()
+            with open(FCStd_file_path, 'rb') as f:
+                self.assertEqual(f.read(), built, "ERR: Restored .FCStd file differs from built one.")
+            self.assertFalse(os.stat(FCStd_file_path).st_mode & 0o200, "ERR: Restored .FCStd file should stay readonly.")
+            self.assertEqual(get_import_cache_stats(config)['hits'], 1, "ERR: Second import should be a cache hit.")
+            
+            # Other config => Other key
+            self.assertNotEqual(get_import_cache_key(FCStd_dir_path, config, True), get_import_cache_key(FCStd_dir_path, config, False), "ERR: Thumbnail setting should change cache key.")
+            
+            # Batch lookup => Same key, directories not in HEAD omitted
+            tree_ids:dict = get_import_cache_tree_ids([FCStd_dir_path, 'NotCommitted_FCStd'], config)
+            self.assertEqual(list(tree_ids), [os.path.normpath(FCStd_dir_path)], "ERR: Only the committed directory should have a tree id.")
+            self.assertEqual(get_import_cache_key(FCStd_dir_path, config, True, tree_ids), get_import_cache_key(FCStd_dir_path, config, True), "ERR: Batch lookup should give the same key.")
+            
+            # Modified directory => Not cached
+            with open(os.path.join(FCStd_dir_path, 'Document.xml'), 'a') as f:
+                f.write("\n")
+            self.assertIsNone(get_import_cache_key(FCStd_dir_path, config, True), "ERR: Modified directory should not be cacheable.")
+            self.assertEqual(get_import_cache_tree_ids([FCStd_dir_path], config), {}, "ERR: Modified directory should be omitted from batch lookup.")
+            git('checkout', '--', FCStd_dir_path)
+            
+            # Over max size => Least recently used evicted
+            config['import_cache']['max_size_megabyte'] = (len(built) + 1) / (1024 ** 2)
+            os.chmod(FCStd_file_path, WRITABLE)
+            import_FCStd_file(FCStd_dir_path, FCStd_file_path, config, False)
+            stats:dict = get_import_cache_stats(config)
+            self.assertEqual((stats['entries'], stats['evictions']), (1, 1), "ERR: Least recently used entry should be evicted.")
+            
+            # Disabled => No key
+            config['import_cache']['enabled'] = False
+            self.assertIsNone(get_import_cache_key(FCStd_dir_path, config, True), "ERR: Disabled cache should not be used.")
+        finally:
+            os.chdir(original_cwd)
+
+    def test_reuse_compressed_binaries(self):
+        config:dict = self.config_file.createTestConfig()
+        FCStd_file_path:str = self.temp_AssemblyExample_path
+        FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config)
+        
+        def export() -> int:
+            with patch('FreeCAD_Automation.FCStdFileTool.write_raw_zip_member', wraps=write_raw_zip_member) as mock_reuse:
+                export_FCStd_file(FCStd_file_path, FCStd_dir_path, config, config['include_thumbnails'])
+                return mock_reuse.call_count
+        
+        def compressed_members(sizes:bool=False) -> dict:
+            members:dict = {}
+            for zip_name in os.listdir(FCStd_dir_path):
+                if zip_name.endswith('.zip'):
+                    with zipfile.ZipFile(os.path.join(FCStd_dir_path, zip_name), 'r') as zf:
+                        self.assertEqual(zf.comment, get_zip_settings_comment(config), "ERR: Zip should record its compression settings.")
+                        members.update({info.filename: info.compress_size if sizes else zf.read(info) for info in zf.infolist()})
+            return members
+        
+        self.assertEqual(export(), 0, "ERR: Nothing to reuse on first export.")
+        first:dict = compressed_members()
+        
+        # Unchanged => Every compressed file reused
+        self.assertEqual(export(), len(first), "ERR: Unchanged files should be reused.")
+        self.assertEqual(compressed_members(), first, "ERR: Reused files differ.")
+        self.assertFalse([f for f in os.listdir(os.path.dirname(FCStd_dir_path)) if f.startswith('.GitCAD-')], "ERR: Previous export should be removed.")
+        
+        # One binary changed => Only it is compressed again
+        with zipfile.ZipFile(FCStd_file_path, 'r') as zf:
+            FCStd_members:list = [(info, zf.read(info)) for info in zf.infolist()]
+        with zipfile.ZipFile(FCStd_file_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for info, data in FCStd_members:
+                zf.writestr(info, data + b' ' if info.filename == 'Shape0.brp' else data)
+        
+        self.assertEqual(export(), len(first) - 1, "ERR: Only the changed file should be compressed again.")
+        self.assertEqual(get_FCStd_sync_status(FCStd_file_path, config)[0], VERIFY_IN_SYNC, "ERR: Exported directory doesn't match .FCStd file.")
+        
+        # zipfile internals missing (IE other python version) => Copied through zipfile's public API instead
+        second:dict = compressed_members()
+        second_sizes:dict = compressed_members(sizes=True)
+        with patch('FreeCAD_Automation.FCStdFileTool.ZIPFILE_RAW_WRITE_ATTRIBUTES', ('_missing_internal',)):
+            self.assertEqual(export(), len(second), "ERR: Unchanged files should be reused.")
+        self.assertEqual(compressed_members(), second, "ERR: Files copied without raw writes differ.")
+        self.assertEqual(compressed_members(sizes=True), second_sizes, "ERR: Files copied without raw writes should keep the configured compression level.")
+        
+        # Compressed again by the fallback => Same size as compressed directly at the target zip's level (not zlib's default)
+        data:bytes = b''.join(f"{i} {i * i} {i % 7}\n".encode() for i in range(100000))
+        source_zip_path:str = os.path.join(self.temp_dir, 'source.zip')
+        with zipfile.ZipFile(source_zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+            zf.writestr('member', data)
+            source_info:zipfile.ZipInfo = zf.getinfo('member')
+        target:io.BytesIO = io.BytesIO()
+        with patch('FreeCAD_Automation.FCStdFileTool.ZIPFILE_RAW_WRITE_ATTRIBUTES', ('_missing_internal',)), \
+             zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+            write_raw_zip_member(zf, 'fallback', source_zip_path, source_info)
+            zf.writestr('direct', data)
+        with zipfile.ZipFile(target, 'r') as zf:
+            self.assertEqual(zf.getinfo('fallback').compress_size, zf.getinfo('direct').compress_size, "ERR: Fallback should compress at the target zip's level.")
+        
+        # Other compression settings => Nothing reused
+        config['compress_binaries']['compression_level'] = 1
+        self.assertEqual(export(), 0, "ERR: Files compressed with other settings should not be reused.")
+
+    def test_atomic_outputs_and_process_lock(self):
+        config:dict = self.config_file.createTestConfig()
+        FCStd_file_path:str = self.temp_AssemblyExample_path
+        FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config)
+        parent_dir_path:str = os.path.dirname(os.path.abspath(FCStd_dir_path))
+        
+        def read_tree(path:str) -> dict:
+            contents:dict = {}
+            for root, _, files in os.walk(path):
+                for file in files:
+                    with open(os.path.join(root, file), 'rb') as f:
+                        contents[os.path.relpath(os.path.join(root, file), path)] = f.read()
+            return contents
+        
+        export_FCStd_file(FCStd_file_path, FCStd_dir_path, config, config['include_thumbnails'])
+        exported:dict = read_tree(FCStd_dir_path)
+        with open(FCStd_file_path, 'rb') as f:
+            FCStd_file_data:bytes = f.read()
+        
+        # Interrupted export => Previous export intact, nothing left behind
+        with patch('FreeCAD_Automation.FCStdFileTool.write_zip_to_disk', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                export_FCStd_file(FCStd_file_path, FCStd_dir_path, config, config['include_thumbnails'])
+        self.assertEqual(read_tree(FCStd_dir_path), exported, "ERR: Interrupted export should leave the previous export intact.")
+        self.assertFalse([f for f in os.listdir(parent_dir_path) if f.startswith('.GitCAD-')], "ERR: Interrupted export left temporary files.")
+        
+        # Interrupted import => .FCStd file and directory intact
+        os.chmod(FCStd_file_path, READONLY)
+        with patch('FreeCAD_Automation.FCStdFileTool.replace_FCStd_file', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                import_FCStd_file(FCStd_dir_path, FCStd_file_path, config, True)
+        with open(FCStd_file_path, 'rb') as f:
+            self.assertEqual(f.read(), FCStd_file_data, "ERR: Interrupted import should leave the .FCStd file intact.")
+        self.assertEqual(read_tree(FCStd_dir_path), exported, "ERR: Import should never modify the uncompressed directory.")
+        self.assertFalse([f for f in os.listdir(parent_dir_path) if f.startswith('.GitCAD-')], "ERR: Interrupted import left temporary files.")
+        self.assertFalse([f for f in os.listdir(os.path.dirname(os.path.abspath(FCStd_file_path))) if f.startswith('.GitCAD-')], "ERR: Interrupted import left temporary files.")
+        
+        import_FCStd_file(FCStd_dir_path, FCStd_file_path, config, True)
+        self.assertFalse(os.stat(FCStd_file_path).st_mode & 0o200, "ERR: Imported .FCStd file should stay readonly.")
+        self.assertEqual(read_tree(FCStd_dir_path), exported, "ERR: Import should never modify the uncompressed directory.")
+        self.assertEqual(get_FCStd_sync_status(FCStd_file_path, config)[0], VERIFY_IN_SYNC, "ERR: Imported .FCStd file doesn't match directory.")
+        os.chmod(FCStd_file_path, WRITABLE)
+        
+        # Crashed between the export's two renames => Next import/export moves the new export in place, removes this file's leftovers only
+        staging_dir_path:str = os.path.join(parent_dir_path, f"{get_temp_name_prefix(FCStd_dir_path, 'export-')}abc123")
+        shutil.copytree(FCStd_dir_path, staging_dir_path)
+        os.replace(FCStd_dir_path, f"{staging_dir_path}{PREVIOUS_EXPORT_SUFFIX}")
+        temp_FCStd_file_path:str = os.path.join(os.path.dirname(os.path.abspath(FCStd_file_path)), f"{get_temp_name_prefix(FCStd_file_path)}xyz789.FCStd")
+        open(temp_FCStd_file_path, 'wb').close()
+        other_staging_dir_path:str = os.path.join(parent_dir_path, f"{get_temp_name_prefix(FCStd_dir_path + '-other', 'export-')}abc123")
+        os.makedirs(other_staging_dir_path)
+        
+        import_FCStd_file(FCStd_dir_path, FCStd_file_path, config, True)
+        self.assertEqual(read_tree(FCStd_dir_path), exported, "ERR: Export interrupted between its renames wasn't recovered.")
+        self.assertFalse(os.path.exists(staging_dir_path) or os.path.exists(f"{staging_dir_path}{PREVIOUS_EXPORT_SUFFIX}") or os.path.exists(temp_FCStd_file_path), "ERR: Leftovers of the interrupted export weren't removed.")
+        self.assertTrue(os.path.isdir(other_staging_dir_path), "ERR: Leftovers of other files should be left alone.")
+        os.rmdir(other_staging_dir_path)
+        
+        # Busy => Fail fast, or wait until timeout
+        with FCStdFileLock(FCStd_file_path, config):
+            config['concurrent_access']['wait_if_busy'] = False
+            with self.assertRaises(TimeoutError):
+                export_FCStd_file(FCStd_file_path, FCStd_dir_path, config, config['include_thumbnails'])
+            
+            config['concurrent_access']['wait_if_busy'] = True
+            config['concurrent_access']['timeout_seconds'] = 0.3
+            start:float = time.monotonic()
+            with self.assertRaises(TimeoutError):
+                import_FCStd_file(FCStd_dir_path, FCStd_file_path, config, True)
+            self.assertGreaterEqual(time.monotonic() - start, 0.3, "ERR: Should wait for the lock before giving up.")
+        
+        # Released => Waiting run proceeds
+        config['concurrent_access']['timeout_seconds'] = 5
+        lock:FCStdFileLock = FCStdFileLock(FCStd_file_path, config).__enter__()
+        threading.Timer(0.3, lock.__exit__, (None, None, None)).start()
+        export_FCStd_file(FCStd_file_path, FCStd_dir_path, config, config['include_thumbnails'])
+        self.assertEqual(get_FCStd_sync_status(FCStd_file_path, config)[0], VERIFY_IN_SYNC, "ERR: Export after waiting for the lock failed.")
+
+    def test_streaming_export(self):
+        config:dict = self.config_file.createTestConfig()
+        FCStd_file_path:str = self.temp_AssemblyExample_path
+        FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config)
+        
+        # Binaries go straight from the .FCStd file into the zips => Nothing extracted to disk and compressed back
+        with patch('FreeCAD_Automation.FCStdFileTool.EXPORT_PIPELINE_QUEUE_SIZE', 1), \
+             patch('FreeCAD_Automation.FCStdFileTool.PU.extractDocument') as mock_extract, \
+             patch('FreeCAD_Automation.FCStdFileTool.compress_binaries') as mock_compress:
+            export_FCStd_file(FCStd_file_path, FCStd_dir_path, config, config['include_thumbnails'])
+        mock_extract.assert_not_called()
+        mock_compress.assert_not_called()
+        
+        exported:dict = {}
+        for root, _, files in os.walk(FCStd_dir_path):
+            for file in files:
+                with open(os.path.join(root, file), 'rb') as f:
+                    exported[os.path.relpath(os.path.join(root, file), FCStd_dir_path).replace(os.sep, '/')] = f.read()
+        
+        # Same files as the in memory export, zips included (both are filled in .FCStd archive order)
+        expected, _ = get_exported_FCStd_tree(FCStd_file_path, FCStd_dir_path, config, config['include_thumbnails'])
+        self.assertEqual(sorted(exported), sorted(expected), "ERR: Streaming export wrote different files.")
+        for path in expected:
+            if path == '.changefile': continue
+            self.assertEqual(exported[path], expected[path], f"ERR: Streaming export of '{path}' differs.")
+        self.assertTrue(os.path.isdir(os.path.join(FCStd_dir_path, 'thumbnails')), "ERR: Directories of compressed files should be kept.")
+        self.assertEqual(get_FCStd_sync_status(FCStd_file_path, config)[0], VERIFY_IN_SYNC, "ERR: Exported directory doesn't match .FCStd file.")
+        
+        # Failing writer stage => Error raised (no deadlock on the bounded queues), previous export intact
+        with patch('FreeCAD_Automation.FCStdFileTool.EXPORT_PIPELINE_QUEUE_SIZE', 1), \
+             patch('builtins.open', side_effect=OSError("disk full")) as mock_open:
+            with self.assertRaises(OSError):
+                stream_FCStd_file_to_dir(FCStd_file_path, tempfile.mkdtemp(dir=self.temp_dir), config, True)
+        self.assertGreater(mock_open.call_count, 0, "ERR: Writer stage should have run.")
+
+    def test_export_manifest(self):
+        self.config_file.compression_level = FCSTD_COMPRESSION_LEVEL
+        config:dict = self.config_file.createTestConfig()
+        FCStd_file_path:str = self.temp_AssemblyExample_path
+        FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config)
+        
+        with zipfile.ZipFile(FCStd_file_path, 'r') as zf:
+            original:list = [(info.filename, zf.read(info)) for info in zf.infolist() if not info.is_dir()]
+        
+        export_FCStd_file(FCStd_file_path, FCStd_dir_path, config, config['include_thumbnails'])
+        
+        entries:list = load_export_manifest(FCStd_dir_path)
+        self.assertIsNotNone(entries, "ERR: Export should write a usable manifest.")
+        self.assertEqual([entry['name'] for entry in entries], [name for name, _ in original], "ERR: Manifest should list entries in archive order.")
+        for entry, (name, data) in zip(entries, original):
+            self.assertEqual((entry['size'], entry['crc32'], entry['sha256']), (len(data), zlib.crc32(data), hashlib.sha256(data).hexdigest()), f"ERR: Manifest entry of '{name}' is wrong.")
+            
+            location_path:str = os.path.join(FCStd_dir_path, entry['location'])
+            if entry['member'] is None:
+                with open(location_path, 'rb') as f:
+                    self.assertEqual(f.read(), data, f"ERR: '{name}' isn't stored at '{entry['location']}'.")
+            else:
+                with zipfile.ZipFile(location_path, 'r') as zf:
+                    self.assertEqual(zf.read(entry['member']), data, f"ERR: '{name}' isn't stored in '{entry['location']}' as '{entry['member']}'.")
+        
+        # In memory export (IE --stage) writes the same manifest
+        files, _ = get_exported_FCStd_tree(FCStd_file_path, FCStd_dir_path, config, config['include_thumbnails'])
+        with open(os.path.join(FCStd_dir_path, EXPORT_MANIFEST_NAME), 'rb') as f:
+            self.assertEqual(files[EXPORT_MANIFEST_NAME], f.read(), "ERR: In memory export should write the same manifest.")
+        
+        # Import streams entries in archive order, shard members are copied without recompressing
+        with patch('FreeCAD_Automation.FCStdFileTool.ImportingContext') as mock_context:
+            import_FCStd_file(FCStd_dir_path, FCStd_file_path, config, True)
+            mock_context.assert_not_called()
+        
+        with zipfile.ZipFile(FCStd_file_path, 'r') as zf:
+            self.assertEqual([(info.filename, zf.read(info)) for info in zf.infolist()], original, "ERR: Imported .FCStd file differs from original.")
+        self.assertEqual(get_FCStd_sync_status(FCStd_file_path, config)[0], VERIFY_IN_SYNC, "ERR: Verify with manifest failed.")
+        
+        # Directory doesn't match the manifest (IE merged shards or files next to it) => Ignored
+        extra_file_path:str = os.path.join(FCStd_dir_path, 'Extra.xml')
+        with open(extra_file_path, 'w') as f:
+            f.write('<Extra/>')
+        self.assertIsNone(load_export_manifest(FCStd_dir_path), "ERR: Manifest not listing every file should be ignored.")
+        os.remove(extra_file_path)
+        
+        shard_entry:dict = next(entry for entry in entries if entry['member'] is not None)
+        shard_path:str = os.path.join(FCStd_dir_path, shard_entry['location'])
+        with open(shard_path, 'rb') as f:
+            shard_data:bytes = f.read()
+        with zipfile.ZipFile(io.BytesIO(shard_data), 'r') as src, zipfile.ZipFile(shard_path, 'w') as dst:
+            for info in src.infolist():
+                if info.filename != shard_entry['member']: dst.writestr(info, src.read(info))
+        self.assertIsNone(load_export_manifest(FCStd_dir_path), "ERR: Manifest listing a missing shard member should be ignored.")
+        with open(shard_path, 'wb') as f:
+            f.write(shard_data)
+        self.assertIsNotNone(load_export_manifest(FCStd_dir_path), "ERR: Restored directory should match the manifest again.")
+        
+        # Merged manifest (digest mismatch) => Ignored, directory is walked instead
+        with open(os.path.join(FCStd_dir_path, EXPORT_MANIFEST_NAME), 'r') as f:
+            manifest:str = f.read()
+        with open(os.path.join(FCStd_dir_path, EXPORT_MANIFEST_NAME), 'w') as f:
+            f.write(manifest.replace('"size": ', '"size": 1', 1))
+        self.assertIsNone(load_export_manifest(FCStd_dir_path), "ERR: Manifest with wrong digest should be ignored.")
+        
+        os.remove(FCStd_file_path)
+        import_FCStd_file(FCStd_dir_path, FCStd_file_path, config, True)
+        self.assertEqual(get_FCStd_sync_status(FCStd_file_path, config)[0], VERIFY_IN_SYNC, "ERR: Import without usable manifest failed.")
+
+    def test_snapshot(self):
+        self.config_file.enable_import_cache = True
+        config:dict = self.config_file.createTestConfig()
+        config_path:str = os.path.abspath(self.config_file.config_path)
+        work_path:str = os.path.abspath(os.path.join(self.temp_dir, 'work'))
+        
+        os.makedirs(work_path)
+        subprocess.run(['git', 'init', '-q'], cwd=work_path, check=True)
+        shutil.copy(self.temp_AssemblyExample_path, work_path)
+        shutil.copy(self.temp_BIMExample_path, work_path)
+        
+        original_cwd:str = os.getcwd()
+        try:
+            os.chdir(work_path)
+            FCStd_file_path:str = 'AssemblyExample.FCStd'
+            FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config)
+            export_FCStd_file(FCStd_file_path, FCStd_dir_path, config, config['include_thumbnails'])
+            with open(FCStd_file_path, 'rb') as f:
+                original:bytes = f.read()
+            
+            # Snapshot through its `.changefile`, like the fstash/freset scripts do
+            stdin:StringIO = StringIO()
+            stdin.buffer = io.BytesIO(os.fsencode(os.path.join(FCStd_dir_path, '.changefile')) + b'\0')
+            with patch('sys.argv', [FILE_NAME, '--SILENT', '--CONFIG-FILE', config_path, '--snapshot']), patch('sys.stdin', stdin):
+                main()
+            
+            # Git operation changes the .FCStd file, directory goes back to the snapshotted contents => Snapshot moved back
+            shutil.copy('BIMExample.FCStd', FCStd_file_path)
+            os.chmod(FCStd_file_path, READONLY)
+            with patch('FreeCAD_Automation.FCStdFileTool.create_FCStd_file') as mock_create, patch('FreeCAD_Automation.FCStdFileTool.create_FCStd_file_from_manifest') as mock_create_from_manifest:
+                import_FCStd_file(FCStd_dir_path, FCStd_file_path, config, True)
+                mock_create.assert_not_called()
+                mock_create_from_manifest.assert_not_called()
+            
+            with open(FCStd_file_path, 'rb') as f:
+                self.assertEqual(f.read(), original, "ERR: Snapshot should be restored.")
+            self.assertFalse(os.stat(FCStd_file_path).st_mode & 0o200, "ERR: Restored .FCStd file should stay readonly.")
+            self.assertEqual(get_import_cache_stats(config)['snapshot_restores'], 1, "ERR: Snapshot restore should be counted.")
+            self.assertEqual(get_import_cache_stats(config)['entries'], 0, "ERR: Snapshot should be moved out of the cache.")
+            
+            # Only snapshots of another .FCStd file => Rebuilt without reading the directory's files
+            snapshot_FCStd_files(['BIMExample.FCStd'], config)
+            os.chmod(FCStd_file_path, WRITABLE)
+            with patch('FreeCAD_Automation.FCStdFileTool.create_FCStd_file_from_manifest') as mock_create_from_manifest, patch('FreeCAD_Automation.FCStdFileTool.get_FCStd_dir_digest') as mock_digest:
+                import_FCStd_file(FCStd_dir_path, FCStd_file_path, config, True)
+                mock_create_from_manifest.assert_called_once()
+                mock_digest.assert_not_called()
+            
+            # Snapshot of this .FCStd file, directory changed since => Sizes differ, rebuilt without reading the directory's files
+            snapshot_FCStd_files([FCStd_file_path], config)
+            with open(os.path.join(FCStd_dir_path, 'Document.xml'), 'a') as f:
+                f.write("\n")
+            with patch('FreeCAD_Automation.FCStdFileTool.create_FCStd_file_from_manifest') as mock_create_from_manifest, patch('FreeCAD_Automation.FCStdFileTool.get_FCStd_dir_digest') as mock_digest:
+                import_FCStd_file(FCStd_dir_path, FCStd_file_path, config, True)
+                mock_create_from_manifest.assert_called_once()
+                mock_digest.assert_not_called()
+        finally:
+            os.chdir(original_cwd)
+
+    def test_watch_export(self):
+        config:dict = self.config_file.createTestConfig()
+        config['require_lock'] = False
+        FCStd_file_path:str = self.temp_AssemblyExample_path
+        FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config)
+        
+        def read_dir() -> dict:
+            contents:dict = {}
+            for root, _, files in os.walk(FCStd_dir_path):
+                for file in files:
+                    with open(os.path.join(root, file), 'rb') as f:
+                        contents[os.path.relpath(os.path.join(root, file), FCStd_dir_path)] = f.read()
+            return contents
+        
+        # Expected result: regular export
+        export_FCStd_file(FCStd_file_path, FCStd_dir_path, config, config['include_thumbnails'])
+        expected:dict = read_dir()
+        shutil.rmtree(FCStd_dir_path)
+        
+        os.chmod(FCStd_file_path, READONLY)
+        self.assertEqual(export_saved_FCStd_file(FCStd_file_path, config, True), "SKIPPED (readonly)", "ERR: Readonly .FCStd file should not be exported.")
+        os.chmod(FCStd_file_path, WRITABLE)
+        
+        self.assertTrue(export_saved_FCStd_file(FCStd_file_path, config, True).startswith("SUCCESS"), "ERR: Saved .FCStd file should be exported.")
+        exported:dict = read_dir()
+        self.assertEqual(sorted(exported), sorted(expected), "ERR: Exported files differ from regular export.")
+        for path, data in expected.items():
+            if path.endswith('.zip') or path == '.changefile': continue # Zip timestamps and export time differ
+            self.assertEqual(exported[path], data, f"ERR: Exported '{path}' differs from regular export.")
+        self.assertEqual(get_FCStd_sync_status(FCStd_file_path, config)[0], VERIFY_IN_SYNC, "ERR: Exported directory doesn't match .FCStd file.")
+        
+        # Written by GitCAD itself (`.changefile` newer, or an import with the directory's contents) => Not exported again
+        changefile_path:str = os.path.join(FCStd_dir_path, '.changefile')
+        self.assertEqual(export_saved_FCStd_file(FCStd_file_path, config, True), "SKIPPED (already exported)", "ERR: Just exported .FCStd file should not be exported again.")
+        older:float = os.path.getmtime(FCStd_file_path) - 10
+        os.utime(changefile_path, (older, older))
+        self.assertEqual(export_saved_FCStd_file(FCStd_file_path, config, True), "SKIPPED (already exported)", "ERR: Imported .FCStd file should not be exported.")
+        
+        # Directory out of sync (missing file, stale file) => Only those files change
+        missing_path:str = sorted(path for path in expected if not path.endswith('.zip') and not path.startswith('.'))[0]
+        os.remove(os.path.join(FCStd_dir_path, missing_path))
+        with open(os.path.join(FCStd_dir_path, 'stale.txt'), 'w') as f:
+            f.write("stale")
+        self.assertEqual(export_saved_FCStd_file(FCStd_file_path, config, True), "SUCCESS (2 files changed)", "ERR: Only the missing and stale files should change.")
+        self.assertTrue(os.path.exists(os.path.join(FCStd_dir_path, missing_path)), "ERR: Missing file should be written.")
+        self.assertFalse(os.path.exists(os.path.join(FCStd_dir_path, 'stale.txt')), "ERR: Stale file should be removed.")
+        self.assertGreaterEqual(os.path.getmtime(os.path.join(FCStd_dir_path, '.changefile')), os.path.getmtime(FCStd_file_path), "ERR: Clean filter should see the .FCStd file as exported.")
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), "inotify is Linux only")
+    def test_inotify_watcher(self):
+        watched_dir:str = os.path.join(self.temp_dir, 'watched')
+        os.makedirs(watched_dir)
+        
+        with InotifyWatcher() as watcher:
+            watcher.add_watch(watched_dir)
+            self.assertEqual(watcher.read_events(0), [], "ERR: No events expected yet.")
+            
+            with open(os.path.join(watched_dir, 'saved.FCStd.tmp'), 'w') as f:
+                f.write("data")
+            os.replace(os.path.join(watched_dir, 'saved.FCStd.tmp'), os.path.join(watched_dir, 'saved.FCStd'))
+            
+            written:list = []
+            while len(written) < 2:
+                events:list = watcher.read_events(1)
+                self.assertTrue(events, "ERR: Timed out waiting for inotify events.")
+                written.extend(events)
+            self.assertEqual(written, [os.path.join(watched_dir, 'saved.FCStd.tmp'), os.path.join(watched_dir, 'saved.FCStd')], "ERR: Close after write and rename events expected.")
+
+    def test_show(self):
+        config:dict = self.config_file.createTestConfig()
+        config_path:str = os.path.abspath(self.config_file.config_path)
+        work_path:str = os.path.abspath(os.path.join(self.temp_dir, 'work'))
+        
+        def git(*args:str) -> str:
+            return subprocess.run(['git', *args], cwd=work_path, check=True, capture_output=True).stdout.decode()
+        
+        os.makedirs(work_path)
+        git('init', '-q')
+        git('config', 'user.name', 'test')
+        git('config', 'user.email', 'test@localhost')
+        shutil.copy(self.temp_AssemblyExample_path, work_path)
+        
+        original_cwd:str = os.getcwd()
+        try:
+            os.chdir(work_path)
+            FCStd_file_path:str = 'AssemblyExample.FCStd'
+            FCStd_dir_path:str = get_FCStd_dir_path(FCStd_file_path, config)
+            
+            with zipfile.ZipFile(FCStd_file_path, 'r') as zf:
+                expected:dict = {info.filename: zf.read(info) for info in zf.infolist() if not info.is_dir()}
+            
+            export_FCStd_file(FCStd_file_path, FCStd_dir_path, config, config['include_thumbnails'])
+            git('add', '-A')
+            git('commit', '-q', '-m', 'export')
+            revision:str = git('rev-parse', 'HEAD').strip()
+            
+            # Later revision without the directory, working tree and index must stay untouched by --show
+            git('rm', '-q', '-r', FCStd_dir_path)
+            git('commit', '-q', '-m', 'remove')
+            shutil.rmtree(FCStd_dir_path, ignore_errors=True)
+            
+            output_FCStd_file_path:str = os.path.join('shown', 'AssemblyExample@old.FCStd')
+            with patch('sys.argv', [FILE_NAME, '--SILENT', '--CONFIG-FILE', config_path, '--show', revision, FCStd_file_path, output_FCStd_file_path]):
+                main()
+            
+            with zipfile.ZipFile(output_FCStd_file_path, 'r') as zf:
+                shown:dict = {info.filename: zf.read(info) for info in zf.infolist() if not info.is_dir()}
+            
+            self.assertEqual(sorted(shown), sorted(expected), "ERR: Rebuilt .FCStd file members differ from original.")
+            for name, data in expected.items():
+                self.assertEqual(shown[name], data, f"ERR: Rebuilt '{name}' differs from original.")
+            
+            self.assertFalse(os.path.exists(FCStd_dir_path), "ERR: --show should not touch the working tree.")
+            self.assertEqual(git('ls-files', '--', FCStd_dir_path), "", "ERR: --show should not touch the index.")
+            
+            # Directory doesn't exist at this revision
+            with patch('sys.argv', [FILE_NAME, '--SILENT', '--CONFIG-FILE', config_path, '--show', 'HEAD', FCStd_file_path, output_FCStd_file_path]), patch('sys.stderr', new_callable=StringIO):
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+            self.assertEqual(cm.exception.code, 1, "ERR: Missing directory at revision should fail.")
+        finally:
+            os.chdir(original_cwd)
+
+    def test_storage_stats(self):
+        config:dict = self.config_file.createTestConfig()
+        config_path:str = os.path.abspath(self.config_file.config_path)
+        work_path:str = os.path.abspath(os.path.join(self.temp_dir, 'work'))
+        
+        def git(*args:str) -> str:
+            return subprocess.run(['git', *args], cwd=work_path, check=True, capture_output=True).stdout.decode()
+        
+        os.makedirs(work_path)
+        git('init', '-q')
+        git('config', 'user.name', 'test')
+        git('config', 'user.email', 'test@localhost')
+        shutil.copy(self.temp_AssemblyExample_path, work_path)
+        shutil.copy(self.temp_BIMExample_path, work_path)
+        
+        original_cwd:str = os.getcwd()
+        try:
+            os.chdir(work_path)
+            FCStd_file_paths:list = ['AssemblyExample.FCStd', 'BIMExample.FCStd']
+            for FCStd_file_path in FCStd_file_paths:
+                export_FCStd_file(FCStd_file_path, get_FCStd_dir_path(FCStd_file_path, config), config, config['include_thumbnails'])
+            git('add', '-A')
+            git('commit', '-q', '-m', 'export')
+            
+            FCStd_dir_path:str = get_FCStd_dir_path('AssemblyExample.FCStd', config)
+            zip_path:str = os.path.join(FCStd_dir_path, next(name for name in sorted(os.listdir(FCStd_dir_path)) if name.endswith('.zip')))
+            zip_size:int = os.path.getsize(zip_path)
+            
+            # New version of the shard stored in LFS (checked out as a pointer)
+            with open(zip_path, 'w') as f:
+                f.write(f"{LFS_POINTER_PREFIX.decode()}\noid sha256:{'1' * 64}\nsize 1000000000\n")
+            git('add', '-A')
+            git('commit', '-q', '-m', 'edit')
+            
+            stats:dict = get_storage_stats(FCStd_file_paths, config, ['--all'], True)
+            models:dict = {model['FCStd_file']: model for model in stats['models']}
+            self.assertEqual(stats['models'][0]['FCStd_file'], 'AssemblyExample.FCStd', "ERR: Model with most churn should be listed first.")
+            self.assertEqual(models['AssemblyExample.FCStd']['history']['versions'], 2, "ERR: Both versions of the shard should be counted.")
+            self.assertEqual(models['AssemblyExample.FCStd']['history']['commits'], 2, "ERR: Both commits of the shard should be counted.")
+            self.assertEqual(models['AssemblyExample.FCStd']['history']['bytes'], zip_size + 1000000000, "ERR: LFS pointer should be sized by its object, other blobs by git.")
+            self.assertEqual(models['AssemblyExample.FCStd']['shards_not_pulled'], 1, "ERR: Shard checked out as LFS pointer not detected.")
+            self.assertEqual(models['BIMExample.FCStd']['history']['versions'], models['BIMExample.FCStd']['shards'], "ERR: Unchanged shards should have one version each.")
+            self.assertLess(models['BIMExample.FCStd']['ratio'], 1, "ERR: Compressed model should be stored smaller than its raw contents.")
+            
+            for pattern, pattern_stats in stats['patterns'].items():
+                self.assertIn(pattern, config['compress_binaries']['binary_file_patterns'], f"ERR: '{pattern}' isn't a `files-to-compress` pattern.")
+                self.assertLessEqual(pattern_stats['compressed_bytes'], pattern_stats['raw_bytes'] * 1.1, f"ERR: '{pattern}' compressed size implausible.")
+            
+            with patch('sys.argv', [FILE_NAME, '--CONFIG-FILE', config_path, '--stats', '--json']), patch('sys.stdout', new_callable=StringIO) as stdout:
+                main()
+            self.assertEqual(json.loads(stdout.getvalue())['total']['history_versions'], stats['total']['history_versions'], "ERR: JSON output differs.")
+            
+            with patch('sys.argv', [FILE_NAME, '--CONFIG-FILE', config_path, '--stats', 'BIMExample.FCStd', '--top', '1']), patch('sys.stdout', new_callable=StringIO) as stdout:
+                main()
+            self.assertIn("Top 1 models by churn", stdout.getvalue(), "ERR: Table not printed.")
+            self.assertNotIn("AssemblyExample", stdout.getvalue(), "ERR: Only the given .FCStd file should be reported.")
+            
+            # Shared store blobs in several subdirectories
+            config['compress_binaries']['shared_store']['enabled'] = True
+            config['compress_binaries']['shared_store']['store_directory'] = 'FreeCAD_Binary_Store'
+            for sha256 in ['ab' + '0' * 62, 'cd' + '0' * 62]:
+                blob_path:str = get_shared_store_blob_path(sha256, config)
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                with open(blob_path, 'wb') as f:
+                    f.write(sha256.encode())
+            git('add', '-A')
+            git('commit', '-q', '-m', 'store')
+            
+            stats:dict = get_storage_stats(FCStd_file_paths, config, ['--all'], True)
+            store_models:list = [model for model in stats['models'] if model['directory'].split(os.sep)[0] == 'FreeCAD_Binary_Store']
+            self.assertEqual(len(store_models), 1, "ERR: Shared store should be reported as one row.")
+            self.assertEqual(store_models[0]['history']['versions'], 2, "ERR: Every shared store blob should be counted.")
+            self.assertTrue(store_models[0]['shared_store'], "ERR: Shared store row not marked.")
+        finally:
+            os.chdir(original_cwd)
+
+    def test_LFS_gc(self):
+        self.config_file.gc_keep_recent_commits = 2
+        self.config_file.gc_keep_branches = ["release"]
+        config:dict = self.config_file.createTestConfig()
+        config_path:str = os.path.abspath(self.config_file.config_path)
+        work_path:str = os.path.abspath(os.path.join(self.temp_dir, 'work'))
+        shard_path:str = os.path.join('uncompressed', 'FCStd_Model_FCStd', f"{config['compress_binaries']['zip_file_prefix']}1.zip")
+        
+        def git(*args:str) -> str:
+            return subprocess.run(['git', *args], cwd=work_path, check=True, capture_output=True).stdout.decode()
+        
+        def commit_shard_version(oid:str, message:str=None):
+            # Emulates `git lfs clean`: pointer in git, object in the local LFS store
+            object_path:str = os.path.join(work_path, '.git', 'lfs', 'objects', oid[0:2], oid[2:4], oid)
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            with open(object_path, 'wb') as f:
+                f.write(b'0' * 1024)
+            with open(os.path.join(work_path, shard_path), 'w') as f:
+                f.write(f"{LFS_POINTER_PREFIX.decode()}\noid sha256:{oid}\nsize 1024\n")
+            if message:
+                git('add', '-A')
+                git('commit', '-q', '-m', message)
+        
+        oids:list = [str(i) * 64 for i in range(1, 7)]
+        os.makedirs(os.path.join(work_path, os.path.dirname(shard_path)))
+        git('init', '-q')
+        git('config', 'user.name', 'test')
+        git('config', 'user.email', 'test@localhost')
+        
+        commit_shard_version(oids[0], 'v1')
+        git('branch', 'release')
+        commit_shard_version(oids[1], 'v2')
+        commit_shard_version(oids[2], 'v3')
+        git('update-ref', 'refs/remotes/origin/main', 'HEAD') # v1-v3 pushed
+        commit_shard_version(oids[3], 'v4') # Not pushed
+        commit_shard_version(oids[4])
+        git('stash', '-q')
+        commit_shard_version(oids[5]) # Orphan object, never committed
+        git('checkout', '-q', '--', '.')
+        
+        original_cwd:str = os.getcwd()
+        try:
+            os.chdir(work_path)
+            plan:dict = get_LFS_gc_plan(config)
+            self.assertEqual([item['oid'] for item in plan['prune']], [oids[1]], "ERR: Only the pushed object outside the retention window (release, 2 recent commits, stash) should be pruned.")
+            self.assertEqual(plan['prune'][0]['path'], shard_path.replace(os.sep, '/'), "ERR: Unexpected shard path.")
+            self.assertEqual(plan['prune_bytes'], 1024, "ERR: Unexpected prune size.")
+            self.assertEqual(plan['retained'], 4, "ERR: v1 (release), v3, v4 (HEAD) and the stash should be retained.")
+            self.assertEqual(plan['not_pushed'], 2, "ERR: v4 and the stash aren't pushed.")
+            
+            with patch('sys.argv', [FILE_NAME, '--CONFIG-FILE', config_path, '--gc', '--dry-run']), patch('sys.stdout', new_callable=StringIO) as stdout:
+                main()
+            self.assertIn("Would prune 1 LFS objects", stdout.getvalue(), "ERR: Dry run summary not printed.")
+            self.assertTrue(all(os.path.isfile(get_LFS_object_path(oid)) for oid in oids), "ERR: Dry run removed LFS objects.")
+            
+            with patch('sys.argv', [FILE_NAME, '--CONFIG-FILE', config_path, '--gc']), patch('sys.stdout', new_callable=StringIO) as stdout:
+                main()
+            self.assertEqual([oid for oid in oids if not os.path.isfile(get_LFS_object_path(oid))], [oids[1]], "ERR: Only the planned object should be removed.")
+            
+            # Nothing on a remote => Nothing pruned
+            git('update-ref', '-d', 'refs/remotes/origin/main')
+            self.assertEqual(get_LFS_gc_plan(config)['prune'], [], "ERR: Objects that weren't pushed must never be pruned.")
+        finally:
+            os.chdir(original_cwd)
+
+    @unittest.skipUnless(shutil.which('git-lfs'), "git-lfs not installed")
+    def test_pull_missing_LFS_objects__local_remote(self):
+        config:dict = self.config_file.createTestConfig()
+        remote_path:str = os.path.abspath(os.path.join(self.temp_dir, 'remote.git'))
+        work_path:str = os.path.abspath(os.path.join(self.temp_dir, 'work'))
+        clone_path:str = os.path.abspath(os.path.join(self.temp_dir, 'clone'))
+        
+        def git(cwd:str, *args:str, env:dict=None):
+            subprocess.run(['git', *args], cwd=cwd, check=True, capture_output=True, env={**os.environ, **(env or {})})
+        
+        # Local bare remote, LFS objects are stored in it by git-lfs' file:// transfer adapter
+        git(self.temp_dir, 'init', '-q', '--bare', remote_path)
+        git(self.temp_dir, 'init', '-q', work_path)
+        git(work_path, 'lfs', 'install', '--local')
+        git(work_path, 'config', 'user.name', 'test')
+        git(work_path, 'config', 'user.email', 'test@localhost')
+        with open(os.path.join(work_path, '.gitattributes'), 'w') as f:
+            f.write("*.zip filter=lfs diff=lfs merge=lfs -text\n")
+        
+        shutil.copy(self.temp_AssemblyExample_path, work_path)
+        shutil.copy(self.temp_BIMExample_path, work_path)
+        
+        original_cwd:str = os.getcwd()
+        try:
+            os.chdir(work_path)
+            for FCStd_file_path in ['AssemblyExample.FCStd', 'BIMExample.FCStd']:
+                export_FCStd_file(FCStd_file_path, get_FCStd_dir_path(FCStd_file_path, config), config, config['include_thumbnails'])
+            
+            git(work_path, 'add', '.gitattributes', 'uncompressed')
+            git(work_path, 'commit', '-q', '-m', 'export')
+            git(work_path, 'push', '-q', f"file://{remote_path}", 'HEAD:refs/heads/main')
+            
+            git(self.temp_dir, 'clone', '-q', '--branch', 'main', f"file://{remote_path}", clone_path, env={"GIT_LFS_SKIP_SMUDGE": "1"})
+            
+            os.chdir(clone_path)
+            AssemblyExample_dir:str = get_FCStd_dir_path('AssemblyExample.FCStd', config, check_exists=False)
+            BIMExample_dir:str = get_FCStd_dir_path('BIMExample.FCStd', config, check_exists=False)
+            
+            self.assertTrue(all(is_LFS_pointer_file(path) for path in get_LFS_paths_for_import(AssemblyExample_dir, config)), "ERR: Shards were downloaded by clone.")
+            
+            pull_missing_LFS_objects([AssemblyExample_dir], config)
+            
+            self.assertTrue(all(zipfile.is_zipfile(path) for path in get_LFS_paths_for_import(AssemblyExample_dir, config)), "ERR: Shards of imported directory were not pulled.")
+            self.assertTrue(all(is_LFS_pointer_file(path) for path in get_LFS_paths_for_import(BIMExample_dir, config)), "ERR: Shards of other directory were pulled.")
+        finally:
+            os.chdir(original_cwd)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -14,9 +14,15 @@ TRUE=0
 FALSE=1
 
 CONFIG_FILE="FreeCAD_Automation/config.json"
+CONFIG_SHELL_SNAPSHOT="FreeCAD_Automation/.config-snapshot.sh" # Written by `FCStdFileTool.py --compile-config`
 FCStdFileTool="FreeCAD_Automation/FCStdFileTool.py"
 PYTHON_EXEC="FreeCAD_Automation/python.sh"
 
+# Lock verdicts printed by `FCStdFileTool.py --resolve-changes`
+LOCK_HELD="locked"
+LOCK_NOT_HELD="not-locked"
+LOCK_NOT_REQUIRED="not-required"
+
 # ==============================================================================================
 #                                      Sourcing Only Check                                      
 # ==============================================================================================
@@ -171,6 +177,17 @@ get_require_gitcad_activation_bool() {
     fi
 }
 
+# DESCRIPTION: Function to validate the config file (every problem is listed) and rewrite its snapshots, IE the shell snapshot sourced below
+# USAGE: `compile_config || exit $FAIL`
+compile_config() {
+    "$PYTHON_EXEC" "$FCStdFileTool" --CONFIG-FILE --compile-config || {
+        echo "Error: Failed to compile '$CONFIG_FILE', fix the errors above." >&2
+        return $FAIL
+    }
+
+    return $SUCCESS
+}
+
 # DESCRIPTION: Function to make a file readonly on both Linux and Windows (via MSYS/Git Bash)
 # USAGE: `make_readonly "path/to/file.ext"`
 make_readonly() {
@@ -244,9 +261,6 @@ get_FCStd_dir() {
 FCStd_file_has_valid_lock() {
     local FCStd_file_path="$1"
 
-    local REQUIRE_LOCKS
-    REQUIRE_LOCKS="$(get_require_locks_bool "$CONFIG_FILE")" || return $FAIL
-
     # If locks not required, return valid
     if [ "$REQUIRE_LOCKS" = "$FALSE" ]; then
         # echo "DEBUG: Locks not required, '$FCStd_file_path' lock is valid." >&2
@@ -333,6 +347,109 @@ get_FCStd_file_from_changefile() {
     return $SUCCESS
 }
 
+# DESCRIPTION: Function to resolve changed paths (NUL separated on stdin) to their .FCStd files, uncompressed dirs, lockfiles and lock verdicts in a single python call.
+    # Outputs NUL terminated records of tab separated fields: FCStd_file_path FCStd_dir_path lockfile lock_verdict ($LOCK_HELD, $LOCK_NOT_HELD or $LOCK_NOT_REQUIRED).
+    # FCStd_file_path is empty if the `.changefile` doesn't exist (IE directory deleted).
+    # Pass `--scoped` to skip paths outside the configured `sync-scope`.
+# USAGE:
+    # `mapfile -d '' RECORDS < <(git diff-tree -z --no-commit-id --name-only -r "$OLD_SHA" "$NEW_SHA" | resolve_changed_FCStd_files [--scoped]); wait $! || exit $FAIL`
+    # `for record in "${RECORDS[@]}"; do IFS=$'\t' read -r FCStd_file_path FCStd_dir_path lockfile lock_verdict <<<"$record"; done`
+resolve_changed_FCStd_files() {
+    "$PYTHON_EXEC" "$FCStdFileTool" --CONFIG-FILE --resolve-changes "$@" || {
+        echo "Error: Failed to resolve changed paths to .FCStd files" >&2
+        return $FAIL
+    }
+
+    return $SUCCESS
+}
+
+# DESCRIPTION: Function to download the missing LFS files (compressed binaries, shared store blobs) needed to import the .FCStd files of `resolve_changed_FCStd_files` records, in a single `git lfs pull --include` call
+# USAGE: `lfs_pull_for_FCStd_records "${RECORDS[@]}"`
+lfs_pull_for_FCStd_records() {
+    local FCStd_file_paths=()
+    local record
+    for record in "$@"; do
+        # Note: First tab separated field is the .FCStd file path (empty if unknown)
+        [ -n "${record%%$'\t'*}" ] && FCStd_file_paths+=("${record%%$'\t'*}")
+    done
+
+    [ ${#FCStd_file_paths[@]} -eq 0 ] && return $SUCCESS
+
+    printf '%s\0' "${FCStd_file_paths[@]}" | "$PYTHON_EXEC" "$FCStdFileTool" --CONFIG-FILE --lfs-pull || {
+        echo "Error: Failed to pull LFS files for changed .FCStd files" >&2
+        return $FAIL
+    }
+
+    return $SUCCESS
+}
+
+# DESCRIPTION: Function to import or export .FCStd files in a single python call, scheduled by size and estimated memory (`job-scheduling` in the config file).
+    # Largest files start first, a per-file report (time, CPU, peak memory) is printed to stderr at the end.
+    # Outputs the NUL terminated paths of the .FCStd files imported/exported successfully, fails if any file failed (errors are printed to stderr).
+# USAGE: `mapfile -d '' -t DONE_FCStd_file_paths < <(run_FCStd_file_jobs "import" "${FCStd_file_paths[@]}")`
+run_FCStd_file_jobs() {
+    local mode="$1"
+    shift
+
+    [ $# -eq 0 ] && return $SUCCESS
+
+    printf '%s\0' "$@" | "$PYTHON_EXEC" "$FCStdFileTool" --CONFIG-FILE --batch "$mode" || {
+        echo "Error: Failed to $mode some .FCStd files, skipping them..." >&2
+        return $FAIL
+    }
+
+    return $SUCCESS
+}
+
+# DESCRIPTION: Function to import the .FCStd files of `resolve_changed_FCStd_files` records (see run_FCStd_file_jobs()), then clear their modification and set them readonly/writable by their lock verdict
+# USAGE: `import_FCStd_records "${RECORDS[@]}"`
+import_FCStd_records() {
+    local FCStd_file_paths=()
+    local -A lock_verdicts # Bash Dictionary
+    local record FCStd_file_path FCStd_dir_path lockfile lock_verdict
+    for record in "$@"; do
+        IFS=$'\t' read -r FCStd_file_path FCStd_dir_path lockfile lock_verdict <<<"$record"
+        [ -z "$FCStd_file_path" ] && continue
+
+        # echo -e "\nDEBUG: checking '$FCStd_dir_path/.changefile'....$(grep -F -- 'File Last Exported On:' "$FCStd_dir_path/.changefile")" >&2
+        FCStd_file_paths+=("$FCStd_file_path")
+        lock_verdicts["$FCStd_file_path"]="$lock_verdict"
+    done
+
+    local imported_FCStd_file_paths=()
+    mapfile -d '' -t imported_FCStd_file_paths < <(run_FCStd_file_jobs "import" "${FCStd_file_paths[@]}")
+
+    for FCStd_file_path in "${imported_FCStd_file_paths[@]}"; do
+        GIT_COMMAND="fcmod" git fcmod "$FCStd_file_path"
+
+        if [ "${lock_verdicts["$FCStd_file_path"]}" = "$LOCK_HELD" ]; then
+            # User has lock, set .FCStd file to writable
+            make_writable "$FCStd_file_path"
+            # echo "DEBUG: set '$FCStd_file_path' writable." >&2
+        elif [ "${lock_verdicts["$FCStd_file_path"]}" = "$LOCK_NOT_HELD" ]; then
+            # User doesn't have lock, set .FCStd file to readonly
+            make_readonly "$FCStd_file_path"
+            # echo "DEBUG: set '$FCStd_file_path' readonly." >&2
+        fi
+    done
+
+    return $SUCCESS
+}
+
+# DESCRIPTION: Function to snapshot .FCStd files (given directly or through their `.changefile`) into the import cache before a git operation rewrites their uncompressed directories, in a single python call.
+    # Imports of a directory whose contents match a snapshot afterwards (IE `git fstash pop`) move the snapshot back instead of rebuilding the .FCStd file.
+    # Failing to snapshot only makes those imports slower, so it never fails the caller.
+# USAGE: `snapshot_FCStd_files "path/to/file.FCStd" "path/to/uncompressed/dir/.changefile" ...`
+snapshot_FCStd_files() {
+    [ $# -eq 0 ] && return $SUCCESS
+
+    printf '%s\0' "$@" | "$PYTHON_EXEC" "$FCStdFileTool" --SILENT --CONFIG-FILE --snapshot || {
+        echo "Warning: Failed to snapshot .FCStd files, they will be rebuilt instead" >&2
+    }
+
+    return $SUCCESS
+}
+
 # DESCRIPTION: Function to check if a directory has changes between two commits
 # USAGE:
     # `DIR_HAS_CHANGES="$(dir_has_changes "path/to/dir")" || exit $FAIL`
@@ -358,10 +475,15 @@ dir_has_changes() {
 #                                   Global Config Variables
 # ==============================================================================================
 # Only set if the config file exists
+# Note: Sets PYTHON_PATH, REQUIRE_LOCKS and REQUIRE_GITCAD_ACTIVATION from the validated snapshot of the config file.
+    # `-nt` is a bash builtin => An up to date snapshot is sourced without spawning a single process, it's only recompiled after the config file changes.
 if [ -f "$CONFIG_FILE" ]; then
-    PYTHON_PATH="$(get_freecad_python_path "$CONFIG_FILE")" || exit $FAIL
-    REQUIRE_LOCKS="$(get_require_locks_bool "$CONFIG_FILE")" || exit $FAIL
-    REQUIRE_GITCAD_ACTIVATION="$(get_require_gitcad_activation_bool "$CONFIG_FILE")" || exit $FAIL
+    if ! [ "$CONFIG_SHELL_SNAPSHOT" -nt "$CONFIG_FILE" ]; then
+        # echo "DEBUG: '$CONFIG_SHELL_SNAPSHOT' is missing or older than '$CONFIG_FILE', compiling..." >&2
+        compile_config || exit $FAIL
+    fi
+
+    source "$CONFIG_SHELL_SNAPSHOT" || exit $FAIL
 
     if [ "$REQUIRE_GITCAD_ACTIVATION" = "$TRUE" ] && [ "$ignore_GitCAD_activation" = "$FALSE" ]; then
         if [ -z "$GITCAD_ACTIVATED" ] || [ "$GITCAD_ACTIVATED" = "$FALSE" ]; then